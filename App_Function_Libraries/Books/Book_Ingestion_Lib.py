@@ -27,7 +27,7 @@ from bs4 import BeautifulSoup
 from ebooklib import epub
 #
 # Import Local
-from App_Function_Libraries.DB.DB_Manager import add_media_with_keywords, add_media_to_database
+from App_Function_Libraries.DB.DB_Manager import add_media_with_keywords, add_media_to_database, add_media_batch
 from App_Function_Libraries.Summarization.Summarization_General_Lib import perform_summarization
 from App_Function_Libraries.Chunk_Lib import chunk_ebook_by_chapters
 from App_Function_Libraries.Metrics.metrics_logger import log_counter, log_histogram
@@ -642,9 +642,9 @@ def extract_epub_metadata(content):
     return title, author
 
 
-def ingest_text_file(file_path, title=None, author=None, keywords=None):
+def _text_file_record(file_path, title=None, author=None, keywords=None):
     """
-    Ingests a plain text file into the database with optional metadata.
+    Reads a text file and builds the media record used to ingest it.
 
     Parameters:
         - file_path (str): Path to the text file.
@@ -653,73 +653,115 @@ def ingest_text_file(file_path, title=None, author=None, keywords=None):
         - keywords (str, optional): Comma-separated keywords.
 
     Returns:
-        - str: Status message indicating success or failure.
+        - dict: Media record accepted by add_media_with_keywords / add_media_batch.
     """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
+    with open(file_path, 'r', encoding='utf-8') as file:
+        content = file.read()
+
+    # Check if it's a converted epub and extract metadata if so
+    if 'epub_converted' in (keywords or '').lower():
+        extracted_title, extracted_author = extract_epub_metadata(content)
+        title = title or extracted_title
+        author = author or extracted_author
+        logging.debug(f"Extracted metadata for converted EPUB - Title: {title}, Author: {author}")
+
+    # If title is still not provided, use the filename without extension
+    if not title:
+        title = os.path.splitext(os.path.basename(file_path))[0]
+
+    # If author is still not provided, set it to 'Unknown'
+    if not author:
+        author = 'Unknown'
+
+    # If keywords are not provided, use a default keyword
+    if not keywords:
+        keywords = 'text_file,epub_converted'
+    else:
+        keywords = f'text_file,epub_converted,{keywords}'
+
+    # Empty URL: the DB derives one from the content hash, so separate books don't collide on a shared placeholder
+    return {
+        'url': '',
+        'title': title,
+        'media_type': 'book',
+        'content': content,
+        'keywords': keywords,
+        'prompt': 'No prompt for text files',
+        'summary': 'No summary for text files',
+        'transcription_model': 'None',
+        'author': author,
+        'ingestion_date': datetime.now().strftime('%Y-%m-%d'),
+    }
 
-        # Check if it's a converted epub and extract metadata if so
-        if 'epub_converted' in (keywords or '').lower():
-            extracted_title, extracted_author = extract_epub_metadata(content)
-            title = title or extracted_title
-            author = author or extracted_author
-            logging.debug(f"Extracted metadata for converted EPUB - Title: {title}, Author: {author}")
 
-        # If title is still not provided, use the filename without extension
-        if not title:
-            title = os.path.splitext(os.path.basename(file_path))[0]
+def ingest_text_file(file_path, title=None, author=None, keywords=None):
+    """
+    Ingests a plain text file into the database with optional metadata.
 
-        # If author is still not provided, set it to 'Unknown'
-        if not author:
-            author = 'Unknown'
+    Parameters:
+        - file_path (str): Path to the text file.
+        - title (str, optional): Title of the document.
+        - author (str, optional): Author of the document.
+        - keywords (str, optional): Comma-separated keywords.
 
-        # If keywords are not provided, use a default keyword
-        if not keywords:
-            keywords = 'text_file,epub_converted'
-        else:
-            keywords = f'text_file,epub_converted,{keywords}'
+    Returns:
+        - str: Status message indicating success or failure.
+    """
+    try:
+        record = _text_file_record(file_path, title, author, keywords)
 
         # Add the text file to the database
-        add_media_with_keywords(
-            url="its_a_book",
-            title=title,
-            media_type='book',
-            content=content,
-            keywords=keywords,
-            prompt='No prompt for text files',
-            summary='No summary for text files',
-            transcription_model='None',
-            author=author,
-            ingestion_date=datetime.now().strftime('%Y-%m-%d')
-        )
+        add_media_with_keywords(**record)
 
-        logging.info(f"Text file '{title}' by {author} ingested successfully.")
-        return f"Text file '{title}' by {author} ingested successfully."
+        logging.info(f"Text file '{record['title']}' by {record['author']} ingested successfully.")
+        return f"Text file '{record['title']}' by {record['author']} ingested successfully."
     except Exception as e:
         logging.error(f"Error ingesting text file: {str(e)}")
         return f"Error ingesting text file: {str(e)}"
 
 
-def ingest_folder(folder_path, keywords=None):
+def ingest_folder(folder_path, keywords=None, batch_size=500):
     """
     Ingests all text files within a specified folder.
 
+    Files are read lazily and written through add_media_batch, so the whole folder is stored with one
+    transaction per `batch_size` files instead of one per file.
+
     Parameters:
         - folder_path (str): Path to the folder containing text files.
         - keywords (str, optional): Comma-separated keywords to add to each file.
+        - batch_size (int, optional): Number of files written per transaction.
 
     Returns:
         - str: Combined status messages for all ingested text files.
     """
     results = []
-    try:
-        logging.info(f"Ingesting all text files from folder {folder_path}")
-        for filename in os.listdir(folder_path):
+    records = []
+
+    def iter_records():
+        for filename in sorted(os.listdir(folder_path)):
             if filename.lower().endswith('.txt'):
                 file_path = os.path.join(folder_path, filename)
-                result = ingest_text_file(file_path, keywords=keywords)
-                results.append(result)
+                try:
+                    record = _text_file_record(file_path, keywords=keywords)
+                except Exception as e:
+                    logging.error(f"Error reading text file {file_path}: {str(e)}")
+                    results.append(f"Error ingesting text file: {str(e)}")
+                    continue
+                # Keep only what the status message needs; the content is released once its batch is written
+                records.append((record['title'], record['author']))
+                yield record
+
+    try:
+        logging.info(f"Ingesting all text files from folder {folder_path}")
+        outcomes = add_media_batch(iter_records(), batch_size=batch_size)
+        for (title, author), outcome in zip(records, outcomes):
+            if outcome['action'] == 'error':
+                results.append(f"Error ingesting text file '{title}': {outcome['error']}")
+            elif outcome['action'] in ('skipped', 'duplicate'):
+                results.append(f"Text file '{title}' by {author} already exists (not updated).")
+            else:
+                results.append(f"Text file '{title}' by {author} ingested successfully.")
         logging.info("Completed ingestion of all text files in the folder.")
     except Exception as e:
         logging.exception(f"Error ingesting folder: {str(e)}")
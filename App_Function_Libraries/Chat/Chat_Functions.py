@@ -23,23 +23,37 @@ from App_Function_Libraries.LLM_API_Calls import chat_with_openai, chat_with_ant
 from App_Function_Libraries.LLM_API_Calls_Local import chat_with_aphrodite, chat_with_local_llm, chat_with_ollama, \
     chat_with_kobold, chat_with_llama, chat_with_oobabooga, chat_with_tabbyapi, chat_with_vllm, chat_with_custom_openai
 from App_Function_Libraries.DB.SQLite_DB import load_media_content
-from App_Function_Libraries.Utils.Utils import generate_unique_filename, load_and_log_configs, logging
+from App_Function_Libraries.Tokenization_Methods_Lib import count_tokens_batch
+from App_Function_Libraries.Utils.Utils import format_api_name, generate_unique_filename, global_api_endpoints, \
+    load_and_log_configs, logging
 from App_Function_Libraries.Metrics.metrics_logger import log_counter, log_histogram
 #
 ####################################################################################################
 #
 # Functions:
 
-def approximate_token_count(history):
+def token_count_model(api_endpoint):
+    """
+    The model configured for a chat API endpoint ("OpenAI", "Llama.cpp", ... as shown in the UI), whose tokenizer
+    counts that chat's tokens. None (the default tokenizer) when no endpoint is selected or it has no model set.
+    """
+    if not api_endpoint or api_endpoint == "None":
+        return None
+    api_name = {format_api_name(api).lower(): api for api in global_api_endpoints}.get(api_endpoint.lower(),
+                                                                                      api_endpoint.lower())
+    api_settings = load_and_log_configs().get(f"{api_name}_api") or {}
+    return api_settings.get('model') or None
+
+
+def approximate_token_count(history, model=None, api_endpoint=None):
+    """
+    Tokens in a chat history of (user message, bot message) pairs, counted with the model's tokenizer. Pass the
+    chat's API endpoint instead of a model to count with the model configured for it.
+    """
     try:
-        total_text = ''
-        for user_msg, bot_msg in history:
-            if user_msg:
-                total_text += user_msg + ' '
-            if bot_msg:
-                total_text += bot_msg + ' '
-        total_tokens = len(total_text.split())
-        return total_tokens
+        model = model or token_count_model(api_endpoint)
+        messages = [message for pair in history for message in pair if message]
+        return sum(count_tokens_batch(messages, model))
     except Exception as e:
         logging.error(f"Error calculating token count: {str(e)}")
         return 0
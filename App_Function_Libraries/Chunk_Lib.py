@@ -6,23 +6,24 @@
 #
 ####
 # Import necessary libraries
+import codecs
 import hashlib
+import io
+import itertools
 import json
+import os
 import re
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 import xml.etree.ElementTree as ET
 #
 # Import 3rd party
-from openai import OpenAI
 from tqdm import tqdm
-from langdetect import detect
-from transformers import GPT2Tokenizer
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from langdetect import DetectorFactory, detect
 #
 # Import Local
+from App_Function_Libraries.DB.DB_Registry import LazyStore, StoreRegistry
+from App_Function_Libraries.Tokenization_Methods_Lib import DEFAULT_TOKENIZER_MODEL, get_token_counter
 from App_Function_Libraries.Utils.Utils import load_and_log_configs, logging
 
 
@@ -30,20 +31,6 @@ from App_Function_Libraries.Utils.Utils import load_and_log_configs, logging
 #######################################################################################################################
 # Config Settings
 #
-#
-# FIXME - Make sure it only downloads if it already exists, and does a check first.
-# Ensure NLTK data is downloaded
-def ensure_nltk_data():
-    try:
-        nltk.data.find('tokenizers/punkt')
-    except LookupError:
-        nltk.download('punkt')
-ensure_nltk_data()
-
-#
-# Load GPT2 tokenizer
-tokenizer = GPT2Tokenizer.from_pretrained("gpt2")
-#
 # Load configuration
 config = load_and_log_configs()
 # Embedding Chunking options
@@ -53,10 +40,81 @@ chunk_options = {
     'overlap': config['chunking_config']['chunk_overlap'] or '200',
     'adaptive': config['chunking_config']['adaptive_chunking'] or False,
     'multi_level': config['chunking_config']['multi_level'] or False,
-    'language': config['chunking_config']['chunk_language'] or None
+    'language': config['chunking_config']['chunk_language'] or None,
+    'tokenizer_model': config['chunking_config'].get('tokenizer_model') or None
 }
 
-openai_api_key = config.get('API', 'openai_api_key')
+openai_api_key = (config.get('openai_api') or {}).get('api_key')
+
+# In offline mode NLTK data (and, in Tokenization_Methods_Lib, tokenizers) are only loaded from the local caches and
+# nothing is downloaded. HF_HUB_OFFLINE=1 turns it on as well.
+chunking_offline = str(config['chunking_config'].get('offline_mode', False)).lower() == 'true' or \
+    os.environ.get('HF_HUB_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+#
+# Heavyweight resources are created the first time a chunker needs them rather than at import, so importing this
+# module stays cheap for everything that imports it (summarize.py, the Gradio app, tests).
+chunk_resources = StoreRegistry()
+
+# Newer NLTK releases load punkt_tab, older ones punkt
+_PUNKT_PACKAGES = ('punkt_tab', 'punkt')
+
+
+def _load_gpt2_tokenizer():
+    # Shared with the token counting service rather than loaded twice
+    counter = get_token_counter(DEFAULT_TOKENIZER_MODEL)
+    if counter.tokenizer is None:
+        raise OSError("The GPT-2 tokenizer could not be loaded; see the log for why")
+    return counter.tokenizer
+
+
+def _punkt_installed() -> bool:
+    import nltk
+    for package in _PUNKT_PACKAGES:
+        try:
+            nltk.data.find(f'tokenizers/{package}')
+            return True
+        except LookupError:
+            pass
+    return False
+
+
+def _load_punkt() -> bool:
+    """Whether NLTK's punkt sentence tokenizer can be used (downloading it once unless offline)."""
+    if _punkt_installed():
+        return True
+    if not chunking_offline:
+        import nltk
+        for package in _PUNKT_PACKAGES:
+            try:
+                nltk.download(package, quiet=True)
+            except Exception as e:
+                logging.warning(f"Could not download NLTK {package}: {e}")
+        if _punkt_installed():
+            return True
+    logging.warning("NLTK punkt data is not available" + (" (offline mode)" if chunking_offline else "") +
+                    "; sentences are split on punctuation instead")
+    return False
+
+
+def _create_openai_client():
+    from openai import OpenAI
+    return OpenAI(api_key=openai_api_key)
+
+
+chunk_resources.register('gpt2_tokenizer', _load_gpt2_tokenizer)
+chunk_resources.register('nltk_punkt', _load_punkt)
+chunk_resources.register('openai_client', _create_openai_client)
+
+# Module-level names kept for existing callers; each loads its resource on first attribute access
+tokenizer = LazyStore(chunk_resources, 'gpt2_tokenizer')
+client = LazyStore(chunk_resources, 'openai_client')
+
+
+def sent_tokenize(text: str, language: str = 'english') -> List[str]:
+    """NLTK's sentence tokenizer for the language, or a punctuation-based split when punkt data is not available."""
+    return get_language_profile(language).split_sentences(text)
+
 #
 # End of settings
 #######################################################################################################################
@@ -91,14 +149,174 @@ openai_api_key = config.get('API', 'openai_api_key')
 #         else:
 #             return [text]
 
-def detect_language(text: str) -> str:
+#
+# Language profiles
+#
+# Language detection looks at a bounded sample of the document, and the per-language tools (punkt sentence splitter,
+# jieba/MeCab word segmenters, stopword lists) are built once per language per process and shared by every chunker.
+
+# Characters of a document that language detection looks at, taken from its start, middle and end
+LANGUAGE_SAMPLE_CHARS = 3000
+# langdetect is randomized; seeding it makes the same text always detect as the same language
+LANGUAGE_DETECTION_SEED = 0
+DetectorFactory.seed = LANGUAGE_DETECTION_SEED
+
+# ISO 639-1 codes (as langdetect returns them) -> NLTK's names for its punkt models and stopword lists
+_NLTK_LANGUAGES = {
+    'ar': 'arabic', 'az': 'azerbaijani', 'ca': 'catalan', 'cs': 'czech', 'da': 'danish', 'de': 'german',
+    'el': 'greek', 'en': 'english', 'es': 'spanish', 'et': 'estonian', 'eu': 'basque', 'fi': 'finnish',
+    'fr': 'french', 'he': 'hebrew', 'hu': 'hungarian', 'id': 'indonesian', 'it': 'italian', 'kk': 'kazakh',
+    'ml': 'malayalam', 'ne': 'nepali', 'nl': 'dutch', 'no': 'norwegian', 'pl': 'polish', 'pt': 'portuguese',
+    'ro': 'romanian', 'ru': 'russian', 'sl': 'slovene', 'sq': 'albanian', 'sv': 'swedish', 'tg': 'tajik',
+    'tr': 'turkish', 'zh': 'chinese',
+}
+_LANGUAGE_CODES = {name: code for code, name in _NLTK_LANGUAGES.items()}
+_LANGUAGE_CODES.update({'japanese': 'ja'})
+# Languages whose sentences are split on their own end punctuation rather than with punkt
+_SENTENCE_PATTERNS = {
+    # jieba does not support sentence segmentation out of the box, so split on punctuation
+    'zh': re.compile(r'[^。！？；]+'),
+    'ja': re.compile(r'[^。！？]+'),
+}
+
+
+def _language_code(language: Optional[str]) -> str:
+    """'en', 'en-US', 'English' -> 'en'; 'zh-cn' -> 'zh'. Defaults to English."""
+    if not language:
+        return 'en'
+    language = language.strip().lower().replace('_', '-')
+    return _LANGUAGE_CODES.get(language, language.split('-')[0])
+
+
+def _language_sample(text: str, sample_chars: int) -> str:
+    if len(text) <= sample_chars:
+        return text
+    # Front matter or a trailing index alone can mislead detection, so sample three places
+    part = sample_chars // 3
+    middle = (len(text) - part) // 2
+    return '\n'.join((text[:part], text[middle:middle + part], text[-part:]))
+
+
+def detect_language(text: str, sample_chars: int = LANGUAGE_SAMPLE_CHARS) -> str:
+    """The language of text as langdetect reports it ('en', 'de', 'zh-cn', ...), judged on a bounded sample."""
     try:
-        return detect(text)
+        return detect(_language_sample(text, sample_chars))
     except:
         # Default to English if detection fails
         return 'en'
 
 
+def _load_punkt_model(language: Optional[str]):
+    try:
+        from nltk.tokenize import PunktTokenizer
+        load = PunktTokenizer
+    except ImportError:
+        # NLTK releases before 3.8.2 ship pickled models instead
+        import nltk
+
+        def load(name):
+            return nltk.data.load(f'tokenizers/punkt/{name}.pickle')
+    for name in dict.fromkeys([language or 'english', 'english']):
+        try:
+            return load(name)
+        except (LookupError, OSError, ValueError):
+            logging.warning(f"NLTK punkt data for '{name}' could not be loaded")
+    return None
+
+
+def _load_stopwords(language: Optional[str], code: str) -> frozenset:
+    if language:
+        try:
+            from nltk.corpus import stopwords
+            return frozenset(stopwords.words(language))
+        except (LookupError, OSError):
+            pass
+    if code == 'en':
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        return frozenset(ENGLISH_STOP_WORDS)
+    return frozenset()
+
+
+class LanguageProfile:
+    """
+    Sentence splitting, word segmentation and stopwords for one language.
+
+    Each tool is loaded the first time it is needed and then reused; get_language_profile() shares one profile per
+    language across the process, so e.g. the MeCab tagger for Japanese is built once rather than on every call.
+    """
+    def __init__(self, code: str):
+        self.code = code
+        self.nltk_language = _NLTK_LANGUAGES.get(code)
+        self._load_lock = threading.Lock()
+        # MeCab taggers must not be used from several threads at once
+        self._tagger_lock = threading.Lock()
+        self._punkt = None
+        self._punkt_loaded = False
+        self._tagger = None
+        self._jieba_ready = False
+        self._stopwords = None
+
+    def _punkt_model(self):
+        with self._load_lock:
+            if not self._punkt_loaded:
+                self._punkt = _load_punkt_model(self.nltk_language)
+                self._punkt_loaded = True
+            return self._punkt
+
+    def split_sentences(self, text: str) -> List[str]:
+        if self.code in _SENTENCE_PATTERNS:
+            return [sentence.strip() for sentence in _SENTENCE_PATTERNS[self.code].findall(text) if sentence.strip()]
+        punkt = self._punkt_model() if chunk_resources.get('nltk_punkt') else None
+        if punkt is not None:
+            return punkt.tokenize(text)
+        return [sentence.strip() for sentence in re.findall(r'[^.!?]+(?:[.!?]+|$)', text) if sentence.strip()]
+
+    def sentence_spans(self, text: str) -> List[Tuple[int, int]]:
+        if self.code in _SENTENCE_PATTERNS:
+            return [match.span() for match in _SENTENCE_PATTERNS[self.code].finditer(text)]
+        return locate_pieces(text, self.split_sentences(text))
+
+    def word_spans(self, text: str) -> List[Tuple[int, int]]:
+        if self.code == 'zh':
+            import jieba
+            with self._load_lock:
+                if not self._jieba_ready:
+                    # Loads jieba's dictionary now rather than inside the first chunking call
+                    jieba.initialize()
+                    self._jieba_ready = True
+            return [(start, end) for _, start, end in jieba.tokenize(text)]
+        if self.code == 'ja':
+            with self._load_lock:
+                if self._tagger is None:
+                    import fugashi
+                    self._tagger = fugashi.Tagger()
+            with self._tagger_lock:
+                surfaces = [word.surface for word in self._tagger(text)]
+            return locate_pieces(text, surfaces)
+        # Default to simple whitespace splitting for other languages
+        return [match.span() for match in re.finditer(r'\S+', text)]
+
+    @property
+    def stopwords(self) -> frozenset:
+        with self._load_lock:
+            if self._stopwords is None:
+                self._stopwords = _load_stopwords(self.nltk_language, self.code)
+            return self._stopwords
+
+
+_language_profiles_lock = threading.Lock()
+
+
+def get_language_profile(language: Optional[str] = None) -> LanguageProfile:
+    """The shared profile for a language code or name (English when not given)."""
+    code = _language_code(language)
+    name = f"language_profile:{code}"
+    with _language_profiles_lock:
+        if name not in chunk_resources.names():
+            chunk_resources.register(name, lambda: LanguageProfile(code))
+    return chunk_resources.get(name)
+
+
 def load_document(file_path: str) -> str:
     with open(file_path, 'r', encoding='utf-8') as file:
         text = file.read()
@@ -109,12 +327,17 @@ def improved_chunking_process(text: str, chunk_options: Dict[str, Any] = None) -
     logging.debug("Improved chunking process started...")
     logging.debug(f"Received chunk_options: {chunk_options}")
 
+    # Offset of the chunked body within the original text, so chunk offsets point into what the caller passed in
+    text_offset = 0
+
     # Extract JSON metadata if present
     json_content = {}
     try:
         json_end = text.index("}\n") + 1
         json_content = json.loads(text[:json_end])
-        text = text[json_end:].strip()
+        remainder = text[json_end:]
+        text = remainder.strip()
+        text_offset += json_end + len(remainder) - len(remainder.lstrip())
         logging.debug(f"Extracted JSON metadata: {json_content}")
     except (ValueError, json.JSONDecodeError):
         logging.debug("No JSON metadata found at the beginning of the text")
@@ -124,7 +347,9 @@ def improved_chunking_process(text: str, chunk_options: Dict[str, Any] = None) -
     header_text = ""
     if header_match:
         header_text = header_match.group(1)
-        text = text[len(header_text):].strip()
+        remainder = text[len(header_text):]
+        text = remainder.strip()
+        text_offset += len(header_text) + len(remainder) - len(remainder.lstrip())
         logging.debug(f"Extracted header text: {header_text}")
 
     # Make a copy of chunk_options and ensure values are correct types
@@ -137,12 +362,13 @@ def improved_chunking_process(text: str, chunk_options: Dict[str, Any] = None) -
             # Handle language specially - it can be None
             lang = chunk_options.get('language')
             options['language'] = str(lang) if lang is not None else None
+            options['tokenizer_model'] = chunk_options.get('tokenizer_model') or None
             logging.debug(f"Processed options: {options}")
         except Exception as e:
             logging.error(f"Error processing chunk options: {e}")
             raise
     else:
-        options = {'method': 'words', 'max_size': 2000, 'overlap': 0, 'language': None}
+        options = {'method': 'words', 'max_size': 2000, 'overlap': 0, 'language': None, 'tokenizer_model': None}
         logging.debug("Using default options")
 
     if options.get('language') is None:
@@ -154,7 +380,8 @@ def improved_chunking_process(text: str, chunk_options: Dict[str, Any] = None) -
         if options['method'] == 'json':
             chunks = chunk_text_by_json(text, max_size=options['max_size'], overlap=options['overlap'])
         else:
-            chunks = chunk_text(text, options['method'], options['max_size'], options['overlap'], options['language'])
+            chunks = chunk_text(text, options['method'], options['max_size'], options['overlap'], options['language'],
+                                with_offsets=True, tokenizer_model=options['tokenizer_model'])
         logging.debug(f"Created {len(chunks)} chunks using method {options['method']}")
     except Exception as e:
         logging.error(f"Error in chunking process: {e}")
@@ -178,8 +405,13 @@ def improved_chunking_process(text: str, chunk_options: Dict[str, Any] = None) -
 
             if options['method'] == 'json':
                 chunk_text_content = json.dumps(chunk['json'], ensure_ascii=False)
+                # JSON chunks are re-serialised, so they have no position in the source text
+                metadata['start_index'] = -1
+                metadata['end_index'] = -1
             else:
-                chunk_text_content = chunk
+                chunk_text_content = chunk['text']
+                metadata['start_index'] = chunk['start_index'] + text_offset
+                metadata['end_index'] = chunk['end_index'] + text_offset
 
             chunks_with_metadata.append({
                 'text': chunk_text_content,
@@ -212,24 +444,37 @@ def multi_level_chunking(text: str, method: str, max_size: int, overlap: int, la
 
 
 # FIXME - ensure language detection occurs in each chunk function
-def chunk_text(text: str, method: str, max_size: int, overlap: int, language: str = None) -> List[str]:
+def chunk_text(text: str, method: str, max_size: int, overlap: int, language: str = None,
+               with_offsets: bool = False, tokenizer_model: Optional[str] = None) -> List[Any]:
+    """
+    Split text into chunks using the given method.
+
+    With with_offsets=True each chunk is returned as {'text', 'start_index', 'end_index'}, where the offsets are the
+    exact character range in `text` that the chunk was built from. tokenizer_model picks the tokenizer that 'tokens'
+    chunking counts with (the [Chunking] tokenizer_model by default).
+    """
     if method == 'words':
         logging.debug("Chunking by words...")
-        return chunk_text_by_words(text, max_words=max_size, overlap=overlap, language=language)
+        return chunk_text_by_words(text, max_words=max_size, overlap=overlap, language=language,
+                                   with_offsets=with_offsets)
     elif method == 'sentences':
         logging.debug("Chunking by sentences...")
-        return chunk_text_by_sentences(text, max_sentences=max_size, overlap=overlap, language=language)
+        return chunk_text_by_sentences(text, max_sentences=max_size, overlap=overlap, language=language,
+                                       with_offsets=with_offsets)
     elif method == 'paragraphs':
         logging.debug("Chunking by paragraphs...")
-        return chunk_text_by_paragraphs(text, max_paragraphs=max_size, overlap=overlap)
+        return chunk_text_by_paragraphs(text, max_paragraphs=max_size, overlap=overlap, with_offsets=with_offsets)
     elif method == 'tokens':
         logging.debug("Chunking by tokens...")
-        return chunk_text_by_tokens(text, max_tokens=max_size, overlap=overlap)
+        return chunk_text_by_tokens(text, max_tokens=max_size, overlap=overlap, with_offsets=with_offsets,
+                                    model=tokenizer_model)
     elif method == 'semantic':
         logging.debug("Chunking by semantic similarity...")
-        return semantic_chunking(text, max_chunk_size=max_size)
+        return semantic_chunking(text, max_chunk_size=max_size, with_offsets=with_offsets, language=language)
     else:
         logging.warning(f"Unknown chunking method '{method}'. Returning full text as a single chunk.")
+        if with_offsets:
+            return [{'text': text, 'start_index': 0, 'end_index': len(text)}]
         return [text]
 
 def determine_chunk_position(relative_position: float) -> str:
@@ -241,7 +486,55 @@ def determine_chunk_position(relative_position: float) -> str:
         return "This chunk is from the end of the document"
 
 
-def chunk_text_by_words(text: str, max_words: int = 300, overlap: int = 0, language: str = None) -> List[str]:
+def locate_pieces(text: str, pieces: List[str]) -> List[Tuple[int, int]]:
+    """
+    Find the (start, end) span of each piece in text.
+
+    Pieces must appear in text in order without overlapping, as tokenizers produce them, so a single cursor walks
+    the text once instead of searching from the beginning for every piece.
+    """
+    spans = []
+    cursor = 0
+    for piece in pieces:
+        start = text.find(piece, cursor)
+        if start == -1:
+            # The tokenizer normalised this piece; pin it to the cursor so later pieces stay in order
+            spans.append((cursor, cursor))
+            continue
+        cursor = start + len(piece)
+        spans.append((start, cursor))
+    return spans
+
+
+def _trim_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _word_spans(text: str, language: str) -> List[Tuple[int, int]]:
+    return get_language_profile(language).word_spans(text)
+
+
+def _finish_chunks(text: str, chunks: List[Tuple[str, int, int]], with_offsets: bool) -> List[Any]:
+    """Strip and drop empty chunks (as post_process_chunks does), keeping their source spans if requested."""
+    results = []
+    for chunk, start, end in chunks:
+        stripped = chunk.strip()
+        if not stripped:
+            continue
+        if with_offsets:
+            start, end = _trim_span(text, start, end)
+            results.append({'text': stripped, 'start_index': start, 'end_index': end})
+        else:
+            results.append(stripped)
+    return results
+
+
+def chunk_text_by_words(text: str, max_words: int = 300, overlap: int = 0, language: str = None,
+                        with_offsets: bool = False) -> List[Any]:
     logging.debug("chunk_text_by_words...")
     logging.debug(f"Parameters: max_words={max_words}, overlap={overlap}, language={language}")
 
@@ -254,102 +547,106 @@ def chunk_text_by_words(text: str, max_words: int = 300, overlap: int = 0, langu
             language = detect_language(text)
             logging.debug(f"Detected language: {language}")
 
-        if language.startswith('zh'):  # Chinese
-            import jieba
-            words = list(jieba.cut(text))
-        elif language == 'ja':  # Japanese
-            import fugashi
-            tagger = fugashi.Tagger()
-            words = [word.surface for word in tagger(text)]
-        else:  # Default to simple splitting for other languages
-            words = text.split()
-
-        logging.debug(f"Total words: {len(words)}")
+        spans = _word_spans(text, language)
+        logging.debug(f"Total words: {len(spans)}")
 
         chunks = []
-        for i in range(0, len(words), max_words - overlap):
-            chunk = ' '.join(words[i:i + max_words])
-            chunks.append(chunk)
-            logging.debug(f"Created chunk {len(chunks)} with {len(chunk.split())} words")
+        for i in range(0, len(spans), max_words - overlap):
+            window = spans[i:i + max_words]
+            chunk = ' '.join(text[start:end] for start, end in window)
+            chunks.append((chunk, window[0][0], window[-1][1]))
+            logging.debug(f"Created chunk {len(chunks)} with {len(window)} words")
 
-        return post_process_chunks(chunks)
+        return _finish_chunks(text, chunks, with_offsets)
     except Exception as e:
         logging.error(f"Error in chunk_text_by_words: {e}")
         raise
 
 
-def chunk_text_by_sentences(text: str, max_sentences: int = 10, overlap: int = 0, language: str = None) -> List[str]:
+def chunk_text_by_sentences(text: str, max_sentences: int = 10, overlap: int = 0, language: str = None,
+                            with_offsets: bool = False) -> List[Any]:
     logging.debug("chunk_text_by_sentences...")
     if language is None:
         language = detect_language(text)
 
-    if language.startswith('zh'):  # Chinese
-        import jieba
-        # Use jieba to perform sentence segmentation
-        # jieba does not support sentence segmentation out of the box
-        # Use punctuation as delimiters
-        sentences = re.split(r'[。！？；]', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-    elif language == 'ja':  # Japanese
-        import fugashi
-        tagger = fugashi.Tagger()
-        # Simple sentence segmentation based on punctuation
-        sentences = re.split(r'[。！？]', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-    else:  # Default to NLTK for other languages
-        try:
-            sentences = sent_tokenize(text, language=language)
-        except LookupError:
-            logging.warning(f"Punkt tokenizer not found for language '{language}'. Using default 'english'.")
-            sentences = sent_tokenize(text, language='english')
+    # Chinese and Japanese are split on their end punctuation, other languages with punkt
+    spans = get_language_profile(language).sentence_spans(text)
+    spans = [span for span in (_trim_span(text, start, end) for start, end in spans) if span[0] < span[1]]
 
+    # Consecutive windows share `overlap` sentences
     chunks = []
-    previous_overlap = []
+    for i in range(0, len(spans), max_sentences - overlap):
+        window = spans[i:i + max_sentences]
+        chunk = ' '.join(text[start:end] for start, end in window)
+        chunks.append((chunk, window[0][0], window[-1][1]))
 
-    for i in range(0, len(sentences), max_sentences - overlap):
-        current_sentences = sentences[i:i + max_sentences]
-        if overlap > 0 and previous_overlap:
-            current_sentences = previous_overlap + current_sentences
-        chunk = ' '.join(current_sentences)
-        chunks.append(chunk)
-        previous_overlap = sentences[i + max_sentences - overlap:i + max_sentences] if overlap > 0 else []
-
-    return post_process_chunks(chunks)
+    return _finish_chunks(text, chunks, with_offsets)
 
 
-def chunk_text_by_paragraphs(text: str, max_paragraphs: int = 5, overlap: int = 0) -> List[str]:
+def chunk_text_by_paragraphs(text: str, max_paragraphs: int = 5, overlap: int = 0,
+                             with_offsets: bool = False) -> List[Any]:
     logging.debug("chunk_text_by_paragraphs...")
-    paragraphs = re.split(r'\n\s*\n', text)
+    spans = []
+    paragraph_start = 0
+    for separator in re.finditer(r'\n\s*\n', text):
+        spans.append((paragraph_start, separator.start()))
+        paragraph_start = separator.end()
+    spans.append((paragraph_start, len(text)))
+
     chunks = []
-    for i in range(0, len(paragraphs), max_paragraphs - overlap):
-        chunk = '\n\n'.join(paragraphs[i:i + max_paragraphs])
-        chunks.append(chunk)
-    return post_process_chunks(chunks)
+    for i in range(0, len(spans), max_paragraphs - overlap):
+        window = spans[i:i + max_paragraphs]
+        chunk = '\n\n'.join(text[start:end] for start, end in window)
+        chunks.append((chunk, window[0][0], window[-1][1]))
+    return _finish_chunks(text, chunks, with_offsets)
+
 
+def chunk_text_by_tokens(text: str, max_tokens: int = 1000, overlap: int = 0, with_offsets: bool = False,
+                         model: Optional[str] = None) -> List[Any]:
+    """
+    Split text into chunks of whole words holding at most max_tokens tokens of `model`'s tokenizer (the
+    [Chunking] tokenizer_model by default); overlap is counted in words.
 
-def chunk_text_by_tokens(text: str, max_tokens: int = 1000, overlap: int = 0) -> List[str]:
+    Every distinct word is encoded once, in one batch, both on its own and with the space that precedes it inside a
+    chunk. BPE tokenizers (tiktoken, GPT-2) never merge across that space, so a chunk's count is exact for them.
+    """
     logging.debug("chunk_text_by_tokens...")
-    # This is a simplified token-based chunking. For more accurate tokenization,
-    # consider using a proper tokenizer like GPT-2 TokenizerFast
-    words = text.split()
+    counter = get_token_counter(model)
+    spans = [match.span() for match in re.finditer(r'\S+', text)]
+    words = list(dict.fromkeys(text[start:end] for start, end in spans))
+    counts = counter.count_batch(words + [' ' + word for word in words])
+    # word -> (tokens at the start of a chunk, tokens after a space)
+    word_tokens = {word: (counts[i], counts[len(words) + i]) for i, word in enumerate(words)}
     chunks = []
     current_chunk = []
     current_token_count = 0
 
-    for word in words:
-        word_token_count = len(word) // 4 + 1  # Rough estimate of token count
+    def emit():
+        chunk = ' '.join(text[start:end] for start, end in current_chunk)
+        chunks.append((chunk, current_chunk[0][0], current_chunk[-1][1]))
+
+    def chunk_token_count(chunk_spans):
+        if not chunk_spans:
+            return 0
+        first, *rest = [text[start:end] for start, end in chunk_spans]
+        return word_tokens[first][0] + sum(word_tokens[word][1] for word in rest)
+
+    for span in spans:
+        word = text[span[0]:span[1]]
+        word_token_count = word_tokens[word][1] if current_chunk else word_tokens[word][0]
         if current_token_count + word_token_count > max_tokens and current_chunk:
-            chunks.append(' '.join(current_chunk))
+            emit()
             current_chunk = current_chunk[-overlap:] if overlap > 0 else []
-            current_token_count = sum(len(w) // 4 + 1 for w in current_chunk)
+            current_token_count = chunk_token_count(current_chunk)
+            word_token_count = word_tokens[word][1] if current_chunk else word_tokens[word][0]
 
-        current_chunk.append(word)
+        current_chunk.append(span)
         current_token_count += word_token_count
 
     if current_chunk:
-        chunks.append(' '.join(current_chunk))
+        emit()
 
-    return post_process_chunks(chunks)
+    return _finish_chunks(text, chunks, with_offsets)
 # def chunk_text_by_tokens(text: str, max_tokens: int = 1000, overlap: int = 0) -> List[str]:
 #     logging.debug("chunk_text_by_tokens...")
 #     # Use GPT2 tokenizer for tokenization
@@ -370,13 +667,21 @@ def post_process_chunks(chunks: List[str]) -> List[str]:
 def get_chunk_metadata(chunk: str, full_text: str, chunk_type: str = "generic",
                       chapter_number: Optional[int] = None,
                       chapter_pattern: Optional[str] = None,
-                      language: str = None) -> Dict[str, Any]:
+                      language: str = None,
+                      start_index: Optional[int] = None,
+                      end_index: Optional[int] = None) -> Dict[str, Any]:
     """
     Generate metadata for a chunk based on its position in the full text.
+
+    Pass start_index/end_index when the chunker already knows them; otherwise the chunk is searched for in
+    full_text, which is slower and finds the first occurrence of repeated text.
     """
     chunk_length = len(chunk)
-    start_index = full_text.find(chunk)
-    end_index = start_index + chunk_length if start_index != -1 else -1
+    if start_index is None:
+        start_index = full_text.find(chunk)
+        end_index = start_index + chunk_length if start_index != -1 else -1
+    elif end_index is None:
+        end_index = start_index + chunk_length
 
     # Calculate a hash for the chunk
     chunk_hash = hashlib.md5(chunk.encode()).hexdigest()
@@ -410,28 +715,28 @@ def process_document_with_metadata(text: str, chunk_options: Dict[str, Any],
 
 
 # Hybrid approach, chunk each sentence while ensuring total token size does not exceed a maximum number
-def chunk_text_hybrid(text: str, max_tokens: int = 1000, overlap: int = 0) -> List[str]:
+def chunk_text_hybrid(text: str, max_tokens: int = 1000, overlap: int = 0, model: Optional[str] = None) -> List[str]:
     logging.debug("chunk_text_hybrid...")
+    counter = get_token_counter(model)
     sentences = sent_tokenize(text)
+    sentence_token_counts = counter.count_batch(sentences)
     chunks = []
     current_chunk = []
     current_length = 0
 
-    for sentence in sentences:
-        tokens = tokenizer.encode(sentence)
-        if current_length + len(tokens) > max_tokens and current_chunk:
+    for sentence, sentence_tokens in zip(sentences, sentence_token_counts):
+        if current_length + sentence_tokens > max_tokens and current_chunk:
             chunks.append(' '.join(current_chunk))
             # Handle overlap
             if overlap > 0:
-                overlap_tokens = tokenizer.encode(' '.join(current_chunk[-overlap:]))
                 current_chunk = current_chunk[-overlap:]
-                current_length = len(overlap_tokens)
+                current_length = counter.count(' '.join(current_chunk))
             else:
                 current_chunk = []
                 current_length = 0
 
         current_chunk.append(sentence)
-        current_length += len(tokens)
+        current_length += sentence_tokens
 
     if current_chunk:
         chunks.append(' '.join(current_chunk))
@@ -442,11 +747,12 @@ def chunk_text_hybrid(text: str, max_tokens: int = 1000, overlap: int = 0) -> Li
 # Thanks openai
 def chunk_on_delimiter(input_string: str,
                        max_tokens: int,
-                       delimiter: str) -> List[str]:
+                       delimiter: str,
+                       model: Optional[str] = None) -> List[str]:
     logging.debug("chunk_on_delimiter...")
     chunks = input_string.split(delimiter)
     combined_chunks, _, dropped_chunk_count = combine_chunks_with_no_minimum(
-        chunks, max_tokens, chunk_delimiter=delimiter, add_ellipsis_for_overflow=True)
+        chunks, max_tokens, chunk_delimiter=delimiter, add_ellipsis_for_overflow=True, model=model)
     if dropped_chunk_count > 0:
         logging.warning(f"Warning: {dropped_chunk_count} chunks were dropped due to exceeding the token limit.")
     combined_chunks = [f"{chunk}{delimiter}" for chunk in combined_chunks]
@@ -519,7 +825,7 @@ def count_units(text: str, unit: str = 'words') -> int:
     if unit == 'words':
         return len(text.split())
     elif unit == 'tokens':
-        return len(tokenizer.encode(text))
+        return get_token_counter().count(text)
     elif unit == 'characters':
         return len(text)
     else:
@@ -527,25 +833,42 @@ def count_units(text: str, unit: str = 'words') -> int:
 
 
 
-def semantic_chunking(text: str, max_chunk_size: int = 2000, unit: str = 'words') -> List[str]:
+def semantic_chunking(text: str, max_chunk_size: int = 2000, unit: str = 'words',
+                      with_offsets: bool = False, language: str = None) -> List[Any]:
     logging.debug("semantic_chunking...")
-    sentences = sent_tokenize(text)
-    vectorizer = TfidfVectorizer()
-    sentence_vectors = vectorizer.fit_transform(sentences)
+    # scikit-learn takes a while to import, so only semantic chunking pays for it
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+    profile = get_language_profile(language)
+    sentences = profile.split_sentences(text)
+    spans = locate_pieces(text, sentences)
+    # Similarity between sentences should come from their content words (stopwords TfidfVectorizer cannot match
+    # as single tokens, like "don't", are left out)
+    stop_words = sorted(word for word in profile.stopwords if re.fullmatch(r'\w+', word))
+    try:
+        sentence_vectors = TfidfVectorizer(stop_words=stop_words or None).fit_transform(sentences)
+    except ValueError:
+        # Nothing but stopwords
+        sentence_vectors = TfidfVectorizer().fit_transform(sentences)
 
     chunks = []
+    # Indices into sentences of the chunk being built
     current_chunk = []
     current_size = 0
 
+    def emit():
+        chunk = ' '.join(sentences[j] for j in current_chunk)
+        chunks.append((chunk, spans[current_chunk[0]][0], spans[current_chunk[-1]][1]))
+
     for i, sentence in enumerate(sentences):
         sentence_size = count_units(sentence, unit)
         if current_size + sentence_size > max_chunk_size and current_chunk:
-            chunks.append(' '.join(current_chunk))
+            emit()
             # Use last 3 sentences for overlap
             current_chunk = current_chunk[-3:]
-            current_size = count_units(' '.join(current_chunk), unit)
+            current_size = count_units(' '.join(sentences[j] for j in current_chunk), unit)
 
-        current_chunk.append(sentence)
+        current_chunk.append(i)
         current_size += sentence_size
 
         if i + 1 < len(sentences):
@@ -553,14 +876,14 @@ def semantic_chunking(text: str, max_chunk_size: int = 2000, unit: str = 'words'
             next_vector = sentence_vectors[i + 1]
             similarity = cosine_similarity(current_vector, next_vector)[0][0]
             if similarity < 0.5 and current_size >= max_chunk_size // 2:
-                chunks.append(' '.join(current_chunk))
+                emit()
                 current_chunk = current_chunk[-3:]
-                current_size = count_units(' '.join(current_chunk), unit)
+                current_size = count_units(' '.join(sentences[j] for j in current_chunk), unit)
 
     if current_chunk:
-        chunks.append(' '.join(current_chunk))
+        emit()
 
-    return chunks
+    return _finish_chunks(text, chunks, with_offsets)
 
 
 def semantic_chunk_long_file(file_path: str, max_chunk_size: int = 1000, overlap: int = 100, unit: str = 'words') -> Optional[List[str]]:
@@ -608,6 +931,7 @@ def chunk_for_embedding(text: str, file_name: str, custom_chunk_options: Dict[st
 
         full_chunk_text = chunk_header + chunk_text
         chunk['text'] = full_chunk_text
+        chunk['raw_text'] = chunk_text
         chunk['metadata']['file_name'] = file_name
         chunked_text_with_headers.append(chunk)
 
@@ -780,7 +1104,6 @@ def chunk_json_dict(json_dict: Dict[str, Any], max_size: int, overlap: int) -> L
 # OpenAI Rolling Summarization
 #
 
-client = OpenAI(api_key=openai_api_key)
 def get_chat_completion(messages, model='gpt-4-turbo'):
     response = client.chat.completions.create(
         model=model,
@@ -798,36 +1121,83 @@ def combine_chunks_with_no_minimum(
         chunk_delimiter: str = "\n\n",
         header: Optional[str] = None,
         add_ellipsis_for_overflow: bool = False,
+        model: Optional[str] = None,
 ) -> Tuple[List[str], List[List[int]], int]:
+    """
+    Greedily group consecutive chunks, joined by chunk_delimiter, into blocks of at most max_tokens tokens.
+
+    Every chunk is tokenized once and the cost of each join (the delimiter's tokens plus any merges across it) is
+    measured around the join, so a candidate's token count is kept as a running total instead of re-tokenizing the
+    growing block for every chunk.
+    """
+    counter = get_token_counter(model)
+    # Parts are chunk indices, plus these two for the header and the overflow ellipsis
+    header_part, ellipsis_part = -1, -2
+    part_texts = {header_part: header, ellipsis_part: "..."}
+
+    def text_of(part):
+        return chunks[part] if part >= 0 else part_texts[part]
+
+    chunk_tokens = counter.count_batch(chunks)
+    header_tokens, ellipsis_tokens = counter.count_batch([header or "", "..."])
+    # Joins that can occur: chunk -> next chunk without a header; header -> chunk -> header with one
+    if header:
+        joins = [(header_part, i) for i in range(len(chunks))] + [(i, header_part) for i in range(len(chunks))]
+    else:
+        joins = [(i, i + 1) for i in range(len(chunks) - 1)]
+    join_costs = dict(zip(joins, counter.separator_costs(
+        [(text_of(left), text_of(right)) for left, right in joins], chunk_delimiter)))
+
+    def tokens_of(part):
+        if part >= 0:
+            return chunk_tokens[part]
+        return header_tokens if part == header_part else ellipsis_tokens
+
+    def join_cost(left, right):
+        if (left, right) not in join_costs:
+            join_costs[(left, right)] = counter.separator_costs([(text_of(left), text_of(right))], chunk_delimiter)[0]
+        return join_costs[(left, right)]
+
+    def extended_count(parts, count, new_parts):
+        # Token count of chunk_delimiter.join(parts + new_parts), given `count` for the join of `parts`
+        last = parts[-1] if parts else None
+        for part in new_parts:
+            count += tokens_of(part) + (join_cost(last, part) if last is not None else 0)
+            last = part
+        return count
+
     dropped_chunk_count = 0
     output = []  # list to hold the final combined chunks
     output_indices = []  # list to hold the indices of the final combined chunks
-    candidate = [header] if header else []  # list to hold the current combined chunk candidate
+    candidate = [header_part] if header else []  # list to hold the current combined chunk candidate (as parts)
+    candidate_tokens = header_tokens if header else 0
     candidate_indices = []
-    for chunk_i, chunk in enumerate(chunks):
-        chunk_with_header = [chunk] if not header else [header, chunk]
-        combined_text = chunk_delimiter.join(candidate + chunk_with_header)
-        token_count = len(tokenizer.encode(combined_text))
+    for chunk_i in range(len(chunks)):
+        chunk_with_header = [chunk_i] if not header else [header_part, chunk_i]
+        token_count = extended_count(candidate, candidate_tokens, chunk_with_header)
         if token_count > max_tokens:
             if add_ellipsis_for_overflow and len(candidate) > 0:
-                ellipsis_text = chunk_delimiter.join(candidate + ["..."])
-                if len(tokenizer.encode(ellipsis_text)) <= max_tokens:
-                    candidate = candidate + ["..."]
+                ellipsis_count = extended_count(candidate, candidate_tokens, [ellipsis_part])
+                if ellipsis_count <= max_tokens:
+                    candidate = candidate + [ellipsis_part]
+                    candidate_tokens = ellipsis_count
                     dropped_chunk_count += 1
             if len(candidate) > 0:
-                output.append(chunk_delimiter.join(candidate))
+                output.append(chunk_delimiter.join(text_of(part) for part in candidate))
                 output_indices.append(candidate_indices)
                 candidate = chunk_with_header
+                candidate_tokens = extended_count([], 0, chunk_with_header)
                 candidate_indices = [chunk_i]
             else:
                 logging.warning(f"Single chunk at index {chunk_i} exceeds max_tokens and will be dropped.")
                 dropped_chunk_count += 1
         else:
             candidate.extend(chunk_with_header)
+            candidate_tokens = token_count
             candidate_indices.append(chunk_i)
 
     if candidate:
-        output.append(chunk_delimiter.join(candidate))
+        output.append(chunk_delimiter.join(text_of(part) for part in candidate))
         output_indices.append(candidate_indices)
     return output, output_indices, dropped_chunk_count
 
@@ -866,17 +1236,18 @@ def rolling_summarize(text: str,
     assert 0 <= detail <= 1, "Detail must be between 0 and 1."
 
     # Interpolate the number of chunks based on the detail parameter
-    text_length = len(tokenizer.encode(text))
+    counter = get_token_counter(model)
+    text_length = counter.count(text)
     max_chunks = text_length // minimum_chunk_size if minimum_chunk_size else 10
     min_chunks = 1
     num_chunks = int(min_chunks + detail * (max_chunks - min_chunks))
 
     # Adjust chunk_size based on interpolated number of chunks
     chunk_size = max(minimum_chunk_size, text_length // num_chunks) if num_chunks else text_length
-    text_chunks = chunk_on_delimiter(text, chunk_size, chunk_delimiter)
+    text_chunks = chunk_on_delimiter(text, chunk_size, chunk_delimiter, model=model)
     if verbose:
         print(f"Splitting the text into {len(text_chunks)} chunks to be summarized.")
-        print(f"Chunk lengths are {[len(tokenizer.encode(x)) for x in text_chunks]} tokens.")
+        print(f"Chunk lengths are {counter.count_batch(text_chunks)} tokens.")
 
     # Set system message
     system_message_content = "Rewrite this text in summarized form."
@@ -943,7 +1314,9 @@ def chunk_ebook_by_chapters(text: str, chunk_options: Dict[str, Any]) -> List[Di
             chunk=text,
             full_text=text,
             chunk_type="whole_document",
-            language=chunk_options.get('language', 'english')
+            language=chunk_options.get('language', 'english'),
+            start_index=0,
+            end_index=len(text)
         )
         return [{'text': text, 'metadata': metadata}]
 
@@ -951,31 +1324,31 @@ def chunk_ebook_by_chapters(text: str, chunk_options: Dict[str, Any]) -> List[Di
     chunks = []
     for i in range(len(chapter_positions)):
         start = chapter_positions[i]
-        end = chapter_positions[i + 1] if i + 1 < len(chapter_positions) else None
-        chapter = text[start:end]
+        end = chapter_positions[i + 1] if i + 1 < len(chapter_positions) else len(text)
 
         # Apply overlap if specified
         if overlap > 0 and i > 0:
-            overlap_start = max(0, chapter_positions[i] - overlap)
-            chapter = text[overlap_start:end]
+            start = max(0, chapter_positions[i] - overlap)
 
-        chunks.append(chapter)
+        chunks.append((text[start:end], start, end))
 
     # Post-process chunks
-    processed_chunks = post_process_chunks(chunks)
+    processed_chunks = _finish_chunks(text, chunks, with_offsets=True)
 
     # Add metadata to chunks
     chunks_with_metadata = []
     for i, chunk in enumerate(processed_chunks):
         metadata = get_chunk_metadata(
-            chunk=chunk,
+            chunk=chunk['text'],
             full_text=text,
             chunk_type="chapter",
             chapter_number=i + 1,
             chapter_pattern=used_pattern,
-            language=chunk_options.get('language', 'english')
+            language=chunk_options.get('language', 'english'),
+            start_index=chunk['start_index'],
+            end_index=chunk['end_index']
         )
-        chunks_with_metadata.append({'text': chunk, 'metadata': metadata})
+        chunks_with_metadata.append({'text': chunk['text'], 'metadata': metadata})
 
     return chunks_with_metadata
 
@@ -1030,102 +1403,345 @@ def chunk_xml(xml_text: str, chunk_options: Dict[str, Any]) -> List[Dict[str, An
     logging.debug("Starting XML chunking process...")
 
     try:
-        # Parse XML content
-        root = ET.fromstring(xml_text)
-        chunks = []
+        chunks = list(stream_xml_chunks(io.StringIO(xml_text), chunk_options))
+
+        # Update total chunks count in metadata
+        for chunk in chunks:
+            chunk['metadata']['total_chunks'] = len(chunks)
 
-        # Get chunking parameters with defaults
-        max_size = chunk_options.get('max_size', 1000)
-        overlap = chunk_options.get('overlap', 0)
-        language = chunk_options.get('language', 'english')
+        logging.debug(f"XML chunking complete. Created {len(chunks)} chunks")
+        return chunks
+
+    except ET.ParseError as e:
+        logging.error(f"XML parsing error: {str(e)}")
+        raise
+    except Exception as e:
+        logging.error(f"Unexpected error during XML chunking: {str(e)}")
+        raise
+
+#
+# End of XML Chunking
+#######################################################################################################################
+#
+# Streaming Chunking
+#
+# Generator versions of the chunkers above for documents too large to hold in memory at once (MediaWiki dumps, book
+# collections, long transcripts). They read their source a block at a time and yield each chunk as soon as it is
+# final, so memory stays around a block plus a chunk (a chapter for ebooks, an element's text for XML) and embedding
+# can start on the first chunks while the rest of the document is still being read.
 
-        logging.debug(f"Chunking parameters - max_size: {max_size}, overlap: {overlap}, language: {language}")
+# Characters read from a stream at a time
+STREAM_BLOCK_CHARS = 1 << 20
+_STREAM_TEXT_METHODS = ('words', 'sentences', 'paragraphs', 'tokens', 'semantic')
 
-        # Extract full structure with hierarchy
-        xml_content = extract_xml_structure(root)
-        logging.debug(f"Extracted {len(xml_content)} XML elements")
 
-        # Initialize chunking variables
-        current_chunk = []
-        current_size = 0
-        chunk_count = 0
+def iter_text_blocks(source: Union[str, TextIO, Iterable[str]], block_chars: int = STREAM_BLOCK_CHARS) -> Iterator[str]:
+    """
+    Text from a string, a file handle (text or binary; binary is read as UTF-8) or any iterable of strings (e.g.
+    transcript segments), in blocks of about block_chars characters.
+    """
+    if isinstance(source, str):
+        for start in range(0, len(source), block_chars):
+            yield source[start:start + block_chars]
+    elif hasattr(source, 'read'):
+        decoder = None
+        while True:
+            block = source.read(block_chars)
+            if isinstance(block, bytes):
+                # A multi-byte character may straddle two reads
+                decoder = decoder or codecs.getincrementaldecoder('utf-8')(errors='replace')
+                block = decoder.decode(block, final=not block)
+            if not block:
+                break
+            yield block
+    else:
+        for block in source:
+            if block:
+                yield block
 
-        # Process XML content into chunks
-        for path, content in xml_content:
-            # Calculate content size (by words)
-            content_size = len(content.split())
 
-            # Check if adding this content would exceed max_size
-            if current_size + content_size > max_size and current_chunk:
-                # Create chunk from current content
-                chunk_text = '\n'.join(f"{p}: {c}" for p, c in current_chunk)
-                chunk_count += 1
+def iter_text_lines(source: Union[str, TextIO, Iterable[str]], block_chars: int = STREAM_BLOCK_CHARS) -> Iterator[str]:
+    """Lines of a text source (see iter_text_blocks), each with its line ending."""
+    pending = ''
+    for block in iter_text_blocks(source, block_chars):
+        lines = (pending + block).splitlines(keepends=True)
+        # The last line may continue in the next block
+        pending = lines.pop() if lines and not lines[-1].endswith(('\n', '\r')) else ''
+        yield from lines
+    if pending:
+        yield pending
 
-                # Create chunk with metadata
-                chunks.append({
-                    'text': chunk_text,
-                    'metadata': {
-                        'paths': [p for p, _ in current_chunk],
-                        'chunk_method': 'xml',
-                        'chunk_index': chunk_count,
-                        'max_size': max_size,
-                        'overlap': overlap,
-                        'language': language,
-                        'root_tag': root.tag,
-                        'xml_attributes': dict(root.attrib)
-                    }
-                })
-
-                # Handle overlap if specified
-                if overlap > 0:
-                    # Keep last few items for overlap
-                    overlap_items = current_chunk[-overlap:]
-                    current_chunk = overlap_items
-                    current_size = sum(len(c.split()) for _, c in overlap_items)
-                    logging.debug(f"Created overlap chunk with {len(overlap_items)} items")
-                else:
-                    current_chunk = []
-                    current_size = 0
 
-            # Add current content to chunk
-            current_chunk.append((path, content))
-            current_size += content_size
+def stream_chunks(source: Union[str, TextIO, Iterable[str]], chunk_options: Dict[str, Any] = None,
+                  block_chars: int = STREAM_BLOCK_CHARS) -> Iterator[Dict[str, Any]]:
+    """
+    Chunk a text source (see iter_text_blocks) incrementally with the words, sentences, paragraphs, tokens or
+    semantic method, yielding {'text', 'metadata'} like improved_chunking_process.
+
+    start_index/end_index count characters from the start of the source. total_chunks and relative_position are not
+    known until the end, so they are left out. The language, when not given, is detected from the first block. Word,
+    sentence, paragraph and token chunks are the same as chunking the whole text at once; semantic chunks are found
+    within a window of about block_chars characters. A chunk still growing past 2 * block_chars (a huge paragraph,
+    say) is cut at a word boundary so memory stays bounded.
+    """
+    chunk_options = chunk_options or {}
+    method = str(chunk_options.get('method', 'words'))
+    max_size = int(chunk_options.get('max_size', 2000))
+    overlap = int(chunk_options.get('overlap', 0))
+    language = chunk_options.get('language')
+    tokenizer_model = chunk_options.get('tokenizer_model') or None
+    if method not in _STREAM_TEXT_METHODS:
+        raise ValueError(f"Chunking method '{method}' cannot be streamed; use one of {_STREAM_TEXT_METHODS}, "
+                         f"stream_xml_chunks or stream_ebook_chapters")
+
+    buffer = ''
+    buffer_offset = 0  # Position of buffer[0] in the source
+    chunk_index = 0
+    blocks = iter_text_blocks(source, block_chars)
+    exhausted = False
+    while not exhausted:
+        block = next(blocks, None)
+        if block is None:
+            exhausted = True
+        else:
+            buffer += block
+            if len(buffer) < block_chars:
+                continue
+        if language is None:
+            language = detect_language(buffer)
+            logging.debug(f"Detected language: {language}")
 
-        # Process final chunk if content remains
-        if current_chunk:
-            chunk_text = '\n'.join(f"{p}: {c}" for p, c in current_chunk)
-            chunk_count += 1
+        # Leave a word cut by the block boundary for the next round
+        limit = len(buffer)
+        if not exhausted:
+            last_space = re.search(r'\s+\S*\Z', buffer)
+            limit = last_space.start() if last_space and last_space.start() > 0 else len(buffer)
+        chunks = chunk_text(buffer[:limit], method, max_size, overlap, language, with_offsets=True,
+                            tokenizer_model=tokenizer_model)
 
-            chunks.append({
-                'text': chunk_text,
+        if exhausted or not chunks:
+            final, carry_from = chunks, limit
+        else:
+            # Chunks that reach the end of the window may still grow; they are chunked again with the next block
+            # (with overlap, several can end on the same unit)
+            window_end = chunks[-1]['end_index']
+            final = [chunk for chunk in chunks if chunk['end_index'] < window_end]
+            carry_from = min(chunk['start_index'] for chunk in chunks if chunk['end_index'] >= window_end)
+            if len(buffer) - carry_from > 2 * block_chars:
+                # A single paragraph or sentence spanning the window would be carried (and re-chunked) forever;
+                # cut it at the window instead
+                final, carry_from = chunks, limit
+
+        for chunk in final:
+            chunk_index += 1
+            yield {
+                'text': chunk['text'],
                 'metadata': {
-                    'paths': [p for p, _ in current_chunk],
-                    'chunk_method': 'xml',
-                    'chunk_index': chunk_count,
+                    'chunk_index': chunk_index,
+                    'chunk_method': method,
                     'max_size': max_size,
                     'overlap': overlap,
                     'language': language,
-                    'root_tag': root.tag,
-                    'xml_attributes': dict(root.attrib)
+                    'start_index': chunk['start_index'] + buffer_offset,
+                    'end_index': chunk['end_index'] + buffer_offset,
                 }
-            })
+            }
+        buffer = buffer[carry_from:]
+        buffer_offset += carry_from
 
-        # Update total chunks count in metadata
-        for chunk in chunks:
-            chunk['metadata']['total_chunks'] = chunk_count
 
-        logging.debug(f"XML chunking complete. Created {len(chunks)} chunks")
-        return chunks
+def _seekable(source) -> bool:
+    return isinstance(source, str) or (hasattr(source, 'seek') and getattr(source, 'seekable', lambda: False)())
 
-    except ET.ParseError as e:
-        logging.error(f"XML parsing error: {str(e)}")
-        raise
-    except Exception as e:
-        logging.error(f"Unexpected error during XML chunking: {str(e)}")
-        raise
+
+def stream_ebook_chapters(source: Union[str, TextIO, Iterable[str]], chunk_options: Dict[str, Any],
+                          block_chars: int = STREAM_BLOCK_CHARS) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming chunk_ebook_by_chapters: yields one chunk per chapter, holding a single chapter in memory.
+
+    Headings are matched line by line with the same patterns. The pattern is picked by scanning the whole source
+    first when it is a string or seekable file; other streams are judged on their first block. A book without
+    headings is chunked by stream_chunks instead of being returned as one chunk.
+    """
+    overlap = int(chunk_options.get('overlap', 0))
+    language = chunk_options.get('language', 'english')
+    chapter_patterns = [pattern for pattern in (
+        chunk_options.get('custom_chapter_pattern', None),
+        r'^#{1,2}\s+',  # Markdown style: '# ' or '## '
+        r'^Chapter\s+\d+',  # 'Chapter ' followed by numbers
+        r'^\d+\.\s+',  # Numbered chapters: '1. ', '2. ', etc.
+        r'^[A-Z\s]+$'  # All caps headings
+    ) if pattern is not None]
+    regexes = [re.compile(pattern, re.MULTILINE | re.IGNORECASE) for pattern in chapter_patterns]
+
+    def first_matching_pattern(lines) -> Optional[int]:
+        best = None
+        for line in lines:
+            for i, regex in enumerate(regexes[:best]):
+                if regex.match(line):
+                    best = i
+                    break
+            if best == 0:
+                break
+        return best
+
+    if _seekable(source):
+        if not isinstance(source, str):
+            position = source.tell()
+        used = first_matching_pattern(iter_text_lines(source, block_chars))
+        if not isinstance(source, str):
+            source.seek(position)
+    else:
+        blocks = iter_text_blocks(source, block_chars)
+        first_block = ''
+        for block in blocks:
+            first_block += block
+            if len(first_block) >= block_chars:
+                break
+        used = first_matching_pattern(first_block.splitlines(keepends=True))
+        source = itertools.chain([first_block], blocks)
+
+    if used is None:
+        logging.debug("stream_ebook_chapters: no chapter headings found, chunking as plain text")
+        yield from stream_chunks(source, {**chunk_options, 'method': chunk_options.get('method') or 'words'},
+                                 block_chars)
+        return
+
+    regex = regexes[used]
+    lines = iter_text_lines(source, block_chars)
+    chapter: List[str] = []
+    chapter_start = None  # Offset of the chapter (including its overlap) in the source
+    preceding = ''  # The last `overlap` characters before the current line
+    chapter_number = 0
+    offset = 0
+
+    def finish_chapter():
+        piece = ''.join(chapter)
+        start, end = _trim_span(piece, 0, len(piece))
+        if start == end:
+            return None
+        metadata = get_chunk_metadata(
+            chunk=piece[start:end],
+            full_text='',
+            chunk_type="chapter",
+            chapter_number=chapter_number,
+            chapter_pattern=chapter_patterns[used],
+            language=language,
+            start_index=chapter_start + start,
+            end_index=chapter_start + end
+        )
+        # Only known once the whole book has been read
+        metadata.pop('relative_position')
+        return {'text': piece[start:end], 'metadata': metadata}
+
+    for line in lines:
+        if regex.match(line):
+            if chapter_start is not None:
+                finished = finish_chapter()
+                if finished:
+                    yield finished
+            chapter_number += 1
+            # As in chunk_ebook_by_chapters, chapters after the first start `overlap` characters early
+            lead = preceding if chapter_number > 1 else ''
+            chapter = [lead] if lead else []
+            chapter_start = offset - len(lead)
+        if chapter_start is not None:
+            chapter.append(line)
+        if overlap > 0:
+            preceding = (preceding + line)[-overlap:]
+        offset += len(line)
+
+    if chapter_start is not None:
+        finished = finish_chapter()
+        if finished:
+            yield finished
+
+
+def stream_xml_chunks(source: Union[str, TextIO, io.BufferedIOBase], chunk_options: Dict[str, Any]
+                      ) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming chunk_xml over a file path or file object, parsed with iterparse.
+
+    Yields the same chunks as chunk_xml except for total_chunks. Each element is released as soon as it has been
+    read, so memory use does not grow with the document.
+    """
+    max_size = chunk_options.get('max_size', 1000)
+    overlap = chunk_options.get('overlap', 0)
+    language = chunk_options.get('language', 'english')
+    logging.debug(f"Chunking parameters - max_size: {max_size}, overlap: {overlap}, language: {language}")
+
+    root_tag = None
+    root_attributes: Dict[str, str] = {}
+    current_chunk: List[Tuple[str, str]] = []
+    current_size = 0
+    chunk_count = 0
+
+    def make_chunk():
+        return {
+            'text': '\n'.join(f"{p}: {c}" for p, c in current_chunk),
+            'metadata': {
+                'paths': [p for p, _ in current_chunk],
+                'chunk_method': 'xml',
+                'chunk_index': chunk_count,
+                'max_size': max_size,
+                'overlap': overlap,
+                'language': language,
+                'root_tag': root_tag,
+                'xml_attributes': dict(root_attributes)
+            }
+        }
+
+    def element_content(element, path):
+        # The (path, text) items extract_xml_structure gives for the element itself
+        items = []
+        if element.text and element.text.strip():
+            items.append((path, element.text.strip()))
+        for key, value in element.attrib.items():
+            items.append((f"{path}/@{key}", value))
+        return items
+
+    # [element, path, whether its own content has been taken]
+    open_elements: List[List[Any]] = []
+    for event, element in ET.iterparse(source, events=('start', 'end')):
+        items = []
+        if event == 'start':
+            parent = open_elements[-1] if open_elements else None
+            if parent is None:
+                root_tag, root_attributes = element.tag, dict(element.attrib)
+            elif not parent[2]:
+                # A child has started, so the parent's text is complete
+                items = element_content(parent[0], parent[1])
+                parent[2] = True
+            open_elements.append([element, f"{parent[1]}/{element.tag}" if parent else element.tag, False])
+        else:
+            _, path, taken = open_elements.pop()
+            if not taken:
+                items = element_content(element, path)
+            element.clear()
+            if open_elements:
+                # Drop the finished child from its parent too
+                del open_elements[-1][0][:]
+
+        for path, content in items:
+            content_size = len(content.split())
+            if current_size + content_size > max_size and current_chunk:
+                chunk_count += 1
+                yield make_chunk()
+                if overlap > 0:
+                    current_chunk = current_chunk[-overlap:]
+                    current_size = sum(len(c.split()) for _, c in current_chunk)
+                else:
+                    current_chunk = []
+                    current_size = 0
+            current_chunk.append((path, content))
+            current_size += content_size
+
+    if current_chunk:
+        chunk_count += 1
+        yield make_chunk()
 
 #
-# End of XML Chunking
+# End of Streaming Chunking
 #######################################################################################################################
 
 #######################################################################################################################
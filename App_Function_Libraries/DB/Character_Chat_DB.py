@@ -7,8 +7,11 @@ import sqlite3
 import json
 import os
 import sys
+from contextlib import closing, contextmanager
 from typing import List, Dict, Optional, Tuple, Any, Union
 
+from App_Function_Libraries.DB.DB_Migrations import Migration, rebuild_fts_tables, run_migrations, sql_migration
+from App_Function_Libraries.DB.DB_Registry import store_registry
 from App_Function_Libraries.Utils.Utils import get_database_dir, get_project_relative_path, get_database_path
 from Tests.Chat_APIs.Chat_APIs_Integration_test import logging
 
@@ -20,8 +23,6 @@ from Tests.Chat_APIs.Chat_APIs_Integration_test import logging
 def ensure_database_directory():
     os.makedirs(get_database_dir(), exist_ok=True)
 
-ensure_database_directory()
-
 
 # Construct the path to the config file
 config_path = get_project_relative_path('Config_Files/config.txt')
@@ -32,166 +33,154 @@ config.read(config_path)
 
 # Get the chat db path from the config, or use the default if not specified
 chat_DB_PATH = config.get('Database', 'chatDB_path', fallback=get_database_path('chatDB.db'))
-print(f"Chat Database path: {chat_DB_PATH}")
 
 ########################################################################################################
 #
 # Functions
 
-# FIXME - Setup properly and test/add documentation for its existence...
-def initialize_database():
-    """Initialize the SQLite database with required tables and FTS5 virtual tables."""
-    conn = None
+# Schema as of the first tracked version: character cards, chats, chat keywords and their FTS5 indexes
+CHAT_DB_BASELINE_SQL = """
+CREATE TABLE IF NOT EXISTS CharacterCards (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT UNIQUE NOT NULL,
+    description TEXT,
+    personality TEXT,
+    scenario TEXT,
+    image BLOB,
+    post_history_instructions TEXT,
+    first_mes TEXT,
+    mes_example TEXT,
+    creator_notes TEXT,
+    system_prompt TEXT,
+    alternate_greetings TEXT,
+    tags TEXT,
+    creator TEXT,
+    character_version TEXT,
+    extensions TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS CharacterCards_fts USING fts5(
+    name,
+    description,
+    personality,
+    scenario,
+    system_prompt,
+    content='CharacterCards',
+    content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS CharacterCards_ai AFTER INSERT ON CharacterCards BEGIN
+    INSERT INTO CharacterCards_fts(
+        rowid,
+        name,
+        description,
+        personality,
+        scenario,
+        system_prompt
+    ) VALUES (
+        new.id,
+        new.name,
+        new.description,
+        new.personality,
+        new.scenario,
+        new.system_prompt
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS CharacterCards_ad AFTER DELETE ON CharacterCards BEGIN
+    DELETE FROM CharacterCards_fts WHERE rowid = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS CharacterCards_au AFTER UPDATE ON CharacterCards BEGIN
+    UPDATE CharacterCards_fts SET
+        name = new.name,
+        description = new.description,
+        personality = new.personality,
+        scenario = new.scenario,
+        system_prompt = new.system_prompt
+    WHERE rowid = new.id;
+END;
+
+CREATE TABLE IF NOT EXISTS CharacterChats (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    character_id INTEGER NOT NULL,
+    conversation_name TEXT,
+    chat_history TEXT,
+    is_snapshot BOOLEAN DEFAULT FALSE,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (character_id) REFERENCES CharacterCards(id) ON DELETE CASCADE
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS CharacterChats_fts USING fts5(
+    conversation_name,
+    chat_history,
+    content='CharacterChats',
+    content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS CharacterChats_ai AFTER INSERT ON CharacterChats BEGIN
+    INSERT INTO CharacterChats_fts(rowid, conversation_name, chat_history)
+    VALUES (new.id, new.conversation_name, new.chat_history);
+END;
+
+CREATE TRIGGER IF NOT EXISTS CharacterChats_ad AFTER DELETE ON CharacterChats BEGIN
+    DELETE FROM CharacterChats_fts WHERE rowid = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS CharacterChats_au AFTER UPDATE ON CharacterChats BEGIN
+    UPDATE CharacterChats_fts SET conversation_name = new.conversation_name, chat_history = new.chat_history
+    WHERE rowid = new.id;
+END;
+
+CREATE TABLE IF NOT EXISTS ChatKeywords (
+    chat_id INTEGER NOT NULL,
+    keyword TEXT NOT NULL,
+    FOREIGN KEY (chat_id) REFERENCES CharacterChats(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_chatkeywords_keyword ON ChatKeywords(keyword);
+
+CREATE INDEX IF NOT EXISTS idx_chatkeywords_chat_id ON ChatKeywords(chat_id);
+"""
+
+MIGRATIONS = [
+    Migration(1, "Baseline schema: character cards, chats, chat keywords and FTS indexes",
+              sql_migration(CHAT_DB_BASELINE_SQL)),
+]
+
+# External-content FTS5 indexes kept in sync by the triggers above
+FTS_TABLES = ['CharacterCards_fts', 'CharacterChats_fts']
+
+
+@contextmanager
+def _chat_db_connection():
+    conn = sqlite3.connect(chat_DB_PATH)
     try:
-        conn = sqlite3.connect(chat_DB_PATH)
-        cursor = conn.cursor()
-
-        # Enable foreign key constraints
-        cursor.execute("PRAGMA foreign_keys = ON;")
+        yield conn
+    finally:
+        conn.close()
 
-        # Create CharacterCards table with V2 fields
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS CharacterCards (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL,
-            description TEXT,
-            personality TEXT,
-            scenario TEXT,
-            image BLOB,
-            post_history_instructions TEXT,
-            first_mes TEXT,
-            mes_example TEXT,
-            creator_notes TEXT,
-            system_prompt TEXT,
-            alternate_greetings TEXT,
-            tags TEXT,
-            creator TEXT,
-            character_version TEXT,
-            extensions TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-        """)
-
-        # Create FTS5 virtual table for CharacterCards
-        cursor.execute("""
-        CREATE VIRTUAL TABLE IF NOT EXISTS CharacterCards_fts USING fts5(
-            name,
-            description,
-            personality,
-            scenario,
-            system_prompt,
-            content='CharacterCards',
-            content_rowid='id'
-        );
-        """)
-
-        # Create triggers to keep FTS5 table in sync with CharacterCards
-        cursor.executescript("""
-        CREATE TRIGGER IF NOT EXISTS CharacterCards_ai AFTER INSERT ON CharacterCards BEGIN
-            INSERT INTO CharacterCards_fts(
-                rowid,
-                name,
-                description,
-                personality,
-                scenario,
-                system_prompt
-            ) VALUES (
-                new.id,
-                new.name,
-                new.description,
-                new.personality,
-                new.scenario,
-                new.system_prompt
-            );
-        END;
-
-        CREATE TRIGGER IF NOT EXISTS CharacterCards_ad AFTER DELETE ON CharacterCards BEGIN
-            DELETE FROM CharacterCards_fts WHERE rowid = old.id;
-        END;
-
-        CREATE TRIGGER IF NOT EXISTS CharacterCards_au AFTER UPDATE ON CharacterCards BEGIN
-            UPDATE CharacterCards_fts SET
-                name = new.name,
-                description = new.description,
-                personality = new.personality,
-                scenario = new.scenario,
-                system_prompt = new.system_prompt
-            WHERE rowid = new.id;
-        END;
-        """)
-
-        # Create CharacterChats table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS CharacterChats (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            character_id INTEGER NOT NULL,
-            conversation_name TEXT,
-            chat_history TEXT,
-            is_snapshot BOOLEAN DEFAULT FALSE,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (character_id) REFERENCES CharacterCards(id) ON DELETE CASCADE
-        );
-        """)
-
-        # Create FTS5 virtual table for CharacterChats
-        cursor.execute("""
-        CREATE VIRTUAL TABLE IF NOT EXISTS CharacterChats_fts USING fts5(
-            conversation_name,
-            chat_history,
-            content='CharacterChats',
-            content_rowid='id'
-        );
-        """)
-
-        # Create triggers to keep FTS5 table in sync with CharacterChats
-        cursor.executescript("""
-        CREATE TRIGGER IF NOT EXISTS CharacterChats_ai AFTER INSERT ON CharacterChats BEGIN
-            INSERT INTO CharacterChats_fts(rowid, conversation_name, chat_history)
-            VALUES (new.id, new.conversation_name, new.chat_history);
-        END;
-
-        CREATE TRIGGER IF NOT EXISTS CharacterChats_ad AFTER DELETE ON CharacterChats BEGIN
-            DELETE FROM CharacterChats_fts WHERE rowid = old.id;
-        END;
-
-        CREATE TRIGGER IF NOT EXISTS CharacterChats_au AFTER UPDATE ON CharacterChats BEGIN
-            UPDATE CharacterChats_fts SET conversation_name = new.conversation_name, chat_history = new.chat_history
-            WHERE rowid = new.id;
-        END;
-        """)
-
-        # Create ChatKeywords table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS ChatKeywords (
-            chat_id INTEGER NOT NULL,
-            keyword TEXT NOT NULL,
-            FOREIGN KEY (chat_id) REFERENCES CharacterChats(id) ON DELETE CASCADE
-        );
-        """)
-
-        # Create indexes for faster searches
-        cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_chatkeywords_keyword ON ChatKeywords(keyword);
-        """)
-        cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_chatkeywords_chat_id ON ChatKeywords(chat_id);
-        """)
 
-        conn.commit()
+def initialize_database():
+    """Create or upgrade the chat database schema. An up-to-date database costs one PRAGMA read."""
+    try:
+        run_migrations(_chat_db_connection, MIGRATIONS, 'character_chat')
         logging.info("Database initialized successfully.")
-    except sqlite3.Error as e:
-        logging.error(f"SQLite error occurred during database initialization: {e}")
-        if conn:
-            conn.rollback()
-        raise
     except Exception as e:
-        logging.error(f"Unexpected error occurred during database initialization: {e}")
-        if conn:
-            conn.rollback()
+        logging.error(f"Error occurred during database initialization: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
+
+
+def rebuild_fts_indexes():
+    """Rebuild the character card and chat FTS indexes from their tables."""
+    get_chat_db_path()
+    with _chat_db_connection() as conn:
+        rebuild_fts_tables(conn, FTS_TABLES)
+    message = f"Rebuilt {len(FTS_TABLES)} character chat FTS indexes"
+    logging.info(message)
+    return message
+
 
 # Call initialize_database() at the start of your application
 def setup_chat_database():
@@ -201,7 +190,25 @@ def setup_chat_database():
         logging.critical(f"Failed to initialize database: {e}")
         sys.exit(1)
 
-setup_chat_database()
+
+def _open_chat_db():
+    ensure_database_directory()
+    logging.info(f"Chat Database path: {chat_DB_PATH}")
+    initialize_database()
+    return chat_DB_PATH
+
+
+def _check_chat_db(db_path):
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.execute("SELECT 1 FROM CharacterCards LIMIT 1")
+
+
+def get_chat_db_path():
+    """Return the chat DB path, creating/migrating the schema the first time it is asked for."""
+    return store_registry.get('character_chat')
+
+
+store_registry.register('character_chat', _open_chat_db, health_check=_check_chat_db)
 
 
 ########################################################################################################
@@ -236,7 +243,7 @@ def parse_character_card(card_data: Dict[str, Any]) -> Dict[str, Any]:
 
 def add_character_card(card_data: Dict[str, Any]) -> Optional[int]:
     """Add or update a character card in the database."""
-    conn = sqlite3.connect(chat_DB_PATH)
+    conn = sqlite3.connect(get_chat_db_path())
     cursor = conn.cursor()
     try:
         parsed_card = parse_character_card(card_data)
@@ -357,7 +364,7 @@ def get_character_cards() -> List[Dict]:
     """Retrieve all character cards from the database and log their name and a preview of the description."""
     try:
         logging.debug(f"Fetching characters from DB: {chat_DB_PATH}")
-        conn = sqlite3.connect(chat_DB_PATH)
+        conn = sqlite3.connect(get_chat_db_path())
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM CharacterCards")
         rows = cursor.fetchall()
@@ -403,7 +410,7 @@ def get_character_card_by_id(character_id: Union[int, Dict[str, Any]]) -> Option
     Returns:
         A dictionary containing the character card data, or None if not found.
     """
-    conn = sqlite3.connect(chat_DB_PATH)
+    conn = sqlite3.connect(get_chat_db_path())
     cursor = conn.cursor()
     try:
         if isinstance(character_id, dict):
@@ -428,7 +435,7 @@ def get_character_card_by_id(character_id: Union[int, Dict[str, Any]]) -> Option
 
 def update_character_card(character_id: int, card_data: Dict) -> bool:
     """Update an existing character card."""
-    conn = sqlite3.connect(chat_DB_PATH)
+    conn = sqlite3.connect(get_chat_db_path())
     cursor = conn.cursor()
     try:
         cursor.execute("""
@@ -456,7 +463,7 @@ def update_character_card(character_id: int, card_data: Dict) -> bool:
 
 def delete_character_card(character_id: int) -> bool:
     """Delete a character card and its associated chats."""
-    conn = sqlite3.connect(chat_DB_PATH)
+    conn = sqlite3.connect(get_chat_db_path())
     cursor = conn.cursor()
     try:
         # Delete associated chats first due to foreign key constraint
@@ -485,7 +492,7 @@ def add_character_chat(character_id: int, conversation_name: str, chat_history:
     Returns:
         Optional[int]: The ID of the inserted chat or None if failed.
     """
-    conn = sqlite3.connect(chat_DB_PATH)
+    conn = sqlite3.connect(get_chat_db_path())
     cursor = conn.cursor()
     try:
         chat_history_json = json.dumps(chat_history)
@@ -519,7 +526,7 @@ def add_character_chat(character_id: int, conversation_name: str, chat_history:
 
 def get_character_chats(character_id: Optional[int] = None) -> List[Dict]:
     """Retrieve all chats, or chats for a specific character if character_id is provided."""
-    conn = sqlite3.connect(chat_DB_PATH)
+    conn = sqlite3.connect(get_chat_db_path())
     cursor = conn.cursor()
     if character_id is not None:
         cursor.execute("SELECT * FROM CharacterChats WHERE character_id = ?", (character_id,))
@@ -533,7 +540,7 @@ def get_character_chats(character_id: Optional[int] = None) -> List[Dict]:
 
 def get_character_chat_by_id(chat_id: int) -> Optional[Dict]:
     """Retrieve a single chat by its ID."""
-    conn = sqlite3.connect(chat_DB_PATH)
+    conn = sqlite3.connect(get_chat_db_path())
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM CharacterChats WHERE id = ?", (chat_id,))
     row = cursor.fetchone()
@@ -560,7 +567,7 @@ def search_character_chats(query: str, character_id: Optional[int] = None) -> Tu
     if not query.strip():
         return [], "Please enter a search query."
 
-    conn = sqlite3.connect(chat_DB_PATH)
+    conn = sqlite3.connect(get_chat_db_path())
     cursor = conn.cursor()
     try:
         if character_id is not None:
@@ -600,7 +607,7 @@ def search_character_chats(query: str, character_id: Optional[int] = None) -> Tu
 
 def update_character_chat(chat_id: int, chat_history: List[Tuple[str, str]]) -> bool:
     """Update an existing chat history."""
-    conn = sqlite3.connect(chat_DB_PATH)
+    conn = sqlite3.connect(get_chat_db_path())
     cursor = conn.cursor()
     try:
         chat_history_json = json.dumps(chat_history)
@@ -623,7 +630,7 @@ def update_character_chat(chat_id: int, chat_history: List[Tuple[str, str]]) ->
 
 def delete_character_chat(chat_id: int) -> bool:
     """Delete a specific chat."""
-    conn = sqlite3.connect(chat_DB_PATH)
+    conn = sqlite3.connect(get_chat_db_path())
     cursor = conn.cursor()
     try:
         cursor.execute("DELETE FROM CharacterChats WHERE id = ?", (chat_id,))
@@ -649,7 +656,7 @@ def fetch_keywords_for_chats(keywords: List[str]) -> List[int]:
     if not keywords:
         return []
 
-    conn = sqlite3.connect(chat_DB_PATH)
+    conn = sqlite3.connect(get_chat_db_path())
     cursor = conn.cursor()
     try:
         # Construct the WHERE clause to search for each keyword
@@ -691,7 +698,7 @@ def search_db(query: str, fields: List[str], where_clause: str = "", page: int =
     if not query.strip():
         return []
 
-    conn = sqlite3.connect(chat_DB_PATH)
+    conn = sqlite3.connect(get_chat_db_path())
     cursor = conn.cursor()
     try:
         # Construct the MATCH query for FTS5
@@ -831,7 +838,7 @@ def search_character_cards(query: str, fts_top_k: int = 10, relevant_media_ids:
         return []
 
     try:
-        conn = sqlite3.connect(chat_DB_PATH)
+        conn = sqlite3.connect(get_chat_db_path())
         cursor = conn.cursor()
 
         # Construct the query
@@ -893,7 +900,7 @@ def fetch_character_ids_by_keywords(keywords: List[str]) -> List[int]:
     if not keywords:
         return []
 
-    conn = sqlite3.connect(chat_DB_PATH)
+    conn = sqlite3.connect(get_chat_db_path())
     cursor = conn.cursor()
     try:
         # Assuming 'tags' column in CharacterCards table stores tags as JSON array
@@ -922,7 +929,7 @@ def fetch_character_ids_by_keywords(keywords: List[str]) -> List[int]:
 
 def view_char_keywords():
     try:
-        with sqlite3.connect(chat_DB_PATH) as conn:
+        with sqlite3.connect(get_chat_db_path()) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT DISTINCT keyword 
@@ -980,7 +987,7 @@ def delete_char_keyword(char_name: str, keyword: str) -> str:
         str: Success/failure message
     """
     try:
-        with sqlite3.connect(chat_DB_PATH) as conn:
+        with sqlite3.connect(get_chat_db_path()) as conn:
             cursor = conn.cursor()
 
             # First, check if the character exists
@@ -1030,7 +1037,7 @@ def export_char_keywords_to_csv() -> Tuple[str, str]:
         # Create a temporary CSV file
         temp_file = NamedTemporaryFile(mode='w+', delete=False, suffix='.csv', newline='')
 
-        with sqlite3.connect(chat_DB_PATH) as conn:
+        with sqlite3.connect(get_chat_db_path()) as conn:
             cursor = conn.cursor()
 
             # Get all characters and their tags
@@ -34,9 +34,11 @@ from App_Function_Libraries.DB.SQLite_DB import (
     create_automated_backup as sqlite_create_automated_backup,
     search_and_display_items as sqlite_search_and_display_items,
     add_media_with_keywords as sqlite_add_media_with_keywords,
+    add_media_batch as sqlite_add_media_batch,
     check_media_and_whisper_model as sqlite_check_media_and_whisper_model, \
     create_document_version as sqlite_create_document_version,
     get_document_version as sqlite_get_document_version, search_media_db as sqlite_search_media_db, add_media_chunk as sqlite_add_media_chunk,
+    search_media_fts as sqlite_search_media_fts, media_fts_maintenance as sqlite_media_fts_maintenance,
     sqlite_update_fts_for_media, get_unprocessed_media as sqlite_get_unprocessed_media, fetch_item_details as sqlite_fetch_item_details, \
     search_media_database as sqlite_search_media_database, mark_as_trash as sqlite_mark_as_trash, \
     get_media_transcripts as sqlite_get_media_transcripts, get_specific_transcript as sqlite_get_specific_transcript, \
@@ -46,16 +48,24 @@ from App_Function_Libraries.DB.SQLite_DB import (
     delete_specific_summary as sqlite_delete_specific_summary, \
     delete_specific_prompt as sqlite_delete_specific_prompt,
     fetch_keywords_for_media as sqlite_fetch_keywords_for_media, \
+    fetch_keywords_for_media_ids as sqlite_fetch_keywords_for_media_ids, \
+    fetch_media_ids_for_keywords as sqlite_fetch_media_ids_for_keywords, \
+    search_media_for_rag as sqlite_search_media_for_rag, \
     update_keywords_for_media as sqlite_update_keywords_for_media, check_media_exists as sqlite_check_media_exists, \
     get_media_content as sqlite_get_media_content, get_paginated_files as sqlite_get_paginated_files, \
     get_media_title as sqlite_get_media_title, get_all_content_from_database as sqlite_get_all_content_from_database, \
-    get_next_media_id as sqlite_get_next_media_id, batch_insert_chunks as sqlite_batch_insert_chunks, Database, \
+    get_media_content_range as sqlite_get_media_content_range, \
+    export_media_library as sqlite_export_media_library, iter_all_content_from_database as sqlite_iter_all_content_from_database, \
+    get_next_media_id as sqlite_get_next_media_id, batch_insert_chunks as sqlite_batch_insert_chunks, Database, db as sqlite_db, \
     save_workflow_chat_to_db as sqlite_save_workflow_chat_to_db, get_workflow_chat as sqlite_get_workflow_chat, \
     update_media_content_with_version as sqlite_update_media_content_with_version, \
     check_existing_media as sqlite_check_existing_media, get_all_document_versions as sqlite_get_all_document_versions, \
     fetch_paginated_data as sqlite_fetch_paginated_data, get_latest_transcription as sqlite_get_latest_transcription, \
     mark_media_as_processed as sqlite_mark_media_as_processed,
+    start_chunking_workers as sqlite_start_chunking_workers, get_chunking_queue_status as sqlite_get_chunking_queue_status,
+    retry_failed_chunking_jobs as sqlite_retry_failed_chunking_jobs,
 )
+from App_Function_Libraries.DB.DB_Registry import store_registry
 from App_Function_Libraries.DB.RAG_QA_Chat_DB import start_new_conversation as sqlite_start_new_conversation, \
     save_message as sqlite_save_message, load_chat_history as sqlite_load_chat_history, \
     get_all_conversations as sqlite_get_all_conversations, get_notes_by_keywords as sqlite_get_notes_by_keywords, \
@@ -69,13 +79,15 @@ from App_Function_Libraries.DB.RAG_QA_Chat_DB import start_new_conversation as s
     fetch_all_conversations as sqlite_fetch_all_conversations, fetch_all_notes as sqlite_fetch_all_notes, \
     fetch_conversations_by_ids as sqlite_fetch_conversations_by_ids, fetch_notes_by_ids as sqlite_fetch_notes_by_ids, \
     delete_messages_in_conversation as sqlite_delete_messages_in_conversation, \
-    get_conversation_text as sqlite_get_conversation_text, search_notes_titles as sqlite_search_notes_titles
+    get_conversation_text as sqlite_get_conversation_text, search_notes_titles as sqlite_search_notes_titles, \
+    rebuild_fts_indexes as sqlite_rebuild_rag_qa_fts_indexes
 from App_Function_Libraries.DB.Character_Chat_DB import (
     add_character_card as sqlite_add_character_card, get_character_cards as sqlite_get_character_cards, \
     get_character_card_by_id as sqlite_get_character_card_by_id, update_character_card as sqlite_update_character_card, \
     delete_character_card as sqlite_delete_character_card, add_character_chat as sqlite_add_character_chat, \
     get_character_chats as sqlite_get_character_chats, get_character_chat_by_id as sqlite_get_character_chat_by_id, \
-    update_character_chat as sqlite_update_character_chat, delete_character_chat as sqlite_delete_character_chat
+    update_character_chat as sqlite_update_character_chat, delete_character_chat as sqlite_delete_character_chat, \
+    rebuild_fts_indexes as sqlite_rebuild_character_chat_fts_indexes
 )
 #
 # Local Imports
@@ -97,53 +109,6 @@ db_path: str = config.get('Database', 'sqlite_path', fallback='./Databases/media
 backup_path: str = config.get('Database', 'backup_path', fallback='database_backups')
 backup_dir: Union[str, bytes] = os.environ.get('DB_BACKUP_DIR', backup_path)
 
-def get_db_config():
-    try:
-        config = load_comprehensive_config()
-
-        if 'Database' not in config:
-            print("Warning: 'Database' section not found in config. Using default values.")
-            return default_db_config()
-
-        return {
-            'type': config.get('Database', 'type', fallback='sqlite'),
-            'sqlite_path': config.get('Database', 'sqlite_path', fallback='Databases/media_summary.db'),
-            'elasticsearch_host': config.get('Database', 'elasticsearch_host', fallback='localhost'),
-            'elasticsearch_port': config.getint('Database', 'elasticsearch_port', fallback=9200)
-        }
-    except FileNotFoundError:
-        print("Warning: Config file not found. Using default database configuration.")
-        return default_db_config()
-    except Exception as e:
-        print(f"Error reading config: {str(e)}. Using default database configuration.")
-        return default_db_config()
-
-def default_db_config():
-    return {
-        'type': 'sqlite',
-        'sqlite_path': get_database_path('media_summary.db'),
-        'elasticsearch_host': 'localhost',
-        'elasticsearch_port': 9200
-    }
-
-def ensure_directory_exists(file_path):
-    directory = os.path.dirname(file_path)
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-        print(f"Created directory: {directory}")
-
-db_config = get_db_config()
-db_type = db_config['type']
-
-if db_type == 'sqlite':
-    db = Database(os.path.basename(db_config['sqlite_path']))
-elif db_type == 'elasticsearch':
-    raise NotImplementedError("Elasticsearch support not yet implemented")
-else:
-    raise ValueError(f"Unsupported database type: {db_type}")
-
-print(f"Database path: {db.db_path}")
-
 def get_db_config():
     try:
         config = load_comprehensive_config()
@@ -187,15 +152,15 @@ db_config = get_db_config()
 db_type = db_config['type']
 
 if db_type == 'sqlite':
-    db = Database(os.path.basename(db_config['sqlite_path']))
+    # Shared with SQLite_DB; the media DB is only opened when something first uses it
+    db = sqlite_db
 elif db_type == 'elasticsearch':
     # Implement Elasticsearch setup here if needed
     raise NotImplementedError("Elasticsearch support not yet implemented")
 else:
     raise ValueError(f"Unsupported database type: {db_type}")
 
-# Print database path for debugging
-print(f"Database path: {db.db_path}")
+logging.debug(f"Media database configured at: {db_config['sqlite_path']}")
 
 # Sanity Check for SQLite DB
 # FIXME - Remove this after testing / Writing Unit tests
@@ -220,6 +185,24 @@ def search_media_db(search_query: str, search_fields: List[str], keywords: str,
     else:
         raise ValueError(f"Unsupported database type: {db_type}")
 
+def search_media_for_rag(*args, **kwargs):
+    if db_type == 'sqlite':
+        return sqlite_search_media_for_rag(*args, **kwargs)
+    elif db_type == 'elasticsearch':
+        # Implement Elasticsearch version when available
+        raise NotImplementedError("Elasticsearch version of search_media_for_rag not yet implemented")
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
+def search_media_fts(*args, **kwargs):
+    if db_type == 'sqlite':
+        return sqlite_search_media_fts(*args, **kwargs)
+    elif db_type == 'elasticsearch':
+        # Implement Elasticsearch version when available
+        raise NotImplementedError("Elasticsearch version of search_media_fts not yet implemented")
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
 def view_database(*args, **kwargs):
     if db_type == 'sqlite':
         return sqlite_view_database(*args, **kwargs)
@@ -241,6 +224,24 @@ def get_all_content_from_database():
         # Implement Elasticsearch version
         raise NotImplementedError("Elasticsearch version of add_media_with_keywords not yet implemented")
 
+
+def iter_all_content_from_database(batch_size: int = 100):
+    if db_type == 'sqlite':
+        return sqlite_iter_all_content_from_database(batch_size)
+    elif db_type == 'elasticsearch':
+        raise NotImplementedError("Elasticsearch version of iter_all_content_from_database not yet implemented")
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
+def export_media_library(*args, **kwargs):
+    if db_type == 'sqlite':
+        return sqlite_export_media_library(*args, **kwargs)
+    elif db_type == 'elasticsearch':
+        raise NotImplementedError("Elasticsearch version of export_media_library not yet implemented")
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
+
 def search_and_display(*args, **kwargs):
     if db_type == 'sqlite':
         return sqlite_search_and_display(*args, **kwargs)
@@ -381,6 +382,14 @@ def add_media_with_keywords(*args, **kwargs):
     elif db_type == 'elasticsearch':
         raise NotImplementedError("Elasticsearch version of add_media_with_keywords not yet implemented")
 
+def add_media_batch(*args, **kwargs):
+    if db_type == 'sqlite':
+        return sqlite_add_media_batch(*args, **kwargs)
+    elif db_type == 'elasticsearch':
+        raise NotImplementedError("Elasticsearch version of add_media_batch not yet implemented")
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
 def check_media_and_whisper_model(*args, **kwargs):
     if db_type == 'sqlite':
         return sqlite_check_media_and_whisper_model(*args, **kwargs)
@@ -415,6 +424,59 @@ def batch_insert_chunks(*args, **kwargs):
     else:
         raise ValueError(f"Unsupported database type: {db_type}")
 
+def start_chunking_workers():
+    if db_type == 'sqlite':
+        sqlite_start_chunking_workers()
+    elif db_type == 'elasticsearch':
+        raise NotImplementedError("Elasticsearch version of start_chunking_workers not yet implemented")
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
+def get_chunking_queue_status():
+    if db_type == 'sqlite':
+        return sqlite_get_chunking_queue_status()
+    elif db_type == 'elasticsearch':
+        raise NotImplementedError("Elasticsearch version of get_chunking_queue_status not yet implemented")
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
+def retry_failed_chunking_jobs():
+    if db_type == 'sqlite':
+        return sqlite_retry_failed_chunking_jobs()
+    elif db_type == 'elasticsearch':
+        raise NotImplementedError("Elasticsearch version of retry_failed_chunking_jobs not yet implemented")
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
+def media_fts_maintenance(action: str = 'optimize'):
+    if db_type == 'sqlite':
+        return sqlite_media_fts_maintenance(action, database=db)
+    elif db_type == 'elasticsearch':
+        raise NotImplementedError("Elasticsearch version of media_fts_maintenance not yet implemented")
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
+def rebuild_all_fts_indexes():
+    """Rebuild the full-text indexes of the media, RAG QA chat and character chat databases."""
+    if db_type == 'sqlite':
+        return [
+            sqlite_media_fts_maintenance('rebuild', database=db),
+            sqlite_rebuild_rag_qa_fts_indexes(),
+            sqlite_rebuild_character_chat_fts_indexes(),
+        ]
+    elif db_type == 'elasticsearch':
+        raise NotImplementedError("Elasticsearch version of rebuild_all_fts_indexes not yet implemented")
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
+def check_database_health(open_closed: bool = True):
+    """Health-check every registered store; with open_closed=False stores nothing has used yet are left closed."""
+    return store_registry.health_check(open_closed=open_closed)
+
+def close_all_databases():
+    """Close every open store (connection pools, clients). Stores reopen on their next use."""
+    store_registry.close_all()
+
 def update_fts_for_media(media_id: int):
     if db_type == 'sqlite':
         sqlite_update_fts_for_media(db, media_id)
@@ -554,6 +616,14 @@ def get_media_content(media_id: int) -> str:
     else:
         raise ValueError(f"Unsupported database type: {db_type}")
 
+def get_media_content_range(media_id: int, start_index: int, end_index: int) -> str:
+    if db_type == 'sqlite':
+        return sqlite_get_media_content_range(media_id, start_index, end_index)
+    elif db_type == 'elasticsearch':
+        raise NotImplementedError("Elasticsearch version of get_media_content_range not yet implemented")
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
 def get_media_transcripts(media_id: int) -> List[Dict]:
     if db_type == 'sqlite':
         return sqlite_get_media_transcripts(media_id)
@@ -702,6 +772,20 @@ def fetch_keywords_for_media(*args, **kwargs):
         # Implement Elasticsearch version
         raise NotImplementedError("Elasticsearch version of add_media_with_keywords not yet implemented")
 
+def fetch_keywords_for_media_ids(*args, **kwargs):
+    if db_type == 'sqlite':
+        return sqlite_fetch_keywords_for_media_ids(*args, **kwargs)
+    elif db_type == 'elasticsearch':
+        # Implement Elasticsearch version
+        raise NotImplementedError("Elasticsearch version of fetch_keywords_for_media_ids not yet implemented")
+
+def fetch_media_ids_for_keywords(*args, **kwargs):
+    if db_type == 'sqlite':
+        return sqlite_fetch_media_ids_for_keywords(*args, **kwargs)
+    elif db_type == 'elasticsearch':
+        # Implement Elasticsearch version
+        raise NotImplementedError("Elasticsearch version of fetch_media_ids_for_keywords not yet implemented")
+
 #
 # End of Keywords-related Functions
 ############################################################################################################
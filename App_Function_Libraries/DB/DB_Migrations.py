@@ -0,0 +1,136 @@
+# DB_Migrations.py
+# Description: Schema-versioned migration runner shared by the SQLite databases.
+#
+# Each database declares an ordered list of numbered migrations. The number of the last migration applied is kept in
+# the database header (`PRAGMA user_version`), so an up-to-date database costs a single PRAGMA read at startup and
+# every migration runs exactly once per database file.
+#
+# Imports
+import sqlite3
+import time
+from typing import Callable, ContextManager, List, NamedTuple
+#
+# Local Imports
+from App_Function_Libraries.Metrics.metrics_logger import log_counter, log_histogram
+from App_Function_Libraries.Utils.Utils import logging
+#
+#######################################################################################################################
+#
+# Functions:
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+class MigrationError(Exception):
+    pass
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def split_sql_script(script: str) -> List[str]:
+    """
+    Split a SQL script into single statements (trigger bodies stay intact).
+
+    Migrations run statements one at a time because sqlite3's executescript() commits the open transaction first.
+    """
+    statements, current = [], ''
+    for line in script.splitlines(keepends=True):
+        if not current and (not line.strip() or line.strip().startswith('--')):
+            continue
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ''
+    if current.strip():
+        statements.append(current.strip())
+    return statements
+
+
+def sql_migration(script: str) -> Callable[[sqlite3.Connection], None]:
+    """Build a migration step that runs every statement of a SQL script."""
+    def apply(conn: sqlite3.Connection) -> None:
+        for statement in split_sql_script(script):
+            conn.execute(statement)
+    return apply
+
+
+def add_column_if_missing(conn: sqlite3.Connection, table: str, column: str, definition: str) -> bool:
+    """ALTER TABLE ... ADD COLUMN for databases created before `column` existed. Returns True if it was added."""
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    if not columns or column in columns:
+        return False
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    logging.info(f"Added column '{column}' to table '{table}'")
+    return True
+
+
+def run_migrations(connect: Callable[[], ContextManager[sqlite3.Connection]], migrations: List[Migration],
+                   db_label: str) -> int:
+    """
+    Bring a database up to the latest schema version.
+
+    :param connect: Context manager factory yielding a connection to the database
+    :param migrations: Migrations in ascending version order
+    :param db_label: Name used in logs and metrics
+    :return: The schema version after running
+    """
+    versions = [migration.version for migration in migrations]
+    if versions != sorted(set(versions)) or (versions and versions[0] < 1):
+        raise MigrationError(f"{db_label}: migration versions must be unique, ascending and start at 1 or above")
+    target = versions[-1] if versions else 0
+
+    with connect() as conn:
+        current = get_schema_version(conn)
+        if current >= target:
+            if current > target:
+                logging.warning(f"{db_label} database schema version {current} is newer than this code "
+                                f"(latest known: {target})")
+            return current
+
+        for migration in migrations:
+            if migration.version <= current:
+                continue
+            start_time = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have migrated while we waited for the write lock
+                current = get_schema_version(conn)
+                if migration.version > current:
+                    logging.info(f"Applying {db_label} migration {migration.version}: {migration.description}")
+                    migration.apply(conn)
+                    conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+                    current = migration.version
+                conn.execute("COMMIT")
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                log_counter("db_migration_error", labels={"db": db_label, "version": str(migration.version)})
+                logging.error(f"{db_label} migration {migration.version} failed: {e}")
+                raise MigrationError(f"{db_label} migration {migration.version} ({migration.description}) "
+                                     f"failed: {e}") from e
+            log_histogram("db_migration_duration", time.time() - start_time,
+                          labels={"db": db_label, "version": str(migration.version)})
+        logging.info(f"{db_label} database schema is at version {current}")
+        return current
+
+
+def rebuild_fts_tables(conn: sqlite3.Connection, fts_tables: List[str]) -> None:
+    """Rebuild external-content FTS5 indexes from their content tables in one transaction."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for fts_table in fts_tables:
+            conn.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+#
+# End of DB_Migrations.py
+#######################################################################################################################
@@ -0,0 +1,154 @@
+# DB_Registry.py
+# Description: Registry of lazily opened data stores (SQLite databases, ChromaDB client, ...).
+#
+# Modules register an opener for each store at import time, which costs nothing. The store itself is opened
+# (connection pool created, schema migrations checked, client constructed) the first time something asks for it,
+# so a CLI one-shot or a test only pays for the stores it actually touches.
+#
+# Imports
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+#
+# Local Imports
+from App_Function_Libraries.Metrics.metrics_logger import log_counter, log_histogram
+from App_Function_Libraries.Utils.Utils import logging
+#
+#######################################################################################################################
+#
+# Functions:
+
+class _StoreEntry:
+    def __init__(self, opener: Callable[[], Any], closer: Optional[Callable[[Any], None]],
+                 health_check: Optional[Callable[[Any], None]]):
+        self.opener = opener
+        self.closer = closer
+        self.health_check = health_check
+        self.handle = None
+        self.is_open = False
+        self.lock = threading.Lock()
+
+
+class StoreRegistry:
+    """
+    Opens registered stores on first use and keeps one handle per store.
+
+    opener() returns the handle, closer(handle) releases it, and health_check(handle) raises if the store is unusable.
+    """
+    def __init__(self):
+        self._entries: Dict[str, _StoreEntry] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, opener: Callable[[], Any], closer: Optional[Callable[[Any], None]] = None,
+                 health_check: Optional[Callable[[Any], None]] = None) -> None:
+        with self._lock:
+            previous = self._entries.get(name)
+            if previous is not None and previous.is_open:
+                raise ValueError(f"Store '{name}' is already open and cannot be re-registered")
+            self._entries[name] = _StoreEntry(opener, closer, health_check)
+
+    def _entry(self, name: str) -> _StoreEntry:
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"Unknown store '{name}'. Registered stores: {sorted(self._entries)}") from None
+
+    def get(self, name: str) -> Any:
+        """Return the store's handle, opening it first if needed."""
+        entry = self._entry(name)
+        if entry.is_open:
+            return entry.handle
+        with entry.lock:
+            if not entry.is_open:
+                start_time = time.time()
+                entry.handle = entry.opener()
+                entry.is_open = True
+                duration = time.time() - start_time
+                log_histogram("store_open_duration", duration, labels={"store": name})
+                logging.debug(f"Opened store '{name}' in {duration:.3f}s")
+        return entry.handle
+
+    open = get
+
+    def is_open(self, name: str) -> bool:
+        return self._entry(name).is_open
+
+    def close(self, name: str) -> None:
+        """Release the store's handle. The next get() opens it again."""
+        entry = self._entry(name)
+        with entry.lock:
+            if not entry.is_open:
+                return
+            handle, entry.handle, entry.is_open = entry.handle, None, False
+            if entry.closer is not None:
+                try:
+                    entry.closer(handle)
+                except Exception as e:
+                    logging.error(f"Error closing store '{name}': {e}")
+        logging.debug(f"Closed store '{name}'")
+
+    def close_all(self) -> None:
+        for name in list(self._entries):
+            self.close(name)
+
+    def health_check(self, names: Optional[List[str]] = None, open_closed: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Check that stores can be opened and used.
+
+        :param names: Stores to check (defaults to every registered store)
+        :param open_closed: Open stores that are not open yet; otherwise they are reported as closed and skipped
+        :return: {name: {'open': bool, 'ok': bool|None, 'error': str|None}}
+        """
+        report = {}
+        for name in names or list(self._entries):
+            entry = self._entry(name)
+            if not entry.is_open and not open_closed:
+                report[name] = {'open': False, 'ok': None, 'error': None}
+                continue
+            try:
+                handle = self.get(name)
+                if entry.health_check is not None:
+                    entry.health_check(handle)
+                report[name] = {'open': True, 'ok': True, 'error': None}
+            except Exception as e:
+                log_counter("store_health_check_failed", labels={"store": name})
+                logging.error(f"Health check failed for store '{name}': {e}")
+                report[name] = {'open': entry.is_open, 'ok': False, 'error': str(e)}
+        return report
+
+    def names(self) -> List[str]:
+        return sorted(self._entries)
+
+
+class LazyStore:
+    """
+    Module-level stand-in for a registered store handle.
+
+    Attribute access is forwarded to the handle, which is opened on first use, so existing code that imports a
+    module-level handle (e.g. `from ...SQLite_DB import db`) keeps working without opening anything at import.
+    """
+    __slots__ = ('_registry', '_name')
+
+    def __init__(self, registry: StoreRegistry, name: str):
+        object.__setattr__(self, '_registry', registry)
+        object.__setattr__(self, '_name', name)
+
+    def __getattr__(self, attr):
+        return getattr(self._registry.get(self._name), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._registry.get(self._name), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._registry.get(self._name), attr)
+
+    def __repr__(self):
+        state = 'open' if self._registry.is_open(self._name) else 'not opened'
+        return f"<LazyStore '{self._name}' ({state})>"
+
+
+store_registry = StoreRegistry()
+
+#
+# End of DB_Registry.py
+#######################################################################################################################
@@ -0,0 +1,193 @@
+# Embedding_Cache_DB.py
+# Description: Disk-backed cache of embedding vectors keyed by (provider, model, normalized-text hash), and of the
+# LLM-written chunk contexts used for contextual embeddings.
+#
+# Embedding the same text with the same model always gives the same vector, so re-ingesting a file, re-indexing a
+# library after changing chunk settings or asking the same query twice only needs the model for texts it has never
+# seen. Vectors are stored as raw float32 (or float16) BLOBs in their own SQLite file, separate from the media DB, so
+# the cache can be deleted at any time. Chunk contexts are cached the same way, keyed by (document hash, chunk hash,
+# model), so re-ingesting a document does not ask the LLM to situate its chunks again.
+#
+# Imports
+import hashlib
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+#
+# 3rd-Party Imports
+import numpy as np
+#
+# Local Imports
+from App_Function_Libraries.DB.DB_Migrations import Migration, sql_migration, run_migrations
+from App_Function_Libraries.DB.DB_Registry import store_registry
+from App_Function_Libraries.DB.SQLite_DB import Database, normalize_chunk_text
+from App_Function_Libraries.Metrics.metrics_logger import log_counter, log_histogram
+from App_Function_Libraries.Utils.Utils import logging
+#
+#######################################################################################################################
+#
+# Functions:
+
+EMBEDDING_CACHE_DB_NAME = 'embedding_cache.db'
+SUPPORTED_DTYPES = ('float32', 'float16')
+# Stay well below SQLite's bound-parameter limit in IN (...) lookups
+LOOKUP_BATCH_SIZE = 500
+
+EMBEDDING_CACHE_BASELINE_SQL = '''
+    CREATE TABLE IF NOT EXISTS EmbeddingCache (
+        provider TEXT NOT NULL,
+        model TEXT NOT NULL,
+        text_hash TEXT NOT NULL,
+        dim INTEGER NOT NULL,
+        dtype TEXT NOT NULL,
+        vector BLOB NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (provider, model, text_hash)
+    ) WITHOUT ROWID;
+'''
+
+CHUNK_CONTEXT_CACHE_SQL = '''
+    CREATE TABLE IF NOT EXISTS ChunkContextCache (
+        doc_hash TEXT NOT NULL,
+        chunk_hash TEXT NOT NULL,
+        model TEXT NOT NULL,
+        context TEXT NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (doc_hash, chunk_hash, model)
+    ) WITHOUT ROWID;
+'''
+
+MIGRATIONS = [
+    Migration(1, "Baseline schema: EmbeddingCache", sql_migration(EMBEDDING_CACHE_BASELINE_SQL)),
+    Migration(2, "Add ChunkContextCache", sql_migration(CHUNK_CONTEXT_CACHE_SQL)),
+]
+
+
+def _open_embedding_cache_db() -> Database:
+    database = Database(EMBEDDING_CACHE_DB_NAME)
+    run_migrations(database.get_connection, MIGRATIONS, 'embedding_cache')
+    return database
+
+
+store_registry.register('embedding_cache', _open_embedding_cache_db,
+                        closer=lambda database: database.close_all_connections(),
+                        health_check=lambda database: database.execute_query("SELECT 1 FROM EmbeddingCache LIMIT 1"))
+
+
+def embedding_text_hash(text: str) -> str:
+    """Cache key for a text: sha256 over its normalized form (Unicode NFC, collapsed whitespace)."""
+    return hashlib.sha256(normalize_chunk_text(text).encode('utf-8')).hexdigest()
+
+
+def _encode_vector(vector, dtype: str) -> Tuple[int, bytes]:
+    array = np.asarray(vector, dtype=dtype).reshape(-1)
+    return array.shape[0], array.tobytes()
+
+
+def _decode_vector(blob: bytes, dtype: str) -> np.ndarray:
+    return np.frombuffer(blob, dtype=dtype).astype(np.float32)
+
+
+def get_cached_embeddings(provider: str, model: str, text_hashes: Iterable[str],
+                          database: Optional[Database] = None) -> Dict[str, np.ndarray]:
+    """
+    Look up many texts at once.
+
+    :return: {text_hash: float32 vector} for every hash that is cached; misses are simply absent
+    """
+    database = database or store_registry.get('embedding_cache')
+    text_hashes = list(dict.fromkeys(text_hashes))
+    found = {}
+    start_time = time.time()
+    with database.get_connection() as conn:
+        for start in range(0, len(text_hashes), LOOKUP_BATCH_SIZE):
+            batch = text_hashes[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = conn.execute(
+                f"SELECT text_hash, dtype, vector FROM EmbeddingCache "
+                f"WHERE provider = ? AND model = ? AND text_hash IN ({placeholders})",
+                [provider, model, *batch]).fetchall()
+            for text_hash, dtype, blob in rows:
+                found[text_hash] = _decode_vector(blob, dtype)
+    log_histogram("embedding_cache_lookup_duration", time.time() - start_time, labels={"model": model})
+    log_counter("embedding_cache_hit", labels={"model": model}, value=len(found))
+    log_counter("embedding_cache_miss", labels={"model": model}, value=len(text_hashes) - len(found))
+    return found
+
+
+def store_cached_embeddings(provider: str, model: str, entries: Sequence[Tuple[str, Sequence[float]]],
+                            dtype: str = 'float32', database: Optional[Database] = None) -> int:
+    """Store (text_hash, vector) pairs, replacing any existing vector for the same key. Returns the number stored."""
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported embedding cache dtype: {dtype}. Use one of {SUPPORTED_DTYPES}")
+    if not entries:
+        return 0
+    database = database or store_registry.get('embedding_cache')
+    rows = []
+    for text_hash, vector in entries:
+        dim, blob = _encode_vector(vector, dtype)
+        rows.append((provider, model, text_hash, dim, dtype, blob))
+    database.execute_many(
+        "INSERT OR REPLACE INTO EmbeddingCache (provider, model, text_hash, dim, dtype, vector) "
+        "VALUES (?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+def clear_embedding_cache(provider: Optional[str] = None, model: Optional[str] = None,
+                          database: Optional[Database] = None) -> int:
+    """Drop cached vectors (all of them, or only those of one provider and/or model). Returns the number removed."""
+    database = database or store_registry.get('embedding_cache')
+    conditions, params = [], []
+    if provider is not None:
+        conditions.append("provider = ?")
+        params.append(provider)
+    if model is not None:
+        conditions.append("model = ?")
+        params.append(model)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+    removed = database.execute_query(f"DELETE FROM EmbeddingCache{where}", tuple(params))
+    logging.info(f"Removed {removed} cached embeddings")
+    return removed
+
+
+def get_cached_chunk_contexts(doc_hash: str, model: str, chunk_hashes: Iterable[str],
+                              database: Optional[Database] = None) -> Dict[str, str]:
+    """Look up the contexts of many chunks of one document. Returns {chunk_hash: context} for the cached ones."""
+    database = database or store_registry.get('embedding_cache')
+    chunk_hashes = list(dict.fromkeys(chunk_hashes))
+    found = {}
+    with database.get_connection() as conn:
+        for start in range(0, len(chunk_hashes), LOOKUP_BATCH_SIZE):
+            batch = chunk_hashes[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = conn.execute(
+                f"SELECT chunk_hash, context FROM ChunkContextCache "
+                f"WHERE doc_hash = ? AND model = ? AND chunk_hash IN ({placeholders})",
+                [doc_hash, model, *batch]).fetchall()
+            found.update(rows)
+    log_counter("chunk_context_cache_hit", labels={"model": model}, value=len(found))
+    log_counter("chunk_context_cache_miss", labels={"model": model}, value=len(chunk_hashes) - len(found))
+    return found
+
+
+def store_cached_chunk_contexts(doc_hash: str, model: str, entries: Sequence[Tuple[str, str]],
+                                database: Optional[Database] = None) -> int:
+    """Store (chunk_hash, context) pairs for one document. Returns the number stored."""
+    if not entries:
+        return 0
+    database = database or store_registry.get('embedding_cache')
+    database.execute_many(
+        "INSERT OR REPLACE INTO ChunkContextCache (doc_hash, chunk_hash, model, context) VALUES (?, ?, ?, ?)",
+        [(doc_hash, chunk_hash, model, context) for chunk_hash, context in entries])
+    return len(entries)
+
+
+def get_embedding_cache_stats(database: Optional[Database] = None) -> List[Dict[str, object]]:
+    """Entry count and stored bytes per (provider, model)."""
+    database = database or store_registry.get('embedding_cache')
+    rows = database.execute_query(
+        "SELECT provider, model, COUNT(*), SUM(LENGTH(vector)) FROM EmbeddingCache GROUP BY provider, model")
+    return [{'provider': row[0], 'model': row[1], 'entries': row[2], 'bytes': row[3]} for row in rows]
+
+#
+# End of Embedding_Cache_DB.py
+#######################################################################################################################
@@ -3,64 +3,90 @@
 #
 # Imports
 import sqlite3
+from contextlib import closing, contextmanager
 #
 # External Imports
 import re
 from typing import Tuple
 #
 # Local Imports
+from App_Function_Libraries.DB.DB_Migrations import Migration, add_column_if_missing, run_migrations, sql_migration
+from App_Function_Libraries.DB.DB_Registry import store_registry
 from App_Function_Libraries.Utils.Utils import get_database_path, logging
 #
 #######################################################################################################################
 #
 # Functions to manage prompts DB
 
+PROMPTS_DB_BASELINE_SQL = '''
+    CREATE TABLE IF NOT EXISTS Prompts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        author TEXT,
+        details TEXT,
+        system TEXT,
+        user TEXT
+    );
+    CREATE TABLE IF NOT EXISTS Keywords (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        keyword TEXT NOT NULL UNIQUE COLLATE NOCASE
+    );
+    CREATE TABLE IF NOT EXISTS PromptKeywords (
+        prompt_id INTEGER,
+        keyword_id INTEGER,
+        FOREIGN KEY (prompt_id) REFERENCES Prompts (id),
+        FOREIGN KEY (keyword_id) REFERENCES Keywords (id),
+        PRIMARY KEY (prompt_id, keyword_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_keywords_keyword ON Keywords(keyword);
+    CREATE INDEX IF NOT EXISTS idx_promptkeywords_prompt_id ON PromptKeywords(prompt_id);
+    CREATE INDEX IF NOT EXISTS idx_promptkeywords_keyword_id ON PromptKeywords(keyword_id);
+'''
+
+
+def _baseline(conn):
+    sql_migration(PROMPTS_DB_BASELINE_SQL)(conn)
+    # Prompts tables created before the author field existed
+    add_column_if_missing(conn, 'Prompts', 'author', 'TEXT')
+
+
+MIGRATIONS = [
+    Migration(1, "Baseline schema: prompts, keywords and the Prompts.author column", _baseline),
+]
+
+
+@contextmanager
+def _prompts_db_connection():
+    conn = sqlite3.connect(get_database_path('prompts.db'))
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
 def create_prompts_db():
+    """Create or upgrade the prompts database schema. An up-to-date database costs one PRAGMA read."""
     logging.debug("create_prompts_db: Creating prompts database.")
-    with sqlite3.connect(get_database_path('prompts.db')) as conn:
-        cursor = conn.cursor()
-        cursor.executescript('''
-            CREATE TABLE IF NOT EXISTS Prompts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                author TEXT,
-                details TEXT,
-                system TEXT,
-                user TEXT
-            );
-            CREATE TABLE IF NOT EXISTS Keywords (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                keyword TEXT NOT NULL UNIQUE COLLATE NOCASE
-            );
-            CREATE TABLE IF NOT EXISTS PromptKeywords (
-                prompt_id INTEGER,
-                keyword_id INTEGER,
-                FOREIGN KEY (prompt_id) REFERENCES Prompts (id),
-                FOREIGN KEY (keyword_id) REFERENCES Keywords (id),
-                PRIMARY KEY (prompt_id, keyword_id)
-            );
-            CREATE INDEX IF NOT EXISTS idx_keywords_keyword ON Keywords(keyword);
-            CREATE INDEX IF NOT EXISTS idx_promptkeywords_prompt_id ON PromptKeywords(prompt_id);
-            CREATE INDEX IF NOT EXISTS idx_promptkeywords_keyword_id ON PromptKeywords(keyword_id);
-        ''')
-
-# FIXME - dirty hack that should be removed later...
-# Migration function to add the 'author' column to the Prompts table
-def add_author_column_to_prompts():
-    with sqlite3.connect(get_database_path('prompts.db')) as conn:
-        cursor = conn.cursor()
-        # Check if 'author' column already exists
-        cursor.execute("PRAGMA table_info(Prompts)")
-        columns = [col[1] for col in cursor.fetchall()]
-
-        if 'author' not in columns:
-            # Add the 'author' column
-            cursor.execute('ALTER TABLE Prompts ADD COLUMN author TEXT')
-            print("Author column added to Prompts table.")
-        else:
-            print("Author column already exists in Prompts table.")
+    run_migrations(_prompts_db_connection, MIGRATIONS, 'prompts')
+
+
+def _open_prompts_db():
+    create_prompts_db()
+    return get_database_path('prompts.db')
+
+
+def _check_prompts_db(db_path):
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.execute("SELECT 1 FROM Prompts LIMIT 1")
+
+
+def get_prompts_db_path():
+    """Return the prompts DB path, creating/migrating the schema the first time it is asked for."""
+    return store_registry.get('prompts')
+
+
+store_registry.register('prompts', _open_prompts_db, health_check=_check_prompts_db)
 
-add_author_column_to_prompts()
 
 def normalize_keyword(keyword):
     return re.sub(r'\s+', ' ', keyword.strip().lower())
@@ -74,7 +100,7 @@ def add_prompt(name, author, details, system=None, user=None, keywords=None):
         return "A name is required."
 
     try:
-        with sqlite3.connect(get_database_path('prompts.db')) as conn:
+        with sqlite3.connect(get_prompts_db_path()) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO Prompts (name, author, details, system, user)
@@ -102,7 +128,7 @@ def add_prompt(name, author, details, system=None, user=None, keywords=None):
 
 def fetch_prompt_details(name):
     logging.debug(f"fetch_prompt_details: Fetching details for prompt: {name}")
-    with sqlite3.connect(get_database_path('prompts.db')) as conn:
+    with sqlite3.connect(get_prompts_db_path()) as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT p.name, p.author, p.details, p.system, p.user, GROUP_CONCAT(k.keyword, ', ') as keywords
@@ -118,7 +144,7 @@ def fetch_prompt_details(name):
 def list_prompts(page=1, per_page=10):
     logging.debug(f"list_prompts: Listing prompts for page {page} with {per_page} prompts per page.")
     offset = (page - 1) * per_page
-    with sqlite3.connect(get_database_path('prompts.db')) as conn:
+    with sqlite3.connect(get_prompts_db_path()) as conn:
         cursor = conn.cursor()
         cursor.execute('SELECT name FROM Prompts LIMIT ? OFFSET ?', (per_page, offset))
         prompts = [row[0] for row in cursor.fetchall()]
@@ -136,8 +162,7 @@ def insert_prompt_to_db(title, author, description, system_prompt, user_prompt,
 
 
 def get_prompt_db_connection():
-    prompt_db_path = get_database_path('prompts.db')
-    return sqlite3.connect(prompt_db_path)
+    return sqlite3.connect(get_prompts_db_path())
 
 
 # def search_prompts(query):
@@ -199,7 +224,7 @@ def search_prompts(query, search_fields):
 def fetch_item_details_with_keywords(media_id):
     logging.debug(f"fetch_item_details_with_keywords: Fetching details for media item with ID: {media_id}")
     try:
-        with sqlite3.connect(get_database_path('prompts.db')) as conn:
+        with sqlite3.connect(get_prompts_db_path()) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT m.content, mm.prompt, mm.summary, GROUP_CONCAT(k.keyword, ', ') as keywords
@@ -222,7 +247,7 @@ def fetch_item_details_with_keywords(media_id):
 def update_prompt_keywords(prompt_name, new_keywords):
     logging.debug(f"update_prompt_keywords: Updating keywords for prompt: {prompt_name}")
     try:
-        with sqlite3.connect(get_database_path('prompts.db')) as conn:
+        with sqlite3.connect(get_prompts_db_path()) as conn:
             cursor = conn.cursor()
 
             cursor.execute('SELECT id FROM Prompts WHERE name = ?', (prompt_name,))
@@ -283,7 +308,7 @@ def load_prompt_details(selected_prompt):
 def update_prompt_in_db(title, author, description, system_prompt, user_prompt):
     logging.debug(f"update_prompt_in_db: Updating prompt: {title}")
     try:
-        with sqlite3.connect(get_database_path('prompts.db')) as conn:
+        with sqlite3.connect(get_prompts_db_path()) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "UPDATE Prompts SET author = ?, details = ?, system = ?, user = ? WHERE name = ?",
@@ -299,7 +324,7 @@ def update_prompt_in_db(title, author, description, system_prompt, user_prompt):
 def delete_prompt(prompt_id):
     logging.debug(f"delete_prompt: Deleting prompt with ID: {prompt_id}")
     try:
-        with sqlite3.connect(get_database_path('prompts.db')) as conn:
+        with sqlite3.connect(get_prompts_db_path()) as conn:
             cursor = conn.cursor()
 
             # Delete associated keywords
@@ -329,7 +354,7 @@ def delete_prompt_keyword(keyword: str) -> str:
     """
     logging.debug(f"delete_prompt_keyword: Deleting keyword: {keyword}")
     try:
-        with sqlite3.connect(get_database_path('prompts.db')) as conn:
+        with sqlite3.connect(get_prompts_db_path()) as conn:
             cursor = conn.cursor()
 
             # First normalize the keyword
@@ -387,7 +412,7 @@ def export_prompt_keywords_to_csv() -> Tuple[str, str]:
         temp_dir = tempfile.gettempdir()
         file_path = os.path.join(temp_dir, f'prompt_keywords_export_{timestamp}.csv')
 
-        with sqlite3.connect(get_database_path('prompts.db')) as conn:
+        with sqlite3.connect(get_prompts_db_path()) as conn:
             cursor = conn.cursor()
 
             # Get keywords with related prompt information
@@ -449,7 +474,7 @@ def view_prompt_keywords() -> str:
     """
     logging.debug("view_prompt_keywords: Retrieving all keywords")
     try:
-        with sqlite3.connect(get_database_path('prompts.db')) as conn:
+        with sqlite3.connect(get_prompts_db_path()) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT k.keyword, COUNT(DISTINCT pk.prompt_id) as prompt_count 
@@ -646,8 +671,6 @@ def export_prompts(
         return error_msg, "None"
 
 
-create_prompts_db()
-
 #
 # End of Propmts_DB.py
 #######################################################################################################################
@@ -16,6 +16,8 @@ from typing import List, Dict, Any, Tuple, Optional
 # (No external imports)
 #
 # Local Imports
+from App_Function_Libraries.DB.DB_Migrations import Migration, rebuild_fts_tables, run_migrations, sql_migration
+from App_Function_Libraries.DB.DB_Registry import store_registry
 from App_Function_Libraries.Utils.Utils import get_project_relative_path, get_project_root, logger, logging
 
 
@@ -246,14 +248,19 @@ END;
 
 # Database connection management
 @contextmanager
-def get_db_connection():
-    db_path = get_rag_qa_db_path()
+def _connect(db_path):
     conn = sqlite3.connect(db_path)
     try:
         yield conn
     finally:
         conn.close()
 
+@contextmanager
+def get_db_connection():
+    # The registry hands back the DB path, creating/migrating the schema the first time it is asked for
+    with _connect(store_registry.get('rag_qa_chat')) as conn:
+        yield conn
+
 @contextmanager
 def transaction():
     with get_db_connection() as conn:
@@ -283,45 +290,63 @@ def execute_query(query, params=None, conn=None):
             return cursor.fetchall()
 
 
-def create_tables():
-    """Create database tables and initialize FTS indexes."""
+# External-content FTS5 indexes (each indexes the table named in its content= option)
+FTS_TABLES = [
+    'rag_qa_notes_fts',
+    'rag_qa_chats_fts',
+    'conversation_metadata_fts',
+    'rag_qa_keywords_fts',
+    'rag_qa_keyword_collections_fts',
+]
+
+
+def _rebuild_fts_after_baseline(conn):
+    # Databases created before migrations were tracked may have FTS indexes that drifted from their tables (the old
+    # startup check compared row counts); rebuild them once while adopting the baseline
+    for fts_table in FTS_TABLES:
+        conn.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+
+
+def _baseline(conn):
+    sql_migration(SCHEMA_SQL)(conn)
+    _rebuild_fts_after_baseline(conn)
+
+
+MIGRATIONS = [
+    Migration(1, "Baseline schema: chats, notes, keywords, collections and their FTS indexes", _baseline),
+]
+
+
+def create_tables(db_path=None):
+    """Create or upgrade the RAG QA Chat schema. An up-to-date database costs one PRAGMA read."""
+    db_path = db_path or get_rag_qa_db_path()
+    run_migrations(lambda: _connect(db_path), MIGRATIONS, 'rag_qa_chat')
+    logger.info("All RAG QA Chat tables and triggers created successfully")
+
+
+def rebuild_fts_indexes():
+    """Rebuild every RAG QA Chat FTS index from its content table (e.g. after restoring a backup)."""
     with get_db_connection() as conn:
-        cursor = conn.cursor()
-        # Execute the SCHEMA_SQL to create tables and triggers
-        cursor.executescript(SCHEMA_SQL)
-
-        # Check and populate all FTS tables
-        fts_tables = [
-            ('rag_qa_notes_fts', 'rag_qa_notes', ['title', 'content']),
-            ('rag_qa_chats_fts', 'rag_qa_chats', ['content']),
-            ('conversation_metadata_fts', 'conversation_metadata', ['title']),
-            ('rag_qa_keywords_fts', 'rag_qa_keywords', ['keyword']),
-            ('rag_qa_keyword_collections_fts', 'rag_qa_keyword_collections', ['name'])
-        ]
+        rebuild_fts_tables(conn, FTS_TABLES)
+    message = f"Rebuilt {len(FTS_TABLES)} RAG QA Chat FTS indexes"
+    logger.info(message)
+    return message
 
-        for fts_table, source_table, columns in fts_tables:
-            # Check if FTS table needs population
-            cursor.execute(f"SELECT COUNT(*) FROM {fts_table}")
-            fts_count = cursor.fetchone()[0]
-            cursor.execute(f"SELECT COUNT(*) FROM {source_table}")
-            source_count = cursor.fetchone()[0]
 
-            if fts_count != source_count:
-                # Repopulate FTS table
-                logger.info(f"Repopulating {fts_table}")
-                cursor.execute(f"DELETE FROM {fts_table}")
-                columns_str = ', '.join(columns)
-                source_columns = ', '.join([f"id" if source_table != 'conversation_metadata' else "rowid"] + columns)
-                cursor.execute(f"""
-                    INSERT INTO {fts_table}(rowid, {columns_str})
-                    SELECT {source_columns} FROM {source_table}
-                """)
+def _open_rag_qa_db():
+    db_path = get_rag_qa_db_path()
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    create_tables(db_path)
+    return db_path
+
 
-        logger.info("All RAG QA Chat tables and triggers created successfully")
+def _check_rag_qa_db(db_path):
+    with _connect(db_path) as conn:
+        conn.execute("SELECT 1 FROM rag_qa_chats LIMIT 1")
 
 
-# Initialize the database
-create_tables()
+# Opened (and migrated) on first use rather than at import
+store_registry.register('rag_qa_chat', _open_rag_qa_db, health_check=_check_rag_qa_db)
 
 #
 # End of Setup
@@ -437,7 +462,7 @@ def add_keywords_to_conversation(conversation_id, keywords):
 
 def view_rag_keywords():
     try:
-        rag_db_path = get_rag_qa_db_path()
+        rag_db_path = store_registry.get('rag_qa_chat')
         with sqlite3.connect(rag_db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT keyword FROM rag_qa_keywords ORDER BY keyword")
@@ -956,7 +981,7 @@ def get_all_conversations(page=1, page_size=20):
         """
 
         count_query = "SELECT COUNT(*) FROM conversation_metadata"
-        db_path = get_rag_qa_db_path()
+        db_path = store_registry.get('rag_qa_chat')
         with sqlite3.connect(db_path) as conn:
             cursor = conn.cursor()
 
@@ -994,7 +1019,7 @@ def get_all_notes(page=1, page_size=20):
         """
 
         count_query = "SELECT COUNT(*) FROM rag_qa_notes"
-        db_path = get_rag_qa_db_path()
+        db_path = store_registry.get('rag_qa_chat')
         with sqlite3.connect(db_path) as conn:
             cursor = conn.cursor()
 
@@ -1188,7 +1213,7 @@ def get_conversation_text(conversation_id):
 
         messages = []
         # Use the connection as a context manager
-        db_path = get_rag_qa_db_path()
+        db_path = store_registry.get('rag_qa_chat')
         with sqlite3.connect(db_path) as conn:
             cursor = conn.cursor()
             cursor.execute(query, (conversation_id,))
@@ -1310,7 +1335,7 @@ def search_rag_chat(query: str, fts_top_k: int = 10, relevant_media_ids: List[st
         return []
 
     try:
-        db_path = get_rag_qa_db_path()
+        db_path = store_registry.get('rag_qa_chat')
         with sqlite3.connect(db_path) as conn:
             cursor = conn.cursor()
             # Perform the full-text search using the FTS virtual table
@@ -1368,7 +1393,7 @@ def search_rag_notes(query: str, fts_top_k: int = 10, relevant_media_ids: List[s
         return []
 
     try:
-        db_path = get_rag_qa_db_path()
+        db_path = store_registry.get('rag_qa_chat')
         with sqlite3.connect(db_path) as conn:
             cursor = conn.cursor()
             # Perform the full-text search using the FTS virtual table
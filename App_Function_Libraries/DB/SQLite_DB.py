@@ -45,24 +45,32 @@ import configparser
 #####################
 #
 # Import necessary libraries
+import atexit
 import csv
 import hashlib
 import html
+import json
 import os
 import queue
 import re
 import shutil
+import socket
 import sqlite3
 import threading
 import time
 import traceback
-from contextlib import contextmanager
+import unicodedata
+import zipfile
+from contextlib import closing, contextmanager
 from datetime import datetime, timedelta
+from itertools import islice
 from typing import List, Tuple, Dict, Any, Optional
 # Local Libraries
 from App_Function_Libraries.Utils.Utils import get_project_relative_path, get_database_path, \
     get_database_dir, logger, logging
 from App_Function_Libraries.Chunk_Lib import chunk_options, chunk_text
+from App_Function_Libraries.DB.DB_Migrations import Migration, add_column_if_missing, run_migrations
+from App_Function_Libraries.DB.DB_Registry import LazyStore, store_registry
 from App_Function_Libraries.Metrics.metrics_logger import log_counter, log_histogram
 #
 # Third-Party Libraries
@@ -77,8 +85,6 @@ import yaml
 def ensure_database_directory():
     os.makedirs(get_database_dir(), exist_ok=True)
 
-ensure_database_directory()
-
 # FIXME - Setup properly and test/add documentation for its existence...
 # Construct the path to the config file
 config_path = get_project_relative_path('Config_Files/config.txt')
@@ -98,6 +104,21 @@ backup_path = get_project_relative_path(backup_path)
 db_path = sqlite_path
 backup_dir = backup_path
 
+# Connection pool / PRAGMA tuning for the media database
+sqlite_pool_size = config.getint('Database', 'sqlite_pool_size', fallback=8)
+sqlite_pragmas = [
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    # Negative cache_size is in KiB
+    ('cache_size', -config.getint('Database', 'sqlite_cache_size_kb', fallback=20000)),
+    ('mmap_size', config.getint('Database', 'sqlite_mmap_size_mb', fallback=256) * 1024 * 1024),
+    ('temp_store', 'MEMORY'),
+]
+
+# Background chunking workers for newly ingested media (0 = chunk inline during ingest)
+chunking_workers = config.getint('Chunking', 'chunking_workers', fallback=1)
+chunking_job_lease_seconds = config.getint('Chunking', 'chunking_job_lease_seconds', fallback=300)
+
 logging.info(f"Media Database path: {db_path}")
 logging.info(f"Media Backup directory: {backup_dir}")
 #create_automated_backup(db_path, backup_dir)
@@ -149,6 +170,10 @@ def create_automated_backup(db_path, backup_dir):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_file = os.path.join(backup_dir, f"media_db_backup_{timestamp}.db")
 
+    # Fold the WAL into the main database file first, otherwise the copy would miss recent writes
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
     # Copy the database file
     shutil.copy2(db_path, backup_file)
 
@@ -221,46 +246,184 @@ class InputError(Exception):
     pass
 
 
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections for a single database file.
+
+    Every connection is opened in autocommit mode with WAL journaling and the tuned PRAGMAs below, so any
+    number of readers can run alongside the one dedicated writer connection. Writes that go through the
+    pool's writer are serialized by a lock and kept in short explicit transactions.
+    """
+    def __init__(self, db_path: str, max_connections: int = 8, timeout: float = 10.0,
+                 pragmas: Optional[List[Tuple[str, Any]]] = None):
+        self.db_path = db_path
+        self.max_connections = max(1, int(max_connections))
+        self.timeout = timeout
+        self.pragmas = pragmas if pragmas is not None else sqlite_pragmas
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._writer = None
+        self._writer_lock = threading.RLock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.isolation_level = None  # Autocommit; transactions are always explicit
+        for pragma, value in self.pragmas:
+            conn.execute(f"PRAGMA {pragma}={value}")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.max_connections
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise DatabaseError(f"Timed out waiting for a free connection to {self.db_path} "
+                                f"(pool size: {self.max_connections})")
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        try:
+            # Never hand a connection to the next caller with a transaction still open
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+        except sqlite3.Error:
+            self.discard(conn)
+            return
+        self._idle.put(conn)
+
+    def discard(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        finally:
+            with self._lock:
+                self._created -= 1
+
+    @contextmanager
+    def writer(self):
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+            yield self._writer
+
+    def close_all(self) -> None:
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(conn)
+
+
 class Database:
     def __init__(self, db_name='media_summary.db'):
         self.db_path = get_database_path(db_name)
         self.timeout = 10.0
         self._local = threading.local()
+        self._pool = ConnectionPool(self.db_path, max_connections=sqlite_pool_size, timeout=self.timeout)
+
+    def _owns_writer(self) -> bool:
+        return getattr(self._local, 'writer_depth', 0) > 0
 
     @contextmanager
     def get_connection(self):
-        if not hasattr(self._local, 'connection') or self._local.connection is None:
-            self._local.connection = sqlite3.connect(self.db_path, timeout=self.timeout)
-            self._local.connection.isolation_level = None  # This enables autocommit mode
-        yield self._local.connection
+        # Inside db.transaction() this thread already holds the writer; reuse it so nested helpers join the transaction
+        if self._owns_writer():
+            with self._pool.writer() as conn:
+                yield conn
+            return
+
+        # Nested get_connection() calls on the same thread share the connection leased by the outermost one
+        conn = getattr(self._local, 'connection', None)
+        if conn is not None:
+            yield conn
+            return
+
+        conn = self._pool.acquire()
+        self._local.connection = conn
+        try:
+            yield conn
+        finally:
+            # close_connection() may already have closed and discarded it
+            if getattr(self._local, 'connection', None) is conn:
+                self._local.connection = None
+                self._pool.release(conn)
+
+    @contextmanager
+    def _write_connection(self):
+        # Route writes from a thread that already holds a connection through that connection, otherwise a write
+        # issued while its own transaction is open would wait on itself
+        conn = getattr(self._local, 'connection', None)
+        if conn is not None:
+            yield conn
+            return
+        with self._pool.writer() as conn:
+            self._local.writer_depth = getattr(self._local, 'writer_depth', 0) + 1
+            try:
+                yield conn
+            finally:
+                self._local.writer_depth -= 1
 
     def close_connection(self):
-        if hasattr(self._local, 'connection') and self._local.connection:
-            self._local.connection.close()
+        conn = getattr(self._local, 'connection', None)
+        if conn is not None:
             self._local.connection = None
+            self._pool.discard(conn)
+
+    def close_all_connections(self):
+        """Close every pooled connection, including the writer (e.g. before deleting or replacing the DB file)."""
+        self.close_connection()
+        self._pool.close_all()
 
     @contextmanager
     def transaction(self):
-        with self.get_connection() as conn:
+        with self._write_connection() as conn:
+            # Nested transaction() blocks join the enclosing transaction
+            if conn.in_transaction:
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
             try:
-                conn.execute("BEGIN")
                 yield conn
-                conn.execute("COMMIT")
+                if conn.in_transaction:
+                    conn.execute("COMMIT")
             except Exception:
-                conn.execute("ROLLBACK")
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
                 raise
 
     def execute_query(self, query: str, params: Tuple = ()) -> Any:
-        with self.get_connection() as conn:
+        if query.strip().upper().startswith("SELECT"):
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                return cursor.fetchall()
+        with self._write_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
-            if query.strip().upper().startswith("SELECT"):
-                return cursor.fetchall()
-            else:
-                return cursor.rowcount
+            return cursor.rowcount
 
     def execute_many(self, query: str, params_list: List[Tuple]) -> None:
-        with self.get_connection() as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.executemany(query, params_list)
 
@@ -269,13 +432,73 @@ class Database:
         result = self.execute_query(query, (table_name,))
         return bool(result)
 
-db = Database()
+# The media DB is opened (and migrated) on first use; see get_media_db()
+db = LazyStore(store_registry, 'media')
+
+# media_fts is an external-content index over Media: it stores only the index, and the triggers below keep it in sync
+MEDIA_FTS_CREATE_SQL = "CREATE VIRTUAL TABLE media_fts USING fts5(title, content, content='Media', content_rowid='id')"
+
+MEDIA_FTS_TRIGGERS_SQL = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS media_fts_ai AFTER INSERT ON Media BEGIN
+        INSERT INTO media_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS media_fts_ad AFTER DELETE ON Media BEGIN
+        INSERT INTO media_fts(media_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS media_fts_au AFTER UPDATE OF title, content ON Media BEGIN
+        INSERT INTO media_fts(media_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO media_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    ''',
+]
+
+
+def migrate_media_fts_to_external_content(db) -> bool:
+    """
+    One-time migration of a standalone media_fts table to an external-content table over Media.
 
-# Usage example:
-if db.table_exists('DocumentVersions'):
-    logging.debug("DocumentVersions table exists")
-else:
-    logging.debug("DocumentVersions table does not exist")
+    Runs in a single write transaction, so readers keep using the old index until it commits.
+    Returns True if a migration was performed.
+    """
+    result = db.execute_query("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'media_fts'")
+    if result and "content='Media'" in result[0][0]:
+        return False
+
+    logging.info("Migrating media_fts to an external-content FTS5 table...")
+    start_time = time.time()
+    with db.transaction() as conn:
+        conn.execute("DROP TABLE IF EXISTS media_fts")
+        conn.execute(MEDIA_FTS_CREATE_SQL)
+        for query in MEDIA_FTS_TRIGGERS_SQL:
+            conn.execute(query)
+        conn.execute("INSERT INTO media_fts(media_fts) VALUES ('rebuild')")
+    logging.info(f"media_fts migration completed in {time.time() - start_time:.2f}s")
+    return True
+
+
+def media_fts_maintenance(action: str = 'optimize', database=None) -> str:
+    """
+    Run an FTS5 maintenance command against media_fts.
+
+    :param action: 'optimize' merges index segments (run after large imports); 'rebuild' regenerates the index from Media
+    :param database: Database instance to use (defaults to the module-level media DB)
+    """
+    if action not in ('optimize', 'rebuild'):
+        raise ValueError(f"Unsupported media_fts maintenance action: {action}")
+    database = database or db
+    start_time = time.time()
+    with database.transaction() as conn:
+        conn.execute(f"INSERT INTO media_fts(media_fts) VALUES ('{action}')")
+    duration = time.time() - start_time
+    log_histogram("media_fts_maintenance_duration", duration, labels={"action": action})
+    message = f"media_fts {action} completed in {duration:.2f}s"
+    logging.info(message)
+    return message
 
 
 # Function to create tables with the new media schema
@@ -356,9 +579,20 @@ def create_tables(db) -> None:
             start_index INTEGER,
             end_index INTEGER,
             chunk_id TEXT,
+            chunk_hash TEXT,
             FOREIGN KEY (media_id) REFERENCES Media(id)
         )''',
         '''
+        CREATE TABLE IF NOT EXISTS ChunkHashes (
+            chunk_hash TEXT NOT NULL,
+            embedding_model TEXT NOT NULL,
+            collection_name TEXT NOT NULL,
+            embedding_id TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (chunk_hash, embedding_model, collection_name)
+        )
+        ''',
+        '''
         CREATE TABLE IF NOT EXISTS UnvectorizedMediaChunks (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             media_id INTEGER NOT NULL,
@@ -375,6 +609,22 @@ def create_tables(db) -> None:
         )
         ''',
         '''
+        CREATE TABLE IF NOT EXISTS ChunkingJobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            media_id INTEGER NOT NULL,
+            media_name TEXT,
+            chunk_options TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            claimed_by TEXT,
+            heartbeat_at TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (media_id) REFERENCES Media(id)
+        )
+        ''',
+        '''
         CREATE TABLE IF NOT EXISTS DocumentVersions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             media_id INTEGER NOT NULL,
@@ -399,18 +649,20 @@ def create_tables(db) -> None:
         'CREATE INDEX IF NOT EXISTS idx_mediamodifications_media_id ON MediaModifications(media_id)',
         'CREATE INDEX IF NOT EXISTS idx_media_is_trash ON Media(is_trash)',
         'CREATE INDEX IF NOT EXISTS idx_mediachunks_media_id ON MediaChunks(media_id)',
+        'CREATE INDEX IF NOT EXISTS idx_mediachunks_chunk_hash ON MediaChunks(chunk_hash)',
         'CREATE INDEX IF NOT EXISTS idx_unvectorized_media_chunks_media_id ON UnvectorizedMediaChunks(media_id)',
         'CREATE INDEX IF NOT EXISTS idx_unvectorized_media_chunks_is_processed ON UnvectorizedMediaChunks(is_processed)',
         'CREATE INDEX IF NOT EXISTS idx_unvectorized_media_chunks_chunk_type ON UnvectorizedMediaChunks(chunk_type)',
         'CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_media_url ON Media(url)',
         'CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_media_keyword ON MediaKeywords(media_id, keyword_id)',
+        'CREATE INDEX IF NOT EXISTS idx_chunking_jobs_status ON ChunkingJobs(status, id)',
         'CREATE INDEX IF NOT EXISTS idx_document_versions_media_id ON DocumentVersions(media_id)',
         'CREATE INDEX IF NOT EXISTS idx_document_versions_version_number ON DocumentVersions(version_number)'
     ]
 
     virtual_table_queries = [
         # CREATE VIRTUAL TABLE statements
-        'CREATE VIRTUAL TABLE IF NOT EXISTS media_fts USING fts5(title, content)',
+        MEDIA_FTS_CREATE_SQL.replace('CREATE VIRTUAL TABLE', 'CREATE VIRTUAL TABLE IF NOT EXISTS', 1),
         'CREATE VIRTUAL TABLE IF NOT EXISTS keyword_fts USING fts5(keyword)'
     ]
 
@@ -441,6 +693,11 @@ def create_tables(db) -> None:
             logging.error(f"Error details: {str(e)}")
             raise
 
+    # Older databases still have a standalone media_fts holding its own copy of every transcript
+    migrate_media_fts_to_external_content(db)
+    for query in MEDIA_FTS_TRIGGERS_SQL:
+        db.execute_query(query)
+
     try:
         db.execute_query('CREATE UNIQUE INDEX IF NOT EXISTS idx_media_content_hash ON Media(content_hash)')
     except Exception as e:
@@ -451,46 +708,56 @@ def create_tables(db) -> None:
     logging.info("All tables, indexes, and virtual tables created successfully.")
 
 # ------------------------------------------------------------------------------------------
-# Safe schema update for existing DBs
-def update_database_schema():
-    """
-    Check for the content_hash column in Media; if missing, add it and create its index.
-    This prevents errors for DBs created before content_hash was added to the schema.
-    """
-    try:
-        logging.info("Checking if the 'content_hash' column exists in the Media table...")
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT COUNT(*) 
-                FROM pragma_table_info('Media') 
-                WHERE name = 'content_hash'
-            ''')
-            column_exists = cursor.fetchone()[0]
+# Schema migrations
+#
+# Columns added to tables after they first shipped. CREATE TABLE IF NOT EXISTS leaves existing tables alone, so older
+# databases get these through ALTER TABLE before create_tables() builds indexes over them.
+MEDIA_DB_LEGACY_COLUMNS = [
+    ('Media', 'chunking_status', "TEXT DEFAULT 'pending'"),
+    ('Media', 'vector_processing', 'INTEGER DEFAULT 0'),
+    ('Media', 'content_hash', 'TEXT'),
+    ('MediaChunks', 'chunk_id', 'TEXT'),
+    ('MediaChunks', 'chunk_hash', 'TEXT'),
+]
+
+
+def _media_db_migrations(database) -> List[Migration]:
+    def baseline(conn):
+        for table, column, definition in MEDIA_DB_LEGACY_COLUMNS:
+            add_column_if_missing(conn, table, column, definition)
+        # Runs on the migration's connection: Database routes this thread's queries through its leased connection
+        create_tables(database)
+
+    def chunking_job_leases(conn):
+        add_column_if_missing(conn, 'ChunkingJobs', 'claimed_by', 'TEXT')
+        add_column_if_missing(conn, 'ChunkingJobs', 'heartbeat_at', 'TIMESTAMP')
+
+    return [
+        Migration(1, "Baseline schema: tables, indexes, legacy columns and external-content media_fts", baseline),
+        Migration(2, "Worker leases on chunking jobs", chunking_job_leases),
+    ]
 
-            if not column_exists:
-                cursor.execute('ALTER TABLE Media ADD COLUMN content_hash TEXT')
-                logging.info("Added content_hash column to 'Media' table.")
 
-                cursor.execute('''
-                    CREATE UNIQUE INDEX IF NOT EXISTS idx_media_content_hash 
-                    ON Media(content_hash)
-                ''')
-                logging.info("Created 'content_hash' unique index.")
+def migrate_media_db(database=None) -> int:
+    """Apply pending media DB migrations; an up-to-date database costs one PRAGMA read."""
+    database = database or db
+    return run_migrations(database.get_connection, _media_db_migrations(database), 'media')
 
-            conn.commit()
-    except Exception as e:
-        logging.error(f"Schema update failed: {str(e)}")
-        logging.error(traceback.format_exc())
-        raise
-    finally:
-        db.close_connection()
 
+def _open_media_db() -> Database:
+    ensure_database_directory()
+    database = Database(os.path.basename(sqlite_path))
+    migrate_media_db(database)
+    return database
 
-# ------------------------------------------------------------------------------------------
-# Create tables (if they don't exist), then update schema (if needed)
-create_tables(db)
-update_database_schema()
+
+def get_media_db() -> Database:
+    """Return the shared media database, opening and migrating it on first use."""
+    return store_registry.get('media')
+
+
+store_registry.register('media', _open_media_db, closer=lambda database: database.close_all_connections(),
+                        health_check=lambda database: database.execute_query("SELECT 1"))
 #
 # End of DB Setup Functions
 #######################################################################################################################
@@ -596,10 +863,9 @@ def add_media_chunk(media_id: int, chunk_text: str, start_index: int, end_index:
         conn.commit()
 
 def sqlite_update_fts_for_media(db, media_id: int):
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("INSERT OR REPLACE INTO media_fts (rowid, title, content) SELECT id, title, content FROM Media WHERE id = ?", (media_id,))
-        conn.commit()
+    # media_fts is kept in sync with Media by triggers; writing to it directly would corrupt the external-content index.
+    # Kept so existing callers don't break.
+    logging.debug(f"sqlite_update_fts_for_media({media_id}): media_fts is maintained by triggers, nothing to do")
 
 
 def get_unprocessed_media(db):
@@ -689,6 +955,10 @@ def add_media_to_database(url, info_dict, segments, summary, keywords, custom_pr
 # )
 
 
+ALLOWED_MEDIA_TYPES = ('article', 'audio', 'book', 'document', 'mediawiki_article', 'mediawiki_dump',
+                       'obsidian_note', 'podcast', 'text', 'video', 'unknown')
+
+
 # Function to add media with keywords
 def add_media_with_keywords(url, title, media_type, content, keywords, prompt, summary, transcription_model, author,
                            ingestion_date, overwrite=False, db=None, chunk_options=None):
@@ -697,7 +967,7 @@ def add_media_with_keywords(url, title, media_type, content, keywords, prompt, s
     logging.debug(f"Entering add_media_with_keywords: URL={url}, Title={title}")
 
     if db is None:
-        db = Database()
+        db = get_media_db()
 
     # Set default values for missing fields
     if url is None:
@@ -712,8 +982,7 @@ def add_media_with_keywords(url, title, media_type, content, keywords, prompt, s
     author = author or 'Unknown'
     ingestion_date = ingestion_date or datetime.now().strftime('%Y-%m-%d')
 
-    if media_type not in ['article', 'audio', 'book', 'document', 'mediawiki_article', 'mediawiki_dump',
-                        'obsidian_note', 'podcast', 'text', 'video', 'unknown']:
+    if media_type not in ALLOWED_MEDIA_TYPES:
         log_counter("add_media_with_keywords_error", labels={"error_type": "InvalidMediaType"})
         duration = time.time() - start_time
         log_histogram("add_media_with_keywords_duration", duration)
@@ -819,10 +1088,6 @@ def add_media_with_keywords(url, title, media_type, content, keywords, prompt, s
                 media_keyword_params = [(media_id, keyword_id) for keyword_id, _ in keyword_ids]
                 cursor.executemany('INSERT OR IGNORE INTO MediaKeywords (media_id, keyword_id) VALUES (?, ?)', media_keyword_params)
 
-                # Update full-text search index
-                cursor.execute('INSERT OR REPLACE INTO media_fts (rowid, title, content) VALUES (?, ?, ?)',
-                            (media_id, title, content))
-
                 # Add media version
                 cursor.execute('SELECT MAX(version) FROM MediaVersion WHERE media_id = ?', (media_id,))
                 current_version = cursor.fetchone()[0] or 0
@@ -835,7 +1100,7 @@ def add_media_with_keywords(url, title, media_type, content, keywords, prompt, s
 
             # Add loading of chunking options from Config file
             if action in ["updated", "added"]:
-                schedule_chunking(media_id, content, title, chunk_options)
+                schedule_chunking(media_id, content, title, media_type, chunk_options, database=db)
 
             duration = time.time() - start_time
             log_histogram("add_media_with_keywords_duration", duration)
@@ -863,6 +1128,201 @@ def add_media_with_keywords(url, title, media_type, content, keywords, prompt, s
         raise DatabaseError(f"Unexpected error: {e}")
 
 
+def _prepare_media_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply the same defaults and validation as add_media_with_keywords to a single bulk-ingest record."""
+    media_type = record.get('media_type') or 'Unknown'
+    if media_type not in ALLOWED_MEDIA_TYPES:
+        raise InputError(f"Invalid media type '{media_type}'.")
+    ingestion_date = record.get('ingestion_date') or datetime.now().strftime('%Y-%m-%d')
+    if not is_valid_date(ingestion_date):
+        raise InputError("Invalid ingestion date format. Use YYYY-MM-DD.")
+
+    content = record.get('content') or 'No content available'
+    keywords = record.get('keywords') or 'default'
+    if isinstance(keywords, str):
+        keywords = keywords.split(',')
+    keyword_list = list(dict.fromkeys(k.strip().lower() for k in keywords if k and k.strip())) or ['default']
+    content_hash = hashlib.sha256(content.encode()).hexdigest()
+
+    return {
+        'url': record.get('url') or f"https://No-URL-Submitted.com/{media_type}/{content_hash}",
+        'title': record.get('title') or 'Untitled',
+        'media_type': media_type,
+        'content': content,
+        'keywords': keyword_list,
+        'prompt': record.get('prompt') or 'No prompt available',
+        'summary': record.get('summary') or 'No summary available',
+        'transcription_model': record.get('transcription_model') or 'Unknown',
+        'author': record.get('author') or 'Unknown',
+        'ingestion_date': ingestion_date,
+        'content_hash': content_hash,
+        'chunk_options': record.get('chunk_options'),
+    }
+
+
+def _write_media_batch(records: List[Dict[str, Any]], overwrite: bool, database) -> List[Dict[str, Any]]:
+    """Write one batch of prepared records in a single transaction and return a result per record."""
+    results: List[Optional[Dict[str, Any]]] = [None] * len(records)
+    first_by_key: Dict[str, int] = {}
+    unique: List[int] = []
+    for pos, record in enumerate(records):
+        first = first_by_key.get(record['content_hash'], first_by_key.get(record['url']))
+        if first is not None:
+            results[pos] = {'media_id': None, 'action': 'duplicate', 'duplicate_of': first}
+            continue
+        first_by_key[record['content_hash']] = pos
+        first_by_key[record['url']] = pos
+        unique.append(pos)
+
+    if not unique:
+        return results
+
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with database.transaction() as conn:
+        cursor = conn.cursor()
+
+        # One lookup for the whole batch instead of one per item
+        hashes = [records[pos]['content_hash'] for pos in unique]
+        urls = [records[pos]['url'] for pos in unique]
+        placeholders = ','.join('?' * len(unique))
+        cursor.execute(f"SELECT id, url, content_hash FROM Media "
+                       f"WHERE content_hash IN ({placeholders}) OR url IN ({placeholders})", hashes + urls)
+        existing_by_hash, existing_by_url = {}, {}
+        for media_id, url, content_hash in cursor.fetchall():
+            existing_by_hash[content_hash] = media_id
+            existing_by_url[url] = media_id
+
+        to_insert, to_update = [], []
+        for pos in unique:
+            record = records[pos]
+            media_id = existing_by_url.get(record['url'], existing_by_hash.get(record['content_hash']))
+            if media_id is None:
+                to_insert.append(pos)
+            elif overwrite:
+                results[pos] = {'media_id': media_id, 'action': 'updated'}
+                to_update.append(pos)
+            else:
+                results[pos] = {'media_id': media_id, 'action': 'skipped'}
+
+        if to_insert:
+            cursor.executemany('''
+            INSERT INTO Media (url, title, type, content, author, ingestion_date, transcription_model, chunking_status, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 'pending', ?)
+            ''', [(records[pos]['url'], records[pos]['title'], records[pos]['media_type'], records[pos]['content'],
+                   records[pos]['author'], records[pos]['ingestion_date'], records[pos]['transcription_model'],
+                   records[pos]['content_hash']) for pos in to_insert])
+            inserted_hashes = [records[pos]['content_hash'] for pos in to_insert]
+            cursor.execute(f"SELECT id, content_hash FROM Media WHERE content_hash IN ({','.join('?' * len(to_insert))})",
+                           inserted_hashes)
+            new_ids = {content_hash: media_id for media_id, content_hash in cursor.fetchall()}
+            for pos in to_insert:
+                results[pos] = {'media_id': new_ids[records[pos]['content_hash']], 'action': 'added'}
+
+        if to_update:
+            cursor.executemany('''
+            UPDATE Media
+            SET url = ?, content = ?, transcription_model = ?, title = ?, type = ?, author = ?,
+                ingestion_date = ?, chunking_status = 'pending', content_hash = ?
+            WHERE id = ?
+            ''', [(records[pos]['url'], records[pos]['content'], records[pos]['transcription_model'],
+                   records[pos]['title'], records[pos]['media_type'], records[pos]['author'],
+                   records[pos]['ingestion_date'], records[pos]['content_hash'], results[pos]['media_id'])
+                  for pos in to_update])
+
+        written = to_insert + to_update
+        if written:
+            cursor.executemany('''
+            INSERT INTO MediaModifications (media_id, prompt, summary, modification_date)
+            VALUES (?, ?, ?, ?)
+            ''', [(results[pos]['media_id'], records[pos]['prompt'], records[pos]['summary'],
+                   records[pos]['ingestion_date']) for pos in written])
+
+            all_keywords = sorted({keyword for pos in written for keyword in records[pos]['keywords']})
+            cursor.executemany('INSERT OR IGNORE INTO Keywords (keyword) VALUES (?)', [(k,) for k in all_keywords])
+            cursor.execute(f"SELECT keyword, id FROM Keywords WHERE keyword IN ({','.join('?' * len(all_keywords))})",
+                           all_keywords)
+            keyword_ids = dict(cursor.fetchall())
+            cursor.executemany('INSERT OR IGNORE INTO MediaKeywords (media_id, keyword_id) VALUES (?, ?)',
+                               [(results[pos]['media_id'], keyword_ids[keyword])
+                                for pos in written for keyword in records[pos]['keywords']])
+
+            cursor.executemany('''
+            INSERT INTO MediaVersion (media_id, version, prompt, summary, created_at)
+            SELECT ?, COALESCE(MAX(version), 0) + 1, ?, ?, ? FROM MediaVersion WHERE media_id = ?
+            ''', [(results[pos]['media_id'], records[pos]['prompt'], records[pos]['summary'], now,
+                   results[pos]['media_id']) for pos in written])
+
+    for pos, result in enumerate(results):
+        if result is not None and result['action'] == 'duplicate':
+            result['media_id'] = results[result.pop('duplicate_of')]['media_id']
+    return results
+
+
+def add_media_batch(media_items, batch_size: int = 500, overwrite: bool = False, schedule_chunks: bool = True,
+                    database=None) -> List[Dict[str, Any]]:
+    """
+    Bulk-ingest an iterable of media records.
+
+    Each record is a dict with the same fields as add_media_with_keywords (url, title, media_type, content, keywords,
+    prompt, summary, transcription_model, author, ingestion_date, chunk_options). Records are consumed lazily and
+    written `batch_size` at a time: existing items are found with one content_hash/url query per batch, and the Media,
+    MediaModifications, Keywords, MediaKeywords and MediaVersion rows for the batch are written with executemany inside
+    a single transaction (media_fts is kept in sync by its triggers). Chunking jobs for the batch are queued together
+    once it commits.
+
+    Returns one dict per input record, in order, with 'media_id', 'action' ('added', 'updated', 'skipped', 'duplicate'
+    or 'error') and, for errors, 'error'.
+    """
+    database = database or db
+    job_queue = _chunking_queue_for(database)
+    results: List[Dict[str, Any]] = []
+    iterator = iter(media_items)
+
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            break
+        start_time = time.time()
+        batch_results: List[Optional[Dict[str, Any]]] = [None] * len(batch)
+        positions, records = [], []
+        for pos, item in enumerate(batch):
+            try:
+                records.append(_prepare_media_record(item))
+                positions.append(pos)
+            except InputError as e:
+                batch_results[pos] = {'media_id': None, 'action': 'error', 'error': str(e)}
+                log_counter("add_media_batch_error", labels={"error_type": "InputError"})
+
+        try:
+            written = _write_media_batch(records, overwrite, database)
+        except sqlite3.Error as e:
+            logging.error(f"Error writing media batch: {e}")
+            log_counter("add_media_batch_error", labels={"error_type": type(e).__name__})
+            raise DatabaseError(f"Error adding media batch: {e}")
+        for pos, result in zip(positions, written):
+            batch_results[pos] = result
+
+        if schedule_chunks:
+            jobs = [(result['media_id'], records[i]['title'], records[i]['chunk_options'])
+                    for i, result in enumerate(written) if result['action'] in ('added', 'updated')]
+            if jobs:
+                try:
+                    job_queue.enqueue_many(jobs)
+                except Exception as e:
+                    logging.error(f"Error scheduling chunking for media batch: {e}")
+                    log_counter("schedule_chunking_error", labels={"error_type": type(e).__name__})
+
+        for action in ('added', 'updated', 'skipped', 'duplicate', 'error'):
+            count = sum(1 for result in batch_results if result['action'] == action)
+            if count:
+                log_counter("add_media_batch_items", labels={"action": action}, value=count)
+        log_histogram("add_media_batch_duration", time.time() - start_time, labels={"batch_size": str(len(batch))})
+        logging.info(f"Bulk ingest: wrote batch of {len(batch)} item(s)")
+        results.extend(batch_results)
+
+    return results
+
+
 def ingest_article_to_db(url, title, author, content, keywords, summary, ingestion_date, custom_prompt):
     try:
         # Check if content is not empty or whitespace
@@ -1074,6 +1534,50 @@ def fetch_keywords_for_media(media_id):
         logging.error(f"Error fetching keywords: {e}")
         return []
 
+def fetch_keywords_for_media_ids(media_ids) -> Dict[int, List[str]]:
+    """Keywords of many media items in one query, as {media_id: [keyword, ...]} (items without keywords are left out)."""
+    media_ids = list(dict.fromkeys(int(media_id) for media_id in media_ids))
+    if not media_ids:
+        return {}
+    try:
+        with db.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholders = ','.join('?' * len(media_ids))
+            cursor.execute(f'''
+                SELECT mk.media_id, k.keyword
+                FROM MediaKeywords mk
+                JOIN Keywords k ON k.id = mk.keyword_id
+                WHERE mk.media_id IN ({placeholders})
+            ''', media_ids)
+            keywords_by_media: Dict[int, List[str]] = {}
+            for media_id, keyword in cursor.fetchall():
+                keywords_by_media.setdefault(media_id, []).append(keyword)
+        return keywords_by_media
+    except sqlite3.Error as e:
+        logging.error(f"Error fetching keywords: {e}")
+        return {}
+
+def fetch_media_ids_for_keywords(keywords: List[str]) -> List[int]:
+    """IDs of the media tagged with any of `keywords`, resolved in one query."""
+    keywords = list(dict.fromkeys(keyword.strip().lower() for keyword in keywords if keyword and keyword.strip()))
+    if not keywords:
+        return []
+    try:
+        with db.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholders = ','.join('?' * len(keywords))
+            cursor.execute(f'''
+                SELECT DISTINCT mk.media_id
+                FROM MediaKeywords mk
+                JOIN Keywords k ON k.id = mk.keyword_id
+                WHERE k.keyword IN ({placeholders})
+                ORDER BY mk.media_id
+            ''', keywords)
+            return [row[0] for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        logging.error(f"Error fetching media IDs for keywords: {e}")
+        return []
+
 def update_keywords_for_media(media_id, keyword_list):
     try:
         with db.get_connection() as conn:
@@ -1187,52 +1691,165 @@ def add_media_version(conn, media_id: int, prompt: str, summary: str) -> None:
         raise
 
 
+# Columns of media_fts; any other search field falls back to a LIKE scan
+MEDIA_FTS_FIELDS = ('title', 'content')
+
+
+def build_fts_match_expression(search_query: str, fields: List[str] = None) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Each whitespace-separated term is quoted (so user input can't inject FTS syntax) and prefix-matched,
+    terms are AND-ed, and the expression is restricted to the given FTS columns.
+    """
+    terms = [term.replace('"', '""') for term in search_query.split() if term.strip('"')]
+    if not terms:
+        return None
+    expression = ' '.join(f'"{term}"*' for term in terms)
+    if fields:
+        return f"{{{' '.join(fields)}}} : ({expression})"
+    return expression
+
+
+def _media_search_is_ranked(search_query: str, search_fields: List[str]) -> bool:
+    """Whether a media search is ordered by match rank; without a usable query it lists newest media first."""
+    fts_fields = [field for field in search_fields if field in MEDIA_FTS_FIELDS]
+    like_fields = [field for field in search_fields if field not in MEDIA_FTS_FIELDS]
+    return bool(search_query) and bool(like_fields or build_fts_match_expression(search_query, fts_fields))
+
+
+def _build_media_search_query(search_query: str, search_fields: List[str], keywords: List[str], limit: int,
+                              offset: int = 0, after: Optional[Tuple[Any, int]] = None,
+                              include_snippets: bool = False, media_ids: Optional[List[int]] = None
+                              ) -> Tuple[str, List[Any]]:
+    fts_fields = [field for field in search_fields if field in MEDIA_FTS_FIELDS]
+    like_fields = [field for field in search_fields if field not in MEDIA_FTS_FIELDS]
+    match_expression = build_fts_match_expression(search_query, fts_fields) if search_query and fts_fields else None
+    ranked = _media_search_is_ranked(search_query, search_fields)
+    params: List[Any] = []
+
+    ctes = []
+    if ranked:
+        # Candidate set: bm25-ranked FTS hits, plus LIKE matches on non-indexed fields ranked after every FTS hit
+        hit_queries = []
+        if match_expression:
+            snippet_sql = "snippet(media_fts, 1, '<b>', '</b>', '...', 16)" if include_snippets else "NULL"
+            # MATERIALIZED keeps bm25()/snippet() evaluated directly against media_fts instead of being flattened
+            ctes.append(f"fts_hits AS MATERIALIZED (SELECT rowid AS media_id, bm25(media_fts) AS rank, "
+                        f"{snippet_sql} AS snippet FROM media_fts WHERE media_fts MATCH ?)")
+            params.append(match_expression)
+            hit_queries.append("SELECT media_id, rank, snippet FROM fts_hits")
+        if search_query and like_fields:
+            like_conditions = " OR ".join(f"{field} LIKE ?" for field in like_fields)
+            hit_queries.append(f"SELECT id AS media_id, 0.0 AS rank, NULL AS snippet FROM Media WHERE {like_conditions}")
+            params.extend(f'%{search_query}%' for _ in like_fields)
+        ctes.append(f"hits AS (SELECT media_id, MIN(rank) AS rank, MAX(snippet) AS snippet "
+                    f"FROM ({' UNION ALL '.join(hit_queries)}) GROUP BY media_id)")
+        order_by = "hits.rank, Media.id"
+    else:
+        ctes.append("hits AS (SELECT id AS media_id, 0.0 AS rank, NULL AS snippet FROM Media)")
+        order_by = "Media.ingestion_date DESC, Media.id DESC"
+
+    conditions = []
+    for keyword in keywords:
+        conditions.append("Media.id IN (SELECT mk.media_id FROM MediaKeywords mk JOIN Keywords k ON mk.keyword_id = k.id "
+                          "WHERE k.keyword LIKE ?)")
+        params.append(f'%{keyword}%')
+    if media_ids is not None:
+        conditions.append(f"Media.id IN ({','.join('?' * len(media_ids))})")
+        params.extend(media_ids)
+    if after is not None and ranked:
+        conditions.append("(hits.rank > ? OR (hits.rank = ? AND Media.id > ?))")
+        params.extend([after[0], after[0], after[1]])
+    elif after is not None and after[0] is not None:
+        # Newest first; media without an ingestion date sort after every dated one
+        conditions.append("(Media.ingestion_date < ? OR Media.ingestion_date IS NULL "
+                          "OR (Media.ingestion_date = ? AND Media.id < ?))")
+        params.extend([after[0], after[0], after[1]])
+    elif after is not None:
+        conditions.append("(Media.ingestion_date IS NULL AND Media.id < ?)")
+        params.append(after[1])
+    where_clause = " AND ".join(conditions) if conditions else "1=1"
+
+    query = f'''
+    WITH {', '.join(ctes)}
+    SELECT Media.id, Media.url, Media.title, Media.type, Media.content, Media.author, Media.ingestion_date,
+           MediaModifications.prompt, MediaModifications.summary, hits.rank, hits.snippet
+    FROM hits
+    JOIN Media ON Media.id = hits.media_id
+    LEFT JOIN MediaModifications ON MediaModifications.id = (
+        SELECT MAX(id) FROM MediaModifications WHERE media_id = Media.id)
+    WHERE {where_clause}
+    ORDER BY {order_by}
+    LIMIT ? OFFSET ?
+    '''
+    params.extend([limit, offset])
+    return query, params
+
+
+def search_media_fts(search_query: str, search_fields: List[str] = None, keywords: str = "", limit: int = 20,
+                     after: Optional[Tuple[Any, int]] = None, include_snippets: bool = False,
+                     connection=None, media_ids: Optional[List[int]] = None
+                     ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, int]]]:
+    """
+    Full-text search over media, ranked by bm25 with keyset pagination. An empty query lists media newest first.
+
+    :param search_query: Free-text query
+    :param search_fields: Fields to search; 'title'/'content' use media_fts, anything else falls back to LIKE
+    :param keywords: Comma-separated keywords every result must be tagged with
+    :param limit: Maximum number of results to return
+    :param after: Cursor returned by the previous call, a (rank, media_id) tuple, or (ingestion_date, media_id)
+                  when there is no search query
+    :param include_snippets: Return a highlighted content snippet for each FTS hit
+    :param media_ids: Only search these media items
+    :return: (results, next_cursor); next_cursor is None once there are no more results
+    """
+    search_fields = search_fields or list(MEDIA_FTS_FIELDS)
+    keyword_list = [keyword.strip().lower() for keyword in (keywords or "").split(',') if keyword.strip()]
+    query, params = _build_media_search_query(search_query, search_fields, keyword_list, limit, after=after,
+                                              include_snippets=include_snippets, media_ids=media_ids)
+
+    def execute_query(conn):
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+    if connection:
+        rows = execute_query(connection)
+    else:
+        with db.get_connection() as conn:
+            rows = execute_query(conn)
+
+    columns = ['id', 'url', 'title', 'type', 'content', 'author', 'ingestion_date', 'prompt', 'summary', 'rank',
+               'snippet']
+    results = [dict(zip(columns, row)) for row in rows]
+    next_cursor = None
+    if len(results) == limit:
+        sort_key = 'rank' if _media_search_is_ranked(search_query, search_fields) else 'ingestion_date'
+        next_cursor = (results[-1][sort_key], results[-1]['id'])
+    return results, next_cursor
+
+
 # Function to search the database with advanced options, including keyword search and full-text search
 def search_media_db(search_query: str, search_fields: List[str], keywords: str, page: int = 1, results_per_page: int = 20, connection=None):
+    """
+    Search media by title/content (through media_fts, ranked by bm25) and any other field (LIKE), filtered by keywords.
+
+    Returns rows of (id, url, title, type, content, author, ingestion_date, prompt, summary). Deep pagination should
+    use search_media_fts() and its keyset cursor instead of page numbers.
+    """
     if page < 1:
         raise ValueError("Page number must be 1 or greater.")
 
     # Prepare keywords by splitting and trimming
     keywords = [keyword.strip().lower() for keyword in keywords.split(',') if keyword.strip()]
+    query, params = _build_media_search_query(search_query, search_fields, keywords, results_per_page,
+                                              offset=(page - 1) * results_per_page)
 
     def execute_query(conn):
         cursor = conn.cursor()
-        offset = (page - 1) * results_per_page
-
-        # Prepare the search conditions for general fields
-        search_conditions = []
-        params = []
-
-        for field in search_fields:
-            if search_query:  # Ensure there's a search query before adding this condition
-                search_conditions.append(f"Media.{field} LIKE ?")
-                params.append(f'%{search_query}%')
-
-        # Prepare the conditions for keywords filtering
-        keyword_conditions = []
-        for keyword in keywords:
-            keyword_conditions.append(
-                f"EXISTS (SELECT 1 FROM MediaKeywords mk JOIN Keywords k ON mk.keyword_id = k.id WHERE mk.media_id = Media.id AND k.keyword LIKE ?)")
-            params.append(f'%{keyword}%')
-
-        # Combine all conditions
-        where_clause = " AND ".join(
-            search_conditions + keyword_conditions) if search_conditions or keyword_conditions else "1=1"
-
-        # Complete the query
-        query = f'''
-        SELECT DISTINCT Media.id, Media.url, Media.title, Media.type, Media.content, Media.author, Media.ingestion_date, 
-               MediaModifications.prompt, MediaModifications.summary
-        FROM Media
-        LEFT JOIN MediaModifications ON Media.id = MediaModifications.media_id
-        WHERE {where_clause}
-        ORDER BY Media.ingestion_date DESC
-        LIMIT ? OFFSET ?
-        '''
-        params.extend([results_per_page, offset])
-
         cursor.execute(query, params)
-        return cursor.fetchall()
+        return [tuple(row[:9]) for row in cursor.fetchall()]
 
     if connection:
         return execute_query(connection)
@@ -1241,6 +1858,32 @@ def search_media_db(search_query: str, search_fields: List[str], keywords: str,
             return execute_query(conn)
 
 
+def search_media_for_rag(query: str, fts_top_k: int = 10, relevant_media_ids: List[str] = None,
+                         connection=None) -> List[Dict[str, Any]]:
+    """
+    Full-text search over media titles and content for RAG, in the same shape as the other RAG search functions.
+
+    relevant_media_ids is applied inside the query, so media outside it are never fetched.
+    """
+    if not query.strip():
+        return []
+    media_ids = None if relevant_media_ids is None else [int(media_id) for media_id in relevant_media_ids]
+    if media_ids == []:
+        return []
+    try:
+        results, _ = search_media_fts(query, limit=fts_top_k, media_ids=media_ids, connection=connection)
+    except sqlite3.Error as e:
+        logging.error(f"Error in search_media_for_rag: {e}")
+        return []
+    return [
+        {
+            "content": result['content'],
+            "metadata": {"media_id": str(result['id']), "title": result['title']}
+        }
+        for result in results
+    ]
+
+
 # Gradio function to handle user input and display results with pagination, with better feedback
 def search_and_display(search_query, search_fields, keywords, page):
     results = search_media_db(search_query, search_fields, keywords, page)
@@ -1370,7 +2013,7 @@ def is_valid_date(date_string: str) -> bool:
 
 
 def check_existing_media(url):
-    db = Database()
+    db = get_media_db()
     try:
         with db.get_connection() as conn:
             cursor = conn.cursor()
@@ -1384,7 +2027,7 @@ def check_existing_media(url):
 
 # Modified update_media_content function to create a new version
 def update_media_content_with_version(media_id, info_dict, content_input, prompt_input, summary_input, whisper_model):
-    db = Database()
+    db = get_media_db()
     try:
         with db.get_connection() as conn:
             cursor = conn.cursor()
@@ -1414,10 +2057,6 @@ def update_media_content_with_version(media_id, info_dict, content_input, prompt
             VALUES (?, ?, ?, ?)
             ''', (media_id, prompt_input, summary_input, datetime.now().strftime('%Y-%m-%d')))
 
-            # Update full-text search index
-            cursor.execute('INSERT OR REPLACE INTO media_fts (rowid, title, content) VALUES (?, ?, ?)',
-                           (media_id, info_dict.get('title', 'Untitled'), content_input))
-
             conn.commit()
 
         # Schedule chunking
@@ -1429,51 +2068,28 @@ def update_media_content_with_version(media_id, info_dict, content_input, prompt
         return f"Error updating content: {str(e)}"
 
 
-# FIXME: This function is not complete and needs to be implemented
-def schedule_chunking(media_id: int, content: str, media_name: str, media_type: str = None, chunk_options: dict = None):
-    try:
-        # Ensure chunk_options is provided; if not, use defaults.
-        if chunk_options is None:
-            chunk_options = {'method': 'words', 'max_size': 300, 'overlap': 0}
-
-        # Retrieve the values from chunk_options as provided.
-        method = chunk_options.get('method', 'words')
-        max_size = chunk_options.get('max_size', 300)  # preserve original type (could be str or int)
-        overlap = chunk_options.get('overlap', 0)        # preserve original type (could be str or int)
-
-        # Convert max_size and overlap to integers for arithmetic without modifying the original chunk_options
-        try:
-            max_size_int = int(max_size)
-            overlap_int = int(overlap)
-        except ValueError as e:
-            logging.error(f"Error converting chunk_options values to int: {e}")
-            raise
+def _chunking_queue_for(database=None):
+    """Return the background queue for the main media DB, or an inline queue for any other database."""
+    if database is None or database.db_path == db.db_path:
+        return chunking_job_queue
+    return ChunkingJobQueue(database, num_workers=0)
 
-        # Use the converted integers when calling the chunking function.
-        chunks = chunk_text(content, method, max_size_int, overlap_int)
 
-        db = Database()
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            for i, chunk in enumerate(chunks):
-                # Calculate start and end indices for the chunk using the integer values
-                start_index = i * max_size_int
-                end_index = min((i + 1) * max_size_int, len(content))
-                cursor.execute('''
-                    INSERT INTO MediaChunks (media_id, chunk_text, start_index, end_index, chunk_id)
-                    VALUES (?, ?, ?, ?, ?)
-                    ''', (media_id, chunk, start_index, end_index, f"{media_id}_chunk_{i}"))
-            conn.commit()
-
-        # Update chunking status in the Media table.
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("UPDATE Media SET chunking_status = 'completed' WHERE id = ?", (media_id,))
-            conn.commit()
+def schedule_chunking(media_id: int, content: str, media_name: str, media_type: str = None, chunk_options: dict = None,
+                      database=None):
+    """
+    Queue a media item for chunking and return the job ID immediately.
 
+    The job is persisted in ChunkingJobs and picked up by the background chunking workers, so ingest latency no
+    longer depends on document length. The text itself is read back from Media when the job runs; `content` is
+    accepted for backwards compatibility. Items written to a database other than the main media DB are chunked inline.
+    """
+    try:
+        return _chunking_queue_for(database).enqueue(media_id, media_name, chunk_options)
     except Exception as e:
         logging.error(f"Error scheduling chunking for media_id {media_id}: {str(e)}")
-        # You might want to update the chunking_status to 'failed' here
+        log_counter("schedule_chunking_error", labels={"error_type": type(e).__name__})
+        return None
 
 #
 # End of ....
@@ -1800,10 +2416,6 @@ def import_obsidian_note_to_db(note_data):
                 VALUES (?, 'Obsidian Frontmatter', ?, CURRENT_TIMESTAMP)
             """, (media_id, frontmatter_str))
 
-            # Update full-text search index
-            cursor.execute('INSERT OR REPLACE INTO media_fts (rowid, title, content) VALUES (?, ?, ?)',
-                           (media_id, note_data['title'], note_data['content']))
-
         action = "Updated" if existing_note else "Imported"
         logger.info(f"{action} Obsidian note: {note_data['title']}")
         return True, None
@@ -1910,7 +2522,6 @@ def permanently_delete_item(media_id: int) -> None:
         cursor.execute("DELETE FROM MediaKeywords WHERE media_id = ?", (media_id,))
         cursor.execute("DELETE FROM MediaVersion WHERE media_id = ?", (media_id,))
         cursor.execute("DELETE FROM MediaModifications WHERE media_id = ?", (media_id,))
-        cursor.execute("DELETE FROM media_fts WHERE rowid = ?", (media_id,))
         conn.commit()
 
 
@@ -1973,13 +2584,96 @@ def get_full_document(media_id: int) -> str:
         result = cursor.fetchone()
     return result[0] if result else None
 
-def get_all_content_from_database() -> List[Dict[str, Any]]:
+def get_media_content_range(media_id: int, start_index: int, end_index: int) -> Optional[str]:
     """
-    Retrieve all media content from the database that requires embedding.
+    Fetch content[start_index:end_index] of a media item, e.g. the text around a chunk using its stored offsets,
+    without loading the whole document.
+    """
+    start_index = max(0, int(start_index))
+    length = max(0, int(end_index) - start_index)
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        # substr() is 1-based and counts characters, matching Python string offsets
+        cursor.execute("SELECT substr(content, ?, ?) FROM Media WHERE id = ?", (start_index + 1, length, media_id))
+        result = cursor.fetchone()
+    return result[0] if result else None
 
-    Returns:
-        List[Dict[str, Any]]: A list of dictionaries, each containing the media ID, content, title, and other relevant fields.
+MEDIA_EXPORT_COLUMNS = ('id', 'url', 'title', 'type', 'content', 'author', 'ingestion_date', 'transcription_model',
+                        'prompt', 'summary', 'keywords')
+
+
+def _build_media_export_filters(keyword: Optional[str] = None, start_date: Optional[str] = None,
+                                end_date: Optional[str] = None, media_type: Optional[str] = None,
+                                include_trash: bool = False) -> Tuple[str, List[Any]]:
+    conditions = []
+    params = []
+    if not include_trash:
+        conditions.append("Media.is_trash = 0")
+    if keyword:
+        conditions.append('''Media.id IN (
+            SELECT mk.media_id FROM MediaKeywords mk JOIN Keywords k ON mk.keyword_id = k.id WHERE k.keyword = ?
+        )''')
+        params.append(keyword.strip().lower())
+    # ingestion_date is stored as 'YYYY-MM-DD' (sometimes with a time part), so compare on the date prefix
+    if start_date:
+        conditions.append("substr(Media.ingestion_date, 1, 10) >= ?")
+        params.append(start_date)
+    if end_date:
+        conditions.append("substr(Media.ingestion_date, 1, 10) <= ?")
+        params.append(end_date)
+    if media_type:
+        conditions.append("Media.type = ?")
+        params.append(media_type)
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where_clause, params
+
+
+def count_media_for_export(keyword: Optional[str] = None, start_date: Optional[str] = None,
+                           end_date: Optional[str] = None, media_type: Optional[str] = None,
+                           include_trash: bool = False, database=None) -> int:
+    database = database or db
+    where_clause, params = _build_media_export_filters(keyword, start_date, end_date, media_type, include_trash)
+    return database.execute_query(f"SELECT COUNT(*) FROM Media {where_clause}", tuple(params))[0][0]
+
+
+def iter_media_for_export(keyword: Optional[str] = None, start_date: Optional[str] = None,
+                          end_date: Optional[str] = None, media_type: Optional[str] = None,
+                          include_trash: bool = False, batch_size: int = 100, database=None):
+    """
+    Yield media items (as dicts keyed by MEDIA_EXPORT_COLUMNS) matching the filters, in id order.
+
+    Rows are pulled from the cursor with fetchmany(batch_size), so at most one batch of documents is held in
+    memory no matter how large the library is.
     """
+    database = database or db
+    where_clause, params = _build_media_export_filters(keyword, start_date, end_date, media_type, include_trash)
+    query = f'''
+        SELECT Media.id, Media.url, Media.title, Media.type, Media.content, Media.author, Media.ingestion_date,
+               Media.transcription_model,
+               MediaModifications.prompt, MediaModifications.summary,
+               (SELECT GROUP_CONCAT(k.keyword, ',')
+                FROM MediaKeywords mk JOIN Keywords k ON mk.keyword_id = k.id
+                WHERE mk.media_id = Media.id) AS keywords
+        FROM Media
+        LEFT JOIN MediaModifications ON MediaModifications.id = (
+            SELECT MAX(id) FROM MediaModifications WHERE media_id = Media.id
+        )
+        {where_clause}
+        ORDER BY Media.id
+    '''
+    with database.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, tuple(params))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(zip(MEDIA_EXPORT_COLUMNS, row))
+
+
+def iter_all_content_from_database(batch_size: int = 100):
+    """Streaming form of get_all_content_from_database()."""
     try:
         with db.get_connection() as conn:
             cursor = conn.cursor()
@@ -1988,26 +2682,35 @@ def get_all_content_from_database() -> List[Dict[str, Any]]:
                 FROM Media
                 WHERE is_trash = 0  -- Exclude items marked as trash
             """)
-            media_items = cursor.fetchall()
-
-            all_content = [
-                {
-                    'id': item[0],
-                    'content': item[1],
-                    'title': item[2],
-                    'author': item[3],
-                    'type': item[4]
-                }
-                for item in media_items
-            ]
-
-        return all_content
-
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for item in rows:
+                    yield {
+                        'id': item[0],
+                        'content': item[1],
+                        'title': item[2],
+                        'author': item[3],
+                        'type': item[4]
+                    }
     except sqlite3.Error as e:
         logger.error(f"Error retrieving all content from database: {e}")
         raise DatabaseError(f"Error retrieving all content from database: {e}")
 
 
+def get_all_content_from_database() -> List[Dict[str, Any]]:
+    """
+    Retrieve all media content from the database that requires embedding.
+
+    Loads every document into memory; prefer iter_all_content_from_database() for large libraries.
+
+    Returns:
+        List[Dict[str, Any]]: A list of dictionaries, each containing the media ID, content, title, and other relevant fields.
+    """
+    return list(iter_all_content_from_database())
+
+
 def get_media_content(media_id: int) -> str:
     try:
         with db.get_connection() as conn:
@@ -2428,11 +3131,207 @@ def rollback_to_version(media_id: int, version_number: int) -> Dict[str, Any]:
 #######################################################################################################################
 
 
+#######################################################################################################################
+#
+# Streaming export of the media library
+
+MEDIA_EXPORT_FORMATS = ('jsonl', 'markdown_zip', 'sqlite')
+# Tables copied into a SQLite-subset export (media_fts is rebuilt by create_tables when the file is opened)
+MEDIA_EXPORT_TABLES = ('Media', 'Keywords', 'MediaKeywords', 'MediaModifications')
+
+
+def _safe_export_filename(media_id: int, title: str) -> str:
+    slug = re.sub(r'[^\w\- ]+', '', title or '').strip()[:50] or 'untitled'
+    return f"{media_id}_{slug}.md"
+
+
+def _export_sqlite_subset(output_path: str, where_clause: str, params: List[Any], batch_size: int, database,
+                          progress) -> int:
+    exported = 0
+    with database.get_connection() as src, closing(sqlite3.connect(output_path)) as out:
+        for table in MEDIA_EXPORT_TABLES:
+            (create_sql,) = src.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                        (table,)).fetchone()
+            out.execute(create_sql)
+
+        id_cursor = src.cursor()
+        id_cursor.execute(f"SELECT Media.id FROM Media {where_clause} ORDER BY Media.id", tuple(params))
+        while True:
+            ids = [row[0] for row in id_cursor.fetchmany(batch_size)]
+            if not ids:
+                break
+            placeholders = ','.join('?' * len(ids))
+            for table, query in (
+                ('Media', f"SELECT * FROM Media WHERE id IN ({placeholders})"),
+                ('Keywords', f'''SELECT DISTINCT Keywords.* FROM Keywords
+                                 JOIN MediaKeywords ON MediaKeywords.keyword_id = Keywords.id
+                                 WHERE MediaKeywords.media_id IN ({placeholders})'''),
+                ('MediaKeywords', f"SELECT * FROM MediaKeywords WHERE media_id IN ({placeholders})"),
+                ('MediaModifications', f"SELECT * FROM MediaModifications WHERE media_id IN ({placeholders})"),
+            ):
+                rows = src.execute(query, ids).fetchall()
+                if rows:
+                    row_placeholders = ','.join('?' * len(rows[0]))
+                    out.executemany(f"INSERT OR IGNORE INTO {table} VALUES ({row_placeholders})", rows)
+            out.commit()
+            exported += len(ids)
+            progress(exported)
+    return exported
+
+
+def export_media_library(output_path: str, export_format: str = 'jsonl', keyword: Optional[str] = None,
+                         start_date: Optional[str] = None, end_date: Optional[str] = None,
+                         media_type: Optional[str] = None, include_trash: bool = False, batch_size: int = 100,
+                         progress_callback=None, database=None) -> Dict[str, Any]:
+    """
+    Export media items matching the filters to output_path, writing each batch as it is read.
+
+    :param export_format: 'jsonl' (one JSON object per item), 'markdown_zip' (one Markdown file per item in a zip)
+        or 'sqlite' (a standalone database with the matching Media rows, their keywords and modifications)
+    :param start_date: Inclusive 'YYYY-MM-DD' lower bound on ingestion_date
+    :param end_date: Inclusive 'YYYY-MM-DD' upper bound on ingestion_date
+    :param progress_callback: Called as progress_callback(exported, total) while the export runs
+    :return: {'path': output_path, 'exported': number of items, 'total': number matching the filters}
+    """
+    if export_format not in MEDIA_EXPORT_FORMATS:
+        raise InputError(f"Unsupported export format: {export_format}. Choose one of {', '.join(MEDIA_EXPORT_FORMATS)}")
+    database = database or db
+    log_counter("export_media_library_attempt", labels={"format": export_format})
+    start_time = time.time()
+
+    total = count_media_for_export(keyword, start_date, end_date, media_type, include_trash, database=database)
+    last_reported = [0]
+
+    def progress(exported: int, force: bool = False):
+        # Report once per batch rather than once per item
+        if progress_callback and (force or exported - last_reported[0] >= batch_size):
+            last_reported[0] = exported
+            progress_callback(exported, total)
+
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    # Write to a temporary file so a failed export never leaves a truncated file behind
+    temp_path = f"{output_path}.partial"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    exported = 0
+    try:
+        if export_format == 'sqlite':
+            where_clause, params = _build_media_export_filters(keyword, start_date, end_date, media_type, include_trash)
+            exported = _export_sqlite_subset(temp_path, where_clause, params, batch_size, database, progress)
+        else:
+            items = iter_media_for_export(keyword, start_date, end_date, media_type, include_trash,
+                                          batch_size=batch_size, database=database)
+            if export_format == 'jsonl':
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    for item in items:
+                        item['keywords'] = item['keywords'].split(',') if item['keywords'] else []
+                        f.write(json.dumps(item, ensure_ascii=False))
+                        f.write('\n')
+                        exported += 1
+                        progress(exported)
+            else:
+                with zipfile.ZipFile(temp_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+                    for item in items:
+                        item['keywords'] = item['keywords'].split(',') if item['keywords'] else []
+                        zf.writestr(_safe_export_filename(item['id'], item['title']), convert_to_markdown(item))
+                        exported += 1
+                        progress(exported)
+        os.replace(temp_path, output_path)
+    except Exception as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        log_counter("export_media_library_error", labels={"format": export_format, "error_type": type(e).__name__})
+        logging.error(f"Error exporting media library to {output_path}: {e}")
+        raise
+
+    progress(exported, force=True)
+    duration = time.time() - start_time
+    log_histogram("export_media_library_duration", duration, labels={"format": export_format})
+    log_counter("export_media_library_success", labels={"format": export_format})
+    logging.info(f"Exported {exported} media items to {output_path} ({export_format}) in {duration:.2f}s")
+    return {'path': output_path, 'exported': exported, 'total': total}
+
+#
+# End of Streaming export
+#######################################################################################################################
+
+
 #######################################################################################################################
 #
 # Functions to manage media chunks
 
-def process_chunks(database, chunks: List[Dict], media_id: int, batch_size: int = 100):
+# Chunking parameters that change what text ends up in a chunk. Anything else in an options dict (file names,
+# display flags, ...) is ignored so it does not split otherwise identical chunks.
+CHUNK_HASH_PARAMS = ('method', 'max_size', 'overlap', 'language', 'adaptive', 'multi_level', 'base_size',
+                     'min_size', 'tokenizer')
+
+
+def normalize_chunk_text(text: str) -> str:
+    """Normalize chunk text for hashing: Unicode NFC and collapsed whitespace."""
+    return ' '.join(unicodedata.normalize('NFC', text or '').split())
+
+
+def compute_chunk_hash(text: str, chunk_params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Content address of a chunk: sha256 over the normalized chunk text and the chunking parameters that produced it.
+    """
+    params = {key: (chunk_params or {}).get(key) for key in CHUNK_HASH_PARAMS if (chunk_params or {}).get(key) is not None}
+    key = normalize_chunk_text(text) + '\x00' + json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def lookup_chunk_embeddings(chunk_hashes, embedding_model: str, database=None) -> Dict[str, Dict[str, str]]:
+    """
+    Find embeddings already stored for the given chunk hashes with `embedding_model`.
+
+    Returns {chunk_hash: {collection_name: embedding_id}}; hashes without an embedding are left out.
+    """
+    database = database or db
+    chunk_hashes = list(dict.fromkeys(chunk_hashes))
+    found: Dict[str, Dict[str, str]] = {}
+    with database.get_connection() as conn:
+        cursor = conn.cursor()
+        for i in range(0, len(chunk_hashes), 500):
+            batch = chunk_hashes[i:i + 500]
+            cursor.execute(
+                f"SELECT chunk_hash, collection_name, embedding_id FROM ChunkHashes "
+                f"WHERE embedding_model = ? AND chunk_hash IN ({','.join('?' * len(batch))})",
+                [embedding_model] + batch)
+            for chunk_hash, collection_name, embedding_id in cursor.fetchall():
+                found.setdefault(chunk_hash, {})[collection_name] = embedding_id
+    return found
+
+
+def register_chunk_embeddings(entries: List[Tuple[str, str]], embedding_model: str, collection_name: str,
+                              database=None) -> None:
+    """Record (chunk_hash, embedding_id) pairs stored in `collection_name`, replacing stale mappings."""
+    if not entries:
+        return
+    database = database or db
+    database.execute_many(
+        "INSERT OR REPLACE INTO ChunkHashes (chunk_hash, embedding_model, collection_name, embedding_id) "
+        "VALUES (?, ?, ?, ?)",
+        [(chunk_hash, embedding_model, collection_name, embedding_id) for chunk_hash, embedding_id in entries])
+    log_counter("chunk_hash_registered", value=len(entries))
+
+
+def find_duplicate_chunks(chunk_hash: str, database=None) -> List[Tuple[int, str]]:
+    """Return (media_id, chunk_id) for every stored chunk with this content hash, oldest first."""
+    database = database or db
+    return database.execute_query(
+        "SELECT media_id, chunk_id FROM MediaChunks WHERE chunk_hash = ? ORDER BY id", (chunk_hash,))
+
+
+def clear_chunk_hashes(collection_name: str, database=None) -> int:
+    """Drop the ChunkHashes entries for a Chroma collection that has been deleted or reset."""
+    database = database or db
+    return database.execute_query("DELETE FROM ChunkHashes WHERE collection_name = ?", (collection_name,))
+
+
+def process_chunks(database, chunks: List[Dict], media_id: int, batch_size: int = 100,
+                   chunk_params: Optional[Dict[str, Any]] = None):
     """
     Process chunks in batches and insert them into the database.
 
@@ -2440,6 +3339,7 @@ def process_chunks(database, chunks: List[Dict], media_id: int, batch_size: int
     :param chunks: List of chunk dictionaries
     :param media_id: ID of the media these chunks belong to
     :param batch_size: Number of chunks to process in each batch
+    :param chunk_params: Chunking options that produced the chunks; part of each chunk's content hash
     """
     log_counter("process_chunks_attempt", labels={"media_id": media_id})
     start_time = time.time()
@@ -2449,14 +3349,20 @@ def process_chunks(database, chunks: List[Dict], media_id: int, batch_size: int
     try:
         for i in range(0, total_chunks, batch_size):
             batch = chunks[i:i + batch_size]
+            # Offsets come either at the top level or in the metadata produced by Chunk_Lib's chunkers
             chunk_data = [
-                (media_id, chunk['text'], chunk['start_index'], chunk['end_index'])
-                for chunk in batch
+                (media_id, chunk['text'],
+                 chunk['start_index'] if 'start_index' in chunk else chunk['metadata']['start_index'],
+                 chunk['end_index'] if 'end_index' in chunk else chunk['metadata']['end_index'],
+                 f"{media_id}_chunk_{i + j + 1}",
+                 compute_chunk_hash(chunk.get('raw_text', chunk['text']), chunk_params))
+                for j, chunk in enumerate(batch)
             ]
 
             try:
                 database.execute_many(
-                    "INSERT INTO MediaChunks (media_id, chunk_text, start_index, end_index) VALUES (?, ?, ?, ?)",
+                    "INSERT INTO MediaChunks (media_id, chunk_text, start_index, end_index, chunk_id, chunk_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
                     chunk_data
                 )
                 processed_chunks += len(batch)
@@ -2499,64 +3405,287 @@ def batch_insert_chunks(conn, chunks, media_id):
     ''', chunk_data)
 
 
-chunk_queue = queue.Queue()
-
-def chunk_processor():
-    while True:
-        chunk_batch = chunk_queue.get()
-        if chunk_batch is None:
-            break
-        try:
-            with db.get_connection() as conn:
-                conn.execute("BEGIN TRANSACTION")
+class ChunkingJobQueue:
+    """
+    Durable chunking job queue backed by the ChunkingJobs table.
+
+    Jobs survive a restart. A claimed job records the claiming process (claimed_by, "host:pid") and a heartbeat that
+    the process's workers refresh while it runs; a 'processing' job whose heartbeat is older than `lease_seconds`
+    belonged to a process that died, and is put back to 'pending' when workers start or go idle. Jobs held by other
+    live processes sharing the database are left alone. The text to chunk is read from Media when the job runs, so
+    re-scheduling an item that is still waiting just refreshes its pending job instead of queueing a second one. With
+    num_workers=0 jobs run inline in the calling thread, without heartbeats.
+    """
+    def __init__(self, database, num_workers: int = 1, batch_size: int = 100, max_attempts: int = 3,
+                 poll_interval: float = 5.0, lease_seconds: float = None):
+        self.database = database
+        self.num_workers = max(0, int(num_workers))
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.lease_seconds = chunking_job_lease_seconds if lease_seconds is None else lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._heartbeat_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, media_id: int, media_name: str = None, chunk_options: Optional[Dict[str, Any]] = None) -> int:
+        options_json = json.dumps(chunk_options) if chunk_options else None
+        with self.database.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM ChunkingJobs WHERE media_id = ? AND status = 'pending'", (media_id,))
+            existing = cursor.fetchone()
+            if existing:
+                job_id = existing[0]
+                cursor.execute(
+                    "UPDATE ChunkingJobs SET media_name = ?, chunk_options = ?, updated_at = CURRENT_TIMESTAMP "
+                    "WHERE id = ?", (media_name, options_json, job_id))
+            else:
+                cursor.execute(
+                    "INSERT INTO ChunkingJobs (media_id, media_name, chunk_options) VALUES (?, ?, ?)",
+                    (media_id, media_name, options_json))
+                job_id = cursor.lastrowid
+            cursor.execute("UPDATE Media SET chunking_status = 'pending' WHERE id = ?", (media_id,))
+            conn.commit()
+        log_counter("chunking_job_enqueued")
+        logging.info(f"Queued chunking job {job_id} for media_id {media_id}")
+        self._dispatch()
+        return job_id
+
+    def enqueue_many(self, jobs: List[Tuple[int, str, Optional[Dict[str, Any]]]]) -> None:
+        """Queue (media_id, media_name, chunk_options) jobs in one transaction, replacing any pending jobs for them."""
+        if not jobs:
+            return
+        with self.database.transaction() as conn:
+            conn.executemany("DELETE FROM ChunkingJobs WHERE media_id = ? AND status = 'pending'",
+                             [(media_id,) for media_id, _, _ in jobs])
+            conn.executemany("INSERT INTO ChunkingJobs (media_id, media_name, chunk_options) VALUES (?, ?, ?)",
+                             [(media_id, media_name, json.dumps(options) if options else None)
+                              for media_id, media_name, options in jobs])
+            conn.executemany("UPDATE Media SET chunking_status = 'pending' WHERE id = ?",
+                             [(media_id,) for media_id, _, _ in jobs])
+        log_counter("chunking_job_enqueued", value=len(jobs))
+        logging.info(f"Queued {len(jobs)} chunking job(s)")
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        if self.num_workers == 0:
+            self.run_pending()
+        else:
+            self.start()
+            self._wakeup.set()
+
+    def start(self) -> None:
+        """Start the worker threads (idempotent) and requeue jobs whose lease has expired."""
+        if self.num_workers == 0:
+            return
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            if self._threads:
+                return
+            self._stop.clear()
+            self._reclaim_expired_jobs()
+            for i in range(self.num_workers):
+                thread = threading.Thread(target=self._worker, name=f"chunking-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            if self._heartbeat_thread is None or not self._heartbeat_thread.is_alive():
+                self._heartbeat_thread = threading.Thread(target=self._heartbeat, name="chunking-heartbeat",
+                                                          daemon=True)
+                self._heartbeat_thread.start()
+        self._wakeup.set()
+
+    def _reclaim_expired_jobs(self) -> int:
+        """Requeue 'processing' jobs whose claiming process stopped heartbeating (or never recorded a claim)."""
+        recovered = self.database.execute_query(
+            "UPDATE ChunkingJobs SET status = 'pending', claimed_by = NULL, heartbeat_at = NULL, "
+            "updated_at = CURRENT_TIMESTAMP WHERE status = 'processing' "
+            "AND (heartbeat_at IS NULL OR heartbeat_at < datetime('now', ?))", (f"-{self.lease_seconds} seconds",))
+        if recovered:
+            log_counter("chunking_job_reclaimed", value=recovered)
+            logging.info(f"Requeued {recovered} chunking job(s) whose worker lease expired")
+        return recovered
+
+    def _heartbeat(self) -> None:
+        # Renew the lease on every job this process is running, well before it can expire
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                self.database.execute_query(
+                    "UPDATE ChunkingJobs SET heartbeat_at = CURRENT_TIMESTAMP "
+                    "WHERE status = 'processing' AND claimed_by = ?", (self.worker_id,))
+            except Exception as e:
+                logging.error(f"Could not renew chunking job leases: {e}")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        with self._lock:
+            for thread in self._threads + [t for t in [self._heartbeat_thread] if t is not None]:
+                thread.join(timeout)
+            self._threads = []
+            self._heartbeat_thread = None
+
+    def _worker(self) -> None:
+        while not self._stop.is_set():
+            try:
+                job = self._claim_next_job()
+            except Exception as e:
+                logging.error(f"Chunking worker failed to claim a job: {e}")
+                job = None
+            if job is None:
                 try:
-                    batch_insert_chunks(conn, chunk_batch['chunks'], chunk_batch['media_id'])
-                    conn.commit()
+                    self._reclaim_expired_jobs()
                 except Exception as e:
-                    conn.rollback()
-                    logging.error(f"Error in batch insert: {str(e)}")
+                    logging.error(f"Chunking worker failed to reclaim expired jobs: {e}")
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._process_job(job)
+
+    def _claim_next_job(self) -> Optional[Dict[str, Any]]:
+        with self.database.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT ChunkingJobs.id, ChunkingJobs.media_id, ChunkingJobs.media_name, ChunkingJobs.chunk_options,
+                       ChunkingJobs.attempts, Media.content
+                FROM ChunkingJobs
+                LEFT JOIN Media ON Media.id = ChunkingJobs.media_id
+                WHERE ChunkingJobs.status = 'pending'
+                ORDER BY ChunkingJobs.id
+                LIMIT 1
+            ''')
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            cursor.execute(
+                "UPDATE ChunkingJobs SET status = 'processing', attempts = attempts + 1, claimed_by = ?, "
+                "heartbeat_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (self.worker_id, row[0]))
+            cursor.execute("UPDATE Media SET chunking_status = 'processing' WHERE id = ?", (row[1],))
+        return {
+            'id': row[0],
+            'media_id': row[1],
+            'media_name': row[2],
+            'chunk_options': json.loads(row[3]) if row[3] else None,
+            'attempts': row[4] + 1,
+            'content': row[5],
+        }
+
+    def _process_job(self, job: Dict[str, Any]) -> bool:
+        media_id = job['media_id']
+        start_time = time.time()
+        try:
+            if job['content'] is None:
+                raise DatabaseError(f"Media {media_id} no longer exists")
+
+            options = job['chunk_options'] or {'method': 'words', 'max_size': 300, 'overlap': 0}
+            content = job['content']
+            chunks = chunk_text(content, options.get('method', 'words'), int(options.get('max_size', 300)),
+                                int(options.get('overlap', 0)), options.get('language'), with_offsets=True)
+            chunk_rows = [
+                (media_id, chunk['text'], chunk['start_index'], chunk['end_index'], f"{media_id}_chunk_{i}",
+                 compute_chunk_hash(chunk['text'], options))
+                for i, chunk in enumerate(chunks, 1)
+            ]
+
+            with self.database.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM MediaChunks WHERE media_id = ?", (media_id,))
+                for i in range(0, len(chunk_rows), self.batch_size):
+                    cursor.executemany(
+                        "INSERT INTO MediaChunks (media_id, chunk_text, start_index, end_index, chunk_id, chunk_hash) "
+                        "VALUES (?, ?, ?, ?, ?, ?)", chunk_rows[i:i + self.batch_size])
+                cursor.execute("UPDATE Media SET chunking_status = 'completed' WHERE id = ?", (media_id,))
+                cursor.execute(
+                    "UPDATE ChunkingJobs SET status = 'completed', error = NULL, updated_at = CURRENT_TIMESTAMP "
+                    "WHERE id = ?", (job['id'],))
+
+            duration = time.time() - start_time
+            log_histogram("chunking_job_duration", duration)
+            log_counter("chunking_job_success")
+            logging.info(f"Chunked media_id {media_id} into {len(chunk_rows)} chunks in {duration:.2f}s")
+            return True
         except Exception as e:
-            logging.error(f"Error processing chunk batch: {str(e)}")
-        finally:
-            chunk_queue.task_done()
+            status = 'failed' if job['attempts'] >= self.max_attempts else 'pending'
+            logging.error(f"Chunking job {job['id']} for media_id {media_id} failed "
+                          f"(attempt {job['attempts']}/{self.max_attempts}): {e}")
+            log_counter("chunking_job_error", labels={"error_type": type(e).__name__})
+            try:
+                with self.database.transaction() as conn:
+                    conn.execute(
+                        "UPDATE ChunkingJobs SET status = ?, error = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                        (status, str(e), job['id']))
+                    conn.execute("UPDATE Media SET chunking_status = ? WHERE id = ?",
+                                 ('failed' if status == 'failed' else 'pending', media_id))
+            except Exception as update_error:
+                logging.error(f"Could not record failure of chunking job {job['id']}: {update_error}")
+            return False
+
+    def run_pending(self, limit: Optional[int] = None) -> int:
+        """Process pending jobs in the calling thread. Returns the number of jobs that completed."""
+        completed = 0
+        processed = 0
+        while limit is None or processed < limit:
+            job = self._claim_next_job()
+            if job is None:
+                break
+            processed += 1
+            if self._process_job(job):
+                completed += 1
+        return completed
+
+    def status(self) -> Dict[str, Any]:
+        """Job counts by status plus the items still waiting, for display in the UI."""
+        counts = {'pending': 0, 'processing': 0, 'completed': 0, 'failed': 0}
+        for status, count in self.database.execute_query(
+                "SELECT status, COUNT(*) FROM ChunkingJobs GROUP BY status"):
+            counts[status] = count
+        waiting = self.database.execute_query('''
+            SELECT id, media_id, media_name, status, attempts, error, created_at
+            FROM ChunkingJobs
+            WHERE status IN ('pending', 'processing', 'failed')
+            ORDER BY id
+            LIMIT 100
+        ''')
+        return {
+            'counts': counts,
+            'workers': sum(1 for t in self._threads if t.is_alive()),
+            'jobs': [
+                {'job_id': row[0], 'media_id': row[1], 'media_name': row[2], 'status': row[3],
+                 'attempts': row[4], 'error': row[5], 'created_at': row[6]}
+                for row in waiting
+            ],
+        }
 
-# Start the chunk processor thread
-#chunk_processor_thread = threading.Thread(target=chunk_processor)
-#chunk_processor_thread.start()
 
-# Make sure to properly shut down the chunk processor when your application exits
-# def shutdown_chunk_processor():
-#     chunk_queue.put(None)
-#     chunk_processor_thread.join()
+chunking_job_queue = ChunkingJobQueue(db, num_workers=chunking_workers)
 
-#FIXME - add into main db creation code
-def update_media_chunks_table():
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS MediaChunks_new (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            media_id INTEGER,
-            chunk_text TEXT,
-            start_index INTEGER,
-            end_index INTEGER,
-            chunk_id TEXT,
-            FOREIGN KEY (media_id) REFERENCES Media(id)
-        )
-        ''')
-        cursor.execute('''
-        INSERT INTO MediaChunks_new (media_id, chunk_text, start_index, end_index)
-        SELECT media_id, chunk_text, start_index, end_index FROM MediaChunks
-        ''')
-        cursor.execute('DROP TABLE MediaChunks')
-        cursor.execute('ALTER TABLE MediaChunks_new RENAME TO MediaChunks')
 
-    logger.info("Updated MediaChunks table schema")
+def start_chunking_workers() -> None:
+    """Start the background chunking workers, resuming any jobs left over from a previous run."""
+    chunking_job_queue.start()
+
+
+def get_chunking_queue_status() -> Dict[str, Any]:
+    return chunking_job_queue.status()
+
+
+def retry_failed_chunking_jobs() -> int:
+    """Move failed chunking jobs back to the queue. Returns the number of jobs requeued."""
+    requeued = db.execute_query(
+        "UPDATE ChunkingJobs SET status = 'pending', attempts = 0, error = NULL, updated_at = CURRENT_TIMESTAMP "
+        "WHERE status = 'failed'")
+    if requeued:
+        if chunking_job_queue.num_workers == 0:
+            chunking_job_queue.run_pending()
+        else:
+            start_chunking_workers()
+    return requeued
 
-update_media_chunks_table()
-# Above function is a dirty hack that should be merged into the initial DB creation statement. This is a placeholder
-# FIXME
 
+atexit.register(chunking_job_queue.stop, 2.0)
 
 # This is backwards compatibility for older setups.
 # Function to add a missing column to the Media table
@@ -13,7 +13,7 @@ import webbrowser
 import gradio as gr
 #
 # Local Imports
-from App_Function_Libraries.DB.DB_Manager import get_db_config, backup_dir
+from App_Function_Libraries.DB.DB_Manager import get_db_config, backup_dir, start_chunking_workers
 from App_Function_Libraries.DB.RAG_QA_Chat_DB import create_tables
 from App_Function_Libraries.Gradio_UI.Anki_tab import create_anki_validation_tab, create_anki_generator_tab
 from App_Function_Libraries.Gradio_UI.Arxiv_tab import create_arxiv_tab
@@ -80,6 +80,7 @@ from App_Function_Libraries.Gradio_UI.Evaluations_Benchmarks_tab import create_g
 from App_Function_Libraries.Gradio_UI.XML_Ingestion_Tab import create_xml_import_tab
 #from App_Function_Libraries.Local_LLM.Local_LLM_huggingface import create_huggingface_tab
 from App_Function_Libraries.Local_LLM.Local_LLM_ollama import create_ollama_tab
+from App_Function_Libraries.RAG.Embeddings_Create import warm_up_embedding_models
 from App_Function_Libraries.Utils.Utils import load_and_log_configs, logging
 
 #
@@ -398,6 +399,10 @@ def launch_ui(share_public=None, server_mode=False):
     rag_chat_db_path = os.path.join(os.path.dirname(media_db_path), "rag_qa.db")
     # Initialize the RAG Chat DB (create tables and update schema)
     create_tables()
+    # Resume any chunking jobs left over from the previous session
+    start_chunking_workers()
+    # Load the local embedding model now so the first query doesn't pay for it
+    warm_up_embedding_models()
 
     # Migrate data from the media DB to the RAG Chat DB
     #migrate_media_db_to_rag_chat_db(media_db_path, rag_chat_db_path)
@@ -549,8 +549,8 @@ def create_anki_generator_tab():
                 lambda: (gr.update(value=""), gr.update(value="")),
                 outputs=[user_prompt, system_prompt_input]
             ).then(
-                lambda history: approximate_token_count(history),
-                inputs=[chatbot],
+                lambda history, api: approximate_token_count(history, api_endpoint=api),
+                inputs=[chatbot, api_endpoint],
                 outputs=[token_count_display]
             )
 
@@ -613,8 +613,8 @@ def create_anki_generator_tab():
                         system_prompt_input],
                 outputs=[chatbot, save_status]
             ).then(
-                lambda history: approximate_token_count(history),
-                inputs=[chatbot],
+                lambda history, api: approximate_token_count(history, api_endpoint=api),
+                inputs=[chatbot, api_endpoint],
                 outputs=[token_count_display]
             )
         gr.Markdown("# Create Anki Deck")
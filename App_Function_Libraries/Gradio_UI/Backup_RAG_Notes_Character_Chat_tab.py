@@ -8,7 +8,8 @@ import gradio as gr
 from typing import Dict, List
 #
 # Local Imports:
-from App_Function_Libraries.DB.DB_Manager import create_automated_backup
+from App_Function_Libraries.DB.DB_Manager import create_automated_backup, get_chunking_queue_status, \
+    retry_failed_chunking_jobs
 from App_Function_Libraries.DB.DB_Backups import create_backup, create_incremental_backup, restore_single_db_backup
 
 
@@ -124,6 +125,41 @@ def create_restore_backup_tab(db_path: str, backup_dir: str, db_name: str):
         outputs=[restore_output]
     )
 
+def format_chunking_queue_status() -> str:
+    """Render the chunking job queue as Markdown."""
+    status = get_chunking_queue_status()
+    counts = status['counts']
+    lines = [
+        f"**Workers running:** {status['workers']}",
+        f"**Pending:** {counts['pending']} | **Processing:** {counts['processing']} | "
+        f"**Completed:** {counts['completed']} | **Failed:** {counts['failed']}",
+    ]
+    if status['jobs']:
+        lines.append("")
+        lines.append("| Job | Media ID | Title | Status | Attempts | Error |")
+        lines.append("|---|---|---|---|---|---|")
+        for job in status['jobs']:
+            lines.append(f"| {job['job_id']} | {job['media_id']} | {job['media_name'] or ''} | {job['status']} | "
+                         f"{job['attempts']} | {job['error'] or ''} |")
+    return "\n".join(lines)
+
+def create_chunking_queue_tab():
+    """Create a tab showing media items still waiting to be chunked."""
+    with gr.TabItem("Chunking Queue", visible=True):
+        gr.Markdown("## Background Chunking Queue")
+        gr.Markdown("Newly ingested media is chunked in the background. Items listed here are still pending or failed.")
+        with gr.Row():
+            refresh_btn = gr.Button("Refresh")
+            retry_btn = gr.Button("Retry Failed Jobs")
+        status_output = gr.Markdown()
+
+        def retry_and_refresh() -> str:
+            requeued = retry_failed_chunking_jobs()
+            return f"Requeued {requeued} failed job(s).\n\n" + format_chunking_queue_status()
+
+        refresh_btn.click(fn=format_chunking_queue_status, inputs=[], outputs=[status_output])
+        retry_btn.click(fn=retry_and_refresh, inputs=[], outputs=[status_output])
+
 def create_media_db_tabs(db_config: Dict[str, str]):
     """Create all tabs for the Media database."""
     create_backup_tab(
@@ -140,6 +176,7 @@ def create_media_db_tabs(db_config: Dict[str, str]):
         backup_dir=db_config['backup_dir'],
         db_name='media'
     )
+    create_chunking_queue_tab()
 
 def create_rag_chat_tabs(db_config: Dict[str, str]):
     """Create all tabs for the RAG Chat database."""
@@ -1112,8 +1112,8 @@ def create_character_card_interaction_tab():
                 ],
                 outputs=[chat_history, save_status]
             ).then(
-                lambda history: approximate_token_count(history),
-                inputs=[chat_history],
+                lambda history, api: approximate_token_count(history, api_endpoint=api),
+                inputs=[chat_history, api_name_input],
                 outputs=[token_count_display]
             )
 
@@ -1134,8 +1134,8 @@ def create_character_card_interaction_tab():
                 ],
                 outputs=[chat_history, save_status]
             ).then(
-                lambda history: approximate_token_count(history),
-                inputs=[chat_history],
+                lambda history, api: approximate_token_count(history, api_endpoint=api),
+                inputs=[chat_history, api_name_input],
                 outputs=[token_count_display]
             )
 
@@ -1156,8 +1156,8 @@ def create_character_card_interaction_tab():
                 inputs=[character_data, user_name_input],
                 outputs=[chat_history, character_data]
             ).then(
-                lambda history: approximate_token_count(history),
-                inputs=[chat_history],
+                lambda history, api: approximate_token_count(history, api_endpoint=api),
+                inputs=[chat_history, api_name_input],
                 outputs=[token_count_display]
             )
 
@@ -1191,8 +1191,8 @@ def create_character_card_interaction_tab():
             ).then(
                 lambda: "", outputs=user_input  # Clear the input box after sending
             ).then(
-                lambda history: approximate_token_count(history),
-                inputs=[chat_history],
+                lambda history, api: approximate_token_count(history, api_endpoint=api),
+                inputs=[chat_history, api_name_input],
                 outputs=[token_count_display]
             )
 
@@ -1213,8 +1213,8 @@ def create_character_card_interaction_tab():
                 ],
                 outputs=[chat_history, save_status]
             ).then(
-                lambda history: approximate_token_count(history) if history is not None else 0,
-                inputs=[chat_history],
+                lambda history, api: approximate_token_count(history, api_endpoint=api) if history is not None else 0,
+                inputs=[chat_history, api_name_input],
                 outputs=[token_count_display]
             )
 
@@ -1228,8 +1228,8 @@ def create_character_card_interaction_tab():
                 inputs=[chat_file_upload, chat_history, character_data, user_name_input],
                 outputs=[chat_history, character_data, save_status]
             ).then(
-                lambda history: approximate_token_count(history),
-                inputs=[chat_history],
+                lambda history, api: approximate_token_count(history, api_endpoint=api),
+                inputs=[chat_history, api_name_input],
                 outputs=[token_count_display]
             )
 
@@ -1288,8 +1288,8 @@ def create_character_card_interaction_tab():
                 inputs=[chat_search_dropdown, user_name_input],
                 outputs=[character_data, chat_history, character_image, save_status]
             ).then(
-                lambda history: approximate_token_count(history),
-                inputs=[chat_history],
+                lambda history, api: approximate_token_count(history, api_endpoint=api),
+                inputs=[chat_history, api_name_input],
                 outputs=[token_count_display]
             )
 
@@ -1098,8 +1098,8 @@ def create_chat_interface():
             lambda: (gr.update(value=""), gr.update(value="")),
             outputs=[user_prompt, system_prompt_input]
         ).then(
-            lambda history: approximate_token_count(history),
-            inputs=[chatbot],
+            lambda history, api: approximate_token_count(history, api_endpoint=api),
+            inputs=[chatbot, api_endpoint],
             outputs=[token_count_display]
         )
 
@@ -1156,8 +1156,8 @@ def create_chat_interface():
                     system_prompt_input, streaming],
             outputs=[chatbot, gr.Textbox(label="Regenerate Status")]
         ).then(
-            lambda history: approximate_token_count(history),
-            inputs=[chatbot],
+            lambda history, api: approximate_token_count(history, api_endpoint=api),
+            inputs=[chatbot, api_endpoint],
             outputs=[token_count_display]
         )
 
@@ -1528,8 +1528,8 @@ def create_chat_interface_stacked():
             inputs=[chatbot],
             outputs=[msg]
         ).then(
-            lambda history: approximate_token_count(history),
-            inputs=[chatbot],
+            lambda history, api: approximate_token_count(history, api_endpoint=api),
+            inputs=[chatbot, api_endpoint],
             outputs=[token_count_display]
         )
 
@@ -1584,8 +1584,8 @@ def create_chat_interface_stacked():
             inputs=[chatbot, media_content, selected_parts, api_endpoint, api_key, user_prompt, temp, system_prompt],
             outputs=[chatbot, gr.Textbox(label="Regenerate Status")]
         ).then(
-            lambda history: approximate_token_count(history),
-            inputs=[chatbot],
+            lambda history, api: approximate_token_count(history, api_endpoint=api),
+            inputs=[chatbot, api_endpoint],
             outputs=[token_count_display]
         )
 
@@ -1826,10 +1826,13 @@ def create_chat_interface_multi_api():
 
             return [gr.update(value="")] + new_chatbots + new_chat_histories
 
-        def update_token_counts(*histories):
+        def update_token_counts(*histories_and_endpoints):
+            # The chat windows' histories, then their API endpoints in the same order
+            half = len(histories_and_endpoints) // 2
+            histories, endpoints = histories_and_endpoints[:half], histories_and_endpoints[half:]
             token_counts = []
-            for history in histories:
-                token_counts.append(approximate_token_count(history))
+            for history, endpoint in zip(histories, endpoints):
+                token_counts.append(approximate_token_count(history, api_endpoint=endpoint))
             return token_counts
 
         def regenerate_last_message(chat_history, chatbot, media_content, selected_parts, api_endpoint, api_key, custom_prompt, temperature, system_prompt):
@@ -1871,8 +1874,8 @@ def create_chat_interface_multi_api():
                         user_prompt, temperatures[i], system_prompt],
                 outputs=[chatbots[i], chat_history[i], gr.Textbox(label=f"Regenerate Status {i + 1}")]
             ).then(
-                lambda history: approximate_token_count(history),
-                inputs=[chat_history[i]],
+                lambda history, api: approximate_token_count(history, api_endpoint=api),
+                inputs=[chat_history[i], api_endpoints[i]],
                 outputs=[token_count_displays[i]]
             )
 
@@ -1888,7 +1891,7 @@ def create_chat_interface_multi_api():
             outputs=[msg, user_prompt]
         ).then(
             update_token_counts,
-            inputs=chat_history,
+            inputs=chat_history + api_endpoints,
             outputs=token_count_displays
         )
 
@@ -2132,8 +2135,8 @@ def create_chat_interface_four():
                     interface['chat_history']
                 ]
             ).then(
-                lambda history: approximate_token_count(history),
-                inputs=[interface['chat_history']],
+                lambda history, api: approximate_token_count(history, api_endpoint=api),
+                inputs=[interface['chat_history'], interface['api_endpoint']],
                 outputs=[interface['token_count_display']]
             )
 
@@ -2152,8 +2155,8 @@ def create_chat_interface_four():
                     gr.Textbox(label="Regenerate Status")
                 ]
             ).then(
-                lambda history: approximate_token_count(history),
-                inputs=[interface['chat_history']],
+                lambda history, api: approximate_token_count(history, api_endpoint=api),
+                inputs=[interface['chat_history'], interface['api_endpoint']],
                 outputs=[interface['token_count_display']]
             )
 
@@ -14,9 +14,11 @@ from tqdm import tqdm
 from App_Function_Libraries.DB.DB_Manager import get_all_content_from_database, get_all_conversations, \
     get_conversation_text, get_note_by_id
 from App_Function_Libraries.DB.RAG_QA_Chat_DB import get_all_notes
+from App_Function_Libraries.DB.SQLite_DB import compute_chunk_hash
 from App_Function_Libraries.RAG.ChromaDB_Library import chroma_client, \
-    store_in_chroma, situate_context
-from App_Function_Libraries.RAG.Embeddings_Create import create_embedding, create_embeddings_batch
+    store_in_chroma, embed_and_store_chunks
+from App_Function_Libraries.RAG.Contextual_Chunking import contextualize_chunks
+from App_Function_Libraries.RAG.Embeddings_Create import create_embeddings_batch
 from App_Function_Libraries.Chunk_Lib import improved_chunking_process, chunk_for_embedding
 from App_Function_Libraries.Utils.Utils import load_and_log_configs, logging
 
@@ -217,32 +219,34 @@ def create_embeddings_tab():
                     text = item['content']
 
                     chunks = improved_chunking_process(text, chunk_options)
+                    texts, ids, metadatas = [], [], []
                     for chunk_idx, chunk in enumerate(chunks):
-                        chunk_text = chunk['text']
-                        chunk_id = f"{database_type.lower()}_{content_id}_chunk_{chunk_idx}"
-
-                        try:
-                            embedding = create_embedding(chunk_text, provider, model, api_url)
-                            metadata = {
-                                'content_id': str(content_id),
-                                'chunk_index': int(chunk_idx),
-                                'total_chunks': int(len(chunks)),
-                                'chunking_method': method,
-                                'max_chunk_size': int(max_size),
-                                'chunk_overlap': int(overlap),
-                                'adaptive_chunking': bool(adaptive),
-                                'embedding_model': model,
-                                'embedding_provider': provider,
-                                'content_type': item.get('type', 'media'),
-                                'conversation_id': item.get('conversation_id'),
-                                **{k: (int(v) if isinstance(v, str) and v.isdigit() else v)
-                                   for k, v in chunk['metadata'].items()}
-                            }
-                            store_in_chroma(collection_name, [chunk_text], [embedding], [chunk_id], [metadata])
-
-                        except Exception as e:
-                            logging.error(f"Error processing chunk {chunk_id}: {str(e)}")
-                            continue
+                        texts.append(chunk['text'])
+                        ids.append(f"{database_type.lower()}_{content_id}_chunk_{chunk_idx}")
+                        metadatas.append({
+                            'content_id': str(content_id),
+                            'chunk_index': int(chunk_idx),
+                            'total_chunks': int(len(chunks)),
+                            'chunking_method': method,
+                            'max_chunk_size': int(max_size),
+                            'chunk_overlap': int(overlap),
+                            'adaptive_chunking': bool(adaptive),
+                            'embedding_model': model,
+                            'embedding_provider': provider,
+                            'content_type': item.get('type', 'media'),
+                            'conversation_id': item.get('conversation_id'),
+                            **{k: (int(v) if isinstance(v, str) and v.isdigit() else v)
+                               for k, v in chunk['metadata'].items()}
+                        })
+
+                    # Chunks already embedded with this model (boilerplate, re-imported documents) are reused
+                    try:
+                        chunk_hashes = [compute_chunk_hash(chunk_text, chunk_options) for chunk_text in texts]
+                        embed_and_store_chunks(None, collection_name, texts, ids, metadatas, chunk_hashes,
+                                               provider, model, api_url)
+                    except Exception as e:
+                        logging.error(f"Error processing chunks for item {content_id}: {str(e)}")
+                        continue
 
                 return f"Embeddings created and stored successfully for all {database_type} content."
             except Exception as e:
@@ -565,16 +569,16 @@ def create_view_embeddings_tab():
                 texts, ids, metadatas = [], [], []
                 chunk_count = 0
                 logging.info("Generating contextual summaries and preparing chunks for embedding")
-                for i, chunk in enumerate(chunks):
+                contexts = contextualize_chunks(contextual_api_choice, item['content'],
+                                                [chunk['text'] for chunk in chunks]) \
+                    if use_contextual else [None] * len(chunks)
+                for i, (chunk, context) in enumerate(zip(chunks, contexts)):
                     chunk_text = chunk['text']
                     chunk_metadata = chunk['metadata']
-                    if use_contextual:
-                        logging.debug(f"Generating contextual summary for chunk {chunk_count}")
-                        context = situate_context(contextual_api_choice, item['content'], chunk_text)
+                    if context:
                         contextualized_text = f"{chunk_text}\n\nContextual Summary: {context}"
                     else:
                         contextualized_text = chunk_text
-                        context = None
 
                     chunk_id = f"{database_type.lower()}_{item_id}_chunk_{i}"
 
@@ -5,8 +5,7 @@
 import os
 import json
 import math
-import shutil
-import tempfile
+from datetime import datetime
 from typing import List, Dict, Optional, Tuple, Any
 #
 # 3rd-Party Imports
@@ -14,9 +13,9 @@ import gradio as gr
 #
 # Local Imports
 from App_Function_Libraries.DB.DB_Manager import DatabaseError, fetch_all_notes, fetch_all_conversations, \
-    get_keywords_for_note, fetch_notes_by_ids, fetch_conversations_by_ids
+    get_keywords_for_note, fetch_notes_by_ids, fetch_conversations_by_ids, export_media_library
 from App_Function_Libraries.DB.RAG_QA_Chat_DB import get_keywords_for_conversation
-from App_Function_Libraries.Gradio_UI.Gradio_Shared import fetch_item_details, fetch_items_by_keyword, browse_items
+from App_Function_Libraries.Gradio_UI.Gradio_Shared import fetch_item_details, browse_items
 from App_Function_Libraries.Utils.Utils import logger, logging
 
 
@@ -43,42 +42,51 @@ def export_item_as_markdown(media_id: int) -> Tuple[Optional[str], str]:
         return None, error_message
 
 
-def export_items_by_keyword(keyword: str) -> str:
+def export_items_by_keyword(keyword: str) -> Tuple[Optional[str], str]:
     try:
-        items = fetch_items_by_keyword(keyword)
-        if not items:
+        zip_filename = f"export_keyword_{keyword}.zip"
+        final_zip_path = os.path.join(os.getcwd(), zip_filename)
+        result = export_media_library(final_zip_path, export_format='markdown_zip', keyword=keyword)
+        if not result['exported']:
+            os.remove(final_zip_path)
             logger.warning(f"No items found for keyword: {keyword}")
-            return f"No items found for keyword: {keyword}"
-
-        # Create a temporary directory to store individual markdown files
-        with tempfile.TemporaryDirectory() as temp_dir:
-            folder_name = f"export_keyword_{keyword}"
-            export_folder = os.path.join(temp_dir, folder_name)
-            os.makedirs(export_folder)
-
-            for item in items:
-                content, prompt, summary = fetch_item_details(item['id'])
-                markdown_content = f"# {item['title']}\n\n## Prompt\n{prompt}\n\n## Summary\n{summary}\n\n## Content\n{content}"
-
-                # Create individual markdown file for each item
-                file_name = f"{item['id']}_{item['title'][:50]}.md"  # Limit filename length
-                file_path = os.path.join(export_folder, file_name)
-                with open(file_path, "w", encoding='utf-8') as f:
-                    f.write(markdown_content)
-
-            # Create a zip file containing all markdown files
-            zip_filename = f"{folder_name}.zip"
-            shutil.make_archive(os.path.join(temp_dir, folder_name), 'zip', export_folder)
-
-            # Move the zip file to a location accessible by Gradio
-            final_zip_path = os.path.join(os.getcwd(), zip_filename)
-            shutil.move(os.path.join(temp_dir, zip_filename), final_zip_path)
-
-        logger.info(f"Successfully exported {len(items)} items for keyword '{keyword}' to {zip_filename}")
-        return final_zip_path
+            return None, f"No items found for keyword: {keyword}"
+
+        logger.info(f"Successfully exported {result['exported']} items for keyword '{keyword}' to {zip_filename}")
+        return final_zip_path, f"Exported {result['exported']} items for keyword '{keyword}'"
     except Exception as e:
         logger.error(f"Error exporting items for keyword '{keyword}': {str(e)}")
-        return f"Error exporting items for keyword '{keyword}': {str(e)}"
+        return None, f"Error exporting items for keyword '{keyword}': {str(e)}"
+
+
+EXPORT_FORMAT_EXTENSIONS = {'jsonl': 'jsonl', 'markdown_zip': 'zip', 'sqlite': 'db'}
+
+
+def export_media_library_to_file(export_format: str, keyword: str, start_date: str, end_date: str, media_type: str,
+                                 progress=gr.Progress()) -> Tuple[Optional[str], str]:
+    """Stream the (optionally filtered) media library to a JSONL, Markdown zip or SQLite file."""
+    try:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = os.path.join(os.getcwd(), "exports",
+                                   f"media_export_{timestamp}.{EXPORT_FORMAT_EXTENSIONS[export_format]}")
+
+        def report(exported, total):
+            progress(exported / total if total else 1.0, desc=f"Exported {exported}/{total} items")
+
+        result = export_media_library(
+            output_path,
+            export_format=export_format,
+            keyword=keyword.strip() or None,
+            start_date=start_date.strip() or None,
+            end_date=end_date.strip() or None,
+            media_type=media_type.strip() or None,
+            progress_callback=report
+        )
+        return output_path, f"Exported {result['exported']} items to {output_path}"
+    except Exception as e:
+        error_message = f"Error exporting media library: {str(e)}"
+        logger.error(error_message)
+        return None, error_message
 
 
 def export_selected_items(selected_items: List[Dict]) -> Tuple[Optional[str], str]:
@@ -530,6 +538,19 @@ def create_export_tabs():
             export_output = gr.File(label="Download Exported File")
             error_output = gr.Textbox(label="Status/Error Messages", interactive=False)
 
+            gr.Markdown("## Export Library")
+            gr.Markdown("Export every item matching the filters (leave a filter empty to skip it). "
+                        "Items are written as they are read, so large libraries can be exported safely.")
+            with gr.Row():
+                library_export_format = gr.Radio(["jsonl", "markdown_zip", "sqlite"], value="jsonl",
+                                                 label="Export Format")
+                library_keyword = gr.Textbox(label="Keyword")
+                library_media_type = gr.Textbox(label="Media Type (e.g. video, article)")
+            with gr.Row():
+                library_start_date = gr.Textbox(label="Ingested On or After (YYYY-MM-DD)")
+                library_end_date = gr.Textbox(label="Ingested On or Before (YYYY-MM-DD)")
+            export_library_button = gr.Button("Export Library")
+
         # Conversations Export Tab
         with gr.Tab("RAG Conversations Export"):
             with gr.Row():
@@ -653,6 +674,13 @@ def create_export_tabs():
             show_progress="full"
         )
 
+        export_library_button.click(
+            fn=export_media_library_to_file,
+            inputs=[library_export_format, library_keyword, library_start_date, library_end_date, library_media_type],
+            outputs=[export_output, error_output],
+            show_progress="full"
+        )
+
         search_results.select(
             fn=handle_item_selection,
             inputs=[search_results],
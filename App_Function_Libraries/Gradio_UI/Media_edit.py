@@ -185,12 +185,6 @@ def create_media_edit_and_clone_tab():
                             # Associate keyword with the new media item
                             cursor.execute("INSERT INTO MediaKeywords (media_id, keyword_id) VALUES (?, ?)", (new_media_id, keyword_id))
 
-                        # Update full-text search index
-                        cursor.execute("""
-                            INSERT INTO media_fts (rowid, title, content)
-                            VALUES (?, ?, ?)
-                        """, (new_media_id, new_title, content))
-
                         conn.commit()
 
                     return f"Cloned item saved successfully with ID: {new_media_id}", gr.update(
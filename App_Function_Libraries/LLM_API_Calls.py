@@ -23,7 +23,7 @@
 import json
 import os
 import time
-from typing import List
+from typing import List, Union
 #
 # Import 3rd-Party Libraries
 import requests
@@ -59,16 +59,16 @@ def extract_text_from_segments(segments):
     return text.strip()
 
 
-def get_openai_embeddings(input_data: str, model: str) -> List[float]:
+def get_openai_embeddings(input_data: Union[str, List[str]], model: str) -> Union[List[float], List[List[float]]]:
     """
     Get embeddings for the input text from OpenAI API.
 
     Args:
-        input_data (str): The input text to get embeddings for.
+        input_data (str | List[str]): The input text, or a list of texts to embed in a single request.
         model (str): The model to use for generating embeddings.
 
     Returns:
-        List[float]: The embeddings generated by the API.
+        List[float]: The embedding for a single text, or one embedding per text (in input order) for a list.
     """
     loaded_config_data = load_and_log_configs()
     api_key = loaded_config_data['openai_api']['api_key']
@@ -98,8 +98,10 @@ def get_openai_embeddings(input_data: str, model: str) -> List[float]:
         if response.status_code == 200:
             response_data = response.json()
             if 'data' in response_data and len(response_data['data']) > 0:
-                embedding = response_data['data'][0]['embedding']
                 logging.debug("OpenAI: Embeddings retrieved successfully")
+                if isinstance(input_data, list):
+                    return [item['embedding'] for item in sorted(response_data['data'], key=lambda item: item['index'])]
+                embedding = response_data['data'][0]['embedding']
                 return embedding
             else:
                 logging.warning("OpenAI: Embedding data not found in the response")
@@ -16,7 +16,7 @@ import mwxml
 import yaml
 #
 # Local Imports
-from App_Function_Libraries.DB.DB_Manager import add_media_with_keywords
+from App_Function_Libraries.DB.DB_Manager import add_media_with_keywords, add_media_batch
 from App_Function_Libraries.RAG.ChromaDB_Library import process_and_store_content
 from App_Function_Libraries.Utils.Utils import logging
 #
@@ -100,28 +100,48 @@ def optimized_chunking(text: str, chunk_options: Dict[str, Any]) -> List[Dict[st
 
 
 
+def _mediawiki_record(content: str, title: str, wiki_name: str, is_combined: bool = False,
+                      item: Dict[str, Any] = None) -> Dict[str, Any]:
+    # Create a unique URL using the wiki name and article title
+    encoded_title = title.replace(" ", "_")
+    url = f"mediawiki:{wiki_name}:{encoded_title}"
+    logging.debug(f"Generated URL: {url}")
+    return {
+        'url': url,
+        'title': title,
+        'media_type': "mediawiki_dump" if is_combined else "mediawiki_article",
+        'content': content,
+        'keywords': f"mediawiki,{wiki_name}" + (",full_dump" if is_combined else ",article"),
+        'prompt': "",
+        'summary': "",
+        'transcription_model': "",
+        'author': "MediaWiki",
+        'ingestion_date': item['timestamp'].strftime('%Y-%m-%d') if item else None,
+    }
+
+
+def _store_item_chunks(content: str, title: str, wiki_name: str, media_id: int, chunk_options: Dict[str, Any],
+                       api_name: str = None):
+    chunks = optimized_chunking(content, chunk_options)
+    for i, chunk in enumerate(chunks):
+        logging.debug(f"Processing chunk {i + 1}/{len(chunks)} for item: {title}")
+
+        # FIXME
+        # def process_and_store_content(content: str, collection_name: str, media_id: int, file_name: str,
+        #                               create_embeddings: bool = False, create_summary: bool = False,
+        #                               api_name: str = None):
+        if api_name:
+            process_and_store_content(chunk['text'], f"mediawiki_{wiki_name}", media_id, title, True, True, api_name)
+        else:
+            process_and_store_content(chunk['text'], f"mediawiki_{wiki_name}", media_id, title)
+
+
 def process_single_item(content: str, title: str, wiki_name: str, chunk_options: Dict[str, Any],
                         is_combined: bool = False, item: Dict[str, Any] = None, api_name: str = None):
     try:
         logging.debug(f"process_single_item: Processing item: {title}")
 
-        # Create a unique URL using the wiki name and article title
-        encoded_title = title.replace(" ", "_")
-        url = f"mediawiki:{wiki_name}:{encoded_title}"
-        logging.debug(f"Generated URL: {url}")
-
-        result = add_media_with_keywords(
-            url=url,  # Use the generated URL here
-            title=title,
-            media_type="mediawiki_dump" if is_combined else "mediawiki_article",
-            content=content,
-            keywords=f"mediawiki,{wiki_name}" + (",full_dump" if is_combined else ",article"),
-            prompt="",
-            summary="",
-            transcription_model="",
-            author="MediaWiki",
-            ingestion_date=item['timestamp'].strftime('%Y-%m-%d') if item else None
-        )
+        result = add_media_with_keywords(**_mediawiki_record(content, title, wiki_name, is_combined, item))
         logging.debug(f"Result from add_media_with_keywords: {result}")
 
         # Unpack the result
@@ -129,24 +149,30 @@ def process_single_item(content: str, title: str, wiki_name: str, chunk_options:
         logging.info(f"Media item result: {message}")
         logging.debug(f"Final media_id: {media_id}")
 
-        chunks = optimized_chunking(content, chunk_options)
-        for i, chunk in enumerate(chunks):
-            logging.debug(f"Processing chunk {i + 1}/{len(chunks)} for item: {title}")
-
-            # FIXME
-            # def process_and_store_content(content: str, collection_name: str, media_id: int, file_name: str,
-            #                               create_embeddings: bool = False, create_summary: bool = False,
-            #                               api_name: str = None):
-            if api_name:
-                process_and_store_content(chunk['text'], f"mediawiki_{wiki_name}", media_id, title, True, True, api_name)
-            else:
-                process_and_store_content(chunk['text'], f"mediawiki_{wiki_name}", media_id, title)
+        _store_item_chunks(content, title, wiki_name, media_id, chunk_options, api_name)
         logging.info(f"Successfully processed item: {title}")
     except Exception as e:
         logging.error(f"Error processing item {title}: {str(e)}")
         logging.error(f"Exception details: {traceback.format_exc()}")
 
 
+def process_item_batch(items: List[Dict[str, Any]], wiki_name: str, chunk_options: Dict[str, Any],
+                       api_name: str = None) -> None:
+    """Write a batch of parsed pages with add_media_batch (one transaction), then chunk and embed each page."""
+    records = [_mediawiki_record(item['content'], item['title'], wiki_name, False, item) for item in items]
+    outcomes = add_media_batch(records, batch_size=len(records))
+    for item, outcome in zip(items, outcomes):
+        if outcome['action'] == 'error':
+            logging.error(f"Error processing item {item['title']}: {outcome['error']}")
+            continue
+        try:
+            _store_item_chunks(item['content'], item['title'], wiki_name, outcome['media_id'], chunk_options, api_name)
+            logging.info(f"Successfully processed item: {item['title']}")
+        except Exception as e:
+            logging.error(f"Error processing item {item['title']}: {str(e)}")
+            logging.error(f"Exception details: {traceback.format_exc()}")
+
+
 def load_checkpoint(file_path: str) -> int:
     if os.path.exists(file_path):
         with open(file_path, 'r') as f:
@@ -168,7 +194,8 @@ def import_mediawiki_dump(
         single_item: bool = False,
         progress_callback: Any = None,
         api_name: str = None,
-        api_key: str = None
+        api_key: str = None,
+        batch_size: int = 100
 ) -> Iterator[str]:
     try:
         logging.info(f"Importing MediaWiki dump: {file_path}")
@@ -183,19 +210,29 @@ def import_mediawiki_dump(
 
         yield f"Found {total_pages} pages to process."
 
+        # Pages are written in batches so each batch costs one transaction; the checkpoint only advances once a
+        # batch has been stored, so an interrupted import resumes from the last complete batch.
+        batch = []
+
+        def flush():
+            nonlocal processed_pages
+            process_item_batch(batch, wiki_name, chunk_options, api_name)
+            save_checkpoint(checkpoint_file, batch[-1]['page_id'])
+            for page in batch:
+                processed_pages += 1
+                if progress_callback is not None:
+                    progress_callback(processed_pages / total_pages, f"Processed page: {page['title']}")
+                yield f"Processed page {processed_pages}/{total_pages}: {page['title']}"
+            batch.clear()
+
         for item in parse_mediawiki_dump(file_path, namespaces, skip_redirects):
             if item['page_id'] <= last_processed_id:
                 continue
-            # FIXME - ensure this works...
-            if api_name is not None:
-                # FIXME - add API key to the call/params
-                process_single_item(item['content'], item['title'], wiki_name, chunk_options, False, item, api_name)
-            process_single_item(item['content'], item['title'], wiki_name, chunk_options, False, item)
-            save_checkpoint(checkpoint_file, item['page_id'])
-            processed_pages += 1
-            if progress_callback is not None:
-                progress_callback(processed_pages / total_pages, f"Processed page: {item['title']}")
-            yield f"Processed page {processed_pages}/{total_pages}: {item['title']}"
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield from flush()
+        if batch:
+            yield from flush()
 
         os.remove(checkpoint_file)  # Remove checkpoint file after successful import
         yield f"Successfully imported and indexed MediaWiki dump: {wiki_name}"
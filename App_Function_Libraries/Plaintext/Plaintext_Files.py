@@ -6,12 +6,13 @@ import json
 import os
 import tempfile
 import zipfile
+from datetime import datetime
 #
 # External Imports
 from docx2txt import docx2txt
 from pypandoc import convert_file
 
-from App_Function_Libraries.DB.DB_Manager import add_media_to_database
+from App_Function_Libraries.DB.DB_Manager import add_media_to_database, add_media_batch
 #
 # Local Imports
 from App_Function_Libraries.Metrics.metrics_logger import log_counter, log_histogram
@@ -299,7 +300,7 @@ def _preview_single_file(
 
 def final_ingest_handler(preview_data_json, updated_metadata_json):
     """
-    Step 2: Actually ingest data into the database using add_media_to_database.
+    Step 2: Actually ingest data into the database using add_media_batch.
 
     - preview_data_json: The JSON output from preview_import_handler()
     - updated_metadata_json: (Optional) JSON from the user specifying
@@ -326,7 +327,7 @@ def final_ingest_handler(preview_data_json, updated_metadata_json):
     else:
         overrides_dict = {}
 
-    results = []
+    records = []
     for file_info in preview_list:
         fname = file_info["filename"]
         # Attempt to match user overrides by filename (the base name without extension, or the full fname).
@@ -334,37 +335,39 @@ def final_ingest_handler(preview_data_json, updated_metadata_json):
         # Here we assume the user’s JSON keys match exactly the 'filename' in file_info.
         this_file_overrides = overrides_dict.get(fname, {})
 
-        # Combine final metadata
-        final_author = this_file_overrides.get("author", file_info["author"])
-        final_keywords = this_file_overrides.get("keywords", file_info["keywords"])
-        final_title = this_file_overrides.get("title", file_info["title"])
-        final_summary = this_file_overrides.get("summary", file_info["summary"])
-
-        text_content = file_info["content"]  # The converted text
-
         # Construct combined prompts if needed or just store them
         combined_prompt = (file_info["system_prompt"] or "") + "\n\n" + (file_info["user_prompt"] or "")
 
-        # Now do the actual DB ingestion
-        try:
-            db_result = add_media_to_database(
-                url=fname,  # or some unique identifier
-                info_dict={
-                    "title": final_title,
-                    "uploader": final_author,
-                },
-                segments=[{"Text": text_content}],
-                summary=final_summary,
-                keywords=final_keywords,
-                custom_prompt_input=combined_prompt,
-                whisper_model="Imported",
-                media_type="document",
-                overwrite=False
-            )
-            results.append(f"✅ {fname} => {db_result}")
-        except Exception as e:
-            logging.exception(f"Error ingesting file {fname}")
-            results.append(f"❌ {fname} => {str(e)}")
+        # Combine final metadata
+        records.append({
+            "url": fname,  # or some unique identifier
+            "title": this_file_overrides.get("title", file_info["title"]),
+            "author": this_file_overrides.get("author", file_info["author"]),
+            "keywords": this_file_overrides.get("keywords", file_info["keywords"]),
+            "summary": this_file_overrides.get("summary", file_info["summary"]),
+            "content": file_info["content"],  # The converted text
+            "prompt": combined_prompt,
+            "transcription_model": "Imported",
+            "media_type": "document",
+            "ingestion_date": datetime.now().strftime('%Y-%m-%d'),
+        })
+
+    # Now do the actual DB ingestion, one transaction per batch of files
+    try:
+        outcomes = add_media_batch(records, overwrite=False)
+    except Exception as e:
+        logging.exception("Error ingesting files")
+        return f"❌ Error ingesting files: {str(e)}"
+
+    results = []
+    for record, outcome in zip(records, outcomes):
+        fname = record["url"]
+        if outcome["action"] == "error":
+            results.append(f"❌ {fname} => {outcome['error']}")
+        elif outcome["action"] in ("skipped", "duplicate"):
+            results.append(f"✅ {fname} => Media '{record['title']}' already exists (not updated)")
+        else:
+            results.append(f"✅ {fname} => Media '{record['title']}' {outcome['action']} with ID: {outcome['media_id']}")
 
     # Return an overall string
     return "\n".join(results)
@@ -2,17 +2,23 @@
 # Description: Functions for managing embeddings in ChromaDB
 #
 # Imports:
-from typing import List, Dict, Any
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 # 3rd-Party Imports:
-import chromadb
-from chromadb import Settings
 from itertools import islice
 import numpy as np
 #
 # Local Imports:
 from App_Function_Libraries.Chunk_Lib import chunk_for_embedding, chunk_options
 from App_Function_Libraries.DB.DB_Manager import get_unprocessed_media, mark_media_as_processed
-from App_Function_Libraries.DB.SQLite_DB import process_chunks
+from App_Function_Libraries.DB.DB_Registry import LazyStore, store_registry
+from App_Function_Libraries.DB.SQLite_DB import process_chunks, clear_chunk_hashes, compute_chunk_hash, \
+    lookup_chunk_embeddings, register_chunk_embeddings
+from App_Function_Libraries.Metrics.metrics_logger import log_counter, log_histogram
+from App_Function_Libraries.RAG.Contextual_Chunking import contextualize_chunks, document_prompt, single_chunk_prompt
 from App_Function_Libraries.RAG.Embeddings_Create import create_embedding, create_embeddings_batch
 from App_Function_Libraries.Summarization.Summarization_General_Lib import summarize
 from App_Function_Libraries.Utils.Utils import get_database_path, ensure_directory_exists, load_and_log_configs, logger, \
@@ -28,14 +34,42 @@ config = load_and_log_configs()
 #
 # ChromaDB settings
 chroma_db_path = config['db_config']['chroma_db_path'] or get_database_path('chroma_db')
-ensure_directory_exists(chroma_db_path)
-chroma_client = chromadb.PersistentClient(path=chroma_db_path, settings=Settings(anonymized_telemetry=False))
+# Chunks per upsert call, and how many freshly written ids to read back as a spot check (0 = never)
+chroma_upsert_batch_size = int(config['db_config'].get('chroma_upsert_batch_size') or 1000)
+chroma_verify_sample = int(config['db_config'].get('chroma_verify_sample') or 0)
+
+
+def _open_chroma_client():
+    # chromadb is slow to import; only pay for it when a vector store is actually used
+    import chromadb
+    from chromadb import Settings
+    ensure_directory_exists(chroma_db_path)
+    return chromadb.PersistentClient(path=chroma_db_path, settings=Settings(anonymized_telemetry=False))
+
+
+def get_chroma_client():
+    """Return the shared ChromaDB client, constructing it on first use."""
+    return store_registry.get('chroma')
+
+
+store_registry.register('chroma', _open_chroma_client, health_check=lambda client: client.heartbeat())
+chroma_client = LazyStore(store_registry, 'chroma')
 #
 # Embedding settings
 embedding_provider = config['embedding_config']['embedding_provider'] or 'openai'
 embedding_model = config['embedding_config']['embedding_model'] or 'text-embedding-3-small'
 embedding_api_key = config['embedding_config']['embedding_api_key'] or ''
 embedding_api_url = config['embedding_config']['embedding_api_url'] or ''
+# Aliases for functions whose parameters shadow the module-level settings
+default_chunk_options = chunk_options
+default_embedding_provider = embedding_provider
+default_embedding_model = embedding_model
+default_embedding_api_url = embedding_api_url
+#
+# Collection metadata recording how a collection's vectors were made, so searches know which model embeds the query
+COLLECTION_EMBEDDING_KEYS = ('embedding_provider', 'embedding_model', 'embedding_dim')
+# Upper bound on concurrent query embeddings/collection searches per vector search
+VECTOR_SEARCH_MAX_WORKERS = 8
 #
 # End of Config Settings
 #######################################################################################################################
@@ -88,24 +122,9 @@ def batched(iterable, n):
 
 
 def situate_context(api_name, doc_content: str, chunk_content: str) -> str:
-    doc_content_prompt = f"""
-    <document>
-    {doc_content}
-    </document>
-    """
-
-    chunk_context_prompt = f"""
-    \n\n\n\n\n
-    Here is the chunk we want to situate within the whole document
-    <chunk>
-    {chunk_content}
-    </chunk>
-
-    Please give a short succinct context to situate this chunk within the overall document for the purposes of improving search retrieval of the chunk.
-    Answer only with the succinct context and nothing else.
-    """
-
-    response = summarize(chunk_context_prompt, doc_content_prompt, api_name, api_key=None, temp=0, system_message=None)
+    """Context for a single chunk, uncached. To situate many chunks of a document use contextualize_chunks."""
+    response = summarize(single_chunk_prompt(chunk_content), document_prompt(doc_content), api_name, api_key=None,
+                         temp=0, system_message=None)
     return response
 
 
@@ -118,24 +137,25 @@ def process_and_store_content(database, content: str, collection_name: str, medi
         logger.info(f"Processing content for media_id {media_id} in collection {collection_name}")
 
         chunks = chunk_for_embedding(content, file_name, chunk_options)
+        chunk_params = {**default_chunk_options, **(chunk_options or {})}
 
         # Process chunks synchronously
-        process_chunks(database, chunks, media_id)
+        process_chunks(database, chunks, media_id, chunk_params=chunk_params)
 
         if create_embeddings:
             texts = []
             contextualized_chunks = []
-            for chunk in chunks:
+            contexts = contextualize_chunks(api_name, content, [chunk['text'] for chunk in chunks]) \
+                if create_contextualized else [''] * len(chunks)
+            for chunk, context in zip(chunks, contexts):
                 chunk_text = chunk['text']
-                if create_contextualized:
-                    context = situate_context(api_name, content, chunk_text)
+                if context:
                     contextualized_text = f"{chunk_text}\n\nContextual Summary: {context}"
                     contextualized_chunks.append(contextualized_text)
                 else:
                     contextualized_chunks.append(chunk_text)
                 texts.append(chunk_text)  # Store original text for database
 
-            embeddings = create_embeddings_batch(contextualized_chunks, embedding_provider, embedding_model, embedding_api_url)
             ids = [f"{media_id}_chunk_{i}" for i in range(1, len(chunks) + 1)]
             metadatas = [{
                 "media_id": str(media_id),
@@ -147,20 +167,21 @@ def process_and_store_content(database, content: str, collection_name: str, medi
                 "relative_position": float(chunk['metadata']['relative_position']),
                 "contextualized": create_contextualized,
                 "original_text": chunk['text'],
-                "contextual_summary": contextualized_chunks[i-1].split("\n\nContextual Summary: ")[-1] if create_contextualized else ""
+                "contextual_summary": contexts[i-1]
             } for i, chunk in enumerate(chunks, 1)]
 
-            store_in_chroma(collection_name, contextualized_chunks, embeddings, ids, metadatas)
+            # Contextualized text is specific to this document, so only plain chunks are deduplicated. Plain chunks
+            # are keyed on their content without the per-document header chunk_for_embedding adds.
+            chunk_hashes = None if create_contextualized else [
+                compute_chunk_hash(chunk.get('raw_text', chunk['text']), chunk_params) for chunk in chunks]
+            embed_and_store_chunks(database, collection_name, contextualized_chunks, ids, metadatas, chunk_hashes,
+                                   embedding_provider or default_embedding_provider,
+                                   embedding_model or default_embedding_model,
+                                   embedding_api_url or default_embedding_api_url)
 
             # Mark the media as processed
             mark_media_as_processed(database, media_id)
 
-        # Update full-text search index
-        database.execute_query(
-            "INSERT OR REPLACE INTO media_fts (rowid, title, content) SELECT id, title, content FROM Media WHERE id = ?",
-            (media_id,)
-        )
-
         logger.info(f"Finished processing and storing content for media_id {media_id}")
 
     except Exception as e:
@@ -206,24 +227,136 @@ def reset_chroma_collection(collection_name: str):
     try:
         chroma_client.delete_collection(collection_name)
         chroma_client.create_collection(collection_name)
+        clear_chunk_hashes(collection_name)
         logging.info(f"Reset ChromaDB collection: {collection_name}")
     except Exception as e:
         logging.error(f"Error resetting ChromaDB collection: {str(e)}")
 
 
+@lru_cache(maxsize=None)
+def chroma_accepts_numpy() -> bool:
+    """Whether the installed chromadb takes numpy embeddings directly (older releases only accept nested lists)."""
+    try:
+        from chromadb.api import types
+    except ImportError:
+        return False
+    return hasattr(types, 'normalize_embeddings')
+
+
+def _collection_metadata(collection) -> Dict[str, Any]:
+    metadata = getattr(collection, 'metadata', None)
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def _update_collection_metadata(collection, values: Dict[str, Any]) -> None:
+    metadata = {key: value for key, value in _collection_metadata(collection).items()
+                if not key.startswith('hnsw:')}  # Chroma refuses to change the index settings after creation
+    metadata.update(values)
+    try:
+        collection.modify(metadata=metadata)
+    except Exception as e:
+        logging.warning(f"Could not record embedding settings in metadata of collection '{collection.name}': {e}")
+
+
+def set_collection_embedding_info(collection, embedding_provider: str, embedding_model: str,
+                                  embedding_dim: Optional[int] = None) -> None:
+    """Record the provider, model and dimension of a collection's vectors in its metadata."""
+    values = {'embedding_provider': embedding_provider, 'embedding_model': embedding_model}
+    if embedding_dim:
+        values['embedding_dim'] = int(embedding_dim)
+    _update_collection_metadata(collection, values)
+
+
+def get_collection_embedding_info(collection) -> Optional[Dict[str, Any]]:
+    """
+    Provider, model and dimension of the vectors in `collection`, or None if unknown.
+
+    Read from the collection's metadata. Collections created before that was recorded fall back to sampling their
+    chunk metadata; the answer is then written to the collection so later searches skip the sample.
+    """
+    metadata = _collection_metadata(collection)
+    if metadata.get('embedding_provider') and metadata.get('embedding_model'):
+        return {key: metadata.get(key) for key in COLLECTION_EMBEDDING_KEYS}
+
+    sample_results = collection.get(limit=10, include=["metadatas"])
+    sample_metadatas = [metadata for metadata in sample_results.get('metadatas') or [] if metadata]
+    embedding_models = [metadata['embedding_model'] for metadata in sample_metadatas
+                        if metadata.get('embedding_model')]
+    embedding_providers = [metadata['embedding_provider'] for metadata in sample_metadatas
+                           if metadata.get('embedding_provider')]
+    if not embedding_models or not embedding_providers:
+        return None
+    info = {
+        'embedding_provider': max(set(embedding_providers), key=embedding_providers.count),
+        'embedding_model': max(set(embedding_models), key=embedding_models.count),
+        'embedding_dim': None,
+    }
+    set_collection_embedding_info(collection, info['embedding_provider'], info['embedding_model'])
+    return info
+
+
+def _stored_embedding_dim(collection) -> Optional[int]:
+    """Dimension of the vectors already in `collection`, from its metadata (or one stored vector for older ones)."""
+    recorded_dim = _collection_metadata(collection).get('embedding_dim')
+    if recorded_dim:
+        return int(recorded_dim)
+    existing_embeddings = collection.get(limit=1, include=['embeddings'])['embeddings']
+    if existing_embeddings is not None and len(existing_embeddings):
+        return len(existing_embeddings[0])
+    return None
+
+
+def _upsert_batch_size() -> int:
+    # Chroma rejects upserts larger than its own limit
+    max_batch_size = getattr(chroma_client, 'get_max_batch_size', lambda: None)()
+    if isinstance(max_batch_size, int) and max_batch_size > 0:
+        return min(chroma_upsert_batch_size, max_batch_size)
+    return chroma_upsert_batch_size
+
+
+def verify_chroma_upsert(collection, ids: List[str], sample_size: int) -> None:
+    """Spot check: read back the ids of a random sample of freshly written chunks (no vectors)."""
+    sample = random.sample(ids, min(sample_size, len(ids)))
+    found = set(collection.get(ids=sample, include=[])['ids'])
+    missing = [doc_id for doc_id in sample if doc_id not in found]
+    if missing:
+        raise ValueError(f"Failed to store embeddings for {len(missing)} of {len(sample)} sampled ids: {missing[:5]}")
+    logging.debug(f"Verified {len(sample)} sampled embeddings in collection '{collection.name}'")
+
+
 #v2
 def store_in_chroma(collection_name: str, texts: List[str], embeddings: Any, ids: List[str],
-                    metadatas: List[Dict[str, Any]]):
-    # Convert embeddings to list if it's a numpy array
-    if isinstance(embeddings, np.ndarray):
-        embeddings = embeddings.tolist()
-    elif not isinstance(embeddings, list):
+                    metadatas: List[Dict[str, Any]], embedding_provider: Optional[str] = None,
+                    embedding_model: Optional[str] = None, verify_sample: Optional[int] = None, database=None):
+    """
+    Upsert chunks and their embeddings into `collection_name`, creating the collection if needed.
+
+    The embedding provider, model (taken from the chunk metadata when not given) and dimension are recorded on the
+    collection, so the dimension check costs nothing on later writes. Chunks are upserted in bounded batches and not
+    read back, except for an optional spot check of `verify_sample` ids (default: [Database] chroma_verify_sample).
+    A collection recreated for a new dimension has its chunk hash mappings in `database` (default: the main one)
+    dropped with it.
+    """
+    # Keep embeddings as one float32 array; Chroma stores float32, so Python float lists would only be converted back
+    if isinstance(embeddings, list):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+    elif not isinstance(embeddings, np.ndarray):
         raise TypeError("Embeddings must be either a list or a numpy array")
 
-    if not embeddings:
+    if embeddings.ndim != 2 or not len(embeddings):
         raise ValueError("No embeddings provided")
-
-    embedding_dim = len(embeddings[0])
+    if not (len(embeddings) == len(texts) == len(ids) == len(metadatas)):
+        raise ValueError(f"Got {len(texts)} texts, {len(embeddings)} embeddings, {len(ids)} ids and "
+                         f"{len(metadatas)} metadatas; they must match one to one")
+
+    embedding_dim = embeddings.shape[1]
+    first_metadata = metadatas[0] if metadatas else {}
+    embedding_provider = embedding_provider or first_metadata.get('embedding_provider')
+    embedding_model = embedding_model or first_metadata.get('embedding_model')
+    collection_metadata = {'embedding_dim': int(embedding_dim)}
+    if embedding_provider and embedding_model:
+        collection_metadata = {'embedding_provider': embedding_provider, 'embedding_model': embedding_model,
+                               'embedding_dim': int(embedding_dim)}
 
     logging.info(f"Storing embeddings in ChromaDB - Collection: {collection_name}")
     logging.info(f"Number of embeddings: {len(embeddings)}, Dimension: {embedding_dim}")
@@ -236,43 +369,36 @@ def store_in_chroma(collection_name: str, texts: List[str], embeddings: Any, ids
         try:
             collection = chroma_client.get_collection(name=collection_name)
             logging.info(f"Existing collection '{collection_name}' found")
-
-            # Check dimension of existing embeddings
-            existing_embeddings = collection.get(limit=1, include=['embeddings'])['embeddings']
-            if existing_embeddings:
-                existing_dim = len(existing_embeddings[0])
-                if existing_dim != embedding_dim:
-                    logging.warning(f"Embedding dimension mismatch. Existing: {existing_dim}, New: {embedding_dim}")
-                    logging.warning("Deleting existing collection and creating a new one")
-                    chroma_client.delete_collection(name=collection_name)
-                    collection = chroma_client.create_collection(name=collection_name)
-            else:
-                logging.info("No existing embeddings in the collection")
         except Exception as e:
             logging.info(f"Collection '{collection_name}' not found. Creating new collection")
-            collection = chroma_client.create_collection(name=collection_name)
-
-        # Perform the upsert operation
-        collection.upsert(
-            documents=texts,
-            embeddings=embeddings,
-            ids=ids,
-            metadatas=cleaned_metadatas
-        )
+            collection = chroma_client.create_collection(name=collection_name, metadata=collection_metadata)
+        else:
+            existing_dim = _stored_embedding_dim(collection)
+            if existing_dim is not None and existing_dim != embedding_dim:
+                logging.warning(f"Embedding dimension mismatch. Existing: {existing_dim}, New: {embedding_dim}")
+                logging.warning("Deleting existing collection and creating a new one")
+                chroma_client.delete_collection(name=collection_name)
+                clear_chunk_hashes(collection_name, database)
+                collection = chroma_client.create_collection(name=collection_name, metadata=collection_metadata)
+
+        if any(_collection_metadata(collection).get(key) != value for key, value in collection_metadata.items()):
+            _update_collection_metadata(collection, collection_metadata)
+
+        batch_size = _upsert_batch_size()
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            batch_embeddings = embeddings[start:end]
+            collection.upsert(
+                documents=texts[start:end],
+                embeddings=batch_embeddings if chroma_accepts_numpy() else batch_embeddings.tolist(),
+                ids=ids[start:end],
+                metadatas=cleaned_metadatas[start:end]
+            )
         logging.info(f"Successfully upserted {len(embeddings)} embeddings")
 
-        # Verify all stored embeddings
-        results = collection.get(ids=ids, include=["documents", "embeddings", "metadatas"])
-
-        for i, doc_id in enumerate(ids):
-            if results['embeddings'][i] is None:
-                raise ValueError(f"Failed to store embedding for {doc_id}")
-            else:
-                logging.debug(f"Embedding stored successfully for {doc_id}")
-                logging.debug(f"Stored document preview: {results['documents'][i][:100]}...")
-                logging.debug(f"Stored metadata: {results['metadatas'][i]}")
-
-        logging.info("Successfully stored and verified all embeddings in ChromaDB")
+        verify_sample = chroma_verify_sample if verify_sample is None else verify_sample
+        if verify_sample > 0:
+            verify_chroma_upsert(collection, ids, verify_sample)
 
     except Exception as e:
         logging.error(f"Error in store_in_chroma: {str(e)}")
@@ -281,64 +407,231 @@ def store_in_chroma(collection_name: str, texts: List[str], embeddings: Any, ids
     return collection
 
 
+def embed_and_store_chunks(database, collection_name: str, texts: List[str], ids: List[str],
+                           metadatas: List[Dict[str, Any]], chunk_hashes: Optional[List[str]],
+                           provider: str, model: str, api_url: str) -> Dict[str, int]:
+    """
+    Embed chunks and store them in Chroma, reusing work for chunks already seen.
+
+    `chunk_hashes` are content addresses from compute_chunk_hash (one per text, or None to disable reuse). A chunk
+    whose hash already has an embedding for this model in `collection_name` (stored earlier, or earlier in this call)
+    is linked: that vector is stored again under the chunk's own id and metadata, and only a chunk already stored
+    under that same id is skipped. One embedded into another collection has its vector copied instead of
+    recomputed. Only the remaining texts are sent to create_embeddings_batch, once per distinct hash.
+
+    Returns counts of 'embedded', 'copied' and 'linked' chunks.
+    """
+    model_key = f"{provider}:{model}"
+    counts = {'embedded': 0, 'copied': 0, 'linked': 0}
+    if not texts:
+        return counts
+
+    known = lookup_chunk_embeddings([h for h in chunk_hashes if h], model_key, database) if chunk_hashes else {}
+    # Mappings can outlive the Chroma rows they point at, so only trust ids Chroma still has
+    stored: Dict[str, Dict[str, List[float]]] = {}
+    by_collection: Dict[str, set] = {}
+    for locations in known.values():
+        for name, embedding_id in locations.items():
+            by_collection.setdefault(name, set()).add(embedding_id)
+    for name, embedding_ids in by_collection.items():
+        try:
+            result = chroma_client.get_collection(name=name).get(ids=list(embedding_ids), include=["embeddings"])
+        except Exception as e:
+            logging.debug(f"Skipping chunk hash lookups in collection '{name}': {e}")
+            continue
+        stored[name] = dict(zip(result['ids'], result['embeddings']))
+
+    vectors: Dict[int, np.ndarray] = {}
+    # Vectors of chunks already stored under their own id; kept only for repeats of them later in this call
+    unchanged: Dict[int, np.ndarray] = {}
+    linked = set()
+    repeats: List[Tuple[int, int]] = []
+    to_embed: List[int] = []
+    first_seen: Dict[str, int] = {}
+    for i in range(len(texts)):
+        chunk_hash = chunk_hashes[i] if chunk_hashes else None
+        if chunk_hash:
+            if chunk_hash in first_seen:
+                # Repeats within this call get the first occurrence's vector once it is known
+                repeats.append((i, first_seen[chunk_hash]))
+                continue
+            first_seen[chunk_hash] = i
+            locations = known.get(chunk_hash, {})
+            embedding_id = locations.get(collection_name)
+            if embedding_id in stored.get(collection_name, {}):
+                linked.add(i)
+                vector = np.asarray(stored[collection_name][embedding_id], dtype=np.float32)
+                if embedding_id == ids[i]:
+                    unchanged[i] = vector
+                else:
+                    vectors[i] = vector
+                continue
+            source = next((stored[name][embedding_id] for name, embedding_id in locations.items()
+                           if embedding_id in stored.get(name, {})), None)
+            if source is not None:
+                vectors[i] = np.asarray(source, dtype=np.float32)
+                counts['copied'] += 1
+                continue
+        to_embed.append(i)
+
+    if to_embed:
+        embeddings = np.asarray(create_embeddings_batch([texts[i] for i in to_embed], provider, model, api_url),
+                                dtype=np.float32)
+        for i, embedding in zip(to_embed, embeddings):
+            vectors[i] = embedding
+        counts['embedded'] = len(to_embed)
+    for i, first in repeats:
+        linked.add(i)
+        if ids[i] != ids[first]:
+            vectors[i] = vectors[first] if first in vectors else unchanged[first]
+    counts['linked'] = len(linked)
+
+    positions = sorted(vectors)
+    if positions:
+        store_metadatas = []
+        for i in positions:
+            metadata = dict(metadatas[i])
+            if chunk_hashes and chunk_hashes[i]:
+                metadata['chunk_hash'] = chunk_hashes[i]
+            store_metadatas.append(metadata)
+        store_in_chroma(collection_name, [texts[i] for i in positions], np.vstack([vectors[i] for i in positions]),
+                        [ids[i] for i in positions], store_metadatas, embedding_provider=provider,
+                        embedding_model=model, database=database)
+        if chunk_hashes:
+            # Linked chunks keep pointing at the embedding they reused
+            register_chunk_embeddings([(chunk_hashes[i], ids[i]) for i in positions
+                                       if chunk_hashes[i] and i not in linked], model_key, collection_name, database)
+
+    for outcome, count in counts.items():
+        if count:
+            log_counter("chunk_embedding_dedup", labels={"outcome": outcome}, value=count)
+    logging.info(f"Stored chunks in '{collection_name}': {counts['embedded']} embedded, {counts['copied']} copied, "
+                 f"{counts['linked']} linked to existing embeddings")
+    return counts
+
+
+def _query_collection(collection, query_embedding, k: int, where: Optional[Dict[str, Any]] = None
+                      ) -> List[Dict[str, Any]]:
+    query_kwargs = {"where": where} if where else {}
+    results = collection.query(
+        query_embeddings=[query_embedding],
+        n_results=k,
+        include=["documents", "metadatas", "distances"],
+        **query_kwargs
+    )
+
+    if not results['documents'][0]:
+        logging.warning(f"No results found for the query in collection '{collection.name}'.")
+        return []
+
+    distances = (results.get('distances') or [None])[0] or [None] * len(results['documents'][0])
+    return [{"content": doc, "metadata": meta, "distance": distance}
+            for doc, meta, distance in zip(results['documents'][0], results['metadatas'][0], distances)]
+
+
 # Function to perform vector search using ChromaDB + Keywords from the media_db
 #v2
-def vector_search(collection_name: str, query: str, k: int = 10) -> List[Dict[str, Any]]:
+def vector_search(collection_name: str, query: str, k: int = 10, query_embedding: Optional[List[float]] = None
+                  ) -> List[Dict[str, Any]]:
+    """Search one collection. Pass `query_embedding` to reuse a query already embedded with the collection's model."""
     try:
         collection = chroma_client.get_collection(name=collection_name)
 
-        # Fetch a sample of embeddings to check metadata
-        sample_results = collection.get(limit=10, include=["metadatas"])
-        if not sample_results.get('metadatas') or not any(sample_results['metadatas']):
-            logging.warning(f"No metadata found in the collection '{collection_name}'. Skipping this collection.")
-            return []
+        if query_embedding is None:
+            info = get_collection_embedding_info(collection)
+            if info is None:
+                logging.warning(f"No embedding model recorded for collection '{collection_name}'. "
+                                f"Skipping this collection.")
+                return []
+
+            logging.info(f"Using embedding model: {info['embedding_model']} from provider: "
+                         f"{info['embedding_provider']}")
 
-        # Check if all embeddings use the same model and provider
-        embedding_models = [
-            metadata.get('embedding_model') for metadata in sample_results['metadatas']
-            if metadata and metadata.get('embedding_model')
-        ]
-        embedding_providers = [
-            metadata.get('embedding_provider') for metadata in sample_results['metadatas']
-            if metadata and metadata.get('embedding_provider')
-        ]
+            # Generate query embedding using the existing create_embedding function
+            query_embedding = create_embedding(query, info['embedding_provider'], info['embedding_model'],
+                                               embedding_api_url)
 
-        if not embedding_models or not embedding_providers:
-            raise ValueError("Embedding model or provider information not found in metadata")
+        return _query_collection(collection, query_embedding, k)
+    except Exception as e:
+        logging.error(f"Error in vector_search for collection '{collection_name}': {str(e)}", exc_info=True)
+        return []
 
-        embedding_model = max(set(embedding_models), key=embedding_models.count)
-        embedding_provider = max(set(embedding_providers), key=embedding_providers.count)
 
-        logging.info(f"Using embedding model: {embedding_model} from provider: {embedding_provider}")
+def vector_search_collections(query: str, k: int = 10, collection_names: Optional[List[str]] = None,
+                              where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Search many collections (all of them by default) for `query`.
 
-        # Generate query embedding using the existing create_embedding function
-        query_embedding = create_embedding(query, embedding_provider, embedding_model, embedding_api_url)
+    Collections are grouped by the embedding model recorded on them, the query is embedded once per distinct model,
+    and the per-collection searches run concurrently. `where` is a Chroma metadata filter applied by every search.
+    The collections' results are merged into one ranking, closest (smallest 'distance') first, so a caller that keeps
+    only the top of the list does not drop later collections wholesale.
+    """
+    start_time = time.time()
+    if collection_names is None:
+        # Depending on the chromadb version, list_collections() returns collections or just their names
+        collections = [chroma_client.get_collection(name=c) if isinstance(c, str) else c
+                       for c in chroma_client.list_collections()]
+    else:
+        collections = [chroma_client.get_collection(name=name) for name in collection_names]
+    if not collections:
+        return []
 
-        # Ensure query_embedding is a list
-        if isinstance(query_embedding, np.ndarray):
-            query_embedding = query_embedding.tolist()
+    targets: List[Tuple[Any, Tuple[str, str], Optional[int]]] = []
+    for collection in collections:
+        try:
+            info = get_collection_embedding_info(collection)
+        except Exception as e:
+            logging.error(f"Could not read embedding model of collection '{collection.name}': {e}")
+            continue
+        if info is None:
+            logging.warning(f"No embedding model recorded for collection '{collection.name}'. Skipping it.")
+            continue
+        targets.append((collection, (info['embedding_provider'], info['embedding_model']), info.get('embedding_dim')))
+    models = list(dict.fromkeys(model_key for _, model_key, _ in targets))
+    if not models:
+        return []
 
-        results = collection.query(
-            query_embeddings=[query_embedding],
-            n_results=k,
-            include=["documents", "metadatas"]
-        )
+    def embed(model_key):
+        provider, model = model_key
+        return create_embedding(query, provider, model, embedding_api_url)
 
-        if not results['documents'][0]:
-            logging.warning(f"No results found for the query in collection '{collection_name}'.")
+    def search(target):
+        collection, model_key, embedding_dim = target
+        query_embedding = query_embeddings.get(model_key)
+        if query_embedding is None:
+            return []
+        if embedding_dim and len(query_embedding) != embedding_dim:
+            logging.warning(f"Query embedding has {len(query_embedding)} dimensions but collection "
+                            f"'{collection.name}' stores {embedding_dim}. Skipping it.")
+            return []
+        try:
+            return _query_collection(collection, query_embedding, k, where)
+        except Exception as e:
+            logging.error(f"Error in vector_search for collection '{collection.name}': {str(e)}", exc_info=True)
             return []
 
-        return [{"content": doc, "metadata": meta} for doc, meta in zip(results['documents'][0], results['metadatas'][0])]
-    except Exception as e:
-        logging.error(f"Error in vector_search for collection '{collection_name}': {str(e)}", exc_info=True)
-        return []
+    query_embeddings = {}
+    with ThreadPoolExecutor(max_workers=min(VECTOR_SEARCH_MAX_WORKERS, len(targets))) as executor:
+        embedding_futures = {model_key: executor.submit(embed, model_key) for model_key in models}
+        for model_key, future in embedding_futures.items():
+            try:
+                query_embeddings[model_key] = future.result()
+            except Exception as e:
+                logging.error(f"Could not embed the query with {model_key[0]}/{model_key[1]}: {e}")
+        per_collection = list(executor.map(search, targets))
+
+    log_histogram("vector_search_query_embeddings", len(models))
+    log_histogram("vector_search_collections_duration", time.time() - start_time)
+    # Stable sort: results without a distance keep their collection order, after the ones that have one
+    return sorted((result for results in per_collection for result in results),
+                  key=lambda result: float('inf') if result.get('distance') is None else result['distance'])
 
 
 def schedule_embedding(media_id: int, content: str, media_name: str):
     try:
         chunks = chunk_for_embedding(content, media_name, chunk_options)
         texts = [chunk['text'] for chunk in chunks]
-        embeddings = create_embeddings_batch(texts, embedding_provider, embedding_model, embedding_api_url)
         ids = [f"{media_id}_chunk_{i}" for i in range(len(chunks))]
         metadatas = [{
             "media_id": str(media_id),
@@ -349,8 +642,10 @@ def schedule_embedding(media_id: int, content: str, media_name: str):
             "file_name": media_name,
             "relative_position": chunk['metadata']['relative_position']
         } for i, chunk in enumerate(chunks)]
+        chunk_hashes = [compute_chunk_hash(chunk.get('raw_text', chunk['text']), chunk_options) for chunk in chunks]
 
-        store_in_chroma("all_content_embeddings", texts, embeddings, ids, metadatas)
+        embed_and_store_chunks(None, "all_content_embeddings", texts, ids, metadatas, chunk_hashes,
+                               embedding_provider, embedding_model, embedding_api_url)
 
     except Exception as e:
         logging.error(f"Error scheduling embedding for media_id {media_id}: {str(e)}")
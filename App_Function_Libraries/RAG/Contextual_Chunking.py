@@ -0,0 +1,216 @@
+# Contextual_Chunking.py
+# Description: Writes the short "where does this chunk sit in the document" contexts used for contextual embeddings.
+#
+# Asking the LLM about one chunk at a time resends the whole document for every chunk, one request after another. Here
+# the chunks of a document are grouped into as few prompts as the context window allows, the prompts run with bounded
+# concurrency, and every answer is cached by (document hash, chunk hash, model) so re-ingesting a document costs
+# nothing. Every prompt starts with the same document text, so a llama.cpp server (which is asked to keep its prompt
+# cache) only processes the document once per slot.
+#
+# Imports
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+#
+# Local Imports
+from App_Function_Libraries.DB.Embedding_Cache_DB import embedding_text_hash, get_cached_chunk_contexts, \
+    store_cached_chunk_contexts
+from App_Function_Libraries.Metrics.metrics_logger import log_counter, log_histogram
+from App_Function_Libraries.Summarization.Summarization_General_Lib import summarize
+from App_Function_Libraries.Utils.Utils import format_api_name, global_api_endpoints, load_and_log_configs, logging
+#
+#######################################################################################################################
+#
+# Functions:
+
+_embedding_config = load_and_log_configs()['embedding_config']
+contextual_max_concurrency = int(_embedding_config.get('contextual_max_concurrency') or 4)
+contextual_batch_size = int(_embedding_config.get('contextual_batch_size') or 8)
+contextual_context_window = int(_embedding_config.get('contextual_context_window') or 8192)
+contextual_cache_enabled = str(_embedding_config.get('contextual_cache', 'True')).lower() == 'true'
+
+# Rough token estimate for budgeting prompts; exact counts are not needed to stay inside the window
+CHARS_PER_TOKEN = 4
+# Instructions plus tags around the document and chunks
+PROMPT_OVERHEAD_TOKENS = 200
+# Room left for each chunk's answer
+ANSWER_TOKENS_PER_CHUNK = 100
+
+_CONTEXT_PATTERN = re.compile(r'<context\s+id="?(\d+)"?\s*>(.*?)</context>', re.DOTALL | re.IGNORECASE)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def document_prompt(doc_content: str) -> str:
+    # Shared by every request for this document and sent first, so it forms a reusable prompt-cache prefix
+    return f"""
+    <document>
+    {doc_content}
+    </document>
+    """
+
+
+def single_chunk_prompt(chunk_content: str) -> str:
+    return f"""
+    \n\n\n\n\n
+    Here is the chunk we want to situate within the whole document
+    <chunk>
+    {chunk_content}
+    </chunk>
+
+    Please give a short succinct context to situate this chunk within the overall document for the purposes of improving search retrieval of the chunk.
+    Answer only with the succinct context and nothing else.
+    """
+
+
+def batch_chunk_prompt(chunk_contents: Sequence[str]) -> str:
+    chunks = "\n".join(f'<chunk id="{i}">\n{chunk}\n</chunk>' for i, chunk in enumerate(chunk_contents, 1))
+    return f"""
+    \n\n\n\n\n
+    Here are {len(chunk_contents)} chunks we want to situate within the whole document
+    {chunks}
+
+    For each chunk, give a short succinct context to situate it within the overall document for the purposes of improving search retrieval of the chunk.
+    Answer with one <context id="N">...</context> element per chunk, using the chunk's id, and nothing else.
+    """
+
+
+def parse_batch_response(response: str, count: int) -> Dict[int, str]:
+    """Map 0-based chunk positions to the contexts found in a batched answer (malformed or missing ids are skipped)."""
+    contexts = {}
+    for chunk_id, context in _CONTEXT_PATTERN.findall(response or ''):
+        position = int(chunk_id) - 1
+        if 0 <= position < count and context.strip():
+            contexts[position] = context.strip()
+    return contexts
+
+
+def _is_error(response) -> bool:
+    # summarize() reports failures as "Error: ..." strings instead of raising
+    return not isinstance(response, str) or not response.strip() or response.startswith("Error:")
+
+
+def plan_context_batches(chunk_tokens: List[int], doc_tokens: int, context_window: int,
+                         max_batch_size: int) -> List[List[int]]:
+    """
+    Group consecutive chunks into prompts that fit the context window next to the document.
+
+    Each prompt holds at most max_batch_size chunks; a chunk that does not fit next to others gets a prompt of its own.
+    Returns lists of indices into `chunk_tokens`.
+    """
+    budget = context_window - doc_tokens - PROMPT_OVERHEAD_TOKENS
+    batches, current, used = [], [], 0
+    for i, tokens in enumerate(chunk_tokens):
+        cost = tokens + ANSWER_TOKENS_PER_CHUNK
+        if current and (used + cost > budget or len(current) >= max_batch_size):
+            batches.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _situate_batch(api_name: str, doc_prompt: str, chunk_contents: List[str]) -> List[Optional[str]]:
+    """Contexts for a group of chunks (None where the LLM failed)."""
+    contexts: List[Optional[str]] = [None] * len(chunk_contents)
+    if len(chunk_contents) > 1:
+        response = summarize(batch_chunk_prompt(chunk_contents), doc_prompt, api_name, api_key=None, temp=0,
+                             system_message=None)
+        if not _is_error(response):
+            for position, context in parse_batch_response(response, len(chunk_contents)).items():
+                contexts[position] = context
+        missing = sum(context is None for context in contexts)
+        if missing:
+            log_counter("chunk_context_batch_fallback", labels={"api_name": api_name}, value=missing)
+            logging.debug(f"Batched context answer covered {len(chunk_contents) - missing} of {len(chunk_contents)} "
+                          f"chunks; asking for the rest one at a time")
+    for position, chunk_content in enumerate(chunk_contents):
+        if contexts[position] is None:
+            response = summarize(single_chunk_prompt(chunk_content), doc_prompt, api_name, api_key=None, temp=0,
+                                 system_message=None)
+            if _is_error(response):
+                log_counter("chunk_context_error", labels={"api_name": api_name})
+                logging.warning(f"Could not generate a context for a chunk: {response}")
+            else:
+                contexts[position] = response.strip()
+    return contexts
+
+
+def context_cache_model(api_name: str) -> str:
+    """
+    The model key contexts from `api_name` are cached under: "api_name:model" with the model configured for that API,
+    so switching models does not reuse another model's contexts.
+    """
+    # summarize() takes display names ("Llama.cpp", "Tabbyapi"); the config sections use the short names
+    short_name = {format_api_name(api).lower(): api for api in global_api_endpoints}.get(api_name.lower(),
+                                                                                        api_name.lower())
+    model = (load_and_log_configs().get(f"{short_name}_api") or {}).get('model')
+    return f"{api_name}:{model}" if model else api_name
+
+
+def contextualize_chunks(api_name: str, doc_content: str, chunk_contents: Sequence[str],
+                         max_workers: Optional[int] = None, batch_size: Optional[int] = None,
+                         context_window: Optional[int] = None, use_cache: Optional[bool] = None) -> List[str]:
+    """
+    Situate every chunk of a document, returning one context per chunk (empty where the LLM failed).
+
+    Cached contexts are reused; the rest are requested (each distinct chunk once) in prompts of up to `batch_size`
+    chunks that fit `context_window` tokens, with at most `max_workers` requests in flight.
+    """
+    if not chunk_contents:
+        return []
+    max_workers = max_workers or contextual_max_concurrency
+    batch_size = batch_size or contextual_batch_size
+    context_window = context_window or contextual_context_window
+    use_cache = contextual_cache_enabled if use_cache is None else use_cache
+    start_time = time.time()
+
+    doc_hash = embedding_text_hash(doc_content)
+    chunk_hashes = [embedding_text_hash(chunk) for chunk in chunk_contents]
+    contexts: Dict[str, str] = {}
+    if use_cache:
+        cache_model = context_cache_model(api_name)
+        try:
+            contexts = get_cached_chunk_contexts(doc_hash, cache_model, chunk_hashes)
+        except Exception as e:
+            logging.warning(f"Chunk context cache lookup failed, generating all contexts: {e}")
+
+    pending = {}
+    for chunk_hash, chunk in zip(chunk_hashes, chunk_contents):
+        if chunk_hash not in contexts and chunk_hash not in pending:
+            pending[chunk_hash] = chunk
+    if pending:
+        pending_hashes = list(pending)
+        pending_chunks = list(pending.values())
+        doc_prompt = document_prompt(doc_content)
+        batches = plan_context_batches([estimate_tokens(chunk) for chunk in pending_chunks],
+                                       estimate_tokens(doc_prompt), context_window, batch_size)
+        logging.info(f"Generating contexts for {len(pending_chunks)} chunks in {len(batches)} requests "
+                     f"({len(chunk_contents) - len(pending_chunks)} cached)")
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            results = executor.map(
+                lambda batch: _situate_batch(api_name, doc_prompt, [pending_chunks[i] for i in batch]), batches)
+            new_entries = []
+            for batch, batch_contexts in zip(batches, results):
+                for i, context in zip(batch, batch_contexts):
+                    if context is not None:
+                        new_entries.append((pending_hashes[i], context))
+        contexts.update(new_entries)
+        if use_cache and new_entries:
+            try:
+                store_cached_chunk_contexts(doc_hash, cache_model, new_entries)
+            except Exception as e:
+                logging.warning(f"Could not cache {len(new_entries)} chunk contexts: {e}")
+        log_histogram("chunk_context_requests", len(batches), labels={"api_name": api_name})
+
+    log_histogram("contextualize_chunks_duration", time.time() - start_time, labels={"api_name": api_name})
+    return [contexts.get(chunk_hash, "") for chunk_hash in chunk_hashes]
+
+#
+# End of Contextual_Chunking.py
+#######################################################################################################################
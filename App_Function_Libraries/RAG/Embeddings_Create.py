@@ -5,8 +5,8 @@
 import os
 import time
 from functools import wraps
-from threading import Lock, Timer
-from typing import List
+from threading import Condition, Event, Lock, Thread
+from typing import List, Optional, Union
 #
 # 3rd-Party Imports:
 import numpy as np
@@ -16,7 +16,11 @@ from transformers import AutoTokenizer, AutoModel
 import torch
 #
 # Local Imports:
+from App_Function_Libraries.DB.Embedding_Cache_DB import embedding_text_hash, get_cached_embeddings, \
+    store_cached_embeddings
 from App_Function_Libraries.LLM_API_Calls import get_openai_embeddings
+from App_Function_Libraries.RAG.Model_Manager import estimate_model_bytes, model_manager
+from App_Function_Libraries.RAG.ONNX_Export import get_quantized_onnx_model, quantized_onnx_model_path
 from App_Function_Libraries.Utils.Utils import load_and_log_configs, logging
 from App_Function_Libraries.Metrics.metrics_logger import log_counter, log_histogram
 #
@@ -31,12 +35,30 @@ embedding_model = loaded_config['embedding_config']['embedding_model']
 embedding_api_url = loaded_config['embedding_config']['embedding_api_url']
 embedding_api_key = loaded_config['embedding_config']['embedding_api_key']
 model_dir = loaded_config['embedding_config']['model_dir'] or './App_Function_Libraries/models/embedding_models/'
+onnx_model_dir = loaded_config['embedding_config']['onnx_model_path'] or './App_Function_Libraries/models/onnx_models/'
+# 'onnx_int8' runs huggingface models through a quantized ONNX export when no GPU is available
+embedding_cpu_backend = (loaded_config['embedding_config'].get('cpu_backend') or 'torch').lower()
 
 # Embedding Chunking Settings
 chunk_size = loaded_config['embedding_config']['chunk_size']
 overlap = loaded_config['embedding_config']['chunk_overlap']
 
-# Global cache for embedding models
+# Persistent embedding cache
+embedding_cache_enabled = str(loaded_config['embedding_config'].get('embedding_cache', 'True')).lower() == 'true'
+embedding_cache_dtype = loaded_config['embedding_config'].get('embedding_cache_dtype') or 'float32'
+
+# Local model residency (see Model_Manager)
+pin_default_model = str(loaded_config['embedding_config'].get('pin_default_model', 'True')).lower() == 'true'
+warm_up_enabled = str(loaded_config['embedding_config'].get('warm_up_models', 'True')).lower() == 'true'
+
+# Batching: local models run token-budgeted sub-batches, remote APIs get many texts per request, and concurrent
+# callers for the same model are coalesced into shared batches
+embedding_batch_max_tokens = int(loaded_config['embedding_config'].get('batch_max_tokens') or 16384)
+embedding_batch_max_size = int(loaded_config['embedding_config'].get('batch_max_size') or 64)
+embedding_remote_batch_size = int(loaded_config['embedding_config'].get('remote_batch_size') or 256)
+embedding_coalesce_ms = float(loaded_config['embedding_config'].get('coalesce_ms') or 0)
+
+# Embedder objects by model name; the models themselves are loaded/evicted by model_manager
 embedding_models = {}
 
 # Commit hashes
@@ -47,175 +69,227 @@ commit_hashes = {
 }
 
 class HuggingFaceEmbedder:
-    def __init__(self, model_name, cache_dir, timeout_seconds=30):
+    """
+    Transformers embedding model. Loading, keeping warm and unloading are left to the shared model manager, so the
+    model stays resident between requests unless the memory budget needs the space.
+    """
+    def __init__(self, model_name, cache_dir, pinned=False):
         self.model_name = model_name
         self.cache_dir = cache_dir  # Store cache_dir
         self.tokenizer = None
         self.model = None
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.timeout_seconds = timeout_seconds
-        self.last_used_time = 0
-        self.unload_timer = None
+        self.manager_key = f"huggingface:{model_name}"
+        model_manager.register(self.manager_key, self._load, unloader=self._unload,
+                               size_fn=lambda _: estimate_model_bytes(self.model), pinned=pinned)
         log_counter("huggingface_embedder_init", labels={"model_name": model_name})
 
-    def load_model(self):
+    def _load(self):
         log_counter("huggingface_model_load_attempt", labels={"model_name": self.model_name})
         start_time = time.time()
         # https://huggingface.co/docs/transformers/custom_models
-        if self.model is None:
-            # Pass cache_dir to from_pretrained to specify download directory
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                self.model_name,
-                trust_remote_code=True,
-                cache_dir=self.cache_dir,  # Specify cache directory
-                revision=commit_hashes.get(self.model_name, None)  # Pass commit hash
-            )
-            self.model = AutoModel.from_pretrained(
-                self.model_name,
-                trust_remote_code=True,
-                cache_dir=self.cache_dir,  # Specify cache directory
-                revision=commit_hashes.get(self.model_name, None)  # Pass commit hash
-            )
-            self.model.to(self.device)
-        self.last_used_time = time.time()
-        self.reset_timer()
+        # Pass cache_dir to from_pretrained to specify download directory
+        self.tokenizer = AutoTokenizer.from_pretrained(
+            self.model_name,
+            trust_remote_code=True,
+            cache_dir=self.cache_dir,  # Specify cache directory
+            revision=commit_hashes.get(self.model_name, None)  # Pass commit hash
+        )
+        self.model = AutoModel.from_pretrained(
+            self.model_name,
+            trust_remote_code=True,
+            cache_dir=self.cache_dir,  # Specify cache directory
+            revision=commit_hashes.get(self.model_name, None)  # Pass commit hash
+        )
+        self.model.to(self.device)
+        self.model.eval()
         load_time = time.time() - start_time
         log_histogram("huggingface_model_load_duration", load_time, labels={"model_name": self.model_name})
         log_counter("huggingface_model_load_success", labels={"model_name": self.model_name})
+        return self
 
-    def unload_model(self):
+    def _unload(self, _):
         log_counter("huggingface_model_unload", labels={"model_name": self.model_name})
-        if self.model is not None:
-            del self.model
-            del self.tokenizer
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-            self.model = None
-            self.tokenizer = None
-        if self.unload_timer:
-            self.unload_timer.cancel()
-
-    def reset_timer(self):
-        if self.unload_timer:
-            self.unload_timer.cancel()
-        self.unload_timer = Timer(self.timeout_seconds, self.unload_model)
-        self.unload_timer.start()
+        self.model = None
+        self.tokenizer = None
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def load_model(self):
+        model_manager.get(self.manager_key)
+
+    def unload_model(self):
+        model_manager.unload(self.manager_key)
 
     def create_embeddings(self, texts):
         log_counter("huggingface_create_embeddings_attempt", labels={"model_name": self.model_name})
         start_time = time.time()
-        self.load_model()
+        with model_manager.use(self.manager_key):
+            return self._create_embeddings(texts, start_time)
+
+    def _create_embeddings(self, texts, start_time):
+        # Tokenize once without padding, then run length-sorted micro-batches padded only to their own longest text
         # https://huggingface.co/docs/transformers/custom_models
-        inputs = self.tokenizer(
-            texts,
-            return_tensors="pt",
-            padding=True,
-            truncation=True,
-            max_length=512
-        )
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        encoded = self.tokenizer(list(texts), truncation=True, max_length=512)
+        embeddings = None
+        try:
+            for batch in plan_micro_batches([len(ids) for ids in encoded['input_ids']]):
+                features = self.tokenizer.pad({key: [encoded[key][i] for i in batch] for key in encoded.keys()},
+                                              return_tensors="pt")
+                inputs = {k: v.to(self.device) for k, v in features.items()}
+                batch_embeddings = self._forward(inputs)
+                if embeddings is None:
+                    embeddings = np.empty((len(texts), batch_embeddings.shape[1]), dtype=np.float32)
+                embeddings[batch] = batch_embeddings
+        except Exception:
+            log_counter("huggingface_create_embeddings_failure", labels={"model_name": self.model_name})
+            raise
+        embedding_time = time.time() - start_time
+        log_histogram("huggingface_create_embeddings_duration", embedding_time, labels={"model_name": self.model_name})
+        log_counter("huggingface_create_embeddings_success", labels={"model_name": self.model_name})
+        return embeddings
+
+    def _forward(self, inputs):
         try:
             with torch.no_grad():
                 outputs = self.model(**inputs)
-            embeddings = outputs.last_hidden_state.mean(dim=1)
-            return embeddings.cpu().float().numpy()  # Convert to float32 before returning
         except RuntimeError as e:
-            if "Got unsupported ScalarType BFloat16" in str(e):
-                logging.warning("BFloat16 not supported. Falling back to float32.")
-                # Convert model to float32
-                self.model = self.model.float()
-                with torch.no_grad():
-                    outputs = self.model(**inputs)
-                embeddings = outputs.last_hidden_state.mean(dim=1)
-                embedding_time = time.time() - start_time
-                log_histogram("huggingface_create_embeddings_duration", embedding_time,
-                              labels={"model_name": self.model_name})
-                log_counter("huggingface_create_embeddings_success", labels={"model_name": self.model_name})
-                return embeddings.cpu().float().numpy()
-            else:
-                log_counter("huggingface_create_embeddings_failure", labels={"model_name": self.model_name})
+            if "Got unsupported ScalarType BFloat16" not in str(e):
                 raise
+            logging.warning("BFloat16 not supported. Falling back to float32.")
+            # Convert model to float32
+            self.model = self.model.float()
+            with torch.no_grad():
+                outputs = self.model(**inputs)
+        # Average only the real tokens; padding positions would otherwise pull every vector towards the pad embedding
+        hidden = outputs.last_hidden_state
+        mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        embeddings = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        return embeddings.cpu().float().numpy()  # Convert to float32 before returning
 
 class ONNXEmbedder:
-    def __init__(self, model_name, onnx_model_dir, timeout_seconds=30):
+    """
+    ONNX Runtime embedding model, by default `{onnx_model_dir}/{model_name}.onnx`.
+
+    `model_path` points it at another export (e.g. the int8 one from ONNX_Export) and `exporter`, if given, is called
+    to create that file when it does not exist yet. Embeddings come back as a float32 array.
+    """
+    def __init__(self, model_name, onnx_model_dir, pinned=False, model_path=None, exporter=None, tokenizer_dir=None):
         self.model_name = model_name
-        self.model_path = os.path.join(onnx_model_dir, f"{model_name}.onnx")
+        self.model_path = model_path or os.path.join(onnx_model_dir, f"{model_name}.onnx")
+        self.exporter = exporter
         # https://huggingface.co/docs/transformers/custom_models
         self.tokenizer = AutoTokenizer.from_pretrained(
             model_name,
             trust_remote_code=True,
-            cache_dir=onnx_model_dir,  # Ensure tokenizer uses the same directory
+            cache_dir=tokenizer_dir or onnx_model_dir,  # Ensure tokenizer uses the same directory
             revision=commit_hashes.get(model_name, None)  # Pass commit hash
         )
         self.session = None
-        self.timeout_seconds = timeout_seconds
-        self.last_used_time = 0
-        self.unload_timer = None
+        self.input_names = set()
         self.device = "cpu"  # ONNX Runtime will default to CPU unless GPU is configured
+        self.manager_key = f"onnx:{model_name}" if model_path is None else f"onnx:{model_path}"
+        model_manager.register(self.manager_key, self._load, unloader=self._unload,
+                               size_fn=lambda _: os.path.getsize(self.model_path), pinned=pinned)
         log_counter("onnx_embedder_init", labels={"model_name": model_name})
 
-    def load_model(self):
+    def _load(self):
         log_counter("onnx_model_load_attempt", labels={"model_name": self.model_name})
         start_time = time.time()
-        if self.session is None:
-            if not os.path.exists(self.model_path):
-                raise FileNotFoundError(f"ONNX model not found at {self.model_path}")
-            logging.info(f"Loading ONNX model from {self.model_path}")
-            self.session = ort.InferenceSession(self.model_path)
-        self.last_used_time = time.time()
-        self.reset_timer()
+        if not os.path.exists(self.model_path) and self.exporter is not None:
+            self.exporter()
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"ONNX model not found at {self.model_path}")
+        logging.info(f"Loading ONNX model from {self.model_path}")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(self.model_path, sess_options=options)
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
         load_time = time.time() - start_time
         log_histogram("onnx_model_load_duration", load_time, labels={"model_name": self.model_name})
         log_counter("onnx_model_load_success", labels={"model_name": self.model_name})
+        return self
 
-    def unload_model(self):
+    def _unload(self, _):
         log_counter("onnx_model_unload", labels={"model_name": self.model_name})
-        if self.session is not None:
-            logging.info("Unloading ONNX model to free resources.")
-            self.session = None
-        if self.unload_timer:
-            self.unload_timer.cancel()
-
-    def reset_timer(self):
-        if self.unload_timer:
-            self.unload_timer.cancel()
-        self.unload_timer = Timer(self.timeout_seconds, self.unload_model)
-        self.unload_timer.start()
-
-    def create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        logging.info("Unloading ONNX model to free resources.")
+        self.session = None
+
+    def load_model(self):
+        model_manager.get(self.manager_key)
+
+    def unload_model(self):
+        model_manager.unload(self.manager_key)
+
+    def create_embeddings(self, texts: List[str]) -> np.ndarray:
         log_counter("onnx_create_embeddings_attempt", labels={"model_name": self.model_name})
         start_time = time.time()
-        self.load_model()
+        with model_manager.use(self.manager_key):
+            return self._create_embeddings(texts, start_time)
+
+    def _create_embeddings(self, texts: List[str], start_time: float) -> np.ndarray:
         try:
-            inputs = self.tokenizer(
-                texts,
-                return_tensors="np",
-                padding=True,
-                truncation=True,
-                max_length=512
-            )
-            input_ids = inputs["input_ids"].astype(np.int64)
-            attention_mask = inputs["attention_mask"].astype(np.int64)
-
-            ort_inputs = {
-                "input_ids": input_ids,
-                "attention_mask": attention_mask
-            }
-
-            ort_outputs = self.session.run(None, ort_inputs)
-
-            last_hidden_state = ort_outputs[0]
-            embeddings = np.mean(last_hidden_state, axis=1)
+            encoded = self.tokenizer(list(texts), truncation=True, max_length=512)
+            embeddings = None
+            for batch in plan_micro_batches([len(ids) for ids in encoded['input_ids']]):
+                features = self.tokenizer.pad(
+                    {key: [encoded[key][i] for i in batch] for key in ('input_ids', 'attention_mask')},
+                    return_tensors="np")
+                ort_inputs = {
+                    "input_ids": features["input_ids"].astype(np.int64),
+                    "attention_mask": features["attention_mask"].astype(np.int64)
+                }
+                if "token_type_ids" in self.input_names:
+                    ort_inputs["token_type_ids"] = np.zeros_like(ort_inputs["input_ids"])
+
+                ort_outputs = self.session.run(None, ort_inputs)
+
+                last_hidden_state = ort_outputs[0]
+                batch_embeddings = masked_mean_pool(last_hidden_state, ort_inputs["attention_mask"])
+                if embeddings is None:
+                    embeddings = np.empty((len(texts), batch_embeddings.shape[1]), dtype=np.float32)
+                embeddings[batch] = batch_embeddings
 
             embedding_time = time.time() - start_time
             log_histogram("onnx_create_embeddings_duration", embedding_time, labels={"model_name": self.model_name})
             log_counter("onnx_create_embeddings_success", labels={"model_name": self.model_name})
-            return embeddings.tolist()
+            return embeddings
         except Exception as e:
             log_counter("onnx_create_embeddings_failure", labels={"model_name": self.model_name})
             logging.error(f"Error creating embeddings with ONNX model: {str(e)}")
             raise
 
+
+def masked_mean_pool(last_hidden_state: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Mean of each text's token vectors over its real tokens only (attention_mask == 1), as float32."""
+    mask = attention_mask[..., np.newaxis].astype(np.float32)
+    summed = (last_hidden_state.astype(np.float32) * mask).sum(axis=1)
+    return summed / np.maximum(mask.sum(axis=1), 1e-9)
+
+
+def plan_micro_batches(lengths: List[int], max_batch_tokens: Optional[int] = None,
+                       max_batch_size: Optional[int] = None) -> List[List[int]]:
+    """
+    Group texts into length-sorted sub-batches for local inference.
+
+    Each batch is padded to its own longest text, so its cost is len(batch) * longest; batches are closed once that
+    padded token count would exceed max_batch_tokens (or the batch holds max_batch_size texts). Returns lists of
+    indices into `lengths`.
+    """
+    max_batch_tokens = max_batch_tokens or embedding_batch_max_tokens
+    max_batch_size = max_batch_size or embedding_batch_max_size
+    batches, current = [], []
+    for i in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        # Sorted ascending, so this text is the longest in the batch so far
+        if current and (lengths[i] * (len(current) + 1) > max_batch_tokens or len(current) >= max_batch_size):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
 class RateLimiter:
     def __init__(self, max_calls, period):
         self.max_calls = max_calls
@@ -251,27 +325,202 @@ def exponential_backoff(max_retries=5, base_delay=1):
         return wrapper
     return decorator
 
-@exponential_backoff()
-@RateLimiter(max_calls=50, period=60)
+class EmbeddingRequestCoalescer:
+    """
+    Merges concurrent embedding requests for one provider/model into shared batches.
+
+    Callers block on their own slice of the result. A single worker thread takes everything that is waiting (after
+    waiting up to `max_wait_seconds` for more to arrive) and embeds it in one call, so ingestion workers and query
+    embedding share batches instead of each paying for a small, poorly filled one.
+    """
+    def __init__(self, embed_fn, max_wait_seconds: float, max_texts: int = 1024, idle_exit_seconds: float = 60.0):
+        self.embed_fn = embed_fn
+        self.max_wait_seconds = max_wait_seconds
+        self.max_texts = max_texts
+        self.idle_exit_seconds = idle_exit_seconds
+        self._pending = []
+        self._condition = Condition()
+        self._worker = None
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        request = {'texts': list(texts), 'done': Event(), 'result': None, 'error': None}
+        with self._condition:
+            self._pending.append(request)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = Thread(target=self._run, name="embedding-coalescer", daemon=True)
+                self._worker.start()
+            self._condition.notify_all()
+        request['done'].wait()
+        if request['error'] is not None:
+            raise request['error']
+        return request['result']
+
+    def _take_batch(self):
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._pending, timeout=self.idle_exit_seconds):
+                self._worker = None
+                return None
+            deadline = time.monotonic() + self.max_wait_seconds
+            while sum(len(r['texts']) for r in self._pending) < self.max_texts:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch, self._pending = self._pending, []
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            texts = [text for request in batch for text in request['texts']]
+            log_histogram("embedding_coalesced_batch_size", len(batch))
+            try:
+                embeddings = np.asarray(self.embed_fn(texts), dtype=np.float32)
+                offset = 0
+                for request in batch:
+                    request['result'] = embeddings[offset:offset + len(request['texts'])]
+                    offset += len(request['texts'])
+            except Exception as e:
+                for request in batch:
+                    request['error'] = e
+            for request in batch:
+                request['done'].set()
+
+
+_coalescers = {}
+_coalescers_lock = Lock()
+
+
+def _embed_uncached(texts: List[str], provider: str, model: str, api_url: str, timeout_seconds: int = 300):
+    if embedding_coalesce_ms <= 0:
+        return _create_embeddings_batch(texts, provider, model, api_url, timeout_seconds)
+    key = (provider.lower(), model, api_url)
+    with _coalescers_lock:
+        coalescer = _coalescers.get(key)
+        if coalescer is None:
+            coalescer = EmbeddingRequestCoalescer(
+                lambda batch: _create_embeddings_batch(batch, provider, model, api_url, timeout_seconds),
+                embedding_coalesce_ms / 1000.0)
+            _coalescers[key] = coalescer
+    return coalescer.embed(texts)
+
+
+def _embedding_cache_provider(provider: str, model: str, api_url: str) -> str:
+    # A local server can serve a different model under the same name, so its cache entries are scoped to its URL
+    provider = provider.lower()
+    if provider == 'local':
+        return f"{provider}:{api_url}"
+    if provider == 'huggingface':
+        # Quantized and unquantized runs of a model give slightly different vectors; keep them apart
+        return f"{provider}:{local_embedding_backend(model)}"
+    return provider
+
+
 def create_embeddings_batch(texts: List[str],
                             provider: str,
                             model: str,
                             api_url: str,
-                            timeout_seconds: int = 300
-                            ) -> List[List[float]]:
+                            timeout_seconds: int = 300,
+                            use_cache: Optional[bool] = None
+                            ) -> Union[np.ndarray, List[List[float]]]:
+    """
+    Embed texts, reusing cached vectors for texts already embedded with the same provider and model.
+
+    Cache lookups happen in one bulk query before the provider is called; only the misses (each distinct text once)
+    are sent to the model, and their vectors are written back to the cache. With the cache on, the result is a float32
+    array of shape (len(texts), dim).
+    """
+    use_cache = embedding_cache_enabled if use_cache is None else use_cache
+    if not use_cache or not texts:
+        return _embed_uncached(texts, provider, model, api_url, timeout_seconds)
+
+    cache_provider = _embedding_cache_provider(provider, model, api_url)
+    text_hashes = [embedding_text_hash(text) for text in texts]
+    try:
+        vectors = get_cached_embeddings(cache_provider, model, text_hashes)
+    except Exception as e:
+        # The cache is only an optimization; never fail an embedding request because of it
+        logging.warning(f"Embedding cache lookup failed, embedding without it: {e}")
+        return _embed_uncached(texts, provider, model, api_url, timeout_seconds)
+
+    misses = {}
+    for i, text_hash in enumerate(text_hashes):
+        if text_hash not in vectors and text_hash not in misses:
+            misses[text_hash] = i
+    if misses:
+        logging.debug(f"Embedding cache: {len(texts) - len(misses)} of {len(texts)} texts cached, "
+                      f"embedding {len(misses)}")
+        computed = _embed_uncached([texts[i] for i in misses.values()], provider, model, api_url, timeout_seconds)
+        computed = np.asarray(computed, dtype=np.float32)
+        new_entries = list(zip(misses, computed))
+        vectors.update(new_entries)
+        try:
+            store_cached_embeddings(cache_provider, model, new_entries, dtype=embedding_cache_dtype)
+        except Exception as e:
+            logging.warning(f"Could not write {len(new_entries)} embeddings to the cache: {e}")
+
+    return np.vstack([vectors[text_hash] for text_hash in text_hashes])
+
+
+def local_embedding_backend(model: str) -> str:
+    """Which runtime embeds `model` locally: 'onnx' (pre-exported model), 'onnx_int8' or 'torch'."""
+    if model == "dunzhang/stella_en_400M_v5":
+        return 'onnx'
+    if embedding_cpu_backend == 'onnx_int8' and not torch.cuda.is_available():
+        return 'onnx_int8'
+    return 'torch'
+
+
+def get_local_embedder(model: str):
+    """Return the (cached) embedder object for a local model; the configured default model is pinned in memory."""
+    if model not in embedding_models:
+        pinned = pin_default_model and model == embedding_model
+        backend = local_embedding_backend(model)
+        if backend == 'onnx':
+            embedding_models[model] = ONNXEmbedder(model, model_dir, pinned=pinned)
+        elif backend == 'onnx_int8':
+            # The quantized export is generated on first load and cached in onnx_model_dir
+            embedding_models[model] = ONNXEmbedder(
+                model, onnx_model_dir, pinned=pinned, tokenizer_dir=model_dir,
+                model_path=quantized_onnx_model_path(model, onnx_model_dir),
+                exporter=lambda: get_quantized_onnx_model(model, onnx_model_dir, cache_dir=model_dir,
+                                                          revision=commit_hashes.get(model)))
+        else:
+            # Pass model_dir to HuggingFaceEmbedder
+            embedding_models[model] = HuggingFaceEmbedder(model, model_dir, pinned=pinned)
+    return embedding_models[model]
+
+
+def warm_up_embedding_models(background: bool = True):
+    """Load the configured local embedding model ahead of the first request (no-op for API providers)."""
+    if not warm_up_enabled or (embedding_provider or '').lower() != 'huggingface' or not embedding_model:
+        return None
+    try:
+        embedder = get_local_embedder(embedding_model)
+    except Exception as e:
+        logging.error(f"Could not prepare embedding model {embedding_model} for warm-up: {e}")
+        return None
+    logging.info(f"Warming up embedding model {embedding_model}")
+    return model_manager.warm_up([embedder.manager_key], background=background)
+
+
+@exponential_backoff()
+@RateLimiter(max_calls=50, period=60)
+def _create_embeddings_batch(texts: List[str],
+                             provider: str,
+                             model: str,
+                             api_url: str,
+                             timeout_seconds: int = 300
+                             ) -> List[List[float]]:
     global embedding_models
     log_counter("create_embeddings_batch_attempt", labels={"provider": provider, "model": model})
     start_time = time.time()
 
     try:
         if provider.lower() == 'huggingface':
-            if model not in embedding_models:
-                if model == "dunzhang/stella_en_400M_v5":
-                    embedding_models[model] = ONNXEmbedder(model, model_dir, timeout_seconds)
-                else:
-                    # Pass model_dir to HuggingFaceEmbedder
-                    embedding_models[model] = HuggingFaceEmbedder(model, model_dir, timeout_seconds)
-            embedder = embedding_models[model]
+            embedder = get_local_embedder(model)
             embedding_time = time.time() - start_time
             log_histogram("create_embeddings_batch_duration", embedding_time,
                           labels={"provider": provider, "model": model})
@@ -280,26 +529,31 @@ def create_embeddings_batch(texts: List[str],
 
         elif provider.lower() == 'openai':
             logging.debug(f"Creating embeddings for {len(texts)} texts using OpenAI API")
+            embeddings = []
+            for start in range(0, len(texts), embedding_remote_batch_size):
+                embeddings.extend(create_openai_embeddings(texts[start:start + embedding_remote_batch_size], model))
             embedding_time = time.time() - start_time
             log_histogram("create_embeddings_batch_duration", embedding_time,
                           labels={"provider": provider, "model": model})
             log_counter("create_embeddings_batch_success", labels={"provider": provider, "model": model})
-            return [create_openai_embedding(text, model) for text in texts]
+            return embeddings
 
         elif provider.lower() == 'local':
-            response = requests.post(
-                api_url,
-                json={"texts": texts, "model": model},
-                headers={"Authorization": f"Bearer {embedding_api_key}"}
-            )
-            if response.status_code == 200:
-                embedding_time = time.time() - start_time
-                log_histogram("create_embeddings_batch_duration", embedding_time,
-                              labels={"provider": provider, "model": model})
-                log_counter("create_embeddings_batch_success", labels={"provider": provider, "model": model})
-                return response.json()['embeddings']
-            else:
-                raise Exception(f"Error from local API: {response.text}")
+            embeddings = []
+            for start in range(0, len(texts), embedding_remote_batch_size):
+                response = requests.post(
+                    api_url,
+                    json={"texts": texts[start:start + embedding_remote_batch_size], "model": model},
+                    headers={"Authorization": f"Bearer {embedding_api_key}"}
+                )
+                if response.status_code != 200:
+                    raise Exception(f"Error from local API: {response.text}")
+                embeddings.extend(response.json()['embeddings'])
+            embedding_time = time.time() - start_time
+            log_histogram("create_embeddings_batch_duration", embedding_time,
+                          labels={"provider": provider, "model": model})
+            log_counter("create_embeddings_batch_success", labels={"provider": provider, "model": model})
+            return embeddings
         else:
             raise ValueError(f"Unsupported embedding provider: {provider}")
     except Exception as e:
@@ -318,6 +572,16 @@ def create_embedding(text: str, provider: str, model: str, api_url: str) -> List
     log_counter("create_embedding_success", labels={"provider": provider, "model": model})
     return embedding
 
+def create_openai_embeddings(texts: List[str], model: str) -> List[List[float]]:
+    """Embed several texts with one OpenAI API request."""
+    log_counter("create_openai_embedding_attempt", labels={"model": model})
+    start_time = time.time()
+    embeddings = get_openai_embeddings(list(texts), model)
+    embedding_time = time.time() - start_time
+    log_histogram("create_openai_embedding_duration", embedding_time, labels={"model": model})
+    log_counter("create_openai_embedding_success", labels={"model": model})
+    return embeddings
+
 def create_openai_embedding(text: str, model: str) -> List[float]:
     log_counter("create_openai_embedding_attempt", labels={"model": model})
     start_time = time.time()
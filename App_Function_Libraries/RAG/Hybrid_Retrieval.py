@@ -0,0 +1,117 @@
+# Hybrid_Retrieval.py
+# Description: Runs the vector and full-text lookups of a RAG query concurrently and fuses their rankings.
+#
+# Every source (one vector or full-text lookup) runs on its own thread under a per-request deadline, so retrieval takes
+# as long as the slowest source rather than the sum of all of them; a source that misses the deadline is left out of
+# that request. The ranked lists are merged with reciprocal rank fusion - a result scores sum(1 / (rrf_k + rank)) over
+# the lists it appears in - and the same chunk found by several sources is kept once, so the reranker sees fewer,
+# better candidates.
+#
+# Imports
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+#
+# Local Imports
+from App_Function_Libraries.Metrics.metrics_logger import log_counter, log_histogram
+from App_Function_Libraries.Utils.Utils import load_and_log_configs, logging
+#
+#######################################################################################################################
+#
+# Functions:
+
+_retrieval_config = load_and_log_configs()['retrieval_config']
+retrieval_timeout = float(_retrieval_config.get('timeout') or 0)
+rrf_k = int(_retrieval_config.get('rrf_k') or 60)
+retrieval_max_workers = int(_retrieval_config.get('max_workers') or 8)
+max_fused_candidates = int(_retrieval_config.get('max_candidates') or 50)
+
+
+def result_key(result: Dict[str, Any]) -> Tuple:
+    """
+    Identity of a search result for de-duplication: (media id, chunk id) when the result carries both, otherwise
+    the hash of its content (whole documents, chat messages and notes have no chunk id).
+    """
+    metadata = result.get('metadata') or {}
+    media_id = metadata.get('media_id')
+    chunk_id = metadata.get('chunk_id', metadata.get('chunk_index'))
+    if media_id is not None and chunk_id is not None:
+        return 'chunk', str(media_id), str(chunk_id)
+    return 'content', hashlib.sha256(str(result.get('content', '')).encode('utf-8')).hexdigest()
+
+
+def reciprocal_rank_fusion(result_lists: Sequence[List[Dict[str, Any]]], k: Optional[int] = None,
+                           limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists, best fused score first, keeping each result (by result_key) once.
+
+    The first copy of a result is the one kept, with its fused score added as 'rrf_score'. Ties keep the order in
+    which results were first seen.
+    """
+    k = rrf_k if k is None else k
+    fused: Dict[Tuple, Dict[str, Any]] = {}
+    scores: Dict[Tuple, float] = {}
+    for results in result_lists:
+        seen = set()
+        for rank, result in enumerate(results, 1):
+            key = result_key(result)
+            # A list counts each result once, at its best rank
+            if key in seen:
+                continue
+            seen.add(key)
+            fused.setdefault(key, result)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    ranked = sorted(fused, key=lambda key: scores[key], reverse=True)
+    if limit is not None:
+        ranked = ranked[:limit]
+    return [dict(fused[key], rrf_score=scores[key]) for key in ranked]
+
+
+def run_sources(sources: Dict[str, Callable[[], List[Dict[str, Any]]]], timeout: Optional[float] = None
+                ) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Run every source concurrently and return the results of those that finished within `timeout` seconds
+    (the configured [Retrieval] timeout by default; 0 waits for all). Failed and late sources are logged and left out.
+    """
+    if not sources:
+        return {}
+    timeout = retrieval_timeout if timeout is None else timeout
+    executor = ThreadPoolExecutor(max_workers=min(retrieval_max_workers, len(sources)),
+                                  thread_name_prefix="rag-retrieval")
+    try:
+        futures = {name: executor.submit(source) for name, source in sources.items()}
+        _, late = wait(futures.values(), timeout=timeout or None)
+    finally:
+        # Sources that missed the deadline finish in the background and their results are discarded
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    for name, future in futures.items():
+        if future in late:
+            log_counter("hybrid_retrieval_source_timeout", labels={"source": name})
+            logging.warning(f"Retrieval source '{name}' missed the {timeout}s deadline; continuing without it")
+            continue
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            log_counter("hybrid_retrieval_source_error", labels={"source": name})
+            logging.error(f"Retrieval source '{name}' failed: {str(e)}")
+    return results
+
+
+def hybrid_search(sources: Dict[str, Callable[[], List[Dict[str, Any]]]], timeout: Optional[float] = None,
+                  limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Run all sources under one deadline and return their fused, de-duplicated results (at most `limit`)."""
+    start_time = time.time()
+    results = run_sources(sources, timeout)
+    for name, source_results in results.items():
+        logging.debug(f"hybrid_search - {len(source_results)} results from {name}")
+    fused = reciprocal_rank_fusion(list(results.values()), limit=max_fused_candidates if limit is None else limit)
+    log_histogram("hybrid_retrieval_duration", time.time() - start_time)
+    log_histogram("hybrid_retrieval_candidates", len(fused))
+    return fused
+
+#
+# End of Hybrid_Retrieval.py
+#######################################################################################################################
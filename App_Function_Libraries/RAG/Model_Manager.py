@@ -0,0 +1,257 @@
+# Model_Manager.py
+# Description: Keeps local models (embedders, rerankers) loaded across requests within a memory budget.
+#
+# Models used to unload themselves 30 seconds after their last use, so steady RAG traffic kept paying for reloads.
+# The manager instead keeps every model it has loaded resident until the memory budget is exceeded, then evicts the
+# least recently used model that is neither pinned nor currently in use. The default embedding model can be pinned
+# and loaded in the background at startup so the first query does not pay for it either.
+#
+# Imports
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+#
+# 3rd-Party Imports
+import psutil
+#
+# Local Imports
+from App_Function_Libraries.Metrics.metrics_logger import log_counter, log_histogram
+from App_Function_Libraries.Utils.Utils import load_and_log_configs, logging
+#
+#######################################################################################################################
+#
+# Functions:
+
+def estimate_model_bytes(*objects) -> int:
+    """Size of the parameters and buffers of any torch modules among `objects` (0 for anything else)."""
+    total = 0
+    for obj in objects:
+        for attr in ('parameters', 'buffers'):
+            tensors = getattr(obj, attr, None)
+            if callable(tensors):
+                try:
+                    total += sum(t.numel() * t.element_size() for t in tensors())
+                except Exception:
+                    pass
+    return total
+
+
+def _process_rss() -> int:
+    return psutil.Process(os.getpid()).memory_info().rss
+
+
+class _ManagedModel:
+    def __init__(self, loader: Callable[[], Any], unloader: Optional[Callable[[Any], None]],
+                 size_fn: Optional[Callable[[Any], int]], pinned: bool):
+        self.loader = loader
+        self.unloader = unloader
+        self.size_fn = size_fn
+        self.pinned = pinned
+        self.model = None
+        self.loaded = False
+        self.size_bytes = 0
+        self.in_use = 0
+        self.last_used = 0.0
+        self.load_lock = threading.Lock()
+
+
+class ModelManager:
+    """
+    Shared cache of loaded models with a memory budget and LRU eviction.
+
+    Register a model with a loader (and optionally an unloader and a size function), then borrow it with
+    `with manager.use(name) as model:`. A model that is borrowed or pinned is never evicted. With
+    `idle_unload_seconds` set, a daemon thread also unloads models left unused for that long, even under budget.
+    """
+    def __init__(self, memory_budget_mb: int = 4096, idle_unload_seconds: float = 0):
+        self.memory_budget_bytes = int(memory_budget_mb) * 1024 * 1024
+        self.idle_unload_seconds = idle_unload_seconds
+        self._models: Dict[str, _ManagedModel] = {}
+        # Loaded models, least recently used first
+        self._lru: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._idle_sweeper: Optional[threading.Thread] = None
+
+    def register(self, name: str, loader: Callable[[], Any], unloader: Optional[Callable[[Any], None]] = None,
+                 size_fn: Optional[Callable[[Any], int]] = None, pinned: bool = False) -> None:
+        """Register a model. Re-registering an existing name keeps the loaded model and only updates its pin."""
+        with self._lock:
+            if name in self._models:
+                self._models[name].pinned = self._models[name].pinned or pinned
+                return
+            self._models[name] = _ManagedModel(loader, unloader, size_fn, pinned)
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._models
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._models.get(name)
+        return entry is not None and entry.loaded
+
+    def pin(self, name: str, pinned: bool = True) -> None:
+        with self._lock:
+            self._models[name].pinned = pinned
+        if not pinned:
+            self._evict()
+
+    def _load(self, name: str, entry: _ManagedModel) -> None:
+        with entry.load_lock:
+            if entry.loaded:
+                return
+            log_counter("model_manager_load", labels={"model_name": name})
+            start_time = time.time()
+            rss_before = _process_rss()
+            model = entry.loader()
+            size_bytes = entry.size_fn(model) if entry.size_fn else 0
+            if not size_bytes:
+                size_bytes = max(0, _process_rss() - rss_before)
+            with self._lock:
+                entry.model, entry.size_bytes, entry.loaded = model, size_bytes, True
+                self._lru[name] = None
+                self._start_idle_sweeper()
+            load_time = time.time() - start_time
+            log_histogram("model_manager_load_duration", load_time, labels={"model_name": name})
+            logging.info(f"Loaded model '{name}' in {load_time:.2f}s (~{size_bytes / 1024 / 1024:.0f} MB)")
+
+    @contextmanager
+    def use(self, name: str):
+        """Borrow a model, loading it first if needed. It cannot be evicted while borrowed."""
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is None:
+                raise KeyError(f"Model '{name}' is not registered with the model manager")
+            entry.in_use += 1
+        try:
+            if not entry.loaded:
+                log_counter("model_manager_miss", labels={"model_name": name})
+                self._load(name, entry)
+                self._evict()
+            else:
+                log_counter("model_manager_hit", labels={"model_name": name})
+            with self._lock:
+                entry.last_used = time.time()
+                self._lru.move_to_end(name)
+            yield entry.model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                over_budget = self._loaded_bytes() > self.memory_budget_bytes
+            # Models that were in use while over budget become evictable once released
+            if over_budget:
+                self._evict()
+
+    def get(self, name: str) -> Any:
+        """Return a loaded model without holding it; prefer use() when the model runs for a while."""
+        with self.use(name) as model:
+            return model
+
+    def _loaded_bytes(self) -> int:
+        return sum(self._models[name].size_bytes for name in self._lru)
+
+    def _evict(self) -> None:
+        now = time.time()
+        to_unload = []
+        with self._lock:
+            total = self._loaded_bytes()
+            for name in list(self._lru):
+                entry = self._models[name]
+                if entry.pinned or entry.in_use:
+                    continue
+                idle = self.idle_unload_seconds and now - entry.last_used > self.idle_unload_seconds
+                if total <= self.memory_budget_bytes and not idle:
+                    continue
+                del self._lru[name]
+                total -= entry.size_bytes
+                to_unload.append((name, entry, entry.model))
+                entry.model, entry.loaded, entry.size_bytes = None, False, 0
+            if total > self.memory_budget_bytes:
+                logging.warning(f"Loaded models use ~{total / 1024 / 1024:.0f} MB, over the "
+                                f"{self.memory_budget_bytes / 1024 / 1024:.0f} MB budget; the rest are pinned or in use")
+        for name, entry, model in to_unload:
+            self._release(name, entry, model)
+
+    def _start_idle_sweeper(self) -> None:
+        # Eviction otherwise only runs when a model is loaded or released, so idle models under budget would stay
+        if not self.idle_unload_seconds or self._idle_sweeper is not None:
+            return
+        interval = max(self.idle_unload_seconds / 2, 0.05)
+
+        def _sweep():
+            while True:
+                time.sleep(interval)
+                try:
+                    self._evict()
+                except Exception as e:
+                    logging.error(f"Idle model sweep failed: {e}")
+
+        self._idle_sweeper = threading.Thread(target=_sweep, name="model-idle-sweeper", daemon=True)
+        self._idle_sweeper.start()
+
+    def _release(self, name: str, entry: _ManagedModel, model: Any) -> None:
+        log_counter("model_manager_evict", labels={"model_name": name})
+        logging.info(f"Unloading model '{name}'")
+        if entry.unloader is not None:
+            try:
+                entry.unloader(model)
+            except Exception as e:
+                logging.error(f"Error unloading model '{name}': {e}")
+
+    def unload(self, name: str) -> None:
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is None or not entry.loaded or entry.in_use:
+                return
+            self._lru.pop(name, None)
+            model = entry.model
+            entry.model, entry.loaded, entry.size_bytes = None, False, 0
+        self._release(name, entry, model)
+
+    def unload_all(self) -> None:
+        for name in list(self._lru):
+            self.unload(name)
+
+    def warm_up(self, names: List[str], background: bool = True) -> Optional[threading.Thread]:
+        """Load models ahead of the first request (in a daemon thread by default)."""
+        def _warm():
+            for name in names:
+                try:
+                    with self.use(name):
+                        pass
+                except Exception as e:
+                    logging.error(f"Warm-up of model '{name}' failed: {e}")
+
+        if not background:
+            _warm()
+            return None
+        thread = threading.Thread(target=_warm, name="model-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'memory_budget_mb': self.memory_budget_bytes / 1024 / 1024,
+                'loaded_mb': self._loaded_bytes() / 1024 / 1024,
+                'models': {
+                    name: {'loaded': entry.loaded, 'pinned': entry.pinned, 'in_use': entry.in_use,
+                           'size_mb': entry.size_bytes / 1024 / 1024}
+                    for name, entry in self._models.items()
+                },
+            }
+
+
+def _manager_settings():
+    embedding_config = load_and_log_configs()['embedding_config']
+    budget_mb = int(embedding_config.get('model_memory_budget_mb') or 4096)
+    idle_seconds = float(embedding_config.get('model_idle_unload_seconds') or 0)
+    return budget_mb, idle_seconds
+
+
+model_manager = ModelManager(*_manager_settings())
+
+#
+# End of Model_Manager.py
+#######################################################################################################################
@@ -0,0 +1,162 @@
+# ONNX_Export.py
+# Description: Export a Hugging Face embedding model to ONNX and quantize it to int8 for CPU inference.
+#
+# Dynamic int8 quantization stores the weights of the linear layers as int8 and quantizes activations on the fly, which
+# makes transformer encoders several times faster on CPU for a small loss in accuracy. Exports are cached under the
+# configured `onnx_model_path`, so the (slow) export and quantization only happen once per model.
+#
+# Usage:
+#   python -m App_Function_Libraries.RAG.ONNX_Export <model_name> [--output-dir DIR] [--force] [--keep-fp32]
+#
+# Imports
+import argparse
+import inspect
+import os
+import threading
+import time
+from typing import Optional
+#
+# 3rd-Party Imports
+import torch
+from transformers import AutoModel, AutoTokenizer
+#
+# Local Imports
+from App_Function_Libraries.Metrics.metrics_logger import log_counter, log_histogram
+from App_Function_Libraries.Utils.Utils import load_and_log_configs, logging
+#
+#######################################################################################################################
+#
+# Functions:
+
+DEFAULT_OPSET = 17
+_export_lock = threading.Lock()
+
+
+def default_onnx_dir() -> str:
+    onnx_dir = load_and_log_configs()['embedding_config'].get('onnx_model_path')
+    return onnx_dir or './App_Function_Libraries/models/onnx_models/'
+
+
+def quantized_onnx_model_path(model_name: str, output_dir: Optional[str] = None) -> str:
+    """Where the int8 export of `model_name` is cached."""
+    if os.path.isabs(model_name):
+        # A model loaded from a local directory is cached under that directory's name
+        model_name = os.path.basename(os.path.normpath(model_name))
+    return os.path.join(output_dir or default_onnx_dir(), f"{model_name}.int8.onnx")
+
+
+class _LastHiddenState(torch.nn.Module):
+    """Exposes only last_hidden_state so the graph has a single output regardless of the model class."""
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+
+
+def export_onnx_model(model_name: str, output_path: str, cache_dir: Optional[str] = None,
+                      revision: Optional[str] = None, opset: int = DEFAULT_OPSET) -> str:
+    """Export `model_name` to an fp32 ONNX graph taking input_ids/attention_mask with dynamic batch and length."""
+    tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True, cache_dir=cache_dir,
+                                              revision=revision)
+    model = AutoModel.from_pretrained(model_name, trust_remote_code=True, cache_dir=cache_dir, revision=revision)
+    model = model.float().eval()
+    sample = tokenizer(["ONNX export sample text", "A second, somewhat longer sample text"], padding=True,
+                       return_tensors="pt")
+    export_kwargs = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        # The dynamo exporter needs onnxscript; the TorchScript one handles these encoders fine
+        export_kwargs['dynamo'] = False
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            _LastHiddenState(model),
+            (sample["input_ids"], sample["attention_mask"]),
+            output_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=opset,
+            do_constant_folding=True,
+            **export_kwargs
+        )
+    return output_path
+
+
+def quantize_onnx_model(fp32_path: str, int8_path: str) -> str:
+    """Dynamically quantize the weights of an fp32 ONNX model to int8."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    return int8_path
+
+
+def get_quantized_onnx_model(model_name: str, output_dir: Optional[str] = None, cache_dir: Optional[str] = None,
+                             revision: Optional[str] = None, force: bool = False, keep_fp32: bool = False) -> str:
+    """
+    Return the path of the int8 ONNX export of `model_name`, exporting and quantizing it first if it is not cached.
+
+    Files are written under temporary names and moved into place at the end, so an interrupted export is never
+    mistaken for a cached one.
+    """
+    target = quantized_onnx_model_path(model_name, output_dir)
+    if os.path.exists(target) and not force:
+        return target
+    with _export_lock:
+        if os.path.exists(target) and not force:
+            return target
+        log_counter("onnx_export_attempt", labels={"model_name": model_name})
+        start_time = time.time()
+        fp32_path = target[:-len(".int8.onnx")] + ".fp32.onnx"
+        fp32_tmp, int8_tmp = fp32_path + ".tmp", target + ".tmp"
+        os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+        try:
+            logging.info(f"Exporting {model_name} to ONNX (one-time, cached at {target})")
+            export_onnx_model(model_name, fp32_tmp, cache_dir=cache_dir, revision=revision)
+            logging.info(f"Quantizing {model_name} to int8")
+            quantize_onnx_model(fp32_tmp, int8_tmp)
+            os.replace(int8_tmp, target)
+            if keep_fp32:
+                os.replace(fp32_tmp, fp32_path)
+        except Exception as e:
+            log_counter("onnx_export_failure", labels={"model_name": model_name})
+            logging.error(f"ONNX export of {model_name} failed: {e}")
+            raise
+        finally:
+            for leftover in (fp32_tmp, int8_tmp):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+        export_time = time.time() - start_time
+        log_histogram("onnx_export_duration", export_time, labels={"model_name": model_name})
+        logging.info(f"Cached int8 ONNX export of {model_name} at {target} ({export_time:.1f}s, "
+                     f"{os.path.getsize(target) / 1024 / 1024:.0f} MB)")
+        return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export an embedding model to an int8-quantized ONNX model")
+    parser.add_argument("model_name", help="Hugging Face model name, e.g. BAAI/bge-small-en-v1.5")
+    parser.add_argument("--output-dir", help="Directory for the export (default: [Embeddings] onnx_model_path)")
+    parser.add_argument("--cache-dir", help="Hugging Face download directory (default: [Embeddings] model_dir)")
+    parser.add_argument("--force", action="store_true", help="Re-export even if a cached export exists")
+    parser.add_argument("--keep-fp32", action="store_true", help="Also keep the unquantized fp32 export")
+    args = parser.parse_args()
+
+    # Same pinned revisions the embedders load, so the export matches what they would run
+    from App_Function_Libraries.RAG.Embeddings_Create import commit_hashes, model_dir
+    path = get_quantized_onnx_model(args.model_name, output_dir=args.output_dir, cache_dir=args.cache_dir or model_dir,
+                                    revision=commit_hashes.get(args.model_name), force=args.force,
+                                    keep_fp32=args.keep_fp32)
+    print(path)
+
+
+if __name__ == "__main__":
+    main()
+
+#
+# End of ONNX_Export.py
+#######################################################################################################################
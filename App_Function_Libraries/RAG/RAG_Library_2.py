@@ -3,15 +3,19 @@
 #
 # Import necessary modules and functions
 import configparser
+import functools
 import os
 import time
 from typing import Dict, Any, List, Optional
 #
 # Local Imports
-from App_Function_Libraries.RAG.ChromaDB_Library import vector_search, chroma_client
+from App_Function_Libraries.RAG.ChromaDB_Library import vector_search, vector_search_collections, chroma_client
+from App_Function_Libraries.RAG.Hybrid_Retrieval import hybrid_search
 from App_Function_Libraries.RAG.RAG_Persona_Chat import perform_vector_search_chat
+from App_Function_Libraries.RAG.Reranker import get_reranker
 from App_Function_Libraries.Summarization.Summarization_General_Lib import summarize
-from App_Function_Libraries.DB.DB_Manager import fetch_keywords_for_media, search_media_db, get_notes_by_keywords, \
+from App_Function_Libraries.DB.DB_Manager import fetch_keywords_for_media_ids, fetch_media_ids_for_keywords, \
+    search_media_for_rag, get_notes_by_keywords, \
     search_conversations_by_keywords
 from App_Function_Libraries.Utils.Utils import load_and_log_configs, logging
 from App_Function_Libraries.Metrics.metrics_logger import log_counter, log_histogram
@@ -22,7 +26,6 @@ from App_Function_Libraries.DB.RAG_QA_Chat_DB import search_rag_chat, search_rag
 #
 # 3rd-Party Imports
 import openai
-from flashrank import Ranker, RerankRequest
 #
 ########################################################################################################################
 #
@@ -41,8 +44,15 @@ config = configparser.ConfigParser()
 config.read('config.txt')
 
 
+def rerank_results(query: str, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Order search results by the shared reranker's scores (see [Reranking] in config.txt)."""
+    ranked = get_reranker().rerank(query, [result['content'] for result in results])
+    logging.debug(f"Reranked results (index, score): {ranked}")
+    return [results[i] for i, _ in ranked]
+
+
 search_functions = {
-    "Media DB": search_media_db,
+    "Media DB": search_media_for_rag,
     "RAG Chat": search_rag_chat,
     "RAG Notes": search_rag_notes,
     "Character Chat": search_character_chat,
@@ -189,71 +199,33 @@ def enhanced_rag_pipeline(
         else:
             relevant_ids = {db_type: None for db_type in database_types}
 
-        # Perform vector search
-        vector_results = []
+        # Vector and full-text searches for every database run concurrently under one deadline, and their rankings
+        # are fused (duplicates merged) before re-ranking
+        sources = {}
+        vector_filters = set()
         for db_type in database_types:
-            try:
-                db_relevant_ids = relevant_ids.get(db_type)
-                results = perform_vector_search(query, db_relevant_ids, top_k=fts_top_k)
-                vector_results.extend(results)
-                logging.debug(f"\nenhanced_rag_pipeline - Vector search results for {db_type}: {results}")
-            except Exception as e:
-                logging.error(f"Error performing vector search on {db_type}: {str(e)}")
-
-        # Perform vector search
-        # FIXME
-        #vector_results = perform_vector_search(query, relevant_media_ids)
-        #ogging.debug(f"\n\nenhanced_rag_pipeline - Vector search results: {vector_results}")
-
-        # Perform full-text search
-        #v1
-        #fts_results = perform_full_text_search(query, database_type, relevant_media_ids, fts_top_k)
-
-        # v2
-        # Perform full-text search across specified databases
-        fts_results = []
-        for db_type in database_types:
-            try:
-                db_relevant_ids = relevant_ids.get(db_type)
-                db_results = perform_full_text_search(query, db_type, db_relevant_ids, fts_top_k)
-                fts_results.extend(db_results)
-                logging.debug(f"enhanced_rag_pipeline - FTS results for {db_type}: {db_results}")
-            except Exception as e:
-                logging.error(f"Error performing full-text search on {db_type}: {str(e)}")
-
-        #logging.debug("\n\nenhanced_rag_pipeline - Full-text search results:")
+            db_relevant_ids = relevant_ids.get(db_type)
+            # perform_vector_search covers every collection, so database types with the same ID filter share a search
+            vector_filter = None if db_relevant_ids is None else tuple(db_relevant_ids)
+            if vector_filter not in vector_filters:
+                vector_filters.add(vector_filter)
+                sources[f"vector:{db_type}"] = functools.partial(perform_vector_search, query, db_relevant_ids,
+                                                                 top_k=fts_top_k)
+            sources[f"fts:{db_type}"] = functools.partial(perform_full_text_search, query, db_type, db_relevant_ids,
+                                                          fts_top_k)
+        all_results = hybrid_search(sources)
         logging.debug(
-            "\n\nenhanced_rag_pipeline - Full-text search results:\n" + "\n".join(
-                [str(item) for item in fts_results]) + "\n"
+            "\n\nenhanced_rag_pipeline - Fused search results:\n" + "\n".join(
+                [str(item) for item in all_results]) + "\n"
         )
 
-        # Combine results
-        all_results = vector_results + fts_results
-
-        # FIXME - specify model + add param to modify at call time
-        # You can specify a model if necessary, e.g., model_name="ms-marco-MiniLM-L-12-v2"
+        # The reranker backend and model are set in the [Reranking] section of config.txt
         # Apply re-ranking if enabled and results exist
         if apply_re_ranking and all_results:
             logging.debug(f"\nenhanced_rag_pipeline - Applying Re-Ranking")
 
             if all_results:
-                ranker = Ranker()
-
-                # Prepare passages for re-ranking
-                passages = [{"id": i, "text": result['content']} for i, result in enumerate(all_results)]
-                rerank_request = RerankRequest(query=query, passages=passages)
-
-                # Rerank the results
-                reranked_results = ranker.rerank(rerank_request)
-
-                # Sort results based on the re-ranking score
-                reranked_results = sorted(reranked_results, key=lambda x: x['score'], reverse=True)
-
-                # Log reranked results
-                logging.debug(f"\n\nenhanced_rag_pipeline - Reranked results: {reranked_results}")
-
-                # Update all_results based on reranking
-                all_results = [all_results[result['id']] for result in reranked_results]
+                all_results = rerank_results(query, all_results)
 
         # Extract content from results (top fts_top_k by default)
         context = "\n".join([result['content'] for result in all_results[:fts_top_k]])
@@ -335,18 +307,14 @@ def generate_answer(api_choice: str, context: str, query: str) -> str:
 def perform_vector_search(query: str, relevant_media_ids: List[str] = None, top_k=10) -> List[Dict[str, Any]]:
     log_counter("perform_vector_search_attempt")
     start_time = time.time()
-    all_collections = chroma_client.list_collections()
-    vector_results = []
     try:
-        for collection in all_collections:
-            collection_results = vector_search(collection.name, query, k=top_k)
-            if not collection_results:
-                continue  # Skip empty results
-            filtered_results = [
-                result for result in collection_results
-                if relevant_media_ids is None or result['metadata'].get('media_id') in relevant_media_ids
-            ]
-            vector_results.extend(filtered_results)
+        if relevant_media_ids is not None and not relevant_media_ids:
+            return []
+        # The query is embedded once per embedding model in use, not once per collection. The media filter is part of
+        # the Chroma query, so each collection returns its top_k among the relevant media only.
+        where = None if relevant_media_ids is None else \
+            {"media_id": {"$in": [str(media_id) for media_id in relevant_media_ids]}}
+        vector_results = vector_search_collections(query, k=top_k, where=where)
         search_duration = time.time() - start_time
         log_histogram("perform_vector_search_duration", search_duration)
         log_counter("perform_vector_search_success", labels={"result_count": len(vector_results)})
@@ -428,15 +396,13 @@ def perform_full_text_search(query: str, database_type: str, relevant_ids: List[
 def fetch_relevant_media_ids(keywords: List[str], top_k=10) -> List[int]:
     log_counter("fetch_relevant_media_ids_attempt", labels={"keyword_count": len(keywords)})
     start_time = time.time()
-    relevant_ids = set()
-    for keyword in keywords:
-        try:
-            media_ids = fetch_keywords_for_media(keyword)
-            relevant_ids.update(media_ids)
-        except Exception as e:
-            log_counter("fetch_relevant_media_ids_error", labels={"error": str(e)})
-            logging.error(f"Error fetching relevant media IDs for keyword '{keyword}': {str(e)}")
-            # Continue processing other keywords
+    try:
+        # All keywords are resolved in a single query
+        relevant_ids = fetch_media_ids_for_keywords(keywords)
+    except Exception as e:
+        log_counter("fetch_relevant_media_ids_error", labels={"error": str(e)})
+        logging.error(f"Error fetching relevant media IDs for keywords {keywords}: {str(e)}")
+        relevant_ids = []
 
     fetch_duration = time.time() - start_time
     log_histogram("fetch_relevant_media_ids_duration", fetch_duration)
@@ -450,27 +416,36 @@ def filter_results_by_keywords(results: List[Dict[str, Any]], keywords: List[str
     if not keywords:
         return results
 
-    filtered_results = []
+    candidates = []
     for result in results:
+        metadata = result.get('metadata', {})
+        if metadata is None:
+            logging.warning(f"No metadata found for result: {result}")
+            continue
+        if not isinstance(metadata, dict):
+            logging.warning(f"Unexpected metadata type: {type(metadata)}. Expected dict.")
+            continue
+
+        media_id = metadata.get('media_id')
+        if media_id is None:
+            logging.warning(f"No media_id found in metadata: {metadata}")
+            continue
         try:
-            metadata = result.get('metadata', {})
-            if metadata is None:
-                logging.warning(f"No metadata found for result: {result}")
-                continue
-            if not isinstance(metadata, dict):
-                logging.warning(f"Unexpected metadata type: {type(metadata)}. Expected dict.")
-                continue
-
-            media_id = metadata.get('media_id')
-            if media_id is None:
-                logging.warning(f"No media_id found in metadata: {metadata}")
-                continue
-
-            media_keywords = fetch_keywords_for_media(media_id)
-            if any(keyword.lower() in [mk.lower() for mk in media_keywords] for keyword in keywords):
-                filtered_results.append(result)
-        except Exception as e:
-            logging.error(f"Error processing result: {result}. Error: {str(e)}")
+            candidates.append((int(media_id), result))
+        except (TypeError, ValueError):
+            logging.error(f"Invalid media_id in result: {result}")
+
+    # The keywords of every candidate media item are fetched in one query
+    wanted = {keyword.lower() for keyword in keywords}
+    try:
+        keywords_by_media = fetch_keywords_for_media_ids([media_id for media_id, _ in candidates])
+    except Exception as e:
+        logging.error(f"Error fetching keywords for results: {str(e)}")
+        keywords_by_media = {}
+    filtered_results = [
+        result for media_id, result in candidates
+        if wanted.intersection(mk.lower() for mk in keywords_by_media.get(media_id, []))
+    ]
 
     filter_duration = time.time() - start_time
     log_histogram("filter_results_by_keywords_duration", filter_duration)
@@ -541,39 +516,19 @@ def enhanced_rag_pipeline_chat(query: str, api_choice: str, character_id: int, k
                 "context": ""
             }
 
-        # Perform vector search within the relevant chats
-        vector_results = perform_vector_search_chat(query, relevant_chat_ids)
-        logging.debug(f"enhanced_rag_pipeline_chat - Vector search results: {vector_results}")
-
-        # Perform full-text search within the relevant chats
+        # Vector and full-text search within the relevant chats, run concurrently and fused
         # FIXME - Update for DB Selection
-        fts_results = perform_full_text_search_chat(query, relevant_chat_ids)
-        logging.debug("enhanced_rag_pipeline_chat - Full-text search results:")
-        logging.debug("\n".join([str(item) for item in fts_results]))
-
-        # Combine results
-        all_results = vector_results + fts_results
+        all_results = hybrid_search({
+            "vector:Character Chat": functools.partial(perform_vector_search_chat, query, relevant_chat_ids),
+            "fts:Character Chat": functools.partial(perform_full_text_search_chat, query, relevant_chat_ids),
+        })
+        logging.debug("enhanced_rag_pipeline_chat - Fused search results:")
+        logging.debug("\n".join([str(item) for item in all_results]))
 
         apply_re_ranking = True
         if apply_re_ranking:
             logging.debug("enhanced_rag_pipeline_chat - Applying Re-Ranking")
-            ranker = Ranker()
-
-            # Prepare passages for re-ranking
-            passages = [{"id": i, "text": result['content']} for i, result in enumerate(all_results)]
-            rerank_request = RerankRequest(query=query, passages=passages)
-
-            # Rerank the results
-            reranked_results = ranker.rerank(rerank_request)
-
-            # Sort results based on the re-ranking score
-            reranked_results = sorted(reranked_results, key=lambda x: x['score'], reverse=True)
-
-            # Log reranked results
-            logging.debug(f"enhanced_rag_pipeline_chat - Reranked results: {reranked_results}")
-
-            # Update all_results based on reranking
-            all_results = [all_results[result['id']] for result in reranked_results]
+            all_results = rerank_results(query, all_results)
 
         # Extract context from top results (limit to top 10)
         context = "\n".join([result['content'] for result in all_results[:10]])
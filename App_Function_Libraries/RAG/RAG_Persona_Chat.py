@@ -94,7 +94,9 @@ def embed_and_store_chat(chat_id: int, chat_history: List[Tuple[str, str]], conv
                 texts=[combined_content],
                 embeddings=[embedding],
                 ids=[document_id],
-                metadatas=[metadata]
+                metadatas=[metadata],
+                embedding_provider=embedding_provider,
+                embedding_model=embedding_model
             )
             logging.debug(f"Stored chat message {idx} of chat ID {chat_id} in ChromaDB.")
     except Exception as e:
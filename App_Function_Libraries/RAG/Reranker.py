@@ -0,0 +1,146 @@
+# Reranker.py
+# Description: Long-lived re-ranking service used by the RAG pipelines.
+#
+# The re-ranking model is loaded on first use and kept warm by the shared model manager, scores are cached per
+# (query, passage) pair so refining a question or paging through results does not score the same passages twice, and
+# each call scores at most `max_passages` passages. The backend trades accuracy for speed:
+#   flashrank      - small ONNX cross-encoders on CPU (default model: ms-marco-TinyBERT-L-2-v2, the "nano" one)
+#   cross-encoder  - sentence-transformers CrossEncoder (default model: cross-encoder/ms-marco-MiniLM-L-6-v2)
+#   none           - keep the retrieval order
+#
+# Imports
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+#
+# Local Imports
+from App_Function_Libraries.Metrics.metrics_logger import log_counter, log_histogram
+from App_Function_Libraries.RAG.Model_Manager import estimate_model_bytes, model_manager
+from App_Function_Libraries.Utils.Utils import load_and_log_configs, logging
+#
+#######################################################################################################################
+#
+# Functions:
+
+RERANKER_BACKENDS = ('flashrank', 'cross-encoder', 'none')
+DEFAULT_RERANKER_MODELS = {
+    'flashrank': 'ms-marco-TinyBERT-L-2-v2',
+    'cross-encoder': 'cross-encoder/ms-marco-MiniLM-L-6-v2',
+}
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class Reranker:
+    """
+    Scores passages against a query with a re-ranking model.
+
+    rerank() is safe to call from several threads; model inference is serialized per instance.
+    """
+    def __init__(self, backend: str = 'flashrank', model_name: Optional[str] = None, max_passages: int = 50,
+                 cache_size: int = 10000):
+        backend = (backend or 'none').lower()
+        if backend not in RERANKER_BACKENDS:
+            raise ValueError(f"Unsupported reranker backend: {backend}. Use one of {RERANKER_BACKENDS}")
+        self.backend = backend
+        self.model_name = model_name or DEFAULT_RERANKER_MODELS.get(backend)
+        self.max_passages = max_passages
+        self.cache_size = cache_size
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._inference_lock = threading.Lock()
+        self.manager_key = f"reranker:{backend}:{self.model_name}"
+        if backend != 'none':
+            model_manager.register(self.manager_key, self._load, size_fn=self._model_size)
+
+    def _load(self):
+        if self.backend == 'flashrank':
+            from flashrank import Ranker
+            return Ranker(model_name=self.model_name)
+        from sentence_transformers import CrossEncoder
+        return CrossEncoder(self.model_name)
+
+    @staticmethod
+    def _model_size(model) -> int:
+        return estimate_model_bytes(getattr(model, 'model', None))
+
+    def _score(self, model, query: str, passages: List[str]) -> List[float]:
+        if self.backend == 'flashrank':
+            from flashrank import RerankRequest
+            results = model.rerank(RerankRequest(query=query, passages=[
+                {"id": i, "text": passage} for i, passage in enumerate(passages)]))
+            scores = [0.0] * len(passages)
+            for result in results:
+                scores[result['id']] = float(result['score'])
+            return scores
+        return [float(score) for score in model.predict([(query, passage) for passage in passages])]
+
+    def rerank(self, query: str, passages: Sequence[str]) -> List[Tuple[int, Optional[float]]]:
+        """
+        Order passages by relevance to `query`.
+
+        Only the first `max_passages` passages are scored; any beyond that keep their order after the scored ones,
+        with a score of None. Returns (index into `passages`, score) pairs, best first.
+        """
+        if self.backend == 'none' or not passages:
+            return [(i, None) for i in range(len(passages))]
+        start_time = time.time()
+        candidates = list(passages[:self.max_passages])
+        query_hash = _text_hash(query)
+        keys = [(query_hash, _text_hash(passage)) for passage in candidates]
+
+        scores: Dict[int, float] = {}
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                if key in self._scores:
+                    self._scores.move_to_end(key)
+                    scores[i] = self._scores[key]
+        misses = [i for i in range(len(candidates)) if i not in scores]
+        log_counter("reranker_cache_hit", labels={"backend": self.backend}, value=len(scores))
+        log_counter("reranker_cache_miss", labels={"backend": self.backend}, value=len(misses))
+
+        if misses:
+            with model_manager.use(self.manager_key) as model, self._inference_lock:
+                new_scores = self._score(model, query, [candidates[i] for i in misses])
+            with self._cache_lock:
+                for i, score in zip(misses, new_scores):
+                    scores[i] = score
+                    self._scores[keys[i]] = score
+                while len(self._scores) > self.cache_size:
+                    self._scores.popitem(last=False)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        ranked += [(i, None) for i in range(len(candidates), len(passages))]
+        log_histogram("reranker_duration", time.time() - start_time, labels={"backend": self.backend})
+        return ranked
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._scores.clear()
+
+
+_rerankers: Dict[Tuple[str, Optional[str]], Reranker] = {}
+_rerankers_lock = threading.Lock()
+
+
+def get_reranker(backend: Optional[str] = None, model_name: Optional[str] = None) -> Reranker:
+    """Return the shared reranker for a backend/model (defaults from the [Reranking] config section)."""
+    reranker_config = load_and_log_configs()['reranker_config']
+    backend = (backend or reranker_config.get('backend') or 'flashrank').lower()
+    if model_name is None and backend == (reranker_config.get('backend') or 'flashrank').lower():
+        model_name = reranker_config.get('model') or None
+    key = (backend, model_name)
+    with _rerankers_lock:
+        if key not in _rerankers:
+            _rerankers[key] = Reranker(backend, model_name,
+                                       max_passages=int(reranker_config.get('max_passages') or 50),
+                                       cache_size=int(reranker_config.get('score_cache_size') or 10000))
+        return _rerankers[key]
+
+#
+# End of Reranker.py
+#######################################################################################################################
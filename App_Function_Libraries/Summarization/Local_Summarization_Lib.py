@@ -263,7 +263,9 @@ def summarize_with_llama(input_data, custom_prompt, api_key=None, temp=None, sys
             ],
             "max_tokens": max_tokens,
             "temperature": temp,
-            "stream": streaming
+            "stream": streaming,
+            # Let the server reuse the KV cache of a matching prompt prefix (e.g. the same document across chunks)
+            "cache_prompt": True
         }
 
         # Create a session
@@ -3,16 +3,33 @@
 # Tokenization Methods Library
 # This library is used to handle tokenization of text for summarization.
 #
+# Token counting service: get_token_counter(model) returns a TokenCounter for the tokenizer that the target model
+# uses, picked by model name:
+#   OpenAI models (gpt-4o, gpt-3.5-turbo, o1, text-embedding-3-small, ...) and tiktoken encoding names
+#       -> tiktoken BPE
+#   gpt2                                      -> the GPT-2 tokenizer (Hugging Face fast tokenizer)
+#   anything else (a Hugging Face model id)   -> that model's Hugging Face fast tokenizer
+# Counters are created once per model name and shared. A tokenizer that cannot be loaded (not cached while offline, an
+# unknown model) falls back to GPT-2, and when even that is unavailable, to an estimate of 4 characters per token.
+#
 ####
-import tiktoken
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 # Import Local
-from typing import List
+from App_Function_Libraries.Utils.Utils import load_and_log_configs, logging
 
 ####################
 # Function List
 #
-# 1. openai_tokenize(text: str) -> List[str]
+# 1. openai_tokenize(text: str) -> List[int]
+# 2. get_token_counter(model: Optional[str] = None) -> TokenCounter
+# 3. clear_token_counters() -> None
+# 4. count_tokens(text: str, model: Optional[str] = None) -> int
+# 5. count_tokens_batch(texts: Sequence[str], model: Optional[str] = None) -> List[int]
 #
 ####################
 
@@ -21,9 +38,237 @@ from typing import List
 # Function Definitions
 #
 
-def openai_tokenize(text: str) -> List[str]:
-    encoding = tiktoken.encoding_for_model('gpt-4-turbo')
-    return encoding.encode(text)
+DEFAULT_TOKENIZER_MODEL = 'gpt2'
+# Encoding for OpenAI model names tiktoken does not know yet
+DEFAULT_TIKTOKEN_ENCODING = 'cl100k_base'
+TIKTOKEN_ENCODINGS = ('o200k_base', 'cl100k_base', 'p50k_base', 'p50k_edit', 'r50k_base')
+_OPENAI_MODEL_PATTERN = re.compile(r'^(gpt-|chatgpt-|o\d|text-embedding-|text-davinci-|davinci|babbage|curie|ada\b)')
+# Texts longer than this are cut into pieces of about this many characters that are encoded as one batch
+BATCH_PIECE_CHARS = 50000
+# Threads tiktoken uses for batch encoding (Hugging Face fast tokenizers manage their own)
+TIKTOKEN_BATCH_THREADS = 8
+# How far from a join separator_costs() looks for the word boundaries that isolate it
+BOUNDARY_WINDOW_CHARS = 256
+
+
+@lru_cache(maxsize=1)
+def _chunking_config() -> Dict[str, Any]:
+    # Read once: get_token_counter() runs per sentence in semantic chunking, and parsing the config takes milliseconds
+    return load_and_log_configs()['chunking_config']
+
+
+def _offline_mode() -> bool:
+    return str(_chunking_config().get('offline_mode', False)).lower() == 'true' or \
+        os.environ.get('HF_HUB_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+
+def _default_model() -> str:
+    return _chunking_config().get('tokenizer_model') or DEFAULT_TOKENIZER_MODEL
+
+
+def _openai_name(model: str) -> str:
+    # "openai/gpt-4o" -> "gpt-4o"
+    return model[len('openai/'):] if model.lower().startswith('openai/') else model
+
+
+def tokenizer_backend(model: str) -> str:
+    """Which tokenizer family counts tokens for `model`: 'tiktoken' or 'huggingface'."""
+    name = _openai_name(model).lower()
+    if name in TIKTOKEN_ENCODINGS or _OPENAI_MODEL_PATTERN.match(name):
+        return 'tiktoken'
+    return 'huggingface'
+
+
+def load_hf_tokenizer(model: str):
+    """
+    Load a Hugging Face (fast, where the model has one) tokenizer, from the local cache when it is there.
+
+    Raises OSError when it is not cached and downloads are off ([Chunking] offline_mode or HF_HUB_OFFLINE).
+    """
+    from transformers import AutoTokenizer
+    try:
+        # Never ask the Hub for updates when the tokenizer is already cached
+        return AutoTokenizer.from_pretrained(model, use_fast=True, local_files_only=True)
+    except OSError:
+        if _offline_mode():
+            raise OSError(f"The {model} tokenizer is not in the local Hugging Face cache and chunking is in offline "
+                          f"mode ([Chunking] offline_mode or HF_HUB_OFFLINE). Run once with network access to cache "
+                          f"it.") from None
+        logging.info(f"{model} tokenizer is not cached yet; downloading it")
+        return AutoTokenizer.from_pretrained(model, use_fast=True)
+
+
+def _load_tiktoken_encoding(model: str):
+    import tiktoken
+    name = _openai_name(model)
+    if name in TIKTOKEN_ENCODINGS:
+        return tiktoken.get_encoding(name)
+    try:
+        return tiktoken.encoding_for_model(name)
+    except KeyError:
+        return tiktoken.get_encoding(DEFAULT_TIKTOKEN_ENCODING)
+
+
+def _split_at_word_boundaries(text: str, piece_chars: int) -> List[str]:
+    """
+    Cut text into pieces of at most about piece_chars characters, each cut made before a single space between two
+    words. BPE tokenizers start a new token at " word", so the pieces' token counts add up to the whole text's.
+    """
+    pieces = []
+    start = 0
+    while len(text) - start > piece_chars:
+        cut = text.rfind(' ', start + 1, start + piece_chars)
+        while cut > start and (text[cut - 1].isspace() or text[cut + 1].isspace()):
+            cut = text.rfind(' ', start + 1, cut)
+        if cut <= start:
+            # No spaces to cut at (e.g. CJK text); the count may be off by a token at the cut
+            cut = start + piece_chars
+        pieces.append(text[start:cut])
+        start = cut
+    pieces.append(text[start:])
+    return pieces
+
+
+def _is_word_boundary(text: str, i: int) -> bool:
+    # A single space between two non-space characters: where BPE pre-tokenizers start a token (" word")
+    return 0 < i < len(text) - 1 and text[i] == ' ' and not text[i - 1].isspace() and not text[i + 1].isspace()
+
+
+def _tail_piece(text: str) -> str:
+    """The end of text from its last word boundary (within BOUNDARY_WINDOW_CHARS)."""
+    low = max(1, len(text) - BOUNDARY_WINDOW_CHARS)
+    cut = text.rfind(' ', low)
+    while cut >= low and not _is_word_boundary(text, cut):
+        cut = text.rfind(' ', low, cut)
+    if cut >= low:
+        return text[cut:]
+    return text[-BOUNDARY_WINDOW_CHARS:]
+
+
+def _head_piece(text: str) -> str:
+    """The start of text up to its first word boundary (within BOUNDARY_WINDOW_CHARS)."""
+    high = min(len(text), BOUNDARY_WINDOW_CHARS)
+    cut = text.find(' ', 1, high)
+    while cut != -1 and not _is_word_boundary(text, cut):
+        cut = text.find(' ', cut + 1, high)
+    return text[:cut] if cut != -1 else text[:BOUNDARY_WINDOW_CHARS]
+
+
+class TokenCounter:
+    """
+    Encodes and counts tokens with one model's tokenizer.
+
+    backend is 'tiktoken', 'huggingface' or 'estimate' (no tokenizer could be loaded; counts are approximate and
+    encode() is unavailable). Special tokens (BOS/EOS) are never added, so counts are of the text alone.
+    """
+    def __init__(self, model: str, backend: str, tokenizer=None):
+        self.model = model
+        self.backend = backend
+        self.tokenizer = tokenizer
+
+    @property
+    def exact(self) -> bool:
+        return self.backend != 'estimate'
+
+    def encode(self, text: str) -> List[int]:
+        return self.encode_batch([text])[0]
+
+    def encode_batch(self, texts: Sequence[str]) -> List[List[int]]:
+        if not texts:
+            return []
+        if self.backend == 'tiktoken':
+            return self.tokenizer.encode_ordinary_batch(list(texts), num_threads=TIKTOKEN_BATCH_THREADS)
+        if self.backend == 'huggingface':
+            if getattr(self.tokenizer, 'is_fast', False):
+                # Straight to the Rust tokenizer; the Python wrapper adds noticeable per-text overhead
+                return [encoding.ids for encoding in
+                        self.tokenizer.backend_tokenizer.encode_batch(list(texts), add_special_tokens=False)]
+            return self.tokenizer(list(texts), add_special_tokens=False, return_attention_mask=False,
+                                  return_token_type_ids=False, verbose=False)['input_ids']
+        raise NotImplementedError(f"No tokenizer is available for {self.model}; only counts can be estimated")
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if len(text) > BATCH_PIECE_CHARS:
+            return sum(self.count_batch(_split_at_word_boundaries(text, BATCH_PIECE_CHARS)))
+        return self.count_batch([text])[0]
+
+    def count_batch(self, texts: Sequence[str]) -> List[int]:
+        """Token counts of several texts, encoded in one batch."""
+        if self.backend == 'estimate':
+            return [len(text) // 4 + 1 if text else 0 for text in texts]
+        if self.backend == 'huggingface' and getattr(self.tokenizer, 'is_fast', False) and texts:
+            return [len(encoding) for encoding in
+                    self.tokenizer.backend_tokenizer.encode_batch(list(texts), add_special_tokens=False)]
+        return [len(ids) for ids in self.encode_batch(texts)]
+
+    def separator_costs(self, pairs: Sequence[Tuple[str, str]], separator: str) -> List[int]:
+        """
+        For each (left, right) pair, the tokens that left + separator + right has beyond count(left) + count(right):
+        the separator's own tokens plus any merges across it.
+
+        Only the text around the join is encoded, all pairs in one batch. A BPE tokenizer never merges across a word
+        boundary (" word"), so the cost is exact whenever both sides have one within BOUNDARY_WINDOW_CHARS of the join.
+        """
+        if not pairs:
+            return []
+        windows = [(_tail_piece(left), _head_piece(right)) for left, right in pairs]
+        # Joins between the same words repeat a lot in prose; encode each distinct one once
+        texts = list(dict.fromkeys(text for tail, head in windows for text in (tail, head, tail + separator + head)))
+        counts = dict(zip(texts, self.count_batch(texts)))
+        return [counts[tail + separator + head] - counts[tail] - counts[head] for tail, head in windows]
+
+
+_counters: Dict[str, TokenCounter] = {}
+_counters_lock = threading.Lock()
+
+
+def _create_token_counter(model: str) -> TokenCounter:
+    backend = tokenizer_backend(model)
+    try:
+        if backend == 'tiktoken':
+            return TokenCounter(model, backend, _load_tiktoken_encoding(model))
+        return TokenCounter(model, backend, load_hf_tokenizer(model))
+    except Exception as e:
+        if model != DEFAULT_TOKENIZER_MODEL:
+            logging.warning(f"Could not load the tokenizer for {model} ({str(e)}); counting tokens with "
+                            f"{DEFAULT_TOKENIZER_MODEL} instead")
+            return get_token_counter(DEFAULT_TOKENIZER_MODEL)
+        logging.warning(f"Could not load the {model} tokenizer ({str(e)}); token counts are estimated")
+        return TokenCounter(model, 'estimate')
+
+
+def get_token_counter(model: Optional[str] = None) -> TokenCounter:
+    """Return the shared token counter for a model (the [Chunking] tokenizer_model by default)."""
+    model = (model or _default_model()).strip()
+    with _counters_lock:
+        counter = _counters.get(model)
+    if counter is None:
+        # Loaded outside the lock: a fallback asks for the default counter, and loading may download files
+        counter = _create_token_counter(model)
+        with _counters_lock:
+            counter = _counters.setdefault(model, counter)
+    return counter
+
+
+def clear_token_counters() -> None:
+    """Forget the loaded counters and the [Chunking] settings, so both are read again on next use."""
+    with _counters_lock:
+        _counters.clear()
+    _chunking_config.cache_clear()
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    return get_token_counter(model).count(text)
+
+
+def count_tokens_batch(texts: Sequence[str], model: Optional[str] = None) -> List[int]:
+    return get_token_counter(model).count_batch(texts)
+
+
+def openai_tokenize(text: str) -> List[int]:
+    return get_token_counter('gpt-4-turbo').encode(text)
 
 #
 #
@@ -487,6 +487,8 @@ def load_and_log_configs():
         adaptive_chunking = config.get('Chunking', 'adaptive_chunking', fallback='False')
         chunking_multi_level = config.get('Chunking', 'chunking_multi_level', fallback='False')
         chunk_language = config.get('Chunking', 'chunk_language', fallback='en')
+        chunking_offline_mode = config.get('Chunking', 'offline_mode', fallback='False')
+        chunking_tokenizer_model = config.get('Chunking', 'tokenizer_model', fallback='gpt2')
         #
         # Article Chunking
         article_chunking_method = config.get('Chunking', 'article_chunking_method', fallback='words')
@@ -575,12 +577,27 @@ def load_and_log_configs():
         logging.trace(f"Embedding model set to: {embedding_model}")
         embedding_provider = config.get('Embeddings', 'embedding_provider', fallback='')
         embedding_model = config.get('Embeddings', 'embedding_model', fallback='')
-        onnx_model_path = config.get('Embeddings', 'onnx_model_path', fallback="./App_Function_Libraries/onnx_models/text-embedding-3-small.onnx")
+        onnx_model_path = config.get('Embeddings', 'onnx_model_path', fallback="./App_Function_Libraries/models/onnx_models/")
         model_dir = config.get('Embeddings', 'model_dir', fallback="./App_Function_Libraries/onnx_models")
         embedding_api_url = config.get('Embeddings', 'embedding_api_url', fallback="http://localhost:8080/v1/embeddings")
         embedding_api_key = config.get('Embeddings', 'embedding_api_key', fallback='')
         chunk_size = config.get('Embeddings', 'chunk_size', fallback=400)
         overlap = config.get('Embeddings', 'overlap', fallback=200)
+        embedding_cache = config.get('Embeddings', 'embedding_cache', fallback='True')
+        embedding_cache_dtype = config.get('Embeddings', 'embedding_cache_dtype', fallback='float32')
+        model_memory_budget_mb = config.get('Embeddings', 'model_memory_budget_mb', fallback='4096')
+        model_idle_unload_seconds = config.get('Embeddings', 'model_idle_unload_seconds', fallback='0')
+        pin_default_model = config.get('Embeddings', 'pin_default_model', fallback='True')
+        warm_up_models = config.get('Embeddings', 'warm_up_models', fallback='True')
+        embedding_batch_max_tokens = config.get('Embeddings', 'batch_max_tokens', fallback='16384')
+        embedding_batch_max_size = config.get('Embeddings', 'batch_max_size', fallback='64')
+        embedding_remote_batch_size = config.get('Embeddings', 'remote_batch_size', fallback='256')
+        embedding_coalesce_ms = config.get('Embeddings', 'coalesce_ms', fallback='5')
+        embedding_cpu_backend = config.get('Embeddings', 'cpu_backend', fallback='torch')
+        contextual_max_concurrency = config.get('Embeddings', 'contextual_max_concurrency', fallback='4')
+        contextual_batch_size = config.get('Embeddings', 'contextual_batch_size', fallback='8')
+        contextual_context_window = config.get('Embeddings', 'contextual_context_window', fallback='8192')
+        contextual_cache = config.get('Embeddings', 'contextual_cache', fallback='True')
 
         # Prompts - FIXME
         prompt_path = config.get('Prompts', 'prompt_path', fallback='Databases/prompts.db')
@@ -977,6 +994,8 @@ def load_and_log_configs():
                 'adaptive_chunking': adaptive_chunking,
                 'multi_level': chunking_multi_level,
                 'chunk_language': chunk_language,
+                'offline_mode': chunking_offline_mode,
+                'tokenizer_model': chunking_tokenizer_model,
                 'chunk_overlap': chunk_overlap,
                 'article_chunking_method': article_chunking_method,
                 'article_chunk_max_size': article_chunk_max_size,
@@ -1046,7 +1065,9 @@ def load_and_log_configs():
                 'sqlite_path': get_project_relative_path(config.get('Database', 'sqlite_path', fallback='Databases/media_summary.db')),
                 'elasticsearch_host': config.get('Database', 'elasticsearch_host', fallback='localhost'),
                 'elasticsearch_port': config.getint('Database', 'elasticsearch_port', fallback=9200),
-                'chroma_db_path': get_project_relative_path(config.get('Database', 'chroma_db_path', fallback='Databases/chroma.db'))
+                'chroma_db_path': get_project_relative_path(config.get('Database', 'chroma_db_path', fallback='Databases/chroma.db')),
+                'chroma_upsert_batch_size': config.getint('Database', 'chroma_upsert_batch_size', fallback=1000),
+                'chroma_verify_sample': config.getint('Database', 'chroma_verify_sample', fallback=0)
             },
             'embedding_config': {
                 'embedding_provider': embedding_provider,
@@ -1056,7 +1077,34 @@ def load_and_log_configs():
                 'embedding_api_url': embedding_api_url,
                 'embedding_api_key': embedding_api_key,
                 'chunk_size': chunk_size,
-                'chunk_overlap': overlap
+                'chunk_overlap': overlap,
+                'embedding_cache': embedding_cache,
+                'embedding_cache_dtype': embedding_cache_dtype,
+                'model_memory_budget_mb': model_memory_budget_mb,
+                'model_idle_unload_seconds': model_idle_unload_seconds,
+                'pin_default_model': pin_default_model,
+                'warm_up_models': warm_up_models,
+                'batch_max_tokens': embedding_batch_max_tokens,
+                'batch_max_size': embedding_batch_max_size,
+                'remote_batch_size': embedding_remote_batch_size,
+                'coalesce_ms': embedding_coalesce_ms,
+                'cpu_backend': embedding_cpu_backend,
+                'contextual_max_concurrency': contextual_max_concurrency,
+                'contextual_batch_size': contextual_batch_size,
+                'contextual_context_window': contextual_context_window,
+                'contextual_cache': contextual_cache
+            },
+            'reranker_config': {
+                'backend': config.get('Reranking', 'backend', fallback='flashrank'),
+                'model': config.get('Reranking', 'model', fallback=''),
+                'max_passages': config.getint('Reranking', 'max_passages', fallback=50),
+                'score_cache_size': config.getint('Reranking', 'score_cache_size', fallback=10000)
+            },
+            'retrieval_config': {
+                'timeout': config.getfloat('Retrieval', 'timeout', fallback=10),
+                'rrf_k': config.getint('Retrieval', 'rrf_k', fallback=60),
+                'max_workers': config.getint('Retrieval', 'max_workers', fallback=8),
+                'max_candidates': config.getint('Retrieval', 'max_candidates', fallback=50)
             },
             'logging': {
                 'log_level': log_level,
@@ -6,6 +6,7 @@ import os
 import sys
 from unittest.mock import patch, MagicMock
 # Third-party library imports
+import numpy as np
 import pytest
 
 
@@ -25,7 +26,8 @@ print(f"Project root added to sys.path: {project_root}")
 #from App_Function_Libraries.Utils.Utils import load_and_log_configs
 from App_Function_Libraries.RAG.ChromaDB_Library import (
     process_and_store_content, check_embedding_status,
-    reset_chroma_collection, vector_search, store_in_chroma, batched, embedding_api_url
+    reset_chroma_collection, vector_search, vector_search_collections, store_in_chroma, batched, embedding_api_url,
+    embed_and_store_chunks
 )
 
 #
@@ -124,10 +126,10 @@ def mock_situate_context(mocker):
 
 @patch('App_Function_Libraries.RAG.ChromaDB_Library.chroma_client')
 @patch('App_Function_Libraries.RAG.ChromaDB_Library.create_embeddings_batch')
-@patch('App_Function_Libraries.RAG.ChromaDB_Library.situate_context')
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.contextualize_chunks')
 @patch('App_Function_Libraries.RAG.ChromaDB_Library.chunk_for_embedding')
 @patch('App_Function_Libraries.RAG.ChromaDB_Library.process_chunks')
-def test_process_and_store_content(mock_process_chunks, mock_chunk_for_embedding, mock_situate_context,
+def test_process_and_store_content(mock_process_chunks, mock_chunk_for_embedding, mock_contextualize_chunks,
                                    mock_create_embeddings_batch, mock_chroma_client):
     mock_database = MagicMock()
     mock_chunk_for_embedding.return_value = [{
@@ -139,7 +141,7 @@ def test_process_and_store_content(mock_process_chunks, mock_chunk_for_embedding
             'relative_position': 0.5
         }
     }]
-    mock_situate_context.return_value = "Contextualized chunk"
+    mock_contextualize_chunks.return_value = ["Contextualized chunk"]
     mock_create_embeddings_batch.return_value = [[0.1, 0.2, 0.3]]
     mock_collection = MagicMock()
     mock_chroma_client.get_collection.side_effect = Exception("Collection not found")
@@ -157,21 +159,22 @@ def test_process_and_store_content(mock_process_chunks, mock_chunk_for_embedding
 
     mock_chunk_for_embedding.assert_called_once()
     mock_process_chunks.assert_called_once()
-    mock_situate_context.assert_called_once()
+    mock_contextualize_chunks.assert_called_once()
     mock_create_embeddings_batch.assert_called_once()
 
     # Check if get_collection was called
     mock_chroma_client.get_collection.assert_called_once_with(name="test_collection")
 
-    # Check if create_collection was called after get_collection raised an exception
-    mock_chroma_client.create_collection.assert_called_once_with(name="test_collection")
+    # Check if create_collection was called after get_collection raised an exception, recording the embedding model
+    mock_chroma_client.create_collection.assert_called_once()
+    create_kwargs = mock_chroma_client.create_collection.call_args.kwargs
+    assert create_kwargs['name'] == "test_collection"
+    assert {'embedding_provider', 'embedding_model', 'embedding_dim'} <= set(create_kwargs['metadata'])
 
     mock_collection.upsert.assert_called_once()
 
-    # Check for both execute_query calls
-    assert mock_database.execute_query.call_count == 2
-    mock_database.execute_query.assert_any_call('UPDATE Media SET vector_processing = 1 WHERE id = ?', (1,))
-    mock_database.execute_query.assert_any_call('INSERT OR REPLACE INTO media_fts (rowid, title, content) SELECT id, title, content FROM Media WHERE id = ?', (1,))
+    # Only the processed flag is written; the FTS index is kept up to date by its triggers
+    mock_database.execute_query.assert_called_once_with('UPDATE Media SET vector_processing = 1 WHERE id = ?', (1,))
 
 ##############################
 # Test: check_embedding_status
@@ -225,12 +228,87 @@ def test_store_in_chroma(mock_chroma_client):
     )
 
     mock_chroma_client.get_collection.assert_called_once_with(name="test_collection")
-    mock_collection.upsert.assert_called_once_with(
-        documents=["Text 1", "Text 2"],
-        embeddings=[[0.1, 0.2], [0.3, 0.4]],
-        ids=["id1", "id2"],
-        metadatas=[{"key1": "value1"}, {"key2": "value2"}]
-    )
+    mock_collection.upsert.assert_called_once()
+    upserted = mock_collection.upsert.call_args.kwargs
+    assert upserted['documents'] == ["Text 1", "Text 2"]
+    assert upserted['ids'] == ["id1", "id2"]
+    assert upserted['metadatas'] == [{"key1": "value1"}, {"key2": "value2"}]
+    # Embeddings are passed on as float32 (a numpy array when the installed chromadb accepts one)
+    np.testing.assert_allclose(np.asarray(upserted['embeddings']), [[0.1, 0.2], [0.3, 0.4]], rtol=1e-6)
+
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.chroma_upsert_batch_size', 400)
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.chroma_client')
+def test_store_in_chroma_upserts_in_batches_without_reading_back(mock_chroma_client):
+    mock_collection = MagicMock()
+    mock_collection.metadata = {'embedding_provider': 'openai', 'embedding_model': 'small', 'embedding_dim': 4}
+    mock_chroma_client.get_collection.return_value = mock_collection
+    mock_chroma_client.get_max_batch_size.return_value = 5461
+    count = 1000
+
+    store_in_chroma("test_collection", [f"Text {i}" for i in range(count)], np.ones((count, 4), dtype=np.float32),
+                    [f"id{i}" for i in range(count)], [{"i": i} for i in range(count)],
+                    embedding_provider='openai', embedding_model='small', verify_sample=0)
+
+    assert [len(call.kwargs['ids']) for call in mock_collection.upsert.call_args_list] == [400, 400, 200]
+    # The dimension comes from the collection metadata, and nothing is read back after the write
+    mock_collection.get.assert_not_called()
+    mock_collection.modify.assert_not_called()
+
+
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.chroma_client')
+def test_store_in_chroma_sampled_verification_reports_missing_ids(mock_chroma_client):
+    mock_collection = MagicMock()
+    mock_collection.metadata = {'embedding_dim': 2}
+    mock_chroma_client.get_collection.return_value = mock_collection
+    mock_collection.get.return_value = {'ids': []}
+
+    with pytest.raises(ValueError, match="Failed to store embeddings"):
+        store_in_chroma("test_collection", ["Text 1", "Text 2"], [[0.1, 0.2], [0.3, 0.4]], ["id1", "id2"],
+                        [{"key": 1}, {"key": 2}], verify_sample=1)
+    sampled = mock_collection.get.call_args.kwargs
+    assert len(sampled['ids']) == 1 and sampled['include'] == []
+
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.clear_chunk_hashes')
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.chroma_client')
+def test_store_in_chroma_clears_chunk_hashes_when_recreating_collection(mock_chroma_client, mock_clear_chunk_hashes):
+    mock_chroma_client.get_collection.return_value = MagicMock(metadata={'embedding_dim': 3})
+
+    store_in_chroma("test_collection", ["Text 1"], [[0.1, 0.2]], ["id1"], [{"key": 1}], verify_sample=0)
+
+    mock_chroma_client.delete_collection.assert_called_once_with(name="test_collection")
+    mock_clear_chunk_hashes.assert_called_once_with("test_collection", None)
+
+##############################
+# Test: embed_and_store_chunks
+##############################
+
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.register_chunk_embeddings')
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.lookup_chunk_embeddings')
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.create_embeddings_batch')
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.chroma_client')
+def test_embed_and_store_chunks_stores_linked_chunks_under_their_own_ids(mock_chroma_client, mock_create_embeddings,
+                                                                         mock_lookup, mock_register):
+    collection = MagicMock(metadata={'embedding_provider': 'openai', 'embedding_model': 'small', 'embedding_dim': 2})
+    collection.get.return_value = {'ids': ['1_chunk_1', '1_chunk_2'], 'embeddings': [[1.0, 0.0], [0.0, 1.0]]}
+    mock_chroma_client.get_collection.return_value = collection
+    # "shared" was stored for media 1; "own" is media 1's chunk being stored again under the same id
+    mock_lookup.return_value = {'shared': {'media': '1_chunk_1'}, 'own': {'media': '1_chunk_2'}}
+    mock_create_embeddings.return_value = [[0.5, 0.5]]
+
+    counts = embed_and_store_chunks(None, 'media', ['intro', 'body', 'intro', 'again'],
+                                    ['2_chunk_1', '2_chunk_2', '2_chunk_3', '1_chunk_2'],
+                                    [{'media_id': '2'}] * 3 + [{'media_id': '1'}], ['shared', 'new', 'shared', 'own'],
+                                    'openai', 'small', None)
+
+    assert counts == {'embedded': 1, 'copied': 0, 'linked': 3}
+    mock_create_embeddings.assert_called_once_with(['body'], 'openai', 'small', None)
+    upserted = collection.upsert.call_args.kwargs
+    # Media 2's copies of the shared chunk (one per occurrence) get media 2's ids and metadata
+    assert upserted['ids'] == ['2_chunk_1', '2_chunk_2', '2_chunk_3']
+    assert [m['media_id'] for m in upserted['metadatas']] == ['2', '2', '2']
+    np.testing.assert_allclose(np.asarray(upserted['embeddings']), [[1.0, 0.0], [0.5, 0.5], [1.0, 0.0]])
+    # Only the newly embedded chunk gets a hash mapping; linked ones keep pointing at the stored embedding
+    assert mock_register.call_args.args[0] == [('new', '2_chunk_2')]
 
 ##############################
 # Test: vector_search
@@ -266,6 +344,75 @@ def test_vector_search(mock_create_embedding, mock_chroma_client):
     assert results[0]['content'] == "Document 1"
     assert results[0]['metadata'] == "metadata1"
 
+##############################
+# Test: vector_search_collections
+##############################
+
+def _collection(name, provider, model, dim=3):
+    collection = MagicMock()
+    collection.name = name
+    collection.metadata = {'embedding_provider': provider, 'embedding_model': model, 'embedding_dim': dim}
+    collection.query.return_value = {'documents': [[f"doc from {name}"]], 'metadatas': [[{'media_id': name}]]}
+    return collection
+
+
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.chroma_client')
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.create_embedding')
+def test_vector_search_collections_embeds_query_once_per_model(mock_create_embedding, mock_chroma_client):
+    collections = [_collection(f"col_{i}", 'openai', 'small') for i in range(5)] + \
+        [_collection("col_large", 'openai', 'large')]
+    mock_chroma_client.list_collections.return_value = collections
+    mock_create_embedding.return_value = [0.1, 0.2, 0.3]
+
+    results = vector_search_collections("query text", k=3)
+
+    assert mock_create_embedding.call_count == 2
+    assert {call.args[2] for call in mock_create_embedding.call_args_list} == {'small', 'large'}
+    # Collection metadata is enough; no chunks are sampled to find the model
+    for collection in collections:
+        collection.get.assert_not_called()
+    assert [result['content'] for result in results] == [f"doc from {c.name}" for c in collections]
+
+
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.chroma_client')
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.create_embedding')
+def test_vector_search_collections_pushes_metadata_filter_into_query(mock_create_embedding, mock_chroma_client):
+    collection = _collection("col_0", 'openai', 'small')
+    mock_chroma_client.list_collections.return_value = [collection]
+    mock_create_embedding.return_value = [0.1, 0.2, 0.3]
+
+    vector_search_collections("query text", k=3, where={"media_id": {"$in": ["1", "2"]}})
+
+    assert collection.query.call_args.kwargs['where'] == {"media_id": {"$in": ["1", "2"]}}
+
+
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.chroma_client')
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.create_embedding')
+def test_vector_search_collections_merges_collections_by_distance(mock_create_embedding, mock_chroma_client):
+    near, far = _collection("col_near", 'openai', 'small'), _collection("col_far", 'openai', 'small')
+    far.query.return_value = {'documents': [["far 1", "far 2"]], 'metadatas': [[{}, {}]], 'distances': [[0.4, 0.9]]}
+    near.query.return_value = {'documents': [["near 1", "near 2"]], 'metadatas': [[{}, {}]], 'distances': [[0.1, 0.5]]}
+    mock_chroma_client.list_collections.return_value = [far, near]
+    mock_create_embedding.return_value = [0.1, 0.2, 0.3]
+
+    results = vector_search_collections("query text", k=2)
+
+    assert [result['content'] for result in results] == ["near 1", "far 1", "near 2", "far 2"]
+    assert [result['distance'] for result in results] == [0.1, 0.4, 0.5, 0.9]
+    assert far.query.call_args.kwargs['include'] == ["documents", "metadatas", "distances"]
+
+
+@patch('App_Function_Libraries.RAG.ChromaDB_Library.chroma_client')
+def test_store_in_chroma_records_embedding_model_on_new_collection(mock_chroma_client):
+    mock_chroma_client.get_collection.side_effect = ValueError("Collection does not exist")
+
+    store_in_chroma("new_collection", ["Text 1"], [[0.1, 0.2]], ["id1"], [{"key": "value"}],
+                    embedding_provider="openai", embedding_model="text-embedding-3-small")
+
+    mock_chroma_client.create_collection.assert_called_once_with(
+        name="new_collection",
+        metadata={'embedding_provider': 'openai', 'embedding_model': 'text-embedding-3-small', 'embedding_dim': 2})
+
 ##############################
 # Parametrized Test: batched
 ##############################
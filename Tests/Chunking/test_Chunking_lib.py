@@ -15,6 +15,7 @@ from App_Function_Libraries.Chunk_Lib import (
     chunk_text_by_words,
     chunk_text_by_sentences,
     chunk_text_by_paragraphs,
+    chunk_text_by_tokens,
     chunk_ebook_by_chapters,
     semantic_chunking,
     get_chunk_metadata,
@@ -66,5 +67,34 @@ class TestChunkLib(unittest.TestCase):
         self.assertIn('start_index', metadata)
         self.assertIn('relative_position', metadata)
 
+    def test_word_chunk_offsets_with_repeated_text(self):
+        text = "alpha beta  gamma\nalpha beta  gamma\n\nalpha beta"
+        chunks = chunk_text_by_words(text, max_words=3, overlap=0, language='en', with_offsets=True)
+        self.assertEqual([c['text'] for c in chunks], ["alpha beta gamma", "alpha beta gamma", "alpha beta"])
+        # Repeated chunks must map to their own occurrence, not the first one
+        self.assertEqual([(c['start_index'], c['end_index']) for c in chunks], [(0, 17), (18, 35), (37, 47)])
+
+    def test_paragraph_and_token_chunk_offsets(self):
+        text = "Paragraph one.\n\nParagraph two.\n\n\nParagraph three."
+        for chunk in chunk_text_by_paragraphs(text, max_paragraphs=1, with_offsets=True):
+            self.assertEqual(text[chunk['start_index']:chunk['end_index']], chunk['text'])
+        for chunk in chunk_text_by_tokens(text, max_tokens=4, overlap=1, with_offsets=True):
+            self.assertEqual(text[chunk['start_index']:chunk['end_index']].split(), chunk['text'].split())
+
+    def test_chapter_and_process_offsets(self):
+        text = "# Chapter 1\nSame text.\n# Chapter 2\nSame text."
+        chunks = chunk_ebook_by_chapters(text, {'max_size': 1000, 'overlap': 0})
+        for chunk in chunks:
+            metadata = chunk['metadata']
+            self.assertEqual(text[metadata['start_index']:metadata['end_index']], chunk['text'])
+
+        header = "This text was transcribed using whisper\n\n"
+        body = "one two three four five"
+        chunks = improved_chunking_process(header + body, {'method': 'words', 'max_size': 2, 'overlap': 0,
+                                                            'language': 'en'})
+        for chunk in chunks:
+            metadata = chunk['metadata']
+            self.assertEqual((header + body)[metadata['start_index']:metadata['end_index']], chunk['text'])
+
 if __name__ == '__main__':
     unittest.main()
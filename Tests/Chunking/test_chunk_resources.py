@@ -0,0 +1,55 @@
+# test_chunk_resources.py
+#
+#
+# Imports
+import os
+import subprocess
+import sys
+#
+# External library imports
+import pytest
+#
+# Add the project root (parent directory of App_Function_Libraries) to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+#
+# Local imports
+from App_Function_Libraries import Chunk_Lib, Tokenization_Methods_Lib
+#
+################################################################################################################################################################
+#
+# Test: lazily loaded chunking resources
+
+
+def test_import_does_not_load_heavy_resources():
+    code = ("import sys; import App_Function_Libraries.Chunk_Lib as c; "
+            "print(sorted(m for m in ('transformers', 'nltk', 'openai', 'sklearn') if m in sys.modules)); "
+            "print([n for n in c.chunk_resources.names() if c.chunk_resources.is_open(n)])")
+    output = subprocess.run([sys.executable, "-c", code], cwd=project_root, capture_output=True, text=True,
+                            env=dict(os.environ, HF_HUB_OFFLINE="1"), timeout=120).stdout.splitlines()
+    assert output[-2:] == ["[]", "[]"]
+
+
+def test_sentences_are_split_on_punctuation_without_punkt(monkeypatch):
+    monkeypatch.setattr(Chunk_Lib, 'chunking_offline', True)
+    monkeypatch.setattr(Chunk_Lib, '_punkt_installed', lambda: False)
+    Chunk_Lib.chunk_resources.close('nltk_punkt')
+    try:
+        assert Chunk_Lib.sent_tokenize("First one. Second one? Third") == ["First one.", "Second one?", "Third"]
+    finally:
+        Chunk_Lib.chunk_resources.close('nltk_punkt')
+
+
+def test_offline_mode_does_not_download_the_tokenizer(monkeypatch):
+    transformers = pytest.importorskip("transformers")
+    calls = []
+
+    def from_pretrained(name, **kwargs):
+        calls.append(kwargs)
+        raise OSError("not cached")
+
+    monkeypatch.setattr(Tokenization_Methods_Lib, '_offline_mode', lambda: True)
+    monkeypatch.setattr(transformers.AutoTokenizer, 'from_pretrained', from_pretrained)
+    with pytest.raises(OSError, match="offline mode"):
+        Tokenization_Methods_Lib.load_hf_tokenizer("gpt2")
+    assert calls == [{'use_fast': True, 'local_files_only': True}]
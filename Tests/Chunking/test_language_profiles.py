@@ -0,0 +1,79 @@
+# test_language_profiles.py
+#
+#
+# Imports
+import os
+import sys
+import types
+#
+# External library imports
+import pytest
+#
+# Add the project root (parent directory of App_Function_Libraries) to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+#
+# Local imports
+from App_Function_Libraries import Chunk_Lib
+from App_Function_Libraries.Chunk_Lib import chunk_text_by_words, detect_language, get_language_profile
+#
+################################################################################################################################################################
+#
+# Test: language profiles
+
+def test_detection_reads_a_bounded_sample(monkeypatch):
+    samples = []
+    monkeypatch.setattr(Chunk_Lib, 'detect', lambda text: samples.append(text) or 'de')
+    text = "Einleitung. " + "Der Fluss stieg im Frühjahr wieder an. " * 20000
+    assert detect_language(text) == 'de'
+    assert len(samples[0]) <= Chunk_Lib.LANGUAGE_SAMPLE_CHARS + 2
+    # Start, middle and end of the document
+    assert samples[0].startswith("Einleitung.")
+
+
+def test_detection_is_deterministic():
+    # Short mixed text is where unseeded langdetect flips between answers
+    text = "Hola, hello, ciao, bonjour"
+    assert len({detect_language(text) for _ in range(10)}) == 1
+
+
+def test_profiles_are_shared_per_language():
+    assert get_language_profile('en') is get_language_profile('English')
+    assert get_language_profile('en') is get_language_profile('en-US')
+    assert get_language_profile(None) is get_language_profile('en')
+    assert get_language_profile('de').nltk_language == 'german'
+    assert get_language_profile('zh-cn') is get_language_profile('zh-tw')
+
+
+def test_japanese_tagger_is_built_once(monkeypatch):
+    created = []
+
+    class Word:
+        def __init__(self, surface):
+            self.surface = surface
+
+    class Tagger:
+        def __init__(self):
+            created.append(self)
+
+        def __call__(self, text):
+            return [Word(character) for character in text if not character.isspace()]
+
+    monkeypatch.setitem(sys.modules, 'fugashi', types.SimpleNamespace(Tagger=Tagger))
+    # A fresh Japanese profile, so the tagger is built inside this test
+    get_language_profile('ja')
+    Chunk_Lib.chunk_resources.close('language_profile:ja')
+    try:
+        for _ in range(3):
+            chunks = chunk_text_by_words("今日は 晴れ", max_words=2, language='ja', with_offsets=True)
+        assert [chunk['text'] for chunk in chunks] == ["今 日", "は 晴", "れ"]
+        assert len(created) == 1
+    finally:
+        Chunk_Lib.chunk_resources.close('language_profile:ja')
+
+
+def test_english_stopwords_are_available():
+    pytest.importorskip("sklearn")
+    stopwords = get_language_profile('en').stopwords
+    assert {'the', 'and', 'of'} <= stopwords
+    assert get_language_profile('en').stopwords is stopwords
@@ -0,0 +1,138 @@
+# test_streaming_chunking.py
+#
+#
+# Imports
+import io
+import os
+import sys
+import xml.etree.ElementTree as ET
+#
+# External library imports
+import pytest
+#
+# Add the project root (parent directory of App_Function_Libraries) to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+#
+# Local imports
+from App_Function_Libraries.Chunk_Lib import chunk_ebook_by_chapters, chunk_text, chunk_xml, \
+    extract_xml_structure, stream_chunks, stream_ebook_chapters, stream_xml_chunks
+#
+################################################################################################################################################################
+#
+# Test: streaming chunking
+
+def make_text(paragraphs=30):
+    sentences = ["The river rose again this spring.", "Nobody in the valley was surprised!",
+                 "Did the old bridge hold?", "It did, barely, and the mill kept running."]
+    return "\n\n".join(" ".join(sentences[(p + i) % 4] for i in range(p % 5 + 2)) + f" Paragraph {p}."
+                       for p in range(paragraphs))
+
+
+@pytest.mark.parametrize("method,max_size,overlap", [
+    ("words", 40, 10),
+    ("sentences", 4, 1),
+    ("paragraphs", 3, 1),
+    ("tokens", 60, 5),
+])
+def test_streamed_chunks_match_whole_text_chunking(method, max_size, overlap):
+    text = make_text()
+    expected = chunk_text(text, method, max_size, overlap, 'en', with_offsets=True)
+    streamed = list(stream_chunks(io.StringIO(text), {'method': method, 'max_size': max_size, 'overlap': overlap,
+                                                      'language': 'en'}, block_chars=300))
+    assert [(c['text'], c['metadata']['start_index'], c['metadata']['end_index']) for c in streamed] == \
+        [(c['text'], c['start_index'], c['end_index']) for c in expected]
+    assert [c['metadata']['chunk_index'] for c in streamed] == list(range(1, len(expected) + 1))
+
+
+def test_chunks_are_yielded_before_the_stream_is_read():
+    pulled = []
+
+    def segments():
+        for i in range(1000):
+            pulled.append(i)
+            yield f"segment {i} of a very long transcript. "
+
+    chunks = stream_chunks(segments(), {'method': 'words', 'max_size': 50, 'overlap': 0, 'language': 'en'},
+                           block_chars=500)
+    first = next(chunks)
+    assert first['text'].startswith("segment 0 of")
+    assert len(pulled) < 50
+    assert sum(1 for _ in chunks) > 10
+
+
+def test_binary_handles_are_decoded_across_block_boundaries():
+    text = "Größe über alles — naïve café. " * 50
+    streamed = list(stream_chunks(io.BytesIO(text.encode('utf-8')),
+                                  {'method': 'words', 'max_size': 7, 'overlap': 0, 'language': 'de'}, block_chars=64))
+    assert all(text[c['metadata']['start_index']:c['metadata']['end_index']].split() == c['text'].split()
+               for c in streamed)
+    assert " ".join(c['text'] for c in streamed) == " ".join(text.split())
+
+
+def test_a_single_huge_paragraph_is_cut_instead_of_buffered(monkeypatch):
+    from App_Function_Libraries import Chunk_Lib
+    windows = []
+    original = Chunk_Lib.chunk_text
+
+    def recording_chunk_text(text, *args, **kwargs):
+        windows.append(len(text))
+        return original(text, *args, **kwargs)
+
+    monkeypatch.setattr(Chunk_Lib, 'chunk_text', recording_chunk_text)
+    text = "one long paragraph without a break " * 500
+    streamed = list(stream_chunks(io.StringIO(text), {'method': 'paragraphs', 'max_size': 1, 'overlap': 0,
+                                                      'language': 'en'}, block_chars=300))
+    assert len(streamed) > 1
+    assert max(windows) <= 3 * 300
+    assert " ".join(c['text'] for c in streamed).split() == text.split()
+    assert all(text[c['metadata']['start_index']:c['metadata']['end_index']].split() == c['text'].split()
+               for c in streamed)
+
+
+def test_unstreamable_methods_are_rejected():
+    with pytest.raises(ValueError):
+        next(stream_chunks("{}", {'method': 'json'}))
+
+
+XML = """<?xml version="1.0" encoding="UTF-8"?>
+<mediawiki version="0.10" lang="en">
+  <siteinfo><sitename>Wiki</sitename></siteinfo>
+  <page id="1"><title>First page</title>
+    <revision><text>Some article text that is long enough to matter here</text></revision>
+  </page>
+  <page id="2"><title>Second page</title>
+    <revision><text>More text</text><comment>fixed typo</comment></revision>
+  </page>
+</mediawiki>"""
+
+
+def test_xml_stream_matches_the_document_structure():
+    chunks = list(stream_xml_chunks(io.BytesIO(XML.encode('utf-8')), {'max_size': 12, 'overlap': 0}))
+    # Every (path, text) item of the tree, in document order
+    expected = extract_xml_structure(ET.fromstring(XML))
+    assert [line for chunk in chunks for line in chunk['text'].split('\n')] == [f"{p}: {c}" for p, c in expected]
+    assert len(chunks) > 1
+    assert chunks[0]['metadata']['root_tag'] == 'mediawiki'
+    assert chunks[0]['metadata']['xml_attributes'] == {'version': '0.10', 'lang': 'en'}
+    assert chunk_xml(XML, {'max_size': 12, 'overlap': 0}) == \
+        [{**chunk, 'metadata': {**chunk['metadata'], 'total_chunks': len(chunks)}} for chunk in chunks]
+
+
+@pytest.mark.parametrize("as_stream", [io.StringIO, lambda text: iter(text.splitlines(keepends=True))])
+def test_streamed_chapters_match_chunk_ebook_by_chapters(as_stream):
+    text = "Title page\n\n" + "".join(f"# Chapter {i}\n{make_text(3)}\n\n" for i in range(1, 6))
+    options = {'max_size': 1000, 'overlap': 20}
+    expected = chunk_ebook_by_chapters(text, options)
+    streamed = list(stream_ebook_chapters(as_stream(text), options, block_chars=100))
+    assert [c['text'] for c in streamed] == [c['text'] for c in expected]
+    for chunk, whole in zip(streamed, expected):
+        metadata = {key: value for key, value in whole['metadata'].items() if key != 'relative_position'}
+        assert chunk['metadata'] == metadata
+
+
+def test_books_without_headings_are_streamed_as_text():
+    text = "just some lowercase prose, nothing more. " * 20
+    chunks = list(stream_ebook_chapters(io.StringIO(text), {'max_size': 30, 'overlap': 0, 'language': 'en'}))
+    assert len(chunks) > 1
+    assert chunks[0]['metadata']['chunk_method'] == 'words'
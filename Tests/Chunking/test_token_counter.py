@@ -0,0 +1,191 @@
+# test_token_counter.py
+#
+#
+# Imports
+import os
+import sys
+#
+# External library imports
+import pytest
+#
+# Add the project root (parent directory of App_Function_Libraries) to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+#
+# Local imports
+from App_Function_Libraries import Tokenization_Methods_Lib
+from App_Function_Libraries.Chunk_Lib import chunk_text_by_tokens, combine_chunks_with_no_minimum
+from App_Function_Libraries.Tokenization_Methods_Lib import clear_token_counters, get_token_counter, tokenizer_backend
+#
+################################################################################################################################################################
+#
+# Test: token counting service
+
+SAMPLE_TEXT = ("The quick brown fox jumps over the lazy dog. Tokenizers split text into pieces, and chunkers "
+               "need to know how many pieces a chunk holds before sending it to a model with a context limit. "
+               "Numbers like 1234567 and punctuation!? count too.")
+
+
+@pytest.fixture(scope="module")
+def bpe_model(tmp_path_factory):
+    """A small byte-level BPE tokenizer (GPT-2 style) saved as a local Hugging Face model, so no download is needed."""
+    tokenizers = pytest.importorskip("tokenizers")
+    transformers = pytest.importorskip("transformers")
+    bpe = tokenizers.ByteLevelBPETokenizer()
+    bpe.train_from_iterator([SAMPLE_TEXT] * 5, vocab_size=300, min_frequency=1, show_progress=False)
+    model_dir = str(tmp_path_factory.mktemp("bpe_tokenizer"))
+    transformers.PreTrainedTokenizerFast(tokenizer_object=bpe._tokenizer).save_pretrained(model_dir)
+    return model_dir
+
+
+def test_tokenizer_is_selected_by_model_name():
+    assert tokenizer_backend("gpt-4o") == "tiktoken"
+    assert tokenizer_backend("openai/gpt-3.5-turbo") == "tiktoken"
+    assert tokenizer_backend("cl100k_base") == "tiktoken"
+    assert tokenizer_backend("gpt2") == "huggingface"
+    assert tokenizer_backend("meta-llama/Llama-3.1-8B-Instruct") == "huggingface"
+
+
+def test_counters_are_cached_and_count_like_the_tokenizer(bpe_model):
+    counter = get_token_counter(bpe_model)
+    assert counter.backend == "huggingface"
+    assert get_token_counter(bpe_model) is counter
+    assert counter.count(SAMPLE_TEXT) == len(counter.tokenizer.encode(SAMPLE_TEXT, add_special_tokens=False))
+    assert counter.count_batch(["", "fox", SAMPLE_TEXT]) == [0, len(counter.encode("fox")), counter.count(SAMPLE_TEXT)]
+
+
+def test_long_texts_are_counted_in_batched_pieces(bpe_model, monkeypatch):
+    counter = get_token_counter(bpe_model)
+    text = "  ".join([SAMPLE_TEXT] * 20)
+    expected = len(counter.encode(text))
+    monkeypatch.setattr(Tokenization_Methods_Lib, 'BATCH_PIECE_CHARS', 100)
+    assert counter.count(text) == expected
+
+
+def test_token_chunks_fit_the_limit_exactly(bpe_model):
+    counter = get_token_counter(bpe_model)
+    text = " ".join([SAMPLE_TEXT] * 3)
+    chunks = chunk_text_by_tokens(text, max_tokens=20, model=bpe_model, with_offsets=True)
+    assert len(chunks) > 1
+    for chunk, following in zip(chunks, chunks[1:] + [None]):
+        assert counter.count(chunk['text']) <= 20
+        assert text[chunk['start_index']:chunk['end_index']].split() == chunk['text'].split()
+        if following:
+            # Chunks are filled greedily: the next word would not have fit
+            next_word = following['text'].split()[0]
+            assert counter.count(chunk['text'] + " " + next_word) > 20
+
+
+def test_combined_chunks_respect_the_model_token_limit(bpe_model):
+    counter = get_token_counter(bpe_model)
+    words = SAMPLE_TEXT.split(" ")
+    combined, indices, dropped = combine_chunks_with_no_minimum(words, 25, chunk_delimiter=" ", model=bpe_model)
+    assert dropped == 0
+    assert 1 < len(combined) < len(words)
+    assert sum(indices, []) == list(range(len(words)))
+    assert all(counter.count(chunk) <= 25 for chunk in combined)
+
+
+def test_tokenizers_that_cannot_load_fall_back(monkeypatch):
+    def unavailable(model):
+        raise OSError("not cached")
+
+    monkeypatch.setattr(Tokenization_Methods_Lib, '_counters', {})
+    monkeypatch.setattr(Tokenization_Methods_Lib, 'load_hf_tokenizer', unavailable)
+    counter = get_token_counter("someone/missing-model")
+    # Falls back to GPT-2, and since that cannot load either, to an estimate
+    assert counter is get_token_counter("gpt2")
+    assert counter.backend == "estimate" and not counter.exact
+    assert counter.count("abcdefgh") == 3
+
+
+def test_the_default_model_is_read_from_the_config_once(monkeypatch, bpe_model):
+    reads = []
+    monkeypatch.setattr(Tokenization_Methods_Lib, 'load_and_log_configs',
+                        lambda: reads.append(1) or {'chunking_config': {'tokenizer_model': bpe_model}})
+    clear_token_counters()
+    try:
+        counter = get_token_counter()
+        assert counter.model == bpe_model
+        assert all(get_token_counter() is counter for _ in range(20))
+        assert len(reads) == 1
+        clear_token_counters()
+        get_token_counter()
+        assert len(reads) == 2
+    finally:
+        monkeypatch.undo()
+        clear_token_counters()
+
+
+def test_chat_token_counts_use_the_selected_endpoints_model(monkeypatch):
+    from App_Function_Libraries.Chat import Chat_Functions
+    monkeypatch.setattr(Chat_Functions, 'load_and_log_configs',
+                        lambda: {'openai_api': {'model': 'gpt-4o'}, 'llama_api': {'api_ip': 'http://localhost'}})
+    models = []
+    monkeypatch.setattr(Chat_Functions, 'count_tokens_batch',
+                        lambda texts, model=None: models.append(model) or [2] * len(texts))
+    history = [("hi", "hello"), ("how are you", None)]
+
+    assert Chat_Functions.approximate_token_count(history, api_endpoint="OpenAI") == 6
+    # No model configured for the endpoint, or no endpoint selected: the default tokenizer counts
+    assert Chat_Functions.approximate_token_count(history, api_endpoint="Llama.cpp") == 6
+    assert Chat_Functions.approximate_token_count(history, api_endpoint="None") == 6
+    assert models == ['gpt-4o', None, None]
+
+
+def _reference_combine(chunks, max_tokens, counter, chunk_delimiter, header=None, add_ellipsis_for_overflow=False):
+    # The original algorithm, which re-tokenizes the whole candidate for every chunk
+    dropped_chunk_count = 0
+    output, output_indices = [], []
+    candidate = [header] if header else []
+    candidate_indices = []
+    for chunk_i, chunk in enumerate(chunks):
+        chunk_with_header = [chunk] if not header else [header, chunk]
+        if counter.count(chunk_delimiter.join(candidate + chunk_with_header)) > max_tokens:
+            if add_ellipsis_for_overflow and len(candidate) > 0:
+                if counter.count(chunk_delimiter.join(candidate + ["..."])) <= max_tokens:
+                    candidate = candidate + ["..."]
+                    dropped_chunk_count += 1
+            if len(candidate) > 0:
+                output.append(chunk_delimiter.join(candidate))
+                output_indices.append(candidate_indices)
+                candidate = chunk_with_header
+                candidate_indices = [chunk_i]
+            else:
+                dropped_chunk_count += 1
+        else:
+            candidate.extend(chunk_with_header)
+            candidate_indices.append(chunk_i)
+    if candidate:
+        output.append(chunk_delimiter.join(candidate))
+        output_indices.append(candidate_indices)
+    return output, output_indices, dropped_chunk_count
+
+
+@pytest.mark.parametrize("delimiter,header,ellipsis", [
+    ("\n\n", None, False),
+    (".", None, True),
+    (" ", "Section 1:", False),
+    ("\n", "Notes", True),
+])
+def test_chunk_combination_matches_full_retokenization(bpe_model, delimiter, header, ellipsis):
+    counter = get_token_counter(bpe_model)
+    text = delimiter.join(f'"{sentence}" ({i}), then more text!' for i, sentence in enumerate(SAMPLE_TEXT.split(". ")))
+    chunks = (text + delimiter) * 5
+    chunks = chunks.split(delimiter)
+    for max_tokens in (15, 40, 90, 400):
+        expected = _reference_combine(chunks, max_tokens, counter, delimiter, header, ellipsis)
+        assert combine_chunks_with_no_minimum(chunks, max_tokens, chunk_delimiter=delimiter, header=header,
+                                              add_ellipsis_for_overflow=ellipsis, model=bpe_model) == expected
+
+
+def test_chunk_combination_tokenizes_in_a_fixed_number_of_batches(bpe_model, monkeypatch):
+    counter = get_token_counter(bpe_model)
+    calls = []
+    count_batch = counter.count_batch
+    monkeypatch.setattr(counter, 'count_batch', lambda texts: calls.append(len(texts)) or count_batch(texts))
+    chunks = SAMPLE_TEXT.split(" ") * 200
+    combined, _, _ = combine_chunks_with_no_minimum(chunks, 50, chunk_delimiter=" ", model=bpe_model)
+    assert len(combined) > 10
+    # The chunks, the header/ellipsis and the joins: each one batch, however many chunks there are
+    assert len(calls) == 3
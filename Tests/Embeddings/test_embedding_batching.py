@@ -0,0 +1,70 @@
+# tests/test_embedding_batching.py
+import threading
+
+import numpy as np
+
+from App_Function_Libraries.RAG import Embeddings_Create
+from App_Function_Libraries.RAG.Embeddings_Create import EmbeddingRequestCoalescer, plan_micro_batches
+#
+####################################################################################################
+# Test Status:
+# Works as expected - 2026-10-18
+
+def test_micro_batches_are_length_sorted_and_token_budgeted():
+    lengths = [500, 10, 12, 480, 11, 300]
+    batches = plan_micro_batches(lengths, max_batch_tokens=1000, max_batch_size=64)
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    for batch in batches:
+        assert max(lengths[i] for i in batch) * len(batch) <= 1000
+    # The three short texts share a batch instead of being padded alongside the long ones
+    assert [1, 4, 2] in batches
+
+
+def test_micro_batches_respect_max_batch_size():
+    batches = plan_micro_batches([5] * 10, max_batch_tokens=10_000, max_batch_size=4)
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+
+
+def test_coalescer_merges_concurrent_requests():
+    calls = []
+    release = threading.Event()
+
+    def embed(texts):
+        calls.append(list(texts))
+        release.wait(5)
+        return [[float(len(text))] for text in texts]
+
+    coalescer = EmbeddingRequestCoalescer(embed, max_wait_seconds=0.05)
+    results = {}
+
+    def worker(name, texts):
+        results[name] = coalescer.embed(texts)
+
+    first = threading.Thread(target=worker, args=('first', ['a']))
+    first.start()
+    # While the first batch is running, the next callers queue up and are served together
+    while not calls:
+        pass
+    others = [threading.Thread(target=worker, args=(f'w{i}', ['bb' * (i + 1)])) for i in range(3)]
+    for thread in others:
+        thread.start()
+    release.set()
+    for thread in [first] + others:
+        thread.join(5)
+
+    assert len(calls) == 2 and sorted(calls[1]) == ['bb', 'bbbb', 'bbbbbb']
+    np.testing.assert_array_equal(results['w2'], [[6.0]])
+
+
+def test_openai_texts_are_packed_into_requests(monkeypatch):
+    requests_made = []
+
+    def fake_get_openai_embeddings(texts, model):
+        requests_made.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    monkeypatch.setattr(Embeddings_Create, 'get_openai_embeddings', fake_get_openai_embeddings)
+    monkeypatch.setattr(Embeddings_Create, 'embedding_remote_batch_size', 2)
+    embeddings = Embeddings_Create._create_embeddings_batch.__wrapped__(['a', 'bb', 'ccc'], 'openai', 'm', '')
+    assert requests_made == [['a', 'bb'], ['ccc']]
+    assert embeddings == [[1.0], [2.0], [3.0]]
@@ -0,0 +1,61 @@
+# tests/test_embedding_cache.py
+import functools
+
+import numpy as np
+import pytest
+
+from App_Function_Libraries.DB import Embedding_Cache_DB
+from App_Function_Libraries.RAG import Embeddings_Create
+#
+####################################################################################################
+# Test Status:
+# Works as expected - 2026-10-18
+
+@pytest.fixture
+def embedder(cache_db, monkeypatch):
+    calls = []
+
+    def fake_embed(texts, provider, model, api_url, timeout_seconds=300):
+        calls.append(list(texts))
+        return [[float(len(text)), 1.0, 0.5] for text in texts]
+
+    monkeypatch.setattr(Embeddings_Create, '_create_embeddings_batch', fake_embed)
+    monkeypatch.setattr(Embeddings_Create, 'get_cached_embeddings',
+                        functools.partial(Embedding_Cache_DB.get_cached_embeddings, database=cache_db))
+    monkeypatch.setattr(Embeddings_Create, 'store_cached_embeddings',
+                        functools.partial(Embedding_Cache_DB.store_cached_embeddings, database=cache_db))
+    return calls
+
+
+def test_only_misses_reach_the_model(embedder):
+    first = Embeddings_Create.create_embeddings_batch(['alpha', 'beta', 'alpha'], 'openai', 'm', '', use_cache=True)
+    assert embedder == [['alpha', 'beta']]
+    assert first.shape == (3, 3) and first.dtype == np.float32
+    np.testing.assert_array_equal(first[0], first[2])
+
+    # Whitespace differences normalize to the same key
+    second = Embeddings_Create.create_embeddings_batch(['beta', 'alpha  ', 'gamma'], 'openai', 'm', '', use_cache=True)
+    assert embedder == [['alpha', 'beta'], ['gamma']]
+    np.testing.assert_array_equal(second[0], first[1])
+    np.testing.assert_array_equal(second[2], [5.0, 1.0, 0.5])
+
+
+def test_cache_is_scoped_by_provider_and_model(embedder):
+    Embeddings_Create.create_embeddings_batch(['alpha'], 'openai', 'm1', '', use_cache=True)
+    Embeddings_Create.create_embeddings_batch(['alpha'], 'openai', 'm2', '', use_cache=True)
+    Embeddings_Create.create_embeddings_batch(['alpha'], 'local', 'm1', 'http://a', use_cache=True)
+    Embeddings_Create.create_embeddings_batch(['alpha'], 'local', 'm1', 'http://b', use_cache=True)
+    assert len(embedder) == 4
+
+
+def test_float16_storage_and_clear(cache_db):
+    vector = np.linspace(-1, 1, 8, dtype=np.float32)
+    Embedding_Cache_DB.store_cached_embeddings('openai', 'm', [('h1', vector)], dtype='float16', database=cache_db)
+    cached = Embedding_Cache_DB.get_cached_embeddings('openai', 'm', ['h1', 'h2'], database=cache_db)
+    assert list(cached) == ['h1'] and cached['h1'].dtype == np.float32
+    np.testing.assert_allclose(cached['h1'], vector, atol=1e-3)
+
+    assert Embedding_Cache_DB.get_embedding_cache_stats(database=cache_db) == [
+        {'provider': 'openai', 'model': 'm', 'entries': 1, 'bytes': 16}]
+    assert Embedding_Cache_DB.clear_embedding_cache(model='m', database=cache_db) == 1
+    assert Embedding_Cache_DB.get_cached_embeddings('openai', 'm', ['h1'], database=cache_db) == {}
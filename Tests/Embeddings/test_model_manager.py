@@ -0,0 +1,78 @@
+# tests/test_model_manager.py
+import time
+
+from App_Function_Libraries.RAG.Model_Manager import ModelManager
+#
+####################################################################################################
+# Test Status:
+# Works as expected - 2026-10-18
+
+MB = 1024 * 1024
+
+
+def make_manager(budget_mb=250, idle_unload_seconds=0):
+    manager = ModelManager(memory_budget_mb=budget_mb, idle_unload_seconds=idle_unload_seconds)
+    events = []
+
+    def register(name, size_mb, pinned=False):
+        manager.register(name, lambda: events.append(('load', name)) or name,
+                         unloader=lambda model: events.append(('unload', model)),
+                         size_fn=lambda model: size_mb * MB, pinned=pinned)
+    return manager, events, register
+
+
+def test_models_stay_loaded_between_uses():
+    manager, events, register = make_manager()
+    register('a', 100)
+    for _ in range(3):
+        with manager.use('a') as model:
+            assert model == 'a'
+    assert events == [('load', 'a')]
+
+
+def test_least_recently_used_model_is_evicted_over_budget():
+    manager, events, register = make_manager()
+    for name in ('a', 'b', 'c'):
+        register(name, 100)
+    manager.get('a')
+    manager.get('b')
+    manager.get('a')
+    manager.get('c')
+    assert ('unload', 'b') in events and manager.is_loaded('a') and manager.is_loaded('c')
+    assert manager.stats()['loaded_mb'] == 200
+
+
+def test_pinned_and_in_use_models_are_not_evicted():
+    manager, events, register = make_manager(budget_mb=150)
+    register('default', 100, pinned=True)
+    register('b', 100)
+    register('c', 100)
+    manager.get('default')
+    with manager.use('b'):
+        manager.get('c')
+        # 'default' is pinned and 'b' is borrowed, so only 'c' can go
+        assert manager.is_loaded('default') and manager.is_loaded('b') and not manager.is_loaded('c')
+    assert ('unload', 'default') not in events
+
+
+def test_idle_models_are_unloaded_under_budget():
+    manager, events, register = make_manager(idle_unload_seconds=0.2)
+    register('idle', 10)
+    register('pinned', 10, pinned=True)
+    manager.get('idle')
+    manager.get('pinned')
+
+    deadline = time.time() + 5
+    while manager.is_loaded('idle') and time.time() < deadline:
+        time.sleep(0.05)
+    assert not manager.is_loaded('idle') and ('unload', 'idle') in events
+    assert manager.is_loaded('pinned')
+
+
+def test_warm_up_loads_in_background():
+    manager, events, register = make_manager()
+    register('a', 10)
+    manager.warm_up(['a']).join(timeout=5)
+    assert manager.is_loaded('a') and events == [('load', 'a')]
+    manager.unload_all()
+    assert not manager.is_loaded('a')
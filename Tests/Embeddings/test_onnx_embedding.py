@@ -0,0 +1,82 @@
+# tests/test_onnx_embedding.py
+import os
+
+import numpy as np
+import pytest
+import torch
+from transformers import BertConfig, BertModel, BertTokenizer
+
+from App_Function_Libraries.RAG import ONNX_Export
+from App_Function_Libraries.RAG.Embeddings_Create import HuggingFaceEmbedder, ONNXEmbedder, masked_mean_pool
+#
+####################################################################################################
+# Test Status:
+# Works as expected - 2026-10-18
+
+WORDS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + \
+    "onnx export sample text a second somewhat longer the quick brown fox jumps over lazy dog hello world".split()
+
+
+@pytest.fixture
+def tiny_model(tmp_path):
+    """A small randomly initialised BERT saved like a Hugging Face checkpoint (no download needed)."""
+    torch.manual_seed(0)
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("\n".join(WORDS))
+    model_path = str(tmp_path / "tiny-bert")
+    BertTokenizer(str(vocab_file)).save_pretrained(model_path)
+    config = BertConfig(vocab_size=len(WORDS), hidden_size=32, num_hidden_layers=2, num_attention_heads=4,
+                        intermediate_size=64)
+    BertModel(config).save_pretrained(model_path)
+    return model_path
+
+
+def test_masked_mean_pool_ignores_padding():
+    hidden = np.array([[[1.0, 1.0], [3.0, 3.0], [100.0, 100.0]]], dtype=np.float32)
+    mask = np.array([[1, 1, 0]])
+    np.testing.assert_allclose(masked_mean_pool(hidden, mask), [[2.0, 2.0]])
+
+
+def test_huggingface_embeddings_do_not_depend_on_batch_padding(tiny_model):
+    embedder = HuggingFaceEmbedder(tiny_model, None)
+    texts = ["hello world", "the quick brown fox jumps over the lazy dog hello world"]
+    batched = embedder.create_embeddings(texts)
+    alone = embedder.create_embeddings(texts[:1])
+    # The short text is padded in the batch but not on its own
+    np.testing.assert_allclose(batched[0], alone[0], atol=1e-5)
+
+
+def test_cached_export_is_reused(tmp_path, monkeypatch):
+    target = ONNX_Export.quantized_onnx_model_path("org/model", str(tmp_path))
+    os.makedirs(os.path.dirname(target))
+    open(target, "wb").close()
+    monkeypatch.setattr(ONNX_Export, "export_onnx_model", lambda *args, **kwargs: pytest.fail("re-exported"))
+    assert ONNX_Export.get_quantized_onnx_model("org/model", str(tmp_path)) == target
+
+
+def test_failed_export_leaves_nothing_behind(tmp_path, monkeypatch):
+    def broken_export(model_name, output_path, **kwargs):
+        open(output_path, "wb").close()
+        raise RuntimeError("unsupported operator")
+
+    monkeypatch.setattr(ONNX_Export, "export_onnx_model", broken_export)
+    with pytest.raises(RuntimeError):
+        ONNX_Export.get_quantized_onnx_model("org/model", str(tmp_path))
+    assert os.listdir(tmp_path / "org") == []
+
+
+def test_quantized_export_matches_torch_embeddings(tiny_model, tmp_path):
+    pytest.importorskip("onnx")
+    output_dir = str(tmp_path / "onnx")
+    path = ONNX_Export.get_quantized_onnx_model(tiny_model, output_dir)
+    assert os.path.exists(path)
+
+    onnx_embedder = ONNXEmbedder(tiny_model, output_dir, model_path=path)
+    texts = ["hello world", "the quick brown fox jumps over the lazy dog hello world"]
+    quantized = onnx_embedder.create_embeddings(texts)
+    reference = HuggingFaceEmbedder(tiny_model, None).create_embeddings(texts)
+
+    assert isinstance(quantized, np.ndarray) and quantized.dtype == np.float32
+    cosine = (quantized * reference).sum(axis=1) / (
+        np.linalg.norm(quantized, axis=1) * np.linalg.norm(reference, axis=1))
+    assert (cosine > 0.99).all()
@@ -21,28 +21,38 @@ from App_Function_Libraries.RAG.RAG_Library_2 import (
     generate_answer,
     #fetch_relevant_chat_ids,
     #fetch_all_chat_ids,
-    #filter_results_by_keywords,
+    filter_results_by_keywords,
     #extract_media_id_from_result
 )
 
 
 def test_fetch_relevant_media_ids_success(mocker):
-    """Test fetch_relevant_media_ids with valid keywords."""
-    mock_fetch_keywords_for_media = mocker.patch(
-        'App_Function_Libraries.RAG.RAG_Library_2.fetch_keywords_for_media',
-        side_effect=lambda keyword: {
-            'geography': [1, 2],
-            'cities': [2, 3, 4]
-        }.get(keyword, [])
+    """Test fetch_relevant_media_ids resolves all keywords in one lookup."""
+    mock_fetch_media_ids = mocker.patch(
+        'App_Function_Libraries.RAG.RAG_Library_2.fetch_media_ids_for_keywords',
+        return_value=[1, 2, 3, 4]
     )
 
     keywords = ['geography', 'cities']
     result = fetch_relevant_media_ids(keywords)
     assert sorted(result) == [1, 2, 3, 4]
 
-    mock_fetch_keywords_for_media.assert_any_call('geography')
-    mock_fetch_keywords_for_media.assert_any_call('cities')
-    assert mock_fetch_keywords_for_media.call_count == 2
+    mock_fetch_media_ids.assert_called_once_with(keywords)
+
+
+def test_filter_results_by_keywords_fetches_keywords_once(mocker):
+    """Test filter_results_by_keywords looks up the keywords of all results together."""
+    mock_fetch_keywords = mocker.patch(
+        'App_Function_Libraries.RAG.RAG_Library_2.fetch_keywords_for_media_ids',
+        return_value={1: ['Geography'], 2: ['history'], 3: ['cities', 'travel']}
+    )
+    results = [{'content': f'doc {i}', 'metadata': {'media_id': str(i)}} for i in (1, 2, 3)] + \
+        [{'content': 'no metadata', 'metadata': None}]
+
+    filtered = filter_results_by_keywords(results, ['geography', 'cities'])
+
+    assert [result['content'] for result in filtered] == ['doc 1', 'doc 3']
+    mock_fetch_keywords.assert_called_once_with([1, 2, 3])
 
 
 def test_perform_full_text_search_with_relevant_ids(mocker):
@@ -179,13 +189,10 @@ def test_enhanced_rag_pipeline_success(mocker):
         return_value="Generated answer"
     )
 
-    # Mock Ranker
-    mock_ranker = mocker.Mock()
-    mock_ranker.rerank.return_value = [
-        {'id': 0, 'score': 0.9},
-        {'id': 1, 'score': 0.8}
-    ]
-    mocker.patch('App_Function_Libraries.RAG.RAG_Library_2.Ranker', return_value=mock_ranker)
+    # Mock Reranker
+    mock_reranker = mocker.Mock()
+    mock_reranker.rerank.return_value = [(0, 0.9), (1, 0.8)]
+    mocker.patch('App_Function_Libraries.RAG.RAG_Library_2.get_reranker', return_value=mock_reranker)
 
     result = enhanced_rag_pipeline(
         query='test query',
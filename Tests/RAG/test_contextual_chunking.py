@@ -0,0 +1,93 @@
+# tests/test_contextual_chunking.py
+import functools
+import re
+import threading
+
+import pytest
+
+from App_Function_Libraries.DB import Embedding_Cache_DB
+from App_Function_Libraries.RAG import Contextual_Chunking
+from App_Function_Libraries.RAG.Contextual_Chunking import contextualize_chunks, parse_batch_response, \
+    plan_context_batches
+#
+####################################################################################################
+# Test Status:
+# Works as expected - 2026-10-18
+
+@pytest.fixture
+def llm(cache_db, monkeypatch):
+    """Fake summarize() answering batched prompts with one <context> per chunk; records every prompt it gets."""
+    calls = []
+    lock = threading.Lock()
+
+    def fake_summarize(input_data, custom_prompt_arg, api_name, api_key=None, temp=None, system_message=None):
+        with lock:
+            calls.append((input_data, custom_prompt_arg))
+        chunks = re.findall(r'<chunk(?: id="(\d+)")?>\s*(.*?)\s*</chunk>', input_data, re.DOTALL)
+        if len(chunks) == 1 and not chunks[0][0]:
+            return f"about {chunks[0][1]}"
+        return "\n".join(f'<context id="{chunk_id}">about {text}</context>' for chunk_id, text in chunks)
+
+    monkeypatch.setattr(Contextual_Chunking, 'summarize', fake_summarize)
+    monkeypatch.setattr(Contextual_Chunking, 'get_cached_chunk_contexts',
+                        functools.partial(Embedding_Cache_DB.get_cached_chunk_contexts, database=cache_db))
+    monkeypatch.setattr(Contextual_Chunking, 'store_cached_chunk_contexts',
+                        functools.partial(Embedding_Cache_DB.store_cached_chunk_contexts, database=cache_db))
+    return calls
+
+
+def test_batches_respect_window_and_size():
+    batches = plan_context_batches([100] * 10, doc_tokens=1000, context_window=2000, max_batch_size=4)
+    assert batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    # A document that nearly fills the window leaves room for one chunk per prompt
+    assert plan_context_batches([100] * 3, doc_tokens=1900, context_window=2000, max_batch_size=4) == [[0], [1], [2]]
+
+
+def test_parse_batch_response_skips_malformed_ids():
+    response = '<context id="2">second</context> <context id="9">bogus</context> <context id=1>first</context>'
+    assert parse_batch_response(response, 2) == {0: 'first', 1: 'second'}
+
+
+def test_chunks_share_prompts_and_are_cached(llm):
+    chunks = [f"chunk {i}" for i in range(10)]
+    contexts = contextualize_chunks('llama.cpp', "the document", chunks, max_workers=3, batch_size=4,
+                                    context_window=8192, use_cache=True)
+    assert contexts == [f"about chunk {i}" for i in range(10)]
+    assert len(llm) == 3
+    # Every request starts from the same document prompt, so a llama.cpp server can reuse its cached prefix
+    assert len({document for _, document in llm}) == 1
+
+    again = contextualize_chunks('llama.cpp', "the document", chunks + ["chunk new"], batch_size=4,
+                                 context_window=8192, use_cache=True)
+    assert again[-1] == "about chunk new" and again[:10] == contexts
+    assert len(llm) == 4
+
+
+def test_contexts_are_cached_per_model(llm, monkeypatch):
+    configured = {'llama_api': {'model': 'qwen-7b'}}
+    monkeypatch.setattr(Contextual_Chunking, 'load_and_log_configs', lambda: configured)
+    assert Contextual_Chunking.context_cache_model('llama.cpp') == 'llama.cpp:qwen-7b'
+    contextualize_chunks('llama.cpp', "the document", ["chunk a"], use_cache=True)
+    contextualize_chunks('llama.cpp', "the document", ["chunk a"], use_cache=True)
+    assert len(llm) == 1
+
+    configured['llama_api']['model'] = 'llama-3-8b'
+    contextualize_chunks('llama.cpp', "the document", ["chunk a"], use_cache=True)
+    assert len(llm) == 2
+
+
+def test_chunks_missing_from_a_batched_answer_are_asked_alone(llm, monkeypatch):
+    answered = []
+
+    def partial_summarize(input_data, custom_prompt_arg, api_name, api_key=None, temp=None, system_message=None):
+        answered.append(input_data)
+        if 'id="1"' in input_data:
+            return '<context id="1">about a</context>'
+        return "Error: model overloaded" if 'chunk b' in input_data else "about c"
+
+    monkeypatch.setattr(Contextual_Chunking, 'summarize', partial_summarize)
+    contexts = contextualize_chunks('openai', "doc", ["chunk a", "chunk b", "chunk c"], batch_size=3,
+                                    context_window=8192, use_cache=False)
+    # Failures give an empty context rather than an error message embedded into the chunk
+    assert contexts == ["about a", "", "about c"]
+    assert len(answered) == 3
@@ -0,0 +1,61 @@
+# tests/test_hybrid_retrieval.py
+import threading
+import time
+
+from App_Function_Libraries.RAG.Hybrid_Retrieval import hybrid_search, reciprocal_rank_fusion, run_sources
+#
+####################################################################################################
+# Test Status:
+# Works as expected - 2026-10-18
+
+def chunk(media_id, chunk_index, content=None):
+    return {"content": content or f"media {media_id} chunk {chunk_index}",
+            "metadata": {"media_id": str(media_id), "chunk_index": chunk_index}}
+
+
+def test_results_found_by_several_sources_rank_first():
+    vector = [chunk(1, 0), chunk(2, 0), chunk(3, 0)]
+    fts = [chunk(3, 0), chunk(4, 0)]
+    fused = reciprocal_rank_fusion([vector, fts], k=60)
+    assert [result['content'] for result in fused] == \
+        ["media 3 chunk 0", "media 1 chunk 0", "media 2 chunk 0", "media 4 chunk 0"]
+    assert fused[0]['rrf_score'] == 1 / 63 + 1 / 61
+
+
+def test_duplicates_are_merged_by_media_and_chunk_id():
+    # The same chunk with different text (e.g. with and without its contextual summary) is one candidate
+    vector = [chunk(1, 0, "context: media 1 chunk 0"), chunk(1, 1)]
+    fts = [chunk(1, 0), {"content": "whole document"}, {"content": "whole document"}]
+    fused = reciprocal_rank_fusion([vector, fts], limit=10)
+    assert [result['content'] for result in fused] == \
+        ["context: media 1 chunk 0", "media 1 chunk 1", "whole document"]
+    assert len(reciprocal_rank_fusion([vector, fts], limit=2)) == 2
+
+
+def test_sources_run_concurrently_and_late_ones_are_dropped():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def source(results, delay=0.0):
+        def run():
+            # Only passes if all three sources are running at the same time
+            barrier.wait()
+            time.sleep(delay)
+            return results
+        return run
+
+    start = time.time()
+    results = run_sources({
+        "vector": source([chunk(1, 0)]),
+        "fts": source([chunk(2, 0)]),
+        "slow": source([chunk(3, 0)], delay=2),
+    }, timeout=0.5)
+    assert time.time() - start < 1.5
+    assert set(results) == {"vector", "fts"}
+
+
+def test_failing_source_does_not_fail_the_search():
+    def broken():
+        raise RuntimeError("database is locked")
+
+    fused = hybrid_search({"vector": lambda: [chunk(1, 0)], "fts": broken}, timeout=5)
+    assert [result['content'] for result in fused] == ["media 1 chunk 0"]
@@ -0,0 +1,81 @@
+# tests/test_reranker.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from App_Function_Libraries.RAG.Model_Manager import model_manager
+from App_Function_Libraries.RAG.Reranker import Reranker
+#
+####################################################################################################
+# Test Status:
+# Works as expected - 2026-10-18
+
+class FakeCrossEncoder:
+    """Scores a passage by how many query words it contains; records every batch it is asked to score."""
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def predict(self, pairs):
+        with self.lock:
+            self.batches.append([passage for _, passage in pairs])
+        return [sum(word in passage.split() for word in query.split()) for query, passage in pairs]
+
+
+@pytest.fixture
+def reranker(monkeypatch, request):
+    model = FakeCrossEncoder()
+    loads = []
+
+    def fake_load(self):
+        loads.append(self.model_name)
+        return model
+
+    monkeypatch.setattr(Reranker, '_load', fake_load)
+    # A model name per test, so each test registers (and loads) its own model with the shared manager
+    instance = Reranker('cross-encoder', f"fake/{request.node.name}", max_passages=3, cache_size=100)
+    yield instance, model, loads
+    model_manager.unload(instance.manager_key)
+
+
+def test_passages_are_ordered_by_score(reranker):
+    instance, _, loads = reranker
+    ranked = instance.rerank("red fox", ["blue sky", "red fox", "red car"])
+    assert [i for i, _ in ranked] == [1, 2, 0]
+    assert [score for _, score in ranked] == [2.0, 1.0, 0.0]
+    instance.rerank("red fox", ["a fox"])
+    # The model is loaded once and reused between calls
+    assert loads == ["fake/test_passages_are_ordered_by_score"]
+
+
+def test_scores_are_cached_per_query_and_passage(reranker):
+    instance, model, _ = reranker
+    instance.rerank("red fox", ["blue sky", "red fox"])
+    instance.rerank("red fox", ["red fox", "red car"])
+    instance.rerank("blue sky", ["blue sky"])
+    assert model.batches == [["blue sky", "red fox"], ["red car"], ["blue sky"]]
+
+
+def test_passages_beyond_the_cap_keep_their_order(reranker):
+    instance, model, _ = reranker
+    passages = ["p0", "red", "p2", "p3", "red fox"]
+    ranked = instance.rerank("red fox", passages)
+    assert model.batches == [["p0", "red", "p2"]]
+    assert ranked[0] == (1, 1.0)
+    assert ranked[3:] == [(3, None), (4, None)]
+
+
+def test_concurrent_calls_share_one_model(reranker):
+    instance, model, loads = reranker
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda i: instance.rerank(f"query {i}", ["query", "other"]), range(16)))
+    assert all(ranked[0][0] == 0 for ranked in results)
+    assert len(loads) == 1
+
+
+def test_none_backend_keeps_retrieval_order():
+    instance = Reranker('none')
+    assert instance.rerank("query", ["a", "b", "c"]) == [(0, None), (1, None), (2, None)]
+    with pytest.raises(ValueError):
+        Reranker('colbert')
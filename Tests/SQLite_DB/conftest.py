@@ -12,7 +12,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'tldw')))
 print("Current sys.path:", sys.path)
 
-from App_Function_Libraries.DB.SQLite_DB import Database
+from App_Function_Libraries.DB.SQLite_DB import Database, create_tables
 
 from pathlib import Path
 
@@ -111,6 +111,19 @@ def empty_db():
     except PermissionError:
         print(f"Warning: Unable to delete temporary database file: {db_path}")
 
+@pytest.fixture
+def media_db(request):
+    """A media database with the full schema, removed again after the test."""
+    # Database keeps only the file name and always puts it in the Databases directory, so name it after the test
+    database = Database(f"test_{request.node.name}.db")
+    create_tables(database)
+    yield database
+    database.close_all_connections()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(database.db_path + suffix):
+            os.remove(database.db_path + suffix)
+
+
 @pytest.fixture
 def mock_workflows_json(tmp_path):
     workflows_data = {
@@ -0,0 +1,60 @@
+# tests/test_bulk_ingest.py
+from App_Function_Libraries.DB.SQLite_DB import add_media_batch
+#
+####################################################################################################
+# Test Status:
+# Works as expected - 2026-10-18
+
+def make_records(count, prefix='doc'):
+    for i in range(count):
+        yield {
+            'url': f'http://example.com/{prefix}/{i}',
+            'title': f'{prefix} {i}',
+            'media_type': 'document',
+            'content': f'{prefix} content number {i}',
+            'keywords': 'bulk, Shared' if i % 2 else ['bulk', f'{prefix}-{i}'],
+            'author': 'author',
+            'ingestion_date': '2024-01-01',
+        }
+
+
+def test_add_media_batch_writes_all_tables(media_db):
+    results = add_media_batch(make_records(5), batch_size=2, schedule_chunks=False, database=media_db)
+
+    assert [r['action'] for r in results] == ['added'] * 5
+    assert [r['media_id'] for r in results] == [1, 2, 3, 4, 5]
+    assert media_db.execute_query("SELECT COUNT(*) FROM MediaModifications")[0][0] == 5
+    assert media_db.execute_query("SELECT COUNT(*) FROM MediaVersion WHERE version = 1")[0][0] == 5
+    keywords = {row[0] for row in media_db.execute_query("SELECT keyword FROM Keywords")}
+    assert keywords == {'bulk', 'shared', 'doc-0', 'doc-2', 'doc-4'}
+    assert media_db.execute_query(
+        "SELECT COUNT(*) FROM MediaKeywords mk JOIN Keywords k ON k.id = mk.keyword_id WHERE k.keyword = 'bulk'"
+    )[0][0] == 5
+    # media_fts is maintained by triggers, so bulk rows are searchable straight away
+    assert media_db.execute_query("SELECT rowid FROM media_fts WHERE media_fts MATCH 'number'") != []
+
+
+def test_add_media_batch_dedupes_by_hash_and_url(media_db):
+    add_media_batch(make_records(2), schedule_chunks=False, database=media_db)
+
+    records = list(make_records(3))
+    records.append(dict(records[2], url='http://example.com/other'))  # same content as an earlier record
+    records.append({'title': 'bad', 'media_type': 'not-a-type', 'content': 'x'})
+    results = add_media_batch(records, schedule_chunks=False, database=media_db)
+
+    assert [r['action'] for r in results] == ['skipped', 'skipped', 'added', 'duplicate', 'error']
+    assert results[3]['media_id'] == results[2]['media_id'] == 3
+    assert media_db.execute_query("SELECT COUNT(*) FROM Media")[0][0] == 3
+
+
+def test_add_media_batch_overwrite_bumps_version_and_queues_chunking(media_db):
+    add_media_batch(make_records(2), schedule_chunks=False, database=media_db)
+    updated = [dict(record, content=record['content'] + ' revised ' * 20) for record in make_records(2)]
+    results = add_media_batch(updated, overwrite=True, database=media_db)
+
+    assert [r['action'] for r in results] == ['updated', 'updated']
+    assert media_db.execute_query("SELECT media_id, MAX(version) FROM MediaVersion GROUP BY media_id") == [(1, 2), (2, 2)]
+    assert media_db.execute_query("SELECT content FROM Media WHERE id = 1")[0][0].endswith('revised ')
+    # A database other than the main media DB chunks inline, so the jobs have already run
+    assert media_db.execute_query("SELECT status FROM ChunkingJobs") == [('completed',), ('completed',)]
+    assert media_db.execute_query("SELECT COUNT(DISTINCT media_id) FROM MediaChunks")[0][0] == 2
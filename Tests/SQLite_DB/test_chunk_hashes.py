@@ -0,0 +1,59 @@
+# tests/test_chunk_hashes.py
+import pytest
+
+from App_Function_Libraries.DB.SQLite_DB import ChunkingJobQueue, clear_chunk_hashes, compute_chunk_hash, \
+    find_duplicate_chunks, lookup_chunk_embeddings, process_chunks, register_chunk_embeddings
+#
+####################################################################################################
+# Test Status:
+# Works as expected - 2026-10-18
+
+@pytest.fixture
+def hash_db(media_db):
+    with media_db.get_connection() as conn:
+        for i in range(1, 3):
+            conn.execute(
+                "INSERT INTO Media (url, title, type, content, author, ingestion_date) VALUES (?, ?, 'article', ?, ?, ?)",
+                (f'http://example.com/{i}', f'Title {i}', 'Shared intro text. ' * 5 + f'Unique body {i}.', 'author',
+                 '2024-01-01'))
+    return media_db
+
+
+def test_chunk_hash_normalizes_text_and_keys_on_chunking_params():
+    params = {'method': 'words', 'max_size': 100, 'overlap': 0}
+    assert compute_chunk_hash("Hello   world\n", params) == compute_chunk_hash(" Hello world", params)
+    # Options that don't affect chunk text are ignored
+    assert compute_chunk_hash("Hello world", dict(params, file_name='a.txt')) == compute_chunk_hash("Hello world", params)
+    assert compute_chunk_hash("Hello world", dict(params, max_size=200)) != compute_chunk_hash("Hello world", params)
+    assert compute_chunk_hash("Hello world", params) != compute_chunk_hash("hello world", params)
+
+
+def test_chunking_links_identical_chunks_across_media(hash_db):
+    options = {'method': 'words', 'max_size': 15, 'overlap': 0}
+    job_queue = ChunkingJobQueue(hash_db, num_workers=0)
+    job_queue.enqueue(1, 'Title 1', options)
+    job_queue.enqueue(2, 'Title 2', options)
+
+    first_hash = hash_db.execute_query(
+        "SELECT chunk_hash FROM MediaChunks WHERE media_id = 1 ORDER BY id LIMIT 1")[0][0]
+    assert first_hash == compute_chunk_hash('Shared intro text. ' * 4 + 'Shared intro text.', options)
+    assert find_duplicate_chunks(first_hash, database=hash_db) == [(1, '1_chunk_1'), (2, '2_chunk_1')]
+
+    process_chunks(hash_db, [{'text': 'header\nbody', 'raw_text': 'body', 'start_index': 0, 'end_index': 4}], 1,
+                   chunk_params=options)
+    assert hash_db.execute_query("SELECT chunk_hash FROM MediaChunks ORDER BY id DESC LIMIT 1")[0][0] == \
+        compute_chunk_hash('body', options)
+
+
+def test_register_lookup_and_clear_chunk_embeddings(hash_db):
+    register_chunk_embeddings([('h1', '1_chunk_1'), ('h2', '1_chunk_2')], 'openai:small', 'media', database=hash_db)
+    register_chunk_embeddings([('h1', 'other_1')], 'openai:small', 'notes', database=hash_db)
+    register_chunk_embeddings([('h1', 'x')], 'huggingface:model', 'media', database=hash_db)
+    # Re-registering replaces a stale mapping
+    register_chunk_embeddings([('h2', '2_chunk_5')], 'openai:small', 'media', database=hash_db)
+
+    found = lookup_chunk_embeddings(['h1', 'h2', 'h3'], 'openai:small', database=hash_db)
+    assert found == {'h1': {'media': '1_chunk_1', 'notes': 'other_1'}, 'h2': {'media': '2_chunk_5'}}
+
+    assert clear_chunk_hashes('media', database=hash_db) == 3
+    assert lookup_chunk_embeddings(['h1', 'h2'], 'openai:small', database=hash_db) == {'h1': {'notes': 'other_1'}}
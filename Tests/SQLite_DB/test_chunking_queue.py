@@ -0,0 +1,94 @@
+# tests/test_chunking_queue.py
+import pytest
+
+from App_Function_Libraries.DB.SQLite_DB import ChunkingJobQueue
+#
+####################################################################################################
+# Test Status:
+# Works as expected - 2026-10-18
+
+@pytest.fixture
+def chunk_db(media_db):
+    with media_db.get_connection() as conn:
+        for i in range(1, 3):
+            conn.execute(
+                "INSERT INTO Media (url, title, type, content, author, ingestion_date) VALUES (?, ?, 'article', ?, ?, ?)",
+                (f'http://example.com/{i}', f'Title {i}', ' '.join(f'word{n}' for n in range(25)), 'author',
+                 '2024-01-01'))
+    return media_db
+
+
+def test_enqueue_is_durable_and_coalesces(chunk_db):
+    job_queue = ChunkingJobQueue(chunk_db, num_workers=1)
+    options = {'method': 'words', 'max_size': 10, 'overlap': 0}
+    # Insert directly so no worker thread is started
+    with chunk_db.get_connection() as conn:
+        conn.execute("INSERT INTO ChunkingJobs (media_id, media_name) VALUES (1, 'Title 1')")
+
+    # Re-scheduling the same item refreshes its pending job rather than adding another
+    job_queue.num_workers = 0
+    job_id = job_queue.enqueue(1, 'Title 1', options)
+    assert job_id == 1
+
+    rows = chunk_db.execute_query("SELECT status, attempts FROM ChunkingJobs")
+    assert rows == [('completed', 1)]
+    chunks = chunk_db.execute_query(
+        "SELECT chunk_text, start_index, end_index, chunk_id FROM MediaChunks WHERE media_id = 1 ORDER BY id")
+    assert len(chunks) == 3
+    content = chunk_db.execute_query("SELECT content FROM Media WHERE id = 1")[0][0]
+    for text, start, end, _ in chunks:
+        assert content[start:end] == text
+    assert chunks[0][3] == '1_chunk_1'
+    assert chunk_db.execute_query("SELECT chunking_status FROM Media WHERE id = 1")[0][0] == 'completed'
+
+
+def test_interrupted_jobs_resume_on_start(chunk_db):
+    with chunk_db.get_connection() as conn:
+        conn.execute("INSERT INTO ChunkingJobs (media_id, media_name, status, attempts) VALUES (2, 'Title 2', 'processing', 1)")
+
+    job_queue = ChunkingJobQueue(chunk_db, num_workers=2, poll_interval=0.05)
+    job_queue.start()
+    try:
+        for _ in range(100):
+            if job_queue.status()['counts']['completed'] == 1:
+                break
+            job_queue._wakeup.wait(0.05)
+    finally:
+        job_queue.stop()
+
+    status = job_queue.status()
+    assert status['counts'] == {'pending': 0, 'processing': 0, 'completed': 1, 'failed': 0}
+    assert chunk_db.execute_query("SELECT COUNT(*) FROM MediaChunks WHERE media_id = 2")[0][0] > 0
+
+
+def test_start_reclaims_only_expired_leases(chunk_db):
+    with chunk_db.get_connection() as conn:
+        # Another live process is running job 1; the process that claimed job 2 died long ago
+        conn.execute("INSERT INTO ChunkingJobs (media_id, media_name, status, attempts, claimed_by, heartbeat_at) "
+                     "VALUES (1, 'Title 1', 'processing', 1, 'other-host:4242', CURRENT_TIMESTAMP)")
+        conn.execute("INSERT INTO ChunkingJobs (media_id, media_name, status, attempts, claimed_by, heartbeat_at) "
+                     "VALUES (2, 'Title 2', 'processing', 1, 'other-host:1111', '2000-01-01 00:00:00')")
+
+    job_queue = ChunkingJobQueue(chunk_db, num_workers=1, poll_interval=0.05, lease_seconds=60)
+    job_queue.start()
+    try:
+        for _ in range(100):
+            if job_queue.status()['counts']['completed'] == 1:
+                break
+            job_queue._wakeup.wait(0.05)
+    finally:
+        job_queue.stop()
+
+    rows = chunk_db.execute_query("SELECT media_id, status, claimed_by FROM ChunkingJobs ORDER BY id")
+    assert rows == [(1, 'processing', 'other-host:4242'), (2, 'completed', job_queue.worker_id)]
+
+
+def test_failed_job_is_retried_then_marked_failed(chunk_db):
+    job_queue = ChunkingJobQueue(chunk_db, num_workers=0, max_attempts=2)
+    job_queue.enqueue(999, 'Missing media')
+
+    assert chunk_db.execute_query("SELECT status, attempts FROM ChunkingJobs")[0] == ('failed', 2)
+    status = job_queue.status()
+    assert status['counts']['failed'] == 1
+    assert status['jobs'][0]['media_id'] == 999
+    assert 'no longer exists' in status['jobs'][0]['error']
@@ -0,0 +1,67 @@
+# tests/test_db_registry.py
+import pytest
+
+from App_Function_Libraries.DB.DB_Registry import LazyStore, StoreRegistry
+#
+####################################################################################################
+# Test Status:
+# Works as expected - 2026-10-18
+
+class FakeStore:
+    def __init__(self):
+        self.closed = False
+        self.name = 'fake'
+
+    def ping(self):
+        if self.closed:
+            raise RuntimeError("store is closed")
+        return 'pong'
+
+
+@pytest.fixture
+def registry():
+    opened = []
+
+    def opener():
+        store = FakeStore()
+        opened.append(store)
+        return store
+
+    registry = StoreRegistry()
+    registry.register('fake', opener, closer=lambda store: setattr(store, 'closed', True),
+                      health_check=lambda store: store.ping())
+    registry.opened = opened
+    return registry
+
+
+def test_store_opens_once_on_first_use(registry):
+    handle = LazyStore(registry, 'fake')
+    assert not registry.is_open('fake') and registry.opened == []
+
+    assert handle.ping() == 'pong'
+    assert handle.name == 'fake'
+    assert registry.get('fake') is registry.opened[0]
+    assert len(registry.opened) == 1
+
+
+def test_close_and_reopen(registry):
+    first = registry.get('fake')
+    registry.close('fake')
+    assert first.closed and not registry.is_open('fake')
+
+    second = registry.get('fake')
+    assert second is not first and not second.closed
+
+
+def test_health_check_reports_failures(registry):
+    assert registry.health_check(open_closed=False) == {'fake': {'open': False, 'ok': None, 'error': None}}
+    assert registry.health_check() == {'fake': {'open': True, 'ok': True, 'error': None}}
+
+    registry.get('fake').closed = True
+    report = registry.health_check()
+    assert report['fake']['ok'] is False and 'closed' in report['fake']['error']
+
+
+def test_unknown_store_raises(registry):
+    with pytest.raises(KeyError):
+        registry.get('missing')
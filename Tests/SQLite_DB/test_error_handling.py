@@ -39,6 +39,8 @@ def mock_db():
     mock_conn = MagicMock()
     mock_cursor = MagicMock()
     mock_conn.cursor.return_value = mock_cursor
+    # get_connection() is used as a context manager
+    mock_conn.__enter__.return_value = mock_conn
 
     with patch('App_Function_Libraries.DB.DB_Manager.db.get_connection', return_value=mock_conn):
         yield mock_conn, mock_cursor
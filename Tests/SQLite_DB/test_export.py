@@ -0,0 +1,79 @@
+# tests/test_export.py
+import json
+import os
+import sqlite3
+import zipfile
+
+import pytest
+
+from App_Function_Libraries.DB.SQLite_DB import InputError, export_media_library, iter_media_for_export
+#
+####################################################################################################
+# Test Status:
+# Works as expected - 2026-10-18
+
+@pytest.fixture
+def export_db(media_db):
+    with media_db.get_connection() as conn:
+        for i in range(1, 6):
+            conn.execute(
+                "INSERT INTO Media (url, title, type, content, author, ingestion_date) VALUES (?, ?, ?, ?, ?, ?)",
+                (f'http://example.com/{i}', f'Title/{i}', 'video' if i % 2 else 'article', f'content {i}',
+                 'author', f'2024-01-0{i}'))
+        conn.execute("INSERT INTO Keywords (keyword) VALUES ('science')")
+        conn.execute("INSERT INTO MediaKeywords (media_id, keyword_id) VALUES (1, 1), (3, 1), (4, 1)")
+        conn.execute("INSERT INTO MediaModifications (media_id, prompt, summary, modification_date) "
+                     "VALUES (3, 'p', 'summary three', '2024-01-03')")
+    return media_db
+
+
+def test_iter_media_for_export_filters(export_db):
+    items = list(iter_media_for_export(keyword='Science', media_type='video', batch_size=1, database=export_db))
+    assert [item['id'] for item in items] == [1, 3]
+    assert items[1]['summary'] == 'summary three'
+    assert items[1]['keywords'] == 'science'
+
+    items = list(iter_media_for_export(start_date='2024-01-02', end_date='2024-01-04', database=export_db))
+    assert [item['id'] for item in items] == [2, 3, 4]
+
+
+def test_export_jsonl_reports_progress(export_db, tmp_path):
+    output_path = str(tmp_path / "export.jsonl")
+    progress = []
+    result = export_media_library(output_path, 'jsonl', batch_size=2, database=export_db,
+                                  progress_callback=lambda done, total: progress.append((done, total)))
+
+    assert result == {'path': output_path, 'exported': 5, 'total': 5}
+    with open(output_path, encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert [row['id'] for row in rows] == [1, 2, 3, 4, 5]
+    assert rows[0]['keywords'] == ['science']
+    assert progress == [(2, 5), (4, 5), (5, 5)]
+    assert not os.path.exists(output_path + '.partial')
+
+
+def test_export_markdown_zip_and_sqlite_subset(export_db, tmp_path):
+    zip_path = str(tmp_path / "export.zip")
+    result = export_media_library(zip_path, 'markdown_zip', keyword='science', database=export_db)
+    assert result['exported'] == 3
+    with zipfile.ZipFile(zip_path) as zf:
+        names = sorted(zf.namelist())
+        assert names == ['1_Title1.md', '3_Title3.md', '4_Title4.md']
+        assert 'summary three' in zf.read('3_Title3.md').decode('utf-8')
+
+    db_path = str(tmp_path / "subset.db")
+    result = export_media_library(db_path, 'sqlite', media_type='video', batch_size=2, database=export_db)
+    assert result['exported'] == 3
+    conn = sqlite3.connect(db_path)
+    try:
+        assert [row[0] for row in conn.execute("SELECT id FROM Media ORDER BY id")] == [1, 3, 5]
+        assert conn.execute("SELECT COUNT(*) FROM MediaKeywords").fetchone()[0] == 2
+        assert conn.execute("SELECT keyword FROM Keywords").fetchall() == [('science',)]
+        assert conn.execute("SELECT summary FROM MediaModifications").fetchall() == [('summary three',)]
+    finally:
+        conn.close()
+
+
+def test_export_rejects_unknown_format(export_db, tmp_path):
+    with pytest.raises(InputError):
+        export_media_library(str(tmp_path / "export.csv"), 'csv', database=export_db)
@@ -13,6 +13,7 @@ from App_Function_Libraries.DB.SQLite_DB import (
     add_media_with_keywords, ingest_article_to_db, add_keyword, delete_keyword,
     fetch_all_keywords, keywords_browser_interface, display_keywords,
     export_keywords_to_csv, fetch_keywords_for_media, update_keywords_for_media,
+    fetch_keywords_for_media_ids, fetch_media_ids_for_keywords,
     InputError, DatabaseError
 )
 #
@@ -274,6 +275,41 @@ def test_fetch_keywords_for_media(mock_get_connection):
     assert "article" in keywords
 
 
+# Tests for the batched keyword lookups
+def _add_tagged_media(title, keywords):
+    media_id, _ = add_media_with_keywords(
+        url=f"http://example.com/{title}",
+        title=title,
+        media_type="article",
+        content=f"The {title} article content.",
+        keywords=keywords,
+        prompt="Test prompt",
+        summary="Test summary",
+        transcription_model=None,
+        author="Test Author",
+        ingestion_date="2023-06-01"
+    )
+    return media_id
+
+
+def test_fetch_keywords_for_media_ids(mock_get_connection):
+    first = _add_tagged_media("first", "test,article")
+    second = _add_tagged_media("second", "other")
+    keywords_by_media = fetch_keywords_for_media_ids([first, str(second), 9999])
+    assert sorted(keywords_by_media[first]) == ["article", "test"]
+    assert keywords_by_media[second] == ["other"]
+    assert 9999 not in keywords_by_media
+    assert fetch_keywords_for_media_ids([]) == {}
+
+
+def test_fetch_media_ids_for_keywords(mock_get_connection):
+    first = _add_tagged_media("first", "test,article")
+    second = _add_tagged_media("second", "other")
+    _add_tagged_media("third", "unrelated")
+    assert fetch_media_ids_for_keywords([" Test", "other", "missing"]) == sorted([first, second])
+    assert fetch_media_ids_for_keywords([]) == []
+
+
 # Tests for update_keywords_for_media
 def test_update_keywords_for_media(mock_get_connection):
     media_id, _ = add_media_with_keywords(
@@ -0,0 +1,118 @@
+# tests/test_migrations.py
+import os
+import sqlite3
+from contextlib import contextmanager
+
+import pytest
+
+from App_Function_Libraries.DB.DB_Migrations import Migration, MigrationError, get_schema_version, run_migrations, \
+    split_sql_script, sql_migration
+from App_Function_Libraries.DB.SQLite_DB import Database, migrate_media_db
+#
+####################################################################################################
+# Test Status:
+# Works as expected - 2026-10-18
+
+@pytest.fixture
+def connect(tmp_path):
+    db_path = str(tmp_path / "test_migrations.db")
+
+    @contextmanager
+    def _connect():
+        conn = sqlite3.connect(db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+    return _connect
+
+
+def test_migrations_apply_once_and_record_version(connect):
+    calls = []
+
+    def add_notes(conn):
+        calls.append(2)
+        conn.execute("ALTER TABLE Items ADD COLUMN notes TEXT")
+
+    migrations = [
+        Migration(1, "baseline", sql_migration("CREATE TABLE Items (id INTEGER PRIMARY KEY, name TEXT);")),
+        Migration(2, "notes column", add_notes),
+    ]
+    assert run_migrations(connect, migrations, 'test') == 2
+    assert run_migrations(connect, migrations, 'test') == 2
+    assert calls == [2]
+    with connect() as conn:
+        assert get_schema_version(conn) == 2
+        assert [row[1] for row in conn.execute("PRAGMA table_info(Items)")] == ['id', 'name', 'notes']
+
+
+def test_failed_migration_rolls_back(connect):
+    def broken(conn):
+        conn.execute("CREATE TABLE Partial (id INTEGER)")
+        raise RuntimeError("boom")
+
+    migrations = [
+        Migration(1, "baseline", sql_migration("CREATE TABLE Items (id INTEGER PRIMARY KEY);")),
+        Migration(2, "broken", broken),
+    ]
+    with pytest.raises(MigrationError):
+        run_migrations(connect, migrations, 'test')
+    with connect() as conn:
+        assert get_schema_version(conn) == 1
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert 'Items' in tables and 'Partial' not in tables
+
+
+def test_split_sql_script_keeps_triggers_intact():
+    script = """
+    -- comment
+    CREATE TABLE a (x TEXT);
+    CREATE TRIGGER a_ai AFTER INSERT ON a BEGIN
+        UPDATE a SET x = 'y';
+        DELETE FROM a WHERE x IS NULL;
+    END;
+    CREATE INDEX idx_a ON a(x);
+    """
+    statements = split_sql_script(script)
+    assert len(statements) == 3
+    assert statements[1].startswith("CREATE TRIGGER") and statements[1].endswith("END;")
+
+
+def test_migrate_media_db_upgrades_legacy_schema(tmp_path):
+    database = Database(str(tmp_path / "legacy_media.db"))
+    db_path = database.db_path
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE Media (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT, title TEXT NOT NULL, type TEXT NOT NULL,
+                            content TEXT, author TEXT, ingestion_date TEXT, transcription_model TEXT,
+                            is_trash BOOLEAN DEFAULT 0, trash_date DATETIME);
+        CREATE TABLE MediaChunks (id INTEGER PRIMARY KEY AUTOINCREMENT, media_id INTEGER, chunk_text TEXT,
+                                  start_index INTEGER, end_index INTEGER);
+        CREATE TABLE ChunkingJobs (id INTEGER PRIMARY KEY AUTOINCREMENT, media_id INTEGER NOT NULL, media_name TEXT,
+                                   chunk_options TEXT, status TEXT NOT NULL DEFAULT 'pending',
+                                   attempts INTEGER NOT NULL DEFAULT 0, error TEXT,
+                                   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                                   updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        INSERT INTO Media (url, title, type, content) VALUES ('http://example.com', 'Old', 'article', 'kept');
+    """)
+    conn.close()
+
+    try:
+        assert migrate_media_db(database) == 2
+        assert migrate_media_db(database) == 2
+        with database.get_connection() as conn:
+            media_columns = [row[1] for row in conn.execute("PRAGMA table_info(Media)")]
+            chunk_columns = [row[1] for row in conn.execute("PRAGMA table_info(MediaChunks)")]
+            job_columns = [row[1] for row in conn.execute("PRAGMA table_info(ChunkingJobs)")]
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == 2
+        assert 'content_hash' in media_columns and 'chunking_status' in media_columns
+        assert 'chunk_id' in chunk_columns and 'chunk_hash' in chunk_columns
+        assert 'claimed_by' in job_columns and 'heartbeat_at' in job_columns
+        indexes = {row[0] for row in database.execute_query("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert 'idx_mediachunks_chunk_hash' in indexes
+        assert database.execute_query("SELECT content FROM Media")[0][0] == 'kept'
+    finally:
+        database.close_all_connections()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
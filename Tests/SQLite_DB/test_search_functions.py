@@ -1,4 +1,5 @@
 # tests/test_search_functions.py
+import os
 import pytest
 import sqlite3
 from unittest.mock import patch, MagicMock
@@ -54,9 +55,10 @@ def test_search_media_db(mock_db):
             # Verify SQL query
             actual_query = cursor.execute.call_args[0][0]
             actual_params = cursor.execute.call_args[0][1]
-            assert 'SELECT DISTINCT Media.id, Media.url, Media.title' in actual_query
-            assert 'WHERE Media.title LIKE ?' in actual_query
-            assert '%Test%' in actual_params
+            assert 'SELECT Media.id, Media.url, Media.title' in actual_query
+            assert 'media_fts MATCH ?' in actual_query
+            assert 'bm25(media_fts)' in actual_query
+            assert '{title} : ("Test"*)' in actual_params
 
 
 def test_search_media_db_with_keywords(mock_db):
@@ -77,7 +79,7 @@ def test_search_media_db_with_keywords(mock_db):
             assert len(results) == 1
             actual_query = cursor.execute.call_args[0][0]
             actual_params = cursor.execute.call_args[0][1]
-            assert 'EXISTS (SELECT 1 FROM MediaKeywords mk JOIN Keywords k ON mk.keyword_id = k.id' in actual_query
+            assert 'Media.id IN (SELECT mk.media_id FROM MediaKeywords mk JOIN Keywords k ON mk.keyword_id = k.id' in actual_query
             assert '%keyword1%' in actual_params
             assert '%keyword2%' in actual_params
 
@@ -144,6 +146,66 @@ def test_search_media_database_error(mock_db):
             assert str(exc_info.value) == "Error searching media database: Test database error"
 
 
+@pytest.fixture
+def populated_media_db(media_db):
+    with media_db.get_connection() as conn:
+        for i in range(1, 7):
+            conn.execute(
+                "INSERT INTO Media (url, title, type, content, author, ingestion_date) VALUES (?, ?, 'article', ?, ?, ?)",
+                (f'http://example.com/{i}', f'Title {i}', 'apple ' * i + 'pie', f'author{i}', '2024-01-01'))
+    return media_db
+
+
+def test_search_media_fts_ranks_and_pages_with_cursor(populated_media_db):
+    from App_Function_Libraries.DB.SQLite_DB import search_media_fts
+    with populated_media_db.get_connection() as conn:
+        all_results, _ = search_media_fts('apple', ['content'], limit=10, connection=conn)
+        assert [r['id'] for r in all_results] == [6, 5, 4, 3, 2, 1]  # bm25 favours the densest match
+
+        page_1, cursor = search_media_fts('apple', ['content'], limit=4, include_snippets=True, connection=conn)
+        page_2, last_cursor = search_media_fts('apple', ['content'], limit=4, after=cursor, connection=conn)
+        assert [r['id'] for r in page_1 + page_2] == [r['id'] for r in all_results]
+        assert last_cursor is None
+        assert '<b>apple</b>' in page_1[0]['snippet']
+
+
+def test_search_media_fts_pages_newest_first_without_query(populated_media_db):
+    from App_Function_Libraries.DB.SQLite_DB import search_media_fts
+    with populated_media_db.get_connection() as conn:
+        conn.execute("UPDATE Media SET ingestion_date = '2024-02-01' WHERE id IN (2, 4)")
+        conn.execute("UPDATE Media SET ingestion_date = NULL WHERE id = 5")
+
+        pages, cursor = [], None
+        for _ in range(4):
+            page, cursor = search_media_fts('', limit=4, after=cursor, connection=conn)
+            pages.append([r['id'] for r in page])
+            if cursor is None:
+                break
+        # Newest first, ties by id descending, undated media last
+        assert pages == [[4, 2, 6, 3], [1, 5]]
+        assert cursor is None
+
+
+def test_search_media_db_like_fallback_for_unindexed_fields(populated_media_db):
+    from App_Function_Libraries.DB.SQLite_DB import search_media_db as sqlite_search_media_db
+    with populated_media_db.get_connection() as conn:
+        results = sqlite_search_media_db('author3', ['title', 'author'], '', connection=conn)
+    assert [row[0] for row in results] == [3]
+
+
+def test_search_media_for_rag_filters_inside_the_query(populated_media_db):
+    from App_Function_Libraries.DB.SQLite_DB import search_media_fts, search_media_for_rag
+    with populated_media_db.get_connection() as conn:
+        results, _ = search_media_fts('apple', ['content'], limit=2, media_ids=[1, 3, 5], connection=conn)
+        # The limit applies to the relevant media only
+        assert [r['id'] for r in results] == [5, 3]
+
+        rag_results = search_media_for_rag('apple', 10, ['2', '4'], connection=conn)
+        assert [r['metadata']['media_id'] for r in rag_results] == ['4', '2']
+        assert rag_results[0]['content'] == 'apple ' * 4 + 'pie'
+        assert search_media_for_rag('apple', 10, [], connection=conn) == []
+
+
 def test_search_media_db_invalid_page():
     with pytest.raises(ValueError, match="Page number must be 1 or greater."):
         search_media_db('Test', ['title'], '', page=0, results_per_page=10)
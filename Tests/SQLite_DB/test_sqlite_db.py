@@ -17,7 +17,7 @@ def db():
     # This fixture creates a single database for all tests
     database = Database('test.db')
     yield database
-    database.close_connection()
+    database.close_all_connections()
 
     # Clean up the database file after all tests
     db_path = Utils.get_database_path('test.db')
@@ -119,6 +119,37 @@ def test_create_tables(db):
 
 
 
+def test_media_fts_migrates_to_external_content(db):
+    from App_Function_Libraries.DB.SQLite_DB import media_fts_maintenance
+    # Pre-migration layout: a standalone media_fts holding its own copy of the content
+    db.execute_query("CREATE TABLE Media (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT, title TEXT NOT NULL, "
+                     "type TEXT NOT NULL, content TEXT, author TEXT, ingestion_date TEXT, is_trash BOOLEAN DEFAULT 0, "
+                     "content_hash TEXT UNIQUE)")
+    db.execute_query("CREATE VIRTUAL TABLE media_fts USING fts5(title, content)")
+    db.execute_query("INSERT INTO Media (title, type, content) VALUES ('Old Title', 'text', 'legacy transcript')")
+    db.execute_query("INSERT INTO media_fts (rowid, title, content) VALUES (1, 'Old Title', 'legacy transcript')")
+
+    create_tables(db)
+
+    fts_sql = db.execute_query("SELECT sql FROM sqlite_master WHERE name = 'media_fts'")[0][0]
+    assert "content='Media'" in fts_sql
+    match = "SELECT rowid FROM media_fts WHERE media_fts MATCH ?"
+    assert db.execute_query(match, ('legacy',)) == [(1,)]
+
+    # Triggers keep the index in sync from here on
+    db.execute_query("UPDATE Media SET content = 'fresh transcript' WHERE id = 1")
+    assert db.execute_query(match, ('legacy',)) == []
+    assert db.execute_query(match, ('fresh',)) == [(1,)]
+    db.execute_query("INSERT INTO Media (title, type, content) VALUES ('New', 'text', 'fresh words')")
+    db.execute_query("DELETE FROM Media WHERE id = 1")
+    assert db.execute_query(match, ('fresh',)) == [(2,)]
+
+    media_fts_maintenance('rebuild', database=db)
+    media_fts_maintenance('optimize', database=db)
+    assert db.execute_query("INSERT INTO media_fts(media_fts, rank) VALUES ('integrity-check', 1)") is not None
+    assert db.execute_query(match, ('fresh',)) == [(2,)]
+
+
 def test_multiple_connections(db):
     def worker():
         with db.get_connection() as conn:
@@ -132,6 +163,56 @@ def test_multiple_connections(db):
         t.join()
     # If this test completes without errors, it means multiple threads could use the database simultaneously
 
+def test_connection_pragmas(db):
+    with db.get_connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == 'wal'
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+
+
+def test_concurrent_readers_and_writers(db):
+    db.execute_query("CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)")
+    errors = []
+
+    def writer(n):
+        try:
+            for i in range(20):
+                db.execute_query("INSERT INTO test (name) VALUES (?)", (f"w{n}_{i}",))
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            for _ in range(20):
+                db.execute_query("SELECT COUNT(*) FROM test")
+        except Exception as e:
+            errors.append(e)
+
+    import threading
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    threads += [threading.Thread(target=reader) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert db.execute_query("SELECT COUNT(*) FROM test")[0][0] == 80
+
+
+def test_nested_transaction_joins_outer(db):
+    db.execute_query("CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)")
+    with pytest.raises(Exception):
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO test (name) VALUES (?)", ('outer',))
+            with db.transaction() as inner:
+                inner.execute("INSERT INTO test (name) VALUES (?)", ('inner',))
+            # Writes through execute_query also join the open transaction
+            db.execute_query("INSERT INTO test (name) VALUES (?)", ('query',))
+            raise Exception("Simulated error")
+
+    assert db.execute_query("SELECT COUNT(*) FROM test")[0][0] == 0
+
 # Add this new test to ensure connections are properly closed
 def test_connection_closure(db):
     with db.get_connection() as conn:
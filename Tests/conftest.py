@@ -0,0 +1,22 @@
+# Tests/conftest.py
+# Fixtures shared by more than one test suite
+import os
+
+import pytest
+
+from App_Function_Libraries.DB import Embedding_Cache_DB
+from App_Function_Libraries.DB.DB_Migrations import run_migrations
+from App_Function_Libraries.DB.SQLite_DB import Database
+
+
+@pytest.fixture
+def cache_db(request):
+    """An embedding cache database (embeddings and chunk contexts), removed again after the test."""
+    # Database keeps only the file name and always puts it in the Databases directory, so name it after the test
+    database = Database(f"test_{request.node.name}.db")
+    run_migrations(database.get_connection, Embedding_Cache_DB.MIGRATIONS, 'embedding_cache')
+    yield database
+    database.close_all_connections()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(database.db_path + suffix):
+            os.remove(database.db_path + suffix)
@@ -28,7 +28,7 @@ from App_Function_Libraries.Summarization.Summarization_General_Lib import summa
     summarize_with_cohere, summarize_with_groq, perform_transcription, perform_summarization
 from App_Function_Libraries.Audio.Audio_Transcription_Lib import speech_to_text
 from App_Function_Libraries.Local_File_Processing_Lib import read_paths_from_file, process_local_file
-from App_Function_Libraries.DB.DB_Manager import add_media_to_database
+from App_Function_Libraries.DB.DB_Manager import add_media_to_database, media_fts_maintenance, rebuild_all_fts_indexes
 from App_Function_Libraries.Utils.System_Checks_Lib import cuda_check, platform_check, check_ffmpeg
 from App_Function_Libraries.Utils.Utils import load_and_log_configs, create_download_directory, \
     extract_text_from_segments, cleanup_downloads, logging
@@ -762,6 +762,9 @@ Sample commands:
     parser.add_argument('--text_title', type=str, help='Title for the text file being ingested')
     parser.add_argument('--text_author', type=str, help='Author of the text file being ingested')
     parser.add_argument('--diarize', action='store_true', help='Enable speaker diarization')
+    parser.add_argument('--fts_maintenance', choices=['optimize', 'rebuild'],
+                        help='Optimize the media full-text search index, or rebuild the full-text indexes of every '
+                             'database (e.g. after restoring a backup), then exit')
     # parser.add_argument('--offload', type=int, default=20, help='Numbers of layers to offload to GPU for Llamafile usage')
     # parser.add_argument('-o', '--output_path', type=str, help='Path to save the output file')
 
@@ -818,6 +821,14 @@ Sample commands:
     local_llm = args.local_llm
     logging.info(f'Local LLM flag: {local_llm}')
 
+    if args.fts_maintenance == 'rebuild':
+        for message in rebuild_all_fts_indexes():
+            print(message)
+        sys.exit(0)
+    elif args.fts_maintenance:
+        print(media_fts_maintenance(args.fts_maintenance))
+        sys.exit(0)
+
     # Check if the user wants to ingest a text file (singular or multiple from a folder)
     if args.input_path is not None:
         if os.path.isdir(args.input_path) and args.ingest_text_file: